@@ -9,9 +9,12 @@ Two authorization modes:
 """
 
 import asyncio
+import dataclasses
 import json
 import logging
 import os
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -25,6 +28,11 @@ NO_PROXY_VALUE = "localhost,127.0.0.1,192.168.0.0/16,10.0.0.0/8,172.16.0.0/12,ho
 # Path where credentials file should be stored
 CREDENTIALS_PATH = "/root/.claude/.credentials.json"
 
+# Per-user settings cache: every prompt reads settings several times
+# (model, env, auth mode, language), all served from memory when warm
+SETTINGS_CACHE_SIZE = 1024
+SETTINGS_CACHE_TTL = 300  # seconds
+
 
 class AuthMode(str, Enum):
     """Authorization mode"""
@@ -155,14 +163,71 @@ class AccountService:
     - Building environment variables for each mode
     """
 
-    def __init__(self, repository: "SQLiteAccountRepository", proxy_service: "ProxyService" = None):
+    def __init__(
+        self,
+        repository: "SQLiteAccountRepository",
+        proxy_service: "ProxyService" = None,
+        cache_size: int = SETTINGS_CACHE_SIZE,
+        cache_ttl: float = SETTINGS_CACHE_TTL,
+    ):
         self.repository = repository
         self.proxy_service = proxy_service
         self._upload_sessions: dict[int, asyncio.Event] = {}
 
+        # user_id -> (expires_at, settings or None if the user has no row)
+        self._settings_cache: OrderedDict[int, tuple[float, Optional[AccountSettings]]] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ==================== Settings cache ====================
+
+    async def _find_settings(self, user_id: int) -> Optional[AccountSettings]:
+        """Read-through lookup; returns a copy callers may modify"""
+        entry = self._settings_cache.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._settings_cache.move_to_end(user_id)
+            self.cache_hits += 1
+            settings = entry[1]
+        else:
+            self.cache_misses += 1
+            settings = await self.repository.find_by_user_id(user_id)
+            self._cache_settings(user_id, settings)
+        return dataclasses.replace(settings) if settings else None
+
+    def _cache_settings(self, user_id: int, settings: Optional[AccountSettings]) -> None:
+        stored = dataclasses.replace(settings) if settings else None
+        self._settings_cache[user_id] = (time.monotonic() + self._cache_ttl, stored)
+        self._settings_cache.move_to_end(user_id)
+        while len(self._settings_cache) > self._cache_size:
+            self._settings_cache.popitem(last=False)
+
+    def invalidate_settings(self, user_id: int) -> None:
+        """Drop cached settings (after writes that bypass this service)"""
+        self._settings_cache.pop(user_id, None)
+
+    def get_cache_stats(self) -> dict:
+        """Settings cache counters"""
+        return {
+            "size": len(self._settings_cache),
+            "max_size": self._cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+        }
+
+    async def _save(self, settings: AccountSettings) -> None:
+        """Save settings and write them through to the cache"""
+        try:
+            await self.repository.save(settings)
+        except Exception:
+            self.invalidate_settings(settings.user_id)
+            raise
+        self._cache_settings(settings.user_id, settings)
+
     async def get_settings(self, user_id: int) -> AccountSettings:
         """Get account settings for user, creating default if not exists"""
-        settings = await self.repository.find_by_user_id(user_id)
+        settings = await self._find_settings(user_id)
         if not settings:
             settings = AccountSettings(
                 user_id=user_id,
@@ -170,7 +235,7 @@ class AccountService:
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
             )
-            await self.repository.save(settings)
+            await self._save(settings)
         return settings
 
     async def get_auth_mode(self, user_id: int) -> AuthMode:
@@ -202,7 +267,7 @@ class AccountService:
         settings = await self.get_settings(user_id)
         settings.auth_mode = mode
         settings.updated_at = datetime.now()
-        await self.repository.save(settings)
+        await self._save(settings)
         logger.info(f"[{user_id}] Auth mode set to: {mode.value}")
         return True, settings, None
 
@@ -295,7 +360,7 @@ class AccountService:
         settings = await self.get_settings(user_id)
         settings.model = model
         settings.updated_at = datetime.now()
-        await self.repository.save(settings)
+        await self._save(settings)
         logger.info(f"[{user_id}] Model set to: {model or 'default'}")
         return settings
 
@@ -306,8 +371,8 @@ class AccountService:
         Returns:
             Language code (ru, en, zh). Defaults to 'ru'.
         """
-        lang = await self.repository.get_language(user_id)
-        return lang or "ru"
+        settings = await self._find_settings(user_id)
+        return (settings.language if settings else None) or "ru"
 
     async def set_user_language(self, user_id: int, language: str) -> None:
         """
@@ -322,6 +387,7 @@ class AccountService:
             language = "ru"
 
         await self.repository.set_language(user_id, language)
+        self.invalidate_settings(user_id)
         logger.info(f"[{user_id}] Language set to: {language}")
 
     async def get_available_models(self, user_id: int) -> list[dict]:
@@ -411,7 +477,7 @@ class AccountService:
         settings.local_model_config = config
         settings.model = config.model_name
         settings.updated_at = datetime.now()
-        await self.repository.save(settings)
+        await self._save(settings)
         logger.info(f"[{user_id}] Set local model: {config.name} ({config.base_url})")
         return settings
 
@@ -438,7 +504,7 @@ class AccountService:
         settings = await self.get_settings(user_id)
         settings.zai_api_key = api_key
         settings.updated_at = datetime.now()
-        await self.repository.save(settings)
+        await self._save(settings)
 
         logger.info(f"[{user_id}] z.ai API key saved successfully")
         return True, "✅ API ключ z.ai сохранён и проверен!", settings
@@ -459,7 +525,7 @@ class AccountService:
 
         settings.zai_api_key = None
         settings.updated_at = datetime.now()
-        await self.repository.save(settings)
+        await self._save(settings)
 
         logger.info(f"[{user_id}] z.ai API key deleted")
         return True, "✅ API ключ удалён"
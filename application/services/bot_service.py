@@ -1,5 +1,7 @@
 import logging
+import time
 import uuid
+from collections import OrderedDict
 from typing import Optional, List, Dict
 from datetime import datetime
 from domain.entities.user import User
@@ -18,6 +20,11 @@ from shared.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# authorize_user runs for every update and button press; results (including
+# "not authorized") are cached briefly and dropped when the user changes
+AUTH_CACHE_TTL = 30.0  # seconds
+AUTH_CACHE_SIZE = 4096
+
 
 class BotService:
     """Application service for bot operations"""
@@ -28,7 +35,8 @@ class BotService:
         session_repository: SessionRepository,
         command_repository: CommandRepository,
         ai_service: ClaudeAIService = None,
-        command_executor: SSHCommandExecutor = None
+        command_executor: SSHCommandExecutor = None,
+        auth_cache_ttl: float = AUTH_CACHE_TTL
     ):
         self.user_repository = user_repository
         self.session_repository = session_repository
@@ -36,6 +44,16 @@ class BotService:
         self.ai_service = ai_service  # Now optional - Claude Code proxy handles main AI interactions
         self.command_executor = command_executor or SSHCommandExecutor()
 
+        # user_id -> (expires_at, authorized user or None)
+        self._auth_cache: OrderedDict[int, tuple[float, Optional[User]]] = OrderedDict()
+        self._auth_cache_ttl = auth_cache_ttl
+        # Bumped on invalidation, so a lookup that raced with a user
+        # change doesn't cache the old result
+        self._auth_generations: Dict[int, int] = {}
+        self.auth_cache_hits = 0
+        self.auth_cache_misses = 0
+        user_repository.add_change_listener(self.invalidate_authorization)
+
     # User management
     def is_user_allowed(self, user_id: int) -> bool:
         """Check if user is in the whitelist (ALLOWED_USER_ID)"""
@@ -85,10 +103,29 @@ class BotService:
 
     async def authorize_user(self, user_id: int) -> Optional[User]:
         """Check if user is authorized to use the bot"""
+        entry = self._auth_cache.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._auth_cache.move_to_end(user_id)
+            self.auth_cache_hits += 1
+            return entry[1]
+
+        self.auth_cache_misses += 1
+        generation = self._auth_generations.get(user_id, 0)
         user = await self.user_repository.find_by_id(UserId.from_int(user_id))
-        if user and user.is_active and user.can_execute_commands():
-            return user
-        return None
+        authorized = user if user and user.is_active and user.can_execute_commands() else None
+
+        if self._auth_generations.get(user_id, 0) == generation:
+            self._auth_cache[user_id] = (time.monotonic() + self._auth_cache_ttl, authorized)
+            self._auth_cache.move_to_end(user_id)
+            while len(self._auth_cache) > AUTH_CACHE_SIZE:
+                self._auth_cache.popitem(last=False)
+        return authorized
+
+    def invalidate_authorization(self, user_id) -> None:
+        """Drop the cached authorization for a user (int or UserId)"""
+        uid = int(user_id)
+        self._auth_cache.pop(uid, None)
+        self._auth_generations[uid] = self._auth_generations.get(uid, 0) + 1
 
     # Session management
     async def get_or_create_session(self, user_id: int) -> Session:
@@ -263,6 +300,7 @@ class BotService:
         metrics = await monitor.get_metrics()
         return {
             "metrics": metrics.to_dict(),
+            "history": monitor.get_history(),
             "top_processes": await monitor.get_top_processes(limit=5),
             "alerts": await monitor.check_alerts(metrics)
         }
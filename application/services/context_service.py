@@ -5,17 +5,40 @@ Application service for managing project contexts (sessions).
 Like Cursor IDE's context/conversation management.
 """
 
+import asyncio
+import contextlib
+import hashlib
 import logging
+import os
 import re
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Dict
 
-from domain.entities.project_context import ProjectContext, ContextMessage, ContextVariable
+from domain.entities.project_context import (
+    ProjectContext,
+    ContextMessage,
+    ContextMessagePage,
+    ContextVariable,
+    build_variables_prompt,
+)
+from domain.entities.message_search import MessageSearchPage
 from domain.value_objects.user_id import UserId
 from domain.repositories.project_context_repository import IProjectContextRepository
+from domain.repositories.message_search_repository import IMessageSearchRepository
 
 logger = logging.getLogger(__name__)
 
+# Variables blocks kept for get_enriched_prompt, one per (context, user)
+VARIABLES_BLOCK_CACHE_SIZE = 512
+# Rough characters per token for the variable value budget
+CHARS_PER_TOKEN = 4
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 class ContextService:
     """
@@ -28,8 +51,33 @@ class ContextService:
     - Claude Code session continuation
     """
 
-    def __init__(self, context_repository: IProjectContextRepository):
+    def __init__(
+        self,
+        context_repository: IProjectContextRepository,
+        search_repository: Optional[IMessageSearchRepository] = None,
+        variable_token_budget: Optional[int] = None
+    ):
         self.context_repository = context_repository
+        self.search_repository = search_repository
+        # Max tokens per variable value in enriched prompts (None = no limit)
+        self.variable_token_budget = variable_token_budget
+
+        # (context_id, user_id) -> (versions, block, chars saved by the budget).
+        # Variable writes bump the context's or user's version, so a block
+        # built from older variables is never served, even if its build
+        # raced with the write.
+        self._variables_blocks: OrderedDict[tuple, tuple[tuple[int, int], str, int]] = OrderedDict()
+        self._context_versions: Dict[str, int] = {}
+        self._global_versions: Dict[int, int] = {}
+        self._prompt_cache_hits = 0
+        self._prompt_cache_misses = 0
+        self._prompt_chars_saved = 0
+
+        # Debounced CLAUDE.md sync: pending users, their sync tasks, and
+        # one lock per CLAUDE.md file
+        self._claude_md_dirty: Dict[int, UserId] = {}
+        self._claude_md_tasks: Dict[int, asyncio.Task] = {}
+        self._claude_md_locks: Dict[str, asyncio.Lock] = {}
 
     async def get_current(self, project_id: str) -> Optional[ProjectContext]:
         """
@@ -149,6 +197,7 @@ class ContextService:
         """
         result = await self.context_repository.delete(context_id)
         if result:
+            self._invalidate_context_variables(context_id)
             logger.info(f"Deleted context {context_id}")
         return result
 
@@ -197,6 +246,60 @@ class ContextService:
         """
         return await self.context_repository.get_messages(context_id, limit)
 
+    async def get_messages_page(
+        self,
+        context_id: str,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        headers_only: bool = False
+    ) -> ContextMessagePage:
+        """
+        Get one page of message history, walking backwards in time.
+
+        Pass page.next_cursor as before_id to get the previous page.
+        Cost does not grow with how deep the page is.
+
+        Args:
+            context_id: Context ID
+            limit: Max messages per page
+            before_id: Cursor from the previous page (None = newest page)
+            headers_only: Skip content and tool_result (for list views)
+
+        Returns:
+            ContextMessagePage with messages oldest first
+        """
+        return await self.context_repository.get_messages_page(
+            context_id, limit, before_id, headers_only
+        )
+
+    async def search_messages(
+        self,
+        user_id: UserId,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> MessageSearchPage:
+        """
+        Full-text search over the user's conversation history.
+
+        Searches project context messages and bot session messages,
+        ranked by bm25, with matches highlighted in each hit's snippet.
+
+        Args:
+            user_id: User whose messages to search
+            query: Free-text query
+            project_id: Only search this project's contexts
+            limit: Max hits per page
+            offset: Offset of the page (page.next_offset of the previous one)
+
+        Returns:
+            MessageSearchPage, empty if search is not configured
+        """
+        if not self.search_repository:
+            return MessageSearchPage(hits=[])
+        return await self.search_repository.search(user_id, query, project_id, limit, offset)
+
     async def clear_messages(self, context_id: str) -> None:
         """
         Clear all messages in a context.
@@ -272,6 +375,7 @@ class ContextService:
             description: Description for AI to understand how to use this variable
         """
         await self.context_repository.set_variable(context_id, name, value, description)
+        self._invalidate_context_variables(context_id)
         logger.info(f"Set variable '{name}' for context {context_id}")
 
     async def delete_variable(self, context_id: str, name: str) -> bool:
@@ -287,6 +391,7 @@ class ContextService:
         """
         result = await self.context_repository.delete_variable(context_id, name)
         if result:
+            self._invalidate_context_variables(context_id)
             logger.info(f"Deleted variable '{name}' from context {context_id}")
         return result
 
@@ -328,6 +433,10 @@ class ContextService:
         so Claude can use them automatically. Global variables are
         inherited and can be overridden by context-specific variables.
 
+        The variables block is cached per (context, user) until one of
+        their variables changes. With a variable token budget, longer
+        values are truncated in the prompt.
+
         Args:
             context_id: Context ID
             user_prompt: Original user prompt
@@ -336,25 +445,73 @@ class ContextService:
         Returns:
             Enriched prompt with context variables prepended
         """
+        variables_block = await self._get_variables_block(context_id, user_id)
+        if variables_block:
+            return f"{variables_block}\n\n---\n\n{user_prompt}"
+
+        return user_prompt
+
+    async def _get_variables_block(self, context_id: str, user_id: Optional[UserId]) -> str:
+        """Get the variables block for a prompt, building it on cache miss"""
+        uid = int(user_id) if user_id else None
+        key = (context_id, uid)
+        versions = (
+            self._context_versions.get(context_id, 0),
+            self._global_versions.get(uid, 0) if uid is not None else 0,
+        )
+
+        entry = self._variables_blocks.get(key)
+        if entry is not None and entry[0] == versions:
+            self._variables_blocks.move_to_end(key)
+            self._prompt_cache_hits += 1
+            self._prompt_chars_saved += entry[2]
+            return entry[1]
+
+        self._prompt_cache_misses += 1
         context = await self.context_repository.find_by_id(context_id)
         if not context:
-            return user_prompt
+            return ""
 
-        # Get merged variables (global + context-specific)
+        # Global variables, overridden by context-specific ones
+        # (find_by_id already loaded the context's variables)
+        variables = dict(context.variables)
         if user_id:
-            merged_variables = await self.get_merged_variables(context_id, user_id)
-            # Temporarily set merged variables for building prompt
-            original_variables = context.variables
-            context.variables = merged_variables
-            variables_block = context.build_variables_prompt()
-            context.variables = original_variables
-        else:
-            variables_block = context.build_variables_prompt()
+            variables = {**await self.get_global_variables(user_id), **variables}
 
-        if variables_block:
-            return f"{variables_block}\n\n---\n\n{user_prompt}"
+        max_chars = self.variable_token_budget * CHARS_PER_TOKEN if self.variable_token_budget else None
+        block = build_variables_prompt(variables, max_chars)
+        saved = len(build_variables_prompt(variables)) - len(block) if max_chars else 0
 
-        return user_prompt
+        self._variables_blocks[key] = (versions, block, saved)
+        self._variables_blocks.move_to_end(key)
+        while len(self._variables_blocks) > VARIABLES_BLOCK_CACHE_SIZE:
+            self._variables_blocks.popitem(last=False)
+        self._prompt_chars_saved += saved
+        return block
+
+    def _invalidate_context_variables(self, context_id: str) -> None:
+        self._context_versions[context_id] = self._context_versions.get(context_id, 0) + 1
+
+    def _invalidate_global_variables(self, user_id: UserId) -> None:
+        uid = int(user_id)
+        self._global_versions[uid] = self._global_versions.get(uid, 0) + 1
+
+    def get_prompt_cache_stats(self) -> dict:
+        """
+        Get enriched prompt cache statistics.
+
+        Returns:
+            Dict with hits, misses, hit_rate, cached blocks and the
+            characters kept out of prompts by the variable token budget
+        """
+        lookups = self._prompt_cache_hits + self._prompt_cache_misses
+        return {
+            "hits": self._prompt_cache_hits,
+            "misses": self._prompt_cache_misses,
+            "hit_rate": round(self._prompt_cache_hits / lookups, 3) if lookups else 0.0,
+            "cached_blocks": len(self._variables_blocks),
+            "chars_saved": self._prompt_chars_saved,
+        }
 
     # ==================== Global Variables ====================
 
@@ -368,7 +525,7 @@ class ContextService:
         """
         Set a global variable that applies to all projects.
 
-        Also syncs to ~/.claude/CLAUDE.md for persistent availability.
+        Also syncs to ~/.claude/CLAUDE.md (in the background) for persistent availability.
 
         Args:
             user_id: User ID
@@ -377,16 +534,17 @@ class ContextService:
             description: Description for AI
         """
         await self.context_repository.set_global_variable(user_id, name, value, description)
+        self._invalidate_global_variables(user_id)
         logger.info(f"Set global variable '{name}' for user {user_id}")
 
         # Auto-sync to CLAUDE.md
-        await self.sync_global_variables_to_claude_md(user_id)
+        self.schedule_claude_md_sync(user_id)
 
     async def delete_global_variable(self, user_id: UserId, name: str) -> bool:
         """
         Delete a global variable.
 
-        Also syncs to ~/.claude/CLAUDE.md to reflect the change.
+        Also syncs to ~/.claude/CLAUDE.md (in the background) to reflect the change.
 
         Args:
             user_id: User ID
@@ -397,9 +555,10 @@ class ContextService:
         """
         result = await self.context_repository.delete_global_variable(user_id, name)
         if result:
+            self._invalidate_global_variables(user_id)
             logger.info(f"Deleted global variable '{name}' for user {user_id}")
             # Auto-sync to CLAUDE.md
-            await self.sync_global_variables_to_claude_md(user_id)
+            self.schedule_claude_md_sync(user_id)
         return result
 
     async def get_global_variables(self, user_id: UserId) -> Dict[str, ContextVariable]:
@@ -457,6 +616,55 @@ class ContextService:
 
     CLAUDE_MD_START_MARKER = "<!-- GLOBAL_VARIABLES_START -->"
     CLAUDE_MD_END_MARKER = "<!-- GLOBAL_VARIABLES_END -->"
+    CLAUDE_MD_SYNC_DELAY = 1.0  # seconds
+
+    def schedule_claude_md_sync(self, user_id: UserId) -> None:
+        """
+        Sync global variables to CLAUDE.md in the background.
+
+        Changes within CLAUDE_MD_SYNC_DELAY of each other are coalesced
+        into one write; the sync reads the variables when it runs, so it
+        always writes the latest state.
+
+        Args:
+            user_id: User whose global variables changed
+        """
+        uid = int(user_id)
+        self._claude_md_dirty[uid] = user_id
+        task = self._claude_md_tasks.get(uid)
+        if task is None or task.done():
+            self._claude_md_tasks[uid] = asyncio.create_task(self._debounced_claude_md_sync(uid))
+
+    async def _debounced_claude_md_sync(self, uid: int) -> None:
+        try:
+            # Changes made while a sync is writing mark the user dirty
+            # again, so the loop runs once more
+            while uid in self._claude_md_dirty:
+                await asyncio.sleep(self.CLAUDE_MD_SYNC_DELAY)
+                user_id = self._claude_md_dirty.pop(uid, None)
+                if user_id is not None:
+                    try:
+                        await self.sync_global_variables_to_claude_md(user_id)
+                    except asyncio.CancelledError:
+                        # Cancelled mid-sync (e.g. by flush_claude_md_sync):
+                        # keep the change pending so the flush writes it
+                        self._claude_md_dirty.setdefault(uid, user_id)
+                        raise
+        finally:
+            if self._claude_md_tasks.get(uid) is asyncio.current_task():
+                del self._claude_md_tasks[uid]
+
+    async def flush_claude_md_sync(self) -> None:
+        """Run pending CLAUDE.md syncs now (call on shutdown)"""
+        tasks = list(self._claude_md_tasks.values())
+        self._claude_md_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for uid in list(self._claude_md_dirty):
+            user_id = self._claude_md_dirty.pop(uid)
+            await self.sync_global_variables_to_claude_md(user_id)
 
     async def sync_global_variables_to_claude_md(self, user_id: UserId) -> bool:
         """
@@ -466,6 +674,10 @@ class ContextService:
         without needing to be passed in the prompt. The variables are written
         to a marked section that gets automatically updated.
 
+        The file is rewritten off the event loop, atomically (temp file +
+        rename, so Claude never reads a half-written file) and only if
+        its content changes.
+
         Args:
             user_id: User ID to get global variables for
 
@@ -475,63 +687,99 @@ class ContextService:
         try:
             variables = await self.get_global_variables(user_id)
             claude_md_path = Path.home() / ".claude" / "CLAUDE.md"
+            new_section = self._build_claude_md_section(variables)
 
-            # Build the auto-generated section
-            section_lines = [
-                self.CLAUDE_MD_START_MARKER,
-                "## 🌐 Global Context Variables",
-                "",
-                "> ⚠️ This section is auto-generated. Do not edit manually.",
-                "> Variables are synced from Telegram bot settings.",
-                "",
-            ]
-
-            if variables:
-                for var in sorted(variables.values(), key=lambda v: v.name):
-                    section_lines.append(f"### {var.name}")
-                    section_lines.append(f"```")
-                    section_lines.append(var.value)
-                    section_lines.append(f"```")
-                    if var.description:
-                        section_lines.append(f"_{var.description}_")
-                    section_lines.append("")
-            else:
-                section_lines.append("_No global variables configured._")
-                section_lines.append("")
+            # One writer per file: users share the bot's home directory
+            lock = self._claude_md_locks.setdefault(str(claude_md_path), asyncio.Lock())
+            async with lock:
+                written = await asyncio.to_thread(self._write_claude_md, claude_md_path, new_section)
 
-            section_lines.append(self.CLAUDE_MD_END_MARKER)
-            new_section = "\n".join(section_lines)
-
-            # Read existing file or start fresh
-            if claude_md_path.exists():
-                content = claude_md_path.read_text()
-
-                # Check if markers exist
-                if self.CLAUDE_MD_START_MARKER in content and self.CLAUDE_MD_END_MARKER in content:
-                    # Replace existing section
-                    pattern = re.compile(
-                        re.escape(self.CLAUDE_MD_START_MARKER) +
-                        r".*?" +
-                        re.escape(self.CLAUDE_MD_END_MARKER),
-                        re.DOTALL
-                    )
-                    content = pattern.sub(new_section, content)
-                else:
-                    # Append section at the end
-                    content = content.rstrip() + "\n\n" + new_section + "\n"
+            if written:
+                logger.info(f"Synced {len(variables)} global variables to {claude_md_path}")
             else:
-                # Create new file with header
-                content = "# Claude Global Configuration\n\n" + new_section + "\n"
-
-            # Ensure directory exists
-            claude_md_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Write the file
-            claude_md_path.write_text(content)
-            logger.info(f"Synced {len(variables)} global variables to {claude_md_path}")
-
+                logger.debug(f"{claude_md_path} already up to date")
             return True
 
         except Exception as e:
             logger.error(f"Failed to sync global variables to CLAUDE.md: {e}")
             return False
+
+    def _build_claude_md_section(self, variables: Dict[str, ContextVariable]) -> str:
+        """Build the auto-generated CLAUDE.md section"""
+        section_lines = [
+            self.CLAUDE_MD_START_MARKER,
+            "## 🌐 Global Context Variables",
+            "",
+            "> ⚠️ This section is auto-generated. Do not edit manually.",
+            "> Variables are synced from Telegram bot settings.",
+            "",
+        ]
+
+        if variables:
+            for var in sorted(variables.values(), key=lambda v: v.name):
+                section_lines.append(f"### {var.name}")
+                section_lines.append(f"```")
+                section_lines.append(var.value)
+                section_lines.append(f"```")
+                if var.description:
+                    section_lines.append(f"_{var.description}_")
+                section_lines.append("")
+        else:
+            section_lines.append("_No global variables configured._")
+            section_lines.append("")
+
+        section_lines.append(self.CLAUDE_MD_END_MARKER)
+        return "\n".join(section_lines)
+
+    def _write_claude_md(self, claude_md_path: Path, new_section: str) -> bool:
+        """
+        Put the section into CLAUDE.md (runs in a worker thread).
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        # Read existing file or start fresh
+        if claude_md_path.exists():
+            old_content = claude_md_path.read_text()
+            content = old_content
+
+            # Check if markers exist
+            if self.CLAUDE_MD_START_MARKER in content and self.CLAUDE_MD_END_MARKER in content:
+                # Replace existing section (a function, so backslashes in
+                # values aren't treated as group references)
+                pattern = re.compile(
+                    re.escape(self.CLAUDE_MD_START_MARKER) +
+                    r".*?" +
+                    re.escape(self.CLAUDE_MD_END_MARKER),
+                    re.DOTALL
+                )
+                content = pattern.sub(lambda _: new_section, content, count=1)
+            else:
+                # Append section at the end
+                content = content.rstrip() + "\n\n" + new_section + "\n"
+        else:
+            old_content = None
+            # Create new file with header
+            content = "# Claude Global Configuration\n\n" + new_section + "\n"
+
+        if old_content is not None and _digest(old_content) == _digest(content):
+            return False
+
+        # Ensure directory exists
+        claude_md_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write a temp file next to it and rename over the original
+        fd, tmp_path = tempfile.mkstemp(dir=claude_md_path.parent, prefix=".CLAUDE.md.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            mode = claude_md_path.stat().st_mode & 0o777 if old_content is not None else 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, claude_md_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+        return True
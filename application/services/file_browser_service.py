@@ -5,14 +5,29 @@ Application service for navigating the file system with a visual tree view.
 Used by the /cd command for interactive folder navigation.
 """
 
+import asyncio
+import bisect
+import hashlib
 import html
 import logging
 import os
+import stat
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Sorted directory listings kept for paging, keyed by (path, mtime_ns)
+LISTING_CACHE_SIZE = 32
+# Page tokens kept for the prev/next buttons
+PAGE_TOKEN_CACHE_SIZE = 1024
+
+# Sort key of a listing entry: "0" (folder) or "1" (file), the lowercased
+# name, NUL, the name. Plain strings sort about 3x faster than tuples,
+# which keeps the worker thread's GIL hold short for huge directories.
+SortKey = str
+
 
 @dataclass
 class DirectoryEntry:
@@ -30,6 +45,10 @@ class DirectoryContent:
     parent_path: Optional[str]
     entries: List[DirectoryEntry]
     is_root: bool
+    offset: int = 0                    # Index of the first entry in the listing
+    total: int = 0                     # Entries in the whole listing
+    prev_token: Optional[str] = None   # Page token of the previous page
+    next_token: Optional[str] = None   # Page token of the next page
 
 
 class FileBrowserService:
@@ -37,7 +56,8 @@ class FileBrowserService:
     Service for navigating the file system.
 
     Features:
-    - List directory contents
+    - List directory contents, page by page
+    - Cache sorted listings until the directory changes
     - Generate HTML tree view with emojis
     - Path validation (security)
     - File type detection for emojis
@@ -51,86 +71,213 @@ class FileBrowserService:
         if root_path:
             self.ROOT_PATH = root_path
 
-    async def list_directory(self, path: str) -> DirectoryContent:
+        # (path, mtime_ns) -> sorted sort keys of the visible entries.
+        # Adding, removing or renaming an entry changes the directory mtime,
+        # so a changed directory is simply a new key.
+        self._listings: OrderedDict[Tuple[str, int], List[SortKey]] = OrderedDict()
+        # Page token -> (path, sort key of the first entry on the page)
+        self._page_tokens: OrderedDict[str, Tuple[str, SortKey]] = OrderedDict()
+        self._listing_cache_hits = 0
+        self._listing_cache_misses = 0
+
+    async def list_directory(self, path: str, page_token: Optional[str] = None) -> DirectoryContent:
         """
-        Get contents of a directory.
+        Get one page of a directory's contents.
+
+        The whole directory is listed and sorted in a worker thread, then
+        cached until its mtime changes. Pages hold MAX_ENTRIES entries.
 
         Args:
             path: Directory path to list
+            page_token: Token of the page to show (DirectoryContent.prev_token
+                or next_token), first page if None or unknown
 
         Returns:
-            DirectoryContent with entries and metadata
+            DirectoryContent with the page's entries and metadata
         """
-        # Normalize and validate path
-        path = self._normalize_path(path)
+        path, mtime_ns = await asyncio.to_thread(self._check_directory, path)
 
-        if not self.is_within_root(path):
-            logger.warning(f"Access denied: {path} is outside root")
-            path = self.ROOT_PATH
+        cache_key = (path, mtime_ns)
+        keys = self._listings.get(cache_key)
+        if keys is not None:
+            self._listings.move_to_end(cache_key)
+            self._listing_cache_hits += 1
+        else:
+            self._listing_cache_misses += 1
+            keys = await asyncio.to_thread(self._scan_directory, path)
+            self._listings[cache_key] = keys
+            while len(self._listings) > LISTING_CACHE_SIZE:
+                self._listings.popitem(last=False)
+
+        # A page starts at its first entry's sort key, so it stays put when
+        # entries before it are added or removed
+        offset = 0
+        page = self._page_tokens.get(page_token) if page_token else None
+        if page is not None and page[0] == path:
+            offset = bisect.bisect_left(keys, page[1])
+            if offset >= len(keys):
+                offset = max(len(keys) - self.MAX_ENTRIES, 0)
+
+        page_keys = keys[offset:offset + self.MAX_ENTRIES]
+        entries = await asyncio.to_thread(self._page_entries, path, page_keys)
+
+        prev_token = None
+        if offset > 0:
+            prev_token = self._page_token(path, keys[max(offset - self.MAX_ENTRIES, 0)])
+        next_token = None
+        if offset + self.MAX_ENTRIES < len(keys):
+            next_token = self._page_token(path, keys[offset + self.MAX_ENTRIES])
 
-        # Ensure directory exists
-        if not os.path.isdir(path):
-            logger.warning(f"Directory not found: {path}")
-            path = self.ROOT_PATH
+        return DirectoryContent(
+            path=path,
+            parent_path=self.get_parent_path(path),
+            entries=entries,
+            is_root=(path == self.ROOT_PATH),
+            offset=offset,
+            total=len(keys),
+            prev_token=prev_token,
+            next_token=next_token,
+        )
 
-        # Create root if it doesn't exist
-        os.makedirs(self.ROOT_PATH, exist_ok=True)
+    def get_page_path(self, page_token: str) -> Optional[str]:
+        """
+        Get the directory a page token belongs to.
 
-        # Get entries
-        entries = []
-        try:
-            for entry in os.scandir(path):
-                # Skip hidden files
-                if entry.name.startswith('.'):
-                    continue
+        Args:
+            page_token: Token from DirectoryContent.prev_token or next_token
 
-                try:
-                    size = entry.stat().st_size if entry.is_file() else None
-                    entries.append(DirectoryEntry(
-                        name=entry.name,
-                        path=entry.path,
-                        is_dir=entry.is_dir(),
-                        size=size
-                    ))
-                except OSError:
-                    continue
+        Returns:
+            Directory path or None if the token is unknown (expired)
+        """
+        page = self._page_tokens.get(page_token)
+        return page[0] if page else None
 
-                # Limit entries
-                if len(entries) >= self.MAX_ENTRIES:
-                    break
+    def get_listing_cache_stats(self) -> dict:
+        """
+        Get directory listing cache statistics.
 
-        except PermissionError:
-            logger.error(f"Permission denied: {path}")
-        except OSError as e:
-            logger.error(f"Error reading directory {path}: {e}")
+        Returns:
+            Dict with hits, misses, hit_rate and cached listings
+        """
+        lookups = self._listing_cache_hits + self._listing_cache_misses
+        return {
+            "hits": self._listing_cache_hits,
+            "misses": self._listing_cache_misses,
+            "hit_rate": round(self._listing_cache_hits / lookups, 3) if lookups else 0.0,
+            "cached_listings": len(self._listings),
+        }
 
-        # Sort: folders first, then files, alphabetically
-        entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+    async def get_tree_view(
+        self,
+        path: str,
+        max_depth: int = 1,
+        page_token: Optional[str] = None
+    ) -> str:
+        """
+        Generate HTML tree view of directory.
 
-        # Determine parent path
-        parent_path = self.get_parent_path(path)
+        Args:
+            path: Directory path
+            max_depth: How deep to show nested structure
+            page_token: Token of the page to show
 
-        return DirectoryContent(
-            path=path,
-            parent_path=parent_path,
-            entries=entries,
-            is_root=(path == self.ROOT_PATH)
-        )
+        Returns:
+            HTML-formatted tree string
+        """
+        content = await self.list_directory(path, page_token)
+        return self.render_tree_view(content, max_depth)
 
-    async def get_tree_view(self, path: str, max_depth: int = 1) -> str:
+    def render_tree_view(self, content: DirectoryContent, max_depth: int = 1) -> str:
         """
-        Generate HTML tree view of directory.
+        Generate HTML tree view of an already listed directory page.
 
         Args:
-            path: Directory path
+            content: Result of list_directory
             max_depth: How deep to show nested structure
 
         Returns:
             HTML-formatted tree string
         """
-        content = await self.list_directory(path)
         return self._build_tree_html(content, max_depth)
 
+    def _check_directory(self, path: str) -> Tuple[str, int]:
+        """Validate a directory path (blocking), return it with its mtime_ns"""
+        # Normalize and validate path
+        path = self._normalize_path(path)
+
+        if not self.is_within_root(path):
+            logger.warning(f"Access denied: {path} is outside root")
+            path = self.ROOT_PATH
+
+        # Create root if it doesn't exist
+        os.makedirs(self.ROOT_PATH, exist_ok=True)
+
+        try:
+            st = os.stat(path)
+            if stat.S_ISDIR(st.st_mode):
+                return path, st.st_mtime_ns
+        except OSError:
+            pass
+
+        logger.warning(f"Directory not found: {path}")
+        return self.ROOT_PATH, os.stat(self.ROOT_PATH).st_mtime_ns
+
+    def _scan_directory(self, path: str) -> List[SortKey]:
+        """List and sort a directory (blocking), without stat() per entry"""
+        keys = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    # Skip hidden files
+                    if entry.name.startswith('.'):
+                        continue
+
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    kind = "0" if is_dir else "1"
+                    keys.append(f"{kind}{entry.name.lower()}\0{entry.name}")
+
+        except PermissionError:
+            logger.error(f"Permission denied: {path}")
+        except OSError as e:
+            logger.error(f"Error reading directory {path}: {e}")
+
+        # Sort: folders first, then files, alphabetically
+        keys.sort()
+        return keys
+
+    def _page_entries(self, path: str, keys: List[SortKey]) -> List[DirectoryEntry]:
+        """Build the entries of one page (blocking), with file sizes"""
+        entries = []
+        for key in keys:
+            is_file = key[0] == "1"
+            name = key.split("\0", 1)[1]
+            entry_path = os.path.join(path, name)
+            size = None
+            if is_file:
+                try:
+                    size = os.stat(entry_path).st_size
+                except OSError:
+                    continue
+            entries.append(DirectoryEntry(
+                name=name,
+                path=entry_path,
+                is_dir=not is_file,
+                size=size
+            ))
+        return entries
+
+    def _page_token(self, path: str, first_key: SortKey) -> str:
+        """Get the token of the page starting at first_key"""
+        token = hashlib.sha1(f"{path}\0{first_key}".encode()).hexdigest()[:16]
+        self._page_tokens[token] = (path, first_key)
+        self._page_tokens.move_to_end(token)
+        while len(self._page_tokens) > PAGE_TOKEN_CACHE_SIZE:
+            self._page_tokens.popitem(last=False)
+        return token
+
     def is_within_root(self, path: str) -> bool:
         """
         Check if path is within allowed root directory.
@@ -256,9 +403,11 @@ class FileBrowserService:
         # Footer with current path
         lines.append(f"\n📍 <b>Путь:</b> <code>{html.escape(content.path)}</code>")
 
-        # Show if truncated
-        if len(content.entries) >= self.MAX_ENTRIES:
-            lines.append(f"<i>... и ещё файлы (показано {self.MAX_ENTRIES})</i>")
+        # Show position if paged
+        if content.total > len(content.entries):
+            first = content.offset + 1
+            last = content.offset + len(content.entries)
+            lines.append(f"<i>Показано {first}–{last} из {content.total}</i>")
 
         return "\n".join(lines)
 
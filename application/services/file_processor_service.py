@@ -5,16 +5,28 @@ File Processor Service
 Поддерживает текстовые файлы, изображения и PDF.
 """
 
+import asyncio
 import base64
 import logging
+import multiprocessing
 import os
+import shutil
+import tempfile
 from dataclasses import dataclass
 from enum import Enum
 from io import BytesIO
-from typing import Optional, Tuple
+from multiprocessing.pool import Pool
+from typing import Any, Optional, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Папка для загруженных файлов внутри рабочей директории проекта
+UPLOADS_DIR = ".uploads"
+# Байт заголовка, по которым определяется тип файла
+HEADER_SIZE = 16
+# Воркеры для извлечения текста из PDF (отдельные процессы, не блокируют loop)
+PDF_WORKERS = min(2, os.cpu_count() or 1)
+
 
 class FileType(Enum):
     """Типы поддерживаемых файлов"""
@@ -29,7 +41,7 @@ class ProcessedFile:
     """Результат обработки файла"""
     file_type: FileType
     filename: str
-    content: str  # Текстовое содержимое или base64 для изображений
+    content: str  # Текстовое содержимое; для изображений пусто, если файл в saved_path
     mime_type: str
     size_bytes: int
     error: Optional[str] = None
@@ -54,6 +66,8 @@ class FileProcessorService:
     MAX_TEXT_SIZE = 1 * 1024 * 1024  # 1 MB
     MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5 MB
     MAX_PDF_SIZE = 2 * 1024 * 1024    # 2 MB
+    MAX_PDF_PAGES = 50                # Страниц PDF в prompt
+    PDF_TIMEOUT = 60.0                # Секунд на извлечение текста из PDF
 
     # Поддерживаемые расширения
     TEXT_EXTENSIONS = {
@@ -125,6 +139,11 @@ class FileProcessorService:
         ".r": "r",
     }
 
+    def __init__(self):
+        # Пул процессов для PDF и ожидающие его результатов future
+        self._pdf_pool: Optional[Pool] = None
+        self._pdf_waiting: Set[asyncio.Future] = set()
+
     def detect_file_type(self, filename: str) -> FileType:
         """Определить тип файла по расширению"""
         ext = self._get_extension(filename)
@@ -147,14 +166,46 @@ class FileProcessorService:
         _, ext = os.path.splitext(filename.lower())
         return ext
 
-    def validate_file(self, filename: str, size: int) -> Tuple[bool, Optional[str]]:
+    def sniff_file_type(self, header: bytes) -> Optional[Tuple[FileType, str]]:
+        """
+        Определить тип файла по сигнатуре в заголовке.
+
+        Args:
+            header: Первые байты файла (HEADER_SIZE)
+
+        Returns:
+            (FileType, mime_type) для изображений и PDF, None для остальных
+        """
+        if header.startswith(b"\x89PNG\r\n\x1a\n"):
+            return FileType.IMAGE, "image/png"
+        if header.startswith(b"\xff\xd8\xff"):
+            return FileType.IMAGE, "image/jpeg"
+        if header.startswith((b"GIF87a", b"GIF89a")):
+            return FileType.IMAGE, "image/gif"
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return FileType.IMAGE, "image/webp"
+        if header.startswith(b"%PDF-"):
+            return FileType.PDF, "application/pdf"
+        return None
+
+    def validate_file(
+        self,
+        filename: str,
+        size: int,
+        file_type: Optional[FileType] = None
+    ) -> Tuple[bool, Optional[str]]:
         """
         Валидация файла перед обработкой.
 
+        Args:
+            filename: Имя файла
+            size: Размер в байтах
+            file_type: Тип файла, если уже известен (по заголовку)
+
         Returns:
             Tuple[is_valid, error_message]
         """
-        file_type = self.detect_file_type(filename)
+        file_type = file_type or self.detect_file_type(filename)
 
         if file_type == FileType.UNSUPPORTED:
             ext = self._get_extension(filename) or "(нет расширения)"
@@ -172,6 +223,141 @@ class FileProcessorService:
 
         return True, None
 
+    def create_upload_path(self) -> str:
+        """
+        Создать временный файл для загрузки в системной временной папке.
+
+        Файл скачивается сюда напрямую (без BytesIO), затем
+        process_upload проверяет его; в проект попадают только изображения.
+
+        Returns:
+            Путь к пустому временному файлу
+        """
+        fd, path = tempfile.mkstemp(prefix="upload-", suffix=".part")
+        os.close(fd)
+        return path
+
+    async def process_upload(
+        self,
+        upload_path: str,
+        filename: str,
+        mime_type: Optional[str] = None,
+        working_dir: Optional[str] = None
+    ) -> ProcessedFile:
+        """
+        Обработать скачанный файл, не загружая его в память целиком.
+
+        Тип определяется по заголовку (с расширением как fallback), размер -
+        по stat(). Текст извлекается в потоке, PDF - в отдельном процессе,
+        после чего временный файл удаляется. Изображения не читаются вовсе:
+        файл переносится в .uploads/<filename> рабочей директории (если
+        перенести не удалось - остаётся во временной папке).
+
+        Args:
+            upload_path: Путь из create_upload_path с содержимым файла
+            filename: Имя файла
+            mime_type: MIME тип (опционально)
+            working_dir: Рабочая директория проекта (для изображений)
+
+        Returns:
+            ProcessedFile (saved_path только у изображений) или ошибка
+        """
+        filename = os.path.basename(filename) or "unknown"
+        file_type = self.detect_file_type(filename)
+        size = 0
+        try:
+            size, header = await asyncio.to_thread(self._read_header, upload_path)
+
+            sniffed = self.sniff_file_type(header)
+            if sniffed:
+                file_type, mime_type = sniffed
+            elif file_type in (FileType.IMAGE, FileType.PDF):
+                ext = self._get_extension(filename)
+                raise ValueError(f"содержимое не соответствует расширению {ext}")
+
+            is_valid, error = self.validate_file(filename, size, file_type)
+            if not is_valid:
+                await asyncio.to_thread(self.discard_upload, upload_path)
+                return ProcessedFile(
+                    file_type=file_type,
+                    filename=filename,
+                    content="",
+                    mime_type=mime_type or "",
+                    size_bytes=size,
+                    error=error
+                )
+
+            saved_path = None
+            if file_type == FileType.TEXT:
+                content = await asyncio.to_thread(self._read_text, upload_path)
+                mime = mime_type or "text/plain"
+            elif file_type == FileType.IMAGE:
+                content = ""
+                mime = mime_type or self.IMAGE_MIME_TYPES.get(self._get_extension(filename), "image/png")
+                saved_path = await asyncio.to_thread(
+                    self._keep_image, upload_path, filename, working_dir
+                )
+            else:
+                content = await self._process_pdf(upload_path)
+                mime = mime_type or "application/pdf"
+
+            if saved_path is None:
+                # Содержимое уже в content - копия на диске не нужна
+                await asyncio.to_thread(self.discard_upload, upload_path)
+
+            logger.info(f"Processed upload: {filename} ({file_type.value}, {size} bytes)")
+
+            return ProcessedFile(
+                file_type=file_type,
+                filename=filename,
+                content=content,
+                mime_type=mime,
+                size_bytes=size,
+                saved_path=saved_path
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing upload {filename}: {e}")
+            await asyncio.to_thread(self.discard_upload, upload_path)
+            return ProcessedFile(
+                file_type=file_type,
+                filename=filename,
+                content="",
+                mime_type=mime_type or "",
+                size_bytes=size,
+                error=f"Ошибка обработки: {str(e)}"
+            )
+
+    def _read_header(self, path: str) -> Tuple[int, bytes]:
+        """Размер и заголовок файла (блокирующий вызов)"""
+        with open(path, "rb") as f:
+            return os.fstat(f.fileno()).st_size, f.read(HEADER_SIZE)
+
+    def _read_text(self, path: str) -> str:
+        """Прочитать и декодировать текстовый файл (блокирующий вызов)"""
+        with open(path, "rb") as f:
+            return self._process_text(f.read())
+
+    def _keep_image(self, upload_path: str, filename: str, working_dir: Optional[str]) -> str:
+        """Перенести изображение в .uploads проекта (блокирующий вызов)"""
+        if not working_dir:
+            return upload_path
+        try:
+            uploads_dir = os.path.join(working_dir, UPLOADS_DIR)
+            os.makedirs(uploads_dir, exist_ok=True)
+            # shutil.move: временная папка может быть на другой файловой системе
+            return shutil.move(upload_path, os.path.join(uploads_dir, filename))
+        except OSError as e:
+            logger.warning(f"Cannot move {filename} to {working_dir}: {e}")
+            return upload_path
+
+    def discard_upload(self, path: str) -> None:
+        """Удалить временный файл загрузки (скачивание не удалось или файл отклонён)"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
     async def process_file(
         self,
         file_content: BytesIO,
@@ -262,34 +448,55 @@ class FileProcessorService:
         """Обработать изображение - вернуть base64"""
         return base64.b64encode(content_bytes).decode("utf-8")
 
-    async def _process_pdf(self, content_bytes: bytes) -> str:
+    async def _process_pdf(self, source: Union[bytes, str]) -> str:
         """
-        Обработать PDF - извлечь текст.
+        Обработать PDF - извлечь текст первых MAX_PDF_PAGES страниц.
 
-        Требует pypdf или pdfplumber.
+        Разбор идёт в пуле процессов, чтобы не блокировать event loop.
+        Если разбор дольше PDF_TIMEOUT, пул завершается вместе с зависшим
+        воркером и создаётся заново при следующем PDF. Требует pypdf.
+
+        Args:
+            source: Содержимое PDF или путь к файлу
         """
+        if self._pdf_pool is None:
+            self._pdf_pool = multiprocessing.get_context("spawn").Pool(PDF_WORKERS)
+        pool = self._pdf_pool
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pdf_waiting.add(future)
+
+        # Колбэки пула вызываются в его потоке - результат передаём в loop
+        pool.apply_async(
+            _extract_pdf_text,
+            (source, self.MAX_PDF_PAGES),
+            callback=lambda result: loop.call_soon_threadsafe(_settle, future, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(_settle, future, None, error),
+        )
         try:
-            from pypdf import PdfReader
-
-            reader = PdfReader(BytesIO(content_bytes))
-            text_parts = []
-
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(f"--- Страница {i + 1} ---\n{page_text}")
-
-            if not text_parts:
-                return "[PDF: не удалось извлечь текст (возможно, отсканированный документ)]"
-
-            return "\n\n".join(text_parts)
-
-        except ImportError:
-            logger.warning("pypdf not installed, PDF processing unavailable")
-            return "[PDF: pypdf не установлен - содержимое недоступно. Установите: pip install pypdf]"
-        except Exception as e:
-            logger.error(f"PDF extraction error: {e}")
-            return f"[PDF: ошибка извлечения текста - {str(e)}]"
+            return await asyncio.wait_for(future, timeout=self.PDF_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"PDF extraction timed out after {self.PDF_TIMEOUT}s")
+            await self._terminate_pdf_pool(pool)
+            return f"[PDF: превышено время обработки ({self.PDF_TIMEOUT:g} с)]"
+        finally:
+            self._pdf_waiting.discard(future)
+
+    async def _terminate_pdf_pool(self, pool: Pool) -> None:
+        """Завершить пул PDF вместе с воркерами (зависший разбор не отменить иначе)"""
+        if self._pdf_pool is not pool:
+            return  # Уже завершён и, возможно, пересоздан
+        self._pdf_pool = None
+        # После terminate() колбэки не вызываются - ожидающих завершаем сами
+        waiting, self._pdf_waiting = self._pdf_waiting, set()
+        for future in waiting:
+            _settle(future, None, RuntimeError("пул обработки PDF перезапущен"))
+        await asyncio.to_thread(pool.terminate)
+
+    async def close(self) -> None:
+        """Остановить пул процессов PDF"""
+        if self._pdf_pool is not None:
+            await self._terminate_pdf_pool(self._pdf_pool)
 
     def save_to_working_dir(
         self,
@@ -308,10 +515,14 @@ class FileProcessorService:
         """
         try:
             # Создаём папку .uploads для временных файлов
-            uploads_dir = os.path.join(working_dir, ".uploads")
+            uploads_dir = os.path.join(working_dir, UPLOADS_DIR)
             os.makedirs(uploads_dir, exist_ok=True)
 
-            file_path = os.path.join(uploads_dir, processed_file.filename)
+            # Загрузка через process_upload уже лежит на диске
+            if processed_file.saved_path and os.path.isfile(processed_file.saved_path):
+                return processed_file.saved_path
+
+            file_path = os.path.join(uploads_dir, os.path.basename(processed_file.filename))
 
             if processed_file.file_type == FileType.IMAGE:
                 # Декодируем base64 и сохраняем
@@ -495,3 +706,54 @@ class FileProcessorService:
             names.append(f"+{total - 2}")
 
         return f"{total} файлов: {', '.join(names)}"
+
+
+def _settle(
+    future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None
+) -> None:
+    """Завершить future результатом пула, если его ещё не отменили"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _extract_pdf_text(source: Union[bytes, str], max_pages: int) -> str:
+    """
+    Извлечь текст из PDF (выполняется в процессе пула).
+
+    Args:
+        source: Содержимое PDF или путь к файлу
+        max_pages: Сколько первых страниц извлекать
+
+    Returns:
+        Текст по страницам или пометка об ошибке
+    """
+    try:
+        from pypdf import PdfReader
+
+        reader = PdfReader(BytesIO(source) if isinstance(source, bytes) else source)
+        total_pages = len(reader.pages)
+        text_parts = []
+
+        for i, page in enumerate(reader.pages[:max_pages]):
+            page_text = page.extract_text()
+            if page_text:
+                text_parts.append(f"--- Страница {i + 1} ---\n{page_text}")
+
+        if not text_parts:
+            return "[PDF: не удалось извлечь текст (возможно, отсканированный документ)]"
+
+        if total_pages > max_pages:
+            text_parts.append(f"[PDF: показаны первые {max_pages} из {total_pages} страниц]")
+
+        return "\n\n".join(text_parts)
+
+    except ImportError:
+        logger.warning("pypdf not installed, PDF processing unavailable")
+        return "[PDF: pypdf не установлен - содержимое недоступно. Установите: pip install pypdf]"
+    except Exception as e:
+        logger.error(f"PDF extraction error: {e}")
+        return f"[PDF: ошибка извлечения текста - {str(e)}]"
@@ -9,107 +9,227 @@ Docker Logs API - простой HTTP сервер для чтения лого
   GET /logs/container_name     - логи контейнера
   GET /logs/container_name?tail=100  - последние 100 строк
   GET /logs/container_name?since=1h  - логи за последний час
+
+Docker Engine API вызывается напрямую через aiohttp (unix socket), поэтому
+ни один обработчик не блокирует event loop: follow-стримы читаются
+асинхронно, а медленный клиент тормозит только свой поток.
 """
 
 import asyncio
+import os
 import re
+import struct
+import time
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+import aiohttp
 from aiohttp import web
-import docker
-from docker.errors import NotFound, APIError
 
-# Инициализация Docker клиента
-client = docker.from_env()
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+DOCKER_API_TIMEOUT = 30  # Секунд на обычный запрос к Docker API
+DEFAULT_TAIL = "500"
+
+# Заголовок кадра мультиплексированного лога: stream (1), 0 (3), size (4, big-endian)
+FRAME_HEADER = struct.Struct(">BxxxL")
+
+
+class DockerAPIError(Exception):
+    """Ошибка Docker Engine API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DockerAPI:
+    """
+    Асинхронный клиент Docker Engine API.
+
+    Одна сессия aiohttp на весь процесс; соединения с сокетом
+    переиспользуются между запросами.
+    """
+
+    def __init__(self, docker_host: Optional[str] = None):
+        self.docker_host = docker_host or os.getenv("DOCKER_HOST") or DEFAULT_DOCKER_HOST
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        if self.docker_host.startswith("unix://"):
+            # limit=0: каждый follow держит соединение, лимит заблокировал бы остальных
+            connector = aiohttp.UnixConnector(path=self.docker_host[len("unix://"):], limit=0)
+            base_url = "http://docker"
+        else:
+            connector = aiohttp.TCPConnector(limit=0)
+            base_url = "http://" + self.docker_host.split("://", 1)[-1]
+        self._session = aiohttp.ClientSession(base_url=base_url, connector=connector)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, path: str, params: Optional[dict] = None):
+        """GET запрос, возвращает JSON."""
+        timeout = aiohttp.ClientTimeout(total=DOCKER_API_TIMEOUT)
+        async with self._session.get(path, params=params, timeout=timeout) as response:
+            await self._raise_for_status(response)
+            return await response.json()
+
+    async def open_logs(self, container_id: str, params: dict) -> aiohttp.ClientResponse:
+        """Открыть поток логов (вызывающий закрывает ответ)."""
+        # Без общего таймаута: follow может длиться часами
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=DOCKER_API_TIMEOUT)
+        response = await self._session.get(
+            f"/containers/{quote(container_id, safe='')}/logs", params=params, timeout=timeout
+        )
+        try:
+            await self._raise_for_status(response)
+        except DockerAPIError:
+            response.release()
+            raise
+        return response
+
+    @staticmethod
+    async def _raise_for_status(response: aiohttp.ClientResponse) -> None:
+        if response.status < 400:
+            return
+        try:
+            message = (await response.json(content_type=None))["message"]
+        except Exception:
+            message = response.reason or f"HTTP {response.status}"
+        raise DockerAPIError(response.status, message)
+
+
+async def iter_log_frames(content: aiohttp.StreamReader, tty: bool) -> AsyncIterator[bytes]:
+    """
+    Данные логов из ответа /containers/{id}/logs.
+
+    Без TTY stdout/stderr мультиплексированы в кадры с 8-байтным
+    заголовком; с TTY поток идёт как есть.
+    """
+    if tty:
+        async for chunk in content.iter_any():
+            yield chunk
+        return
+
+    while True:
+        try:
+            header = await content.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError:
+            return
+        _, size = FRAME_HEADER.unpack(header)
+        if size:
+            yield await content.readexactly(size)
+
+
+def parse_since(since: Optional[str]) -> Optional[int]:
+    """Парсим since (1h -> 3600, 30m -> 1800, etc.)"""
+    if not since:
+        return None
+    match = re.match(r"(\d+)([smhd])", since)
+    if not match:
+        return None
+    value, unit = int(match.group(1)), match.group(2)
+    multipliers = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    return value * multipliers[unit]
+
+
+def short_image(container: dict) -> str:
+    """Имя образа из /containers/json (короткий id, если образ без тега)."""
+    image = container.get("Image") or ""
+    if image and not image.startswith("sha256:"):
+        return image
+    image_id = container.get("ImageID") or image
+    return f"sha256:{image_id.split(':', 1)[-1][:10]}"
 
 
 async def list_containers(request):
-    """Список всех контейнеров."""
+    """Список всех контейнеров (один запрос /containers/json)."""
+    docker: DockerAPI = request.app["docker"]
     try:
-        containers = client.containers.list(all=True)
-        result = []
-        for c in containers:
-            result.append({
-                "id": c.short_id,
-                "name": c.name,
-                "status": c.status,
-                "image": c.image.tags[0] if c.image.tags else c.image.short_id,
-            })
-        return web.json_response({"containers": result})
+        containers = await docker.get_json("/containers/json", params={"all": "1"})
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
+    result = [
+        {
+            "id": c["Id"][:12],
+            "name": (c.get("Names") or ["/" + c["Id"][:12]])[0].lstrip("/"),
+            "status": c.get("State", ""),
+            "image": short_image(c),
+        }
+        for c in containers
+    ]
+    return web.json_response({"containers": result})
+
 
 async def get_logs(request):
     """Получить логи контейнера."""
+    docker: DockerAPI = request.app["docker"]
     container_name = request.match_info.get("name")
 
     # Параметры
-    tail = request.query.get("tail", "500")  # По умолчанию 500 строк
+    tail = request.query.get("tail", DEFAULT_TAIL)  # По умолчанию 500 строк
     since = request.query.get("since")  # Например: 1h, 30m, 2d
     follow = request.query.get("follow", "false").lower() == "true"
 
+    if tail != "all" and not tail.isdigit():
+        return web.json_response({"error": f"Invalid tail: {tail}"}, status=400)
+
     try:
-        container = client.containers.get(container_name)
-    except NotFound:
-        return web.json_response(
-            {"error": f"Container '{container_name}' not found"},
-            status=404
-        )
+        info = await docker.get_json(f"/containers/{quote(container_name, safe='')}/json")
+    except DockerAPIError as e:
+        if e.status == 404:
+            return web.json_response(
+                {"error": f"Container '{container_name}' not found"},
+                status=404
+            )
+        return web.json_response({"error": str(e)}, status=500)
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
-    # Парсим since (1h -> 3600, 30m -> 1800, etc.)
-    since_seconds = None
-    if since:
-        match = re.match(r"(\d+)([smhd])", since)
-        if match:
-            value, unit = int(match.group(1)), match.group(2)
-            multipliers = {"s": 1, "m": 60, "h": 3600, "d": 86400}
-            since_seconds = value * multipliers.get(unit, 1)
+    params = {
+        "stdout": "1",
+        "stderr": "1",
+        "timestamps": "1",
+        "tail": tail,
+        "follow": "1" if follow else "0",
+    }
+    since_seconds = parse_since(since)
+    if since_seconds:
+        params["since"] = str(int(time.time() - since_seconds))
 
     try:
-        # Получаем логи
-        logs_kwargs = {
-            "stdout": True,
-            "stderr": True,
-            "timestamps": True,
-        }
-
-        if tail != "all":
-            logs_kwargs["tail"] = int(tail)
-
-        if since_seconds:
-            import time
-            logs_kwargs["since"] = int(time.time() - since_seconds)
-
-        if follow:
-            # Streaming режим
-            response = web.StreamResponse(
-                status=200,
-                reason="OK",
-                headers={"Content-Type": "text/plain; charset=utf-8"}
-            )
-            await response.prepare(request)
-
-            logs_kwargs["follow"] = True
-            logs_kwargs["stream"] = True
-
-            for line in container.logs(**logs_kwargs):
-                await response.write(line)
-                await asyncio.sleep(0)  # Yield control
-
-            await response.write_eof()
-            return response
-        else:
-            # Обычный режим
-            logs = container.logs(**logs_kwargs)
-            return web.Response(
-                text=logs.decode("utf-8", errors="replace"),
-                content_type="text/plain"
-            )
-
+        upstream = await docker.open_logs(info["Id"], params)
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
+    response = web.StreamResponse(
+        status=200,
+        reason="OK",
+        headers={"Content-Type": "text/plain; charset=utf-8"}
+    )
+    if not follow:
+        # Большие tail сжимаются (если клиент принимает gzip) и идут chunked.
+        # Для follow сжатие не включаем - zlib копит данные и задерживает строки.
+        response.enable_compression()
+
+    tty = bool(info.get("Config", {}).get("Tty"))
+    try:
+        await response.prepare(request)
+        async for data in iter_log_frames(upstream.content, tty):
+            # write() ждёт, пока клиент разберёт буфер - это и есть backpressure:
+            # пока клиент не читает, мы не читаем из Docker
+            await response.write(data)
+        await response.write_eof()
+    except (ConnectionResetError, aiohttp.ClientError):
+        # Клиент отключился (или Docker оборвал поток) - просто закрываем upstream
+        pass
+    finally:
+        upstream.close()
+    return response
+
 
 async def health(request):
     """Health check."""
@@ -133,18 +253,32 @@ Query параметры для /logs/{name}:
   since=1h                     - логи за период (1h, 30m, 2d, 60s)
   follow=true                  - streaming режим (как docker logs -f)
 
+Ответы без follow сжимаются gzip, если клиент передал Accept-Encoding.
+
 Примеры:
   curl http://host.docker.internal:9999/containers
   curl http://host.docker.internal:9999/logs/claude_agent
   curl http://host.docker.internal:9999/logs/claude_agent?tail=100
   curl http://host.docker.internal:9999/logs/claude_agent?since=1h
   curl http://host.docker.internal:9999/logs/claude_agent?follow=true
+  curl --compressed http://host.docker.internal:9999/logs/claude_agent?tail=all
 """
     return web.Response(text=docs, content_type="text/plain")
 
 
-def create_app():
+def create_app(docker_host: Optional[str] = None):
     app = web.Application()
+    app["docker"] = DockerAPI(docker_host)
+
+    async def on_startup(app):
+        await app["docker"].start()
+
+    async def on_cleanup(app):
+        await app["docker"].close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+
     app.router.add_get("/", index)
     app.router.add_get("/health", health)
     app.router.add_get("/containers", list_containers)
@@ -154,4 +288,6 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
-    web.run_app(app, host="0.0.0.0", port=9999)
+    # handler_cancellation: отключение клиента отменяет обработчик,
+    # и простаивающий follow закрывает поток Docker сразу
+    web.run_app(app, host="0.0.0.0", port=9999, handler_cancellation=True)
@@ -0,0 +1,42 @@
+"""
+Message Search Entities
+
+Results of full-text search over conversation history (project context
+messages and bot session messages).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+# Markers around matched terms in MessageSearchHit.snippet. Control
+# characters never occur in user text, so presentation can escape the
+# snippet first and then turn them into its own highlighting.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+@dataclass
+class MessageSearchHit:
+    """A message matching a search query"""
+    source: str  # 'context' or 'session'
+    message_id: int
+    role: str
+    snippet: str  # Excerpt with HIGHLIGHT_START/HIGHLIGHT_END around matches
+    score: float  # bm25, lower is more relevant
+    timestamp: datetime = field(default_factory=datetime.now)
+    context_id: Optional[str] = None
+    context_name: Optional[str] = None
+    project_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+@dataclass
+class MessageSearchPage:
+    """
+    A page of search hits, most relevant first.
+
+    next_offset is the offset of the next page, or None on the last page.
+    """
+    hits: List[MessageSearchHit]
+    next_offset: Optional[int] = None
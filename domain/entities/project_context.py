@@ -28,6 +28,34 @@ class ContextVariable:
     description: str = ""
 
 
+def build_variables_prompt(
+    variables: Dict[str, ContextVariable],
+    max_value_chars: Optional[int] = None
+) -> str:
+    """Build the variables prompt block for a set of variables.
+
+    Args:
+        variables: Dict of variable name -> ContextVariable
+        max_value_chars: Truncate longer values to this many characters (None = no limit)
+
+    Returns:
+        Formatted string with variables and descriptions, or empty string if no variables set.
+    """
+    if not variables:
+        return ""
+
+    lines = ["📋 Context Variables (use these in your responses when relevant):"]
+    for var in sorted(variables.values(), key=lambda v: v.name):
+        value = var.value
+        if max_value_chars is not None and len(value) > max_value_chars:
+            value = f"{value[:max_value_chars]}… [truncated, {len(var.value)} chars total]"
+        lines.append(f"  {var.name}={value}")
+        if var.description:
+            lines.append(f"    ↳ {var.description}")
+
+    return "\n".join(lines)
+
+
 @dataclass
 class ContextMessage:
     """A message within a project context"""
@@ -40,6 +68,18 @@ class ContextMessage:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
+@dataclass
+class ContextMessagePage:
+    """
+    A page of context messages in chronological order.
+
+    next_cursor is the id to pass as before_id to fetch the previous
+    (older) page, or None when there are no older messages.
+    """
+    messages: List[ContextMessage]
+    next_cursor: Optional[int] = None
+
+
 @dataclass
 class ProjectContext:
     """
@@ -194,24 +234,18 @@ class ProjectContext:
         var = self.variables.get(name)
         return var.value if var else None
 
-    def build_variables_prompt(self) -> str:
+    def build_variables_prompt(self, max_value_chars: Optional[int] = None) -> str:
         """Build a prompt block with all context variables for Claude.
 
         Includes descriptions to help Claude understand how to use each variable.
 
+        Args:
+            max_value_chars: Truncate longer values to this many characters (None = no limit)
+
         Returns:
             Formatted string with variables and descriptions, or empty string if no variables set.
         """
-        if not self.variables:
-            return ""
-
-        lines = ["📋 Context Variables (use these in your responses when relevant):"]
-        for var in sorted(self.variables.values(), key=lambda v: v.name):
-            lines.append(f"  {var.name}={var.value}")
-            if var.description:
-                lines.append(f"    ↳ {var.description}")
-
-        return "\n".join(lines)
+        return build_variables_prompt(self.variables, max_value_chars)
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, ProjectContext):
@@ -61,6 +61,17 @@ class Session:
     updated_at: datetime = None
     is_active: bool = True
 
+    # Persistence tracking (set by repositories, not part of equality)
+    _persisted_count: Optional[int] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _persisted_tail: Optional[Message] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _persisted_state: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.utcnow()
@@ -276,6 +287,43 @@ class Session:
         self.is_active = True
         self.updated_at = datetime.utcnow()
 
+    # === Persistence Tracking ===
+
+    def mark_persisted(self, state: Optional[tuple] = None) -> None:
+        """
+        Record that the current messages are stored.
+
+        Called by repositories after loading or saving the session.
+
+        Args:
+            state: Opaque snapshot of the stored session row, used to
+                skip row updates when nothing changed
+        """
+        self._persisted_count = len(self.messages)
+        self._persisted_tail = self.messages[-1] if self.messages else None
+        self._persisted_state = state
+
+    @property
+    def persisted_state(self) -> Optional[tuple]:
+        """Snapshot of the stored session row (None if never stored)"""
+        return self._persisted_state
+
+    def get_unsaved_messages(self) -> Optional[List[Message]]:
+        """
+        Get messages appended since the last load/save.
+
+        Returns:
+            List of new messages, or None if the stored history is no
+            longer a prefix of the current one (never stored, cleared,
+            pruned or replaced) and must be rewritten in full
+        """
+        count = self._persisted_count
+        if count is None or count > len(self.messages):
+            return None
+        if count and self.messages[count - 1] is not self._persisted_tail:
+            return None
+        return self.messages[count:]
+
     # === Properties ===
 
     @property
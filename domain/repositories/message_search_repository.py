@@ -0,0 +1,39 @@
+"""
+Message Search Repository Interface
+
+Defines the contract for full-text search over conversation history.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from domain.entities.message_search import MessageSearchPage
+from domain.value_objects.user_id import UserId
+
+
+class IMessageSearchRepository(ABC):
+    """Repository interface for searching context and session messages."""
+
+    @abstractmethod
+    async def search(
+        self,
+        user_id: UserId,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> MessageSearchPage:
+        """
+        Search a user's messages.
+
+        Args:
+            user_id: Owner of the messages
+            query: Free-text query (words are ANDed, last word is a prefix)
+            project_id: Only search this project's contexts (skips sessions)
+            limit: Maximum number of hits
+            offset: Offset for pagination
+
+        Returns:
+            MessageSearchPage ranked by bm25
+        """
+        pass
@@ -7,7 +7,7 @@ Defines the contract for project context persistence operations.
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
-from domain.entities.project_context import ProjectContext, ContextMessage
+from domain.entities.project_context import ProjectContext, ContextMessage, ContextMessagePage
 from domain.value_objects.user_id import UserId
 
 
@@ -156,6 +156,28 @@ class IProjectContextRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_messages_page(
+        self,
+        context_id: str,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        headers_only: bool = False
+    ) -> ContextMessagePage:
+        """
+        Get a page of messages using keyset (cursor) pagination.
+
+        Args:
+            context_id: Context ID
+            limit: Maximum number of messages
+            before_id: Cursor from the previous page (None = newest page)
+            headers_only: Skip content and tool_result (for list views)
+
+        Returns:
+            ContextMessagePage, messages oldest first
+        """
+        pass
+
     @abstractmethod
     async def clear_messages(self, context_id: str) -> None:
         """
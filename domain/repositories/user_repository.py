@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional
 from domain.entities.user import User
 from domain.value_objects.user_id import UserId
 
@@ -7,6 +7,9 @@ from domain.value_objects.user_id import UserId
 class UserRepository(ABC):
     """Repository interface for User aggregate"""
 
+    def __init__(self) -> None:
+        self._change_listeners: List[Callable[[UserId], None]] = []
+
     @abstractmethod
     async def find_by_id(self, user_id: UserId) -> Optional[User]:
         """Find user by ID"""
@@ -31,3 +34,12 @@ class UserRepository(ABC):
     async def find_active(self) -> List[User]:
         """Find all active users"""
         pass
+
+    def add_change_listener(self, listener: Callable[[UserId], None]) -> None:
+        """Call listener(user_id) whenever a user is saved or deleted"""
+        self._change_listeners.append(listener)
+
+    def _notify_changed(self, user_id: UserId) -> None:
+        """Notify change listeners (implementations call this after writes)"""
+        for listener in self._change_listeners:
+            listener(user_id)
@@ -0,0 +1,247 @@
+"""
+Warm pool of connected ClaudeSDKClient sessions.
+
+Entering ClaudeSDKClient spawns the Claude CLI, loads plugins and starts
+MCP servers, which dominates time-to-first-token for short prompts.
+The pool keeps one idle, connected client per (user, project, auth env,
+model, config) and hands it to the next prompt of the same session, which
+then only needs client.query(). Idle clients are disconnected after a TTL.
+
+Per-task callbacks (can_use_tool, hooks) are baked into ClaudeAgentOptions
+at connect time, so options point at a TaskBinding whose targets are
+rebound for every task that uses the client.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TaskBinding:
+    """
+    Stable callbacks for ClaudeAgentOptions that delegate to the current task.
+
+    Usage:
+        binding = TaskBinding()
+        options = ClaudeAgentOptions(can_use_tool=binding.can_use_tool, ...)
+        binding.bind(can_use_tool=..., pre_tool_use=..., post_tool_use=...)
+    """
+
+    def __init__(self):
+        self._can_use_tool: Optional[Callable[..., Awaitable[Any]]] = None
+        self._pre_tool_use: Optional[Callable[..., Awaitable[dict]]] = None
+        self._post_tool_use: Optional[Callable[..., Awaitable[dict]]] = None
+
+    def bind(
+        self,
+        can_use_tool: Callable[..., Awaitable[Any]],
+        pre_tool_use: Callable[..., Awaitable[dict]],
+        post_tool_use: Callable[..., Awaitable[dict]],
+    ) -> None:
+        """Route callbacks to the task that currently owns the client."""
+        self._can_use_tool = can_use_tool
+        self._pre_tool_use = pre_tool_use
+        self._post_tool_use = post_tool_use
+
+    async def can_use_tool(self, tool_name: str, tool_input: dict, context: Any) -> Any:
+        return await self._can_use_tool(tool_name, tool_input, context)
+
+    async def pre_tool_use(self, input_data: dict, tool_use_id: Optional[str], context: Any) -> dict:
+        return await self._pre_tool_use(input_data, tool_use_id, context)
+
+    async def post_tool_use(self, input_data: dict, tool_use_id: Optional[str], context: Any) -> dict:
+        return await self._post_tool_use(input_data, tool_use_id, context)
+
+
+def config_fingerprint(*parts: Any) -> str:
+    """Short stable digest of configuration that is fixed at connect time."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PooledClient:
+    """A connected client and the session it is positioned on."""
+    client: Any
+    key: Hashable
+    binding: TaskBinding
+    session_id: Optional[str] = None
+    warm: bool = False  # True when taken from the pool
+    reusable: bool = False  # Set by the task when it finished cleanly
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    expiry: Optional[asyncio.Task] = None
+
+
+@dataclass
+class TTFTStat:
+    """Running time-to-first-token statistics."""
+    count: int = 0
+    total: float = 0.0
+    last: Optional[float] = None
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_s": round(self.total / self.count, 3) if self.count else None,
+            "last_s": round(self.last, 3) if self.last is not None else None,
+        }
+
+
+class SDKClientPool:
+    """
+    Opt-in pool of idle ClaudeSDKClient instances.
+
+    When disabled, acquire() always misses and release() disconnects, so
+    the caller has a single code path either way.
+    """
+
+    IDLE_TTL = 300.0  # Seconds an idle client stays connected
+    DISCONNECT_TIMEOUT = 10.0
+
+    def __init__(self, enabled: bool = False, idle_ttl: float = IDLE_TTL):
+        self.enabled = enabled
+        self.idle_ttl = idle_ttl
+        self._idle: dict[Hashable, PooledClient] = {}
+        self._closing: set[asyncio.Task] = set()
+
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._ttft = {"cold": TTFTStat(), "warm": TTFTStat()}
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        key: Hashable,
+        session_id: Optional[str],
+        connect: Callable[[TaskBinding], Awaitable[Any]],
+    ) -> AsyncIterator[PooledClient]:
+        """
+        Use a warm client for key/session_id, or connect a new one.
+
+        The task marks entry.reusable (and entry.session_id) when it
+        finished cleanly; otherwise the client is disconnected on exit.
+
+        Usage:
+            async with pool.lease(key, session_id, connect) as entry:
+                entry.binding.bind(can_use_tool, pre_hook, post_hook)
+                await entry.client.query(prompt)
+                ...
+                entry.session_id, entry.reusable = result_session_id, True
+        """
+        entry = self.acquire(key, session_id)
+        if entry is None:
+            binding = TaskBinding()
+            client = await connect(binding)
+            entry = PooledClient(client=client, key=key, binding=binding, session_id=session_id)
+        entry.reusable = False
+        try:
+            yield entry
+        finally:
+            await self.release(entry)
+
+    def acquire(self, key: Hashable, session_id: Optional[str]) -> Optional[PooledClient]:
+        """
+        Take the idle client for key if it continues session_id.
+
+        A client positioned on another session can't be redirected, so it
+        is disconnected and the caller starts cold.
+        """
+        entry = self._idle.pop(key, None)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._cancel_expiry(entry)
+        if entry.session_id != session_id:
+            logger.info(f"Warm pool: session changed for {key[0]}, discarding idle client")
+            self._misses += 1
+            self._disconnect_later(entry)
+            return None
+
+        entry.warm = True
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+        self._hits += 1
+        return entry
+
+    async def release(self, entry: PooledClient) -> None:
+        """Return a client after a task: pooled if reusable, disconnected otherwise."""
+        if not (self.enabled and entry.reusable and entry.session_id):
+            await self._disconnect(entry)
+            return
+
+        previous = self._idle.pop(entry.key, None)
+        if previous is not None and previous is not entry:
+            self._cancel_expiry(previous)
+            self._disconnect_later(previous)
+
+        entry.last_used = time.monotonic()
+        entry.expiry = asyncio.create_task(self._expire(entry))
+        self._idle[entry.key] = entry
+
+    def record_ttft(self, warm: bool, seconds: float) -> None:
+        """Record time from task start to the first assistant message."""
+        self._ttft["warm" if warm else "cold"].add(seconds)
+
+    async def close(self) -> None:
+        """Disconnect all idle clients."""
+        entries = list(self._idle.values())
+        self._idle.clear()
+        for entry in entries:
+            self._cancel_expiry(entry)
+        await asyncio.gather(
+            *(self._disconnect(e) for e in entries),
+            *self._closing,
+            return_exceptions=True,
+        )
+
+    def get_stats(self) -> dict:
+        """Pool and time-to-first-token statistics."""
+        return {
+            "enabled": self.enabled,
+            "idle": len(self._idle),
+            "hits": self._hits,
+            "misses": self._misses,
+            "expired": self._expired,
+            "ttft": {kind: stat.to_dict() for kind, stat in self._ttft.items()},
+        }
+
+    async def _expire(self, entry: PooledClient) -> None:
+        await asyncio.sleep(self.idle_ttl)
+        if self._idle.get(entry.key) is entry:
+            del self._idle[entry.key]
+            self._expired += 1
+            logger.info(f"Warm pool: idle client for {entry.key[0]} expired")
+            entry.expiry = None
+            await self._disconnect(entry)
+
+    @staticmethod
+    def _cancel_expiry(entry: PooledClient) -> None:
+        if entry.expiry is not None and not entry.expiry.done():
+            entry.expiry.cancel()
+        entry.expiry = None
+
+    def _disconnect_later(self, entry: PooledClient) -> None:
+        task = asyncio.create_task(self._disconnect(entry))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _disconnect(self, entry: PooledClient) -> None:
+        try:
+            await asyncio.wait_for(entry.client.disconnect(), timeout=self.DISCONNECT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Warm pool: error disconnecting client: {e}")
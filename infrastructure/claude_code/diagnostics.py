@@ -2,56 +2,141 @@
 Claude Code CLI Diagnostics
 
 Run comprehensive tests to diagnose why Claude Code CLI isn't working.
+
+Tests run concurrently. The live prompt test is the expensive one (up to
+30s), so on startup its result is cached on disk keyed by a fingerprint
+of the CLI binary and its version, and it is only re-run when the CLI
+changes or when diagnostics are requested explicitly (/diagnose).
 """
 
 import asyncio
+import hashlib
+import json
 import os
 import logging
-import subprocess
+import shutil
+import time
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_PATH = Path("data") / "diagnostics_cache.json"
+SIMPLE_PROMPT_TEST = "Simple prompt test"
+
 
-async def run_diagnostics(claude_path: str = "claude") -> dict:
+async def run_diagnostics(
+    claude_path: str = "claude",
+    include_prompt: bool = True,
+) -> dict:
     """
     Run comprehensive diagnostics on Claude Code CLI.
     Returns dict with results of each test.
+
+    Args:
+        claude_path: CLI binary name or path
+        include_prompt: Also run the live prompt test (slow, uses the API)
     """
-    results = {
-        "tests": [],
-        "summary": "",
-        "working": False
-    }
+    started = time.perf_counter()
 
-    # Test 1: Check if claude binary exists
-    test1 = await _test_binary_exists(claude_path)
-    results["tests"].append(test1)
+    checks = [
+        _test_binary_exists(claude_path),
+        _test_version(claude_path),
+        _test_help(claude_path),
+    ]
+    if include_prompt:
+        checks.append(_test_simple_prompt(claude_path))
 
-    # Test 2: Get version
-    test2 = await _test_version(claude_path)
-    results["tests"].append(test2)
+    binary, version, help_, *prompt = await asyncio.gather(*checks)
+    tests = [binary, version, help_, _test_environment(), *prompt]
+
+    results = _build_results(tests)
+    results["duration"] = time.perf_counter() - started
+    return results
 
-    # Test 3: Get help output
-    test3 = await _test_help(claude_path)
-    results["tests"].append(test3)
 
-    # Test 4: Check environment
-    test4 = _test_environment()
-    results["tests"].append(test4)
+async def run_cached_diagnostics(
+    claude_path: str = "claude",
+    cache_path: Path = DEFAULT_CACHE_PATH,
+    force_prompt: bool = False,
+) -> dict:
+    """
+    Run diagnostics, reusing the cached prompt test for an unchanged CLI.
 
-    # Test 5: Simple prompt test (with timeout)
-    test5 = await _test_simple_prompt(claude_path)
-    results["tests"].append(test5)
+    The cheap tests always run. The live prompt test runs only when the
+    cache has no result for the current binary fingerprint and version,
+    or when force_prompt is set. Only a passing result is cached, so a
+    transient failure is re-checked on the next run.
+    Sets results["cached"] when the prompt result came from the cache.
+    """
+    started = time.perf_counter()
 
-    # Generate summary
-    passed = sum(1 for t in results["tests"] if t["passed"])
-    total = len(results["tests"])
-    results["summary"] = f"Passed {passed}/{total} tests"
-    results["working"] = all(t["passed"] for t in results["tests"])
+    results = await run_diagnostics(claude_path, include_prompt=False)
+    version = results["tests"][1]["output"] if results["tests"][1]["passed"] else ""
+    key = await asyncio.to_thread(_cli_fingerprint, claude_path, version)
 
+    cache = await asyncio.to_thread(_load_cache, cache_path)
+    prompt_test = None if force_prompt else cache.get(key)
+    cached = prompt_test is not None
+
+    if not cached:
+        prompt_test = await _test_simple_prompt(claude_path)
+        if prompt_test["passed"]:
+            # Only the current CLI is worth keeping
+            await asyncio.to_thread(_save_cache, cache_path, {key: prompt_test})
+
+    results = _build_results(results["tests"] + [prompt_test])
+    results["cached"] = cached
+    results["duration"] = time.perf_counter() - started
     return results
 
 
+def _build_results(tests: list[dict]) -> dict:
+    """Assemble results dict with summary from individual tests"""
+    passed = sum(1 for t in tests if t["passed"])
+    return {
+        "tests": tests,
+        "summary": f"Passed {passed}/{len(tests)} tests",
+        "working": all(t["passed"] for t in tests),
+    }
+
+
+def _cli_fingerprint(claude_path: str, version: str) -> str:
+    """
+    Cache key for the installed CLI.
+
+    Hashes the resolved binary path with its size and mtime instead of the
+    file contents: the npm package is large, and an upgrade always rewrites
+    the file. The version string covers wrappers whose target changes.
+    """
+    resolved = shutil.which(claude_path) or claude_path
+    try:
+        real = os.path.realpath(resolved)
+        stat = os.stat(real)
+        identity = f"{real}:{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        identity = resolved
+    return hashlib.sha256(f"{identity}|{version}".encode()).hexdigest()
+
+
+def _load_cache(cache_path: Path) -> dict:
+    try:
+        data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_cache(cache_path: Path, cache: dict) -> None:
+    try:
+        path = Path(cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Failed to save diagnostics cache: {e}")
+
+
 async def _test_binary_exists(claude_path: str) -> dict:
     """Test if claude binary is accessible"""
     test = {
@@ -62,31 +147,13 @@ async def _test_binary_exists(claude_path: str) -> dict:
     }
 
     try:
-        result = subprocess.run(
-            ["which", claude_path],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
+        # shutil.which works on every platform and doesn't spawn a process
+        path = shutil.which(claude_path)
+        if path:
             test["passed"] = True
-            test["output"] = result.stdout.strip()
+            test["output"] = path
         else:
-            test["error"] = f"Binary not found: {result.stderr}"
-    except FileNotFoundError:
-        # Windows doesn't have 'which', try 'where' or just run --version
-        try:
-            result = subprocess.run(
-                [claude_path, "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            test["passed"] = result.returncode == 0
-            test["output"] = result.stdout.strip() if result.returncode == 0 else ""
-            test["error"] = result.stderr.strip() if result.returncode != 0 else ""
-        except Exception as e:
-            test["error"] = str(e)
+            test["error"] = f"Binary not found: {claude_path}"
     except Exception as e:
         test["error"] = str(e)
 
@@ -186,7 +253,7 @@ def _test_environment() -> dict:
 async def _test_simple_prompt(claude_path: str) -> dict:
     """Test a simple prompt with short timeout"""
     test = {
-        "name": "Simple prompt test",
+        "name": SIMPLE_PROMPT_TEST,
         "passed": False,
         "output": "",
         "error": ""
@@ -227,14 +294,18 @@ async def _test_simple_prompt(claude_path: str) -> dict:
     return test
 
 
-async def run_and_log_diagnostics(claude_path: str = "claude"):
-    """Run diagnostics and log results"""
+async def run_and_log_diagnostics(
+    claude_path: str = "claude",
+    cache_path: Path = DEFAULT_CACHE_PATH,
+    force_prompt: bool = False,
+):
+    """Run diagnostics (prompt test cached per CLI version) and log results"""
+    results = await run_cached_diagnostics(claude_path, cache_path, force_prompt)
+
     logger.info("=" * 50)
     logger.info("CLAUDE CODE CLI DIAGNOSTICS")
     logger.info("=" * 50)
 
-    results = await run_diagnostics(claude_path)
-
     for test in results["tests"]:
         status = "✓ PASS" if test["passed"] else "✗ FAIL"
         logger.info(f"\n{status}: {test['name']}")
@@ -248,6 +319,8 @@ async def run_and_log_diagnostics(claude_path: str = "claude"):
     logger.info(f"\n{'=' * 50}")
     logger.info(f"SUMMARY: {results['summary']}")
     logger.info(f"CLI Working: {results['working']}")
+    prompt_source = "cached" if results.get("cached") else "live"
+    logger.info(f"Took {results['duration']:.2f}s (prompt test: {prompt_source})")
     logger.info("=" * 50)
 
     return results
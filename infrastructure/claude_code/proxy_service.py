@@ -18,6 +18,8 @@ from enum import Enum
 from typing import Any, Callable, Awaitable, Optional
 from datetime import datetime
 
+from .stream_reader import StreamJsonReader, _loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -184,40 +186,38 @@ class ClaudeCodeProxyService:
             self._processes[user_id] = process
             logger.info(f"[{user_id}] Process started with PID: {process.pid}")
 
-            # Read stream-json output line by line (each event is a JSON line)
+            # Read stream-json output: the reader parses stdout in its own task,
+            # this loop drains its queue and runs the (slow) UI callbacks
+            reader = StreamJsonReader(
+                process.stdout,
+                self._event_from_data,
+                merge=self._merge_text_events,
+            )
+
             async def read_stream():
                 nonlocal result_session_id
-                text_buffer = ""  # Accumulate text for streaming
-
-                while True:
-                    if self._cancel_events[user_id].is_set():
-                        logger.info(f"[{user_id}] Stream cancelled")
-                        return
-
-                    try:
-                        line = await asyncio.wait_for(
-                            process.stdout.readline(),
-                            timeout=60  # 60 sec timeout per line
-                        )
-                    except asyncio.TimeoutError:
-                        # No output for 60 seconds - check if process still running
-                        if process.returncode is not None:
-                            break
-                        continue
+                reader_task = asyncio.create_task(reader.run())
 
-                    if not line:
-                        logger.info(f"[{user_id}] Stream EOF")
-                        break
+                try:
+                    while True:
+                        if self._cancel_events[user_id].is_set():
+                            logger.info(f"[{user_id}] Stream cancelled")
+                            return
 
-                    line_str = line.decode('utf-8').strip()
-                    if not line_str:
-                        continue
+                        item = await reader.get()
+                        if item is None:
+                            logger.info(f"[{user_id}] Stream EOF, reader stats: {reader.get_stats()}")
+                            break
 
-                    logger.debug(f"[{user_id}] RAW: {line_str[:200]}")
+                        if isinstance(item, str):
+                            # Non-JSON line - might be plain text output
+                            logger.info(f"[{user_id}] Non-JSON: {item[:100]}")
+                            if on_text:
+                                output_buffer.append(item)
+                                await on_text(item + "\n")
+                            continue
 
-                    # Try to parse as JSON event
-                    event = self._parse_event(line_str)
-                    if event:
+                        event = item
                         logger.info(f"[{user_id}] Event: {event.type.value}")
 
                         # Handle the event
@@ -231,12 +231,8 @@ class ClaudeCodeProxyService:
                         # Extract session_id from result
                         if event.type == EventType.RESULT and event.session_id:
                             result_session_id = event.session_id
-                    else:
-                        # Non-JSON line - might be plain text output
-                        logger.info(f"[{user_id}] Non-JSON: {line_str[:100]}")
-                        if on_text and line_str:
-                            output_buffer.append(line_str)
-                            await on_text(line_str + "\n")
+                finally:
+                    reader_task.cancel()
 
             # Read stderr in background
             async def read_stderr():
@@ -302,174 +298,191 @@ class ClaudeCodeProxyService:
             self._permission_responses.pop(user_id, None)
             self._question_responses.pop(user_id, None)
 
+    @staticmethod
+    def _merge_text_events(queued: Any, new: Any) -> Optional[ClaudeCodeEvent]:
+        """Merge consecutive text deltas waiting in the reader queue."""
+        if (
+            isinstance(queued, ClaudeCodeEvent)
+            and isinstance(new, ClaudeCodeEvent)
+            and queued.type == EventType.TEXT
+            and new.type == EventType.TEXT
+        ):
+            queued.content += new.content
+            return queued
+        return None
+
     def _parse_event(self, line: str) -> Optional[ClaudeCodeEvent]:
         """Parse a JSON line from Claude Code stream output"""
         try:
-            data = json.loads(line)
-
-            # Determine event type
-            event_type = data.get("type", "")
-            logger.debug(f"Parsing event type: {event_type}, data keys: {list(data.keys())}")
-
-            # Assistant message - can contain text and tool_use blocks
-            if event_type == "assistant":
-                message = data.get("message", {})
-                content_blocks = message.get("content", [])
-
-                text_content = ""
-                for block in content_blocks:
-                    block_type = block.get("type", "")
-                    if block_type == "text":
-                        text_content += block.get("text", "")
-                    elif block_type == "tool_use":
-                        # Also emit tool_use event
-                        return ClaudeCodeEvent(
-                            type=EventType.TOOL_USE,
-                            tool_name=block.get("name"),
-                            tool_input=block.get("input", {}),
-                            tool_id=block.get("id"),
-                            raw=data
-                        )
-
-                if text_content:
-                    return ClaudeCodeEvent(
-                        type=EventType.ASSISTANT_MESSAGE,
-                        content=text_content,
-                        session_id=data.get("session_id"),
-                        raw=data
-                    )
-
-            # Content block start - tool use
-            elif event_type == "content_block_start":
-                content_block = data.get("content_block", {})
-                if content_block.get("type") == "tool_use":
+            data = _loads(line)
+        except ValueError:
+            # Not JSON - could be plain text
+            return None
+        if not isinstance(data, dict):
+            return None
+        return self._event_from_data(data)
+
+    def _event_from_data(self, data: dict) -> Optional[ClaudeCodeEvent]:
+        """Build an event from a decoded stream-json object"""
+        # Determine event type
+        event_type = data.get("type", "")
+        logger.debug(f"Parsing event type: {event_type}, data keys: {list(data.keys())}")
+
+        # Assistant message - can contain text and tool_use blocks
+        if event_type == "assistant":
+            message = data.get("message", {})
+            content_blocks = message.get("content", [])
+
+            text_content = ""
+            for block in content_blocks:
+                block_type = block.get("type", "")
+                if block_type == "text":
+                    text_content += block.get("text", "")
+                elif block_type == "tool_use":
+                    # Also emit tool_use event
                     return ClaudeCodeEvent(
                         type=EventType.TOOL_USE,
-                        tool_name=content_block.get("name"),
-                        tool_input=content_block.get("input", {}),
-                        tool_id=content_block.get("id"),
+                        tool_name=block.get("name"),
+                        tool_input=block.get("input", {}),
+                        tool_id=block.get("id"),
                         raw=data
                     )
 
-            # Streaming text delta
-            elif event_type == "content_block_delta":
-                delta = data.get("delta", {})
-                if delta.get("type") == "text_delta":
-                    return ClaudeCodeEvent(
-                        type=EventType.TEXT,
-                        content=delta.get("text", ""),
-                        raw=data
-                    )
-                elif delta.get("type") == "input_json_delta":
-                    # Tool input streaming - skip for now
-                    pass
-
-            # Tool use event
-            elif event_type == "tool_use":
+            if text_content:
                 return ClaudeCodeEvent(
-                    type=EventType.TOOL_USE,
-                    tool_name=data.get("name") or data.get("tool"),
-                    tool_input=data.get("input", {}),
-                    tool_id=data.get("id"),
+                    type=EventType.ASSISTANT_MESSAGE,
+                    content=text_content,
+                    session_id=data.get("session_id"),
                     raw=data
                 )
 
-            # Tool result
-            elif event_type == "tool_result" or event_type == "user":
-                # user type with tool_result content
-                content = data.get("content", "")
-                if isinstance(content, list):
-                    # Extract text from content blocks
-                    text_parts = []
-                    for block in content:
-                        if isinstance(block, dict) and block.get("type") == "tool_result":
-                            text_parts.append(str(block.get("content", "")))
-                    content = "\n".join(text_parts)
-
+        # Content block start - tool use
+        elif event_type == "content_block_start":
+            content_block = data.get("content_block", {})
+            if content_block.get("type") == "tool_use":
                 return ClaudeCodeEvent(
-                    type=EventType.TOOL_RESULT,
-                    tool_id=data.get("tool_use_id") or data.get("id"),
-                    content=str(content)[:500],  # Truncate long results
+                    type=EventType.TOOL_USE,
+                    tool_name=content_block.get("name"),
+                    tool_input=content_block.get("input", {}),
+                    tool_id=content_block.get("id"),
                     raw=data
                 )
 
-            # Result/completion
-            elif event_type == "result" or event_type == "message_stop":
+        # Streaming text delta
+        elif event_type == "content_block_delta":
+            delta = data.get("delta", {})
+            if delta.get("type") == "text_delta":
                 return ClaudeCodeEvent(
-                    type=EventType.RESULT,
-                    content=data.get("content", "") or data.get("result", ""),
-                    session_id=data.get("session_id"),
+                    type=EventType.TEXT,
+                    content=delta.get("text", ""),
                     raw=data
                 )
+            elif delta.get("type") == "input_json_delta":
+                # Tool input streaming - skip for now
+                pass
+
+        # Tool use event
+        elif event_type == "tool_use":
+            return ClaudeCodeEvent(
+                type=EventType.TOOL_USE,
+                tool_name=data.get("name") or data.get("tool"),
+                tool_input=data.get("input", {}),
+                tool_id=data.get("id"),
+                raw=data
+            )
 
-            # Error
-            elif event_type == "error":
+        # Tool result
+        elif event_type == "tool_result" or event_type == "user":
+            # user type with tool_result content
+            content = data.get("content", "")
+            if isinstance(content, list):
+                # Extract text from content blocks
+                text_parts = []
+                for block in content:
+                    if isinstance(block, dict) and block.get("type") == "tool_result":
+                        text_parts.append(str(block.get("content", "")))
+                content = "\n".join(text_parts)
+
+            return ClaudeCodeEvent(
+                type=EventType.TOOL_RESULT,
+                tool_id=data.get("tool_use_id") or data.get("id"),
+                content=str(content)[:500],  # Truncate long results
+                raw=data
+            )
+
+        # Result/completion
+        elif event_type == "result" or event_type == "message_stop":
+            return ClaudeCodeEvent(
+                type=EventType.RESULT,
+                content=data.get("content", "") or data.get("result", ""),
+                session_id=data.get("session_id"),
+                raw=data
+            )
+
+        # Error
+        elif event_type == "error":
+            return ClaudeCodeEvent(
+                type=EventType.ERROR,
+                error=data.get("error", {}).get("message") if isinstance(data.get("error"), dict) else data.get("error") or data.get("message"),
+                raw=data
+            )
+
+        # System message
+        elif event_type == "system" or "system" in event_type.lower():
+            return ClaudeCodeEvent(
+                type=EventType.SYSTEM,
+                content=data.get("message") or data.get("content", ""),
+                raw=data
+            )
+
+        # Input request (permission or question)
+        elif event_type == "input_request" or event_type == "input":
+            # This is the HITL event - permission or question
+            input_type = data.get("input_type", "")
+
+            if input_type == "permission" or "permission" in str(data).lower():
                 return ClaudeCodeEvent(
-                    type=EventType.ERROR,
-                    error=data.get("error", {}).get("message") if isinstance(data.get("error"), dict) else data.get("error") or data.get("message"),
+                    type=EventType.PERMISSION_REQUEST,
+                    tool_name=data.get("tool") or data.get("tool_name", ""),
+                    content=data.get("description") or data.get("command") or json.dumps(data),
                     raw=data
                 )
-
-            # System message
-            elif event_type == "system" or "system" in event_type.lower():
+            else:
+                # Question
                 return ClaudeCodeEvent(
-                    type=EventType.SYSTEM,
-                    content=data.get("message") or data.get("content", ""),
+                    type=EventType.ASK_USER,
+                    question=data.get("question") or data.get("message") or data.get("prompt", ""),
+                    options=data.get("options", []),
                     raw=data
                 )
 
-            # Input request (permission or question)
-            elif event_type == "input_request" or event_type == "input":
-                # This is the HITL event - permission or question
-                input_type = data.get("input_type", "")
-
-                if input_type == "permission" or "permission" in str(data).lower():
-                    return ClaudeCodeEvent(
-                        type=EventType.PERMISSION_REQUEST,
-                        tool_name=data.get("tool") or data.get("tool_name", ""),
-                        content=data.get("description") or data.get("command") or json.dumps(data),
-                        raw=data
-                    )
-                else:
-                    # Question
-                    return ClaudeCodeEvent(
-                        type=EventType.ASK_USER,
-                        question=data.get("question") or data.get("message") or data.get("prompt", ""),
-                        options=data.get("options", []),
-                        raw=data
-                    )
+        # Skip these event types silently
+        elif event_type in ["message_start", "content_block_stop", "message_delta", "ping"]:
+            return None
 
-            # Skip these event types silently
-            elif event_type in ["message_start", "content_block_stop", "message_delta", "ping"]:
-                return None
+        # Unknown event type - log it and try to extract content
+        logger.info(f"Unknown event type: {event_type}, keys: {list(data.keys())}")
 
-            # Unknown event type - log it and try to extract content
-            logger.info(f"Unknown event type: {event_type}, keys: {list(data.keys())}")
+        # Check for permission-like events
+        if "permission" in str(data).lower() or "approve" in str(data).lower():
+            return ClaudeCodeEvent(
+                type=EventType.PERMISSION_REQUEST,
+                tool_name=data.get("tool") or data.get("name", "unknown"),
+                content=json.dumps(data, ensure_ascii=False)[:500],
+                raw=data
+            )
 
-            # Check for permission-like events
-            if "permission" in str(data).lower() or "approve" in str(data).lower():
+        # Try to extract any text content
+        if data.get("text") or data.get("content"):
+            content = data.get("text") or data.get("content", "")
+            if isinstance(content, str) and content:
                 return ClaudeCodeEvent(
-                    type=EventType.PERMISSION_REQUEST,
-                    tool_name=data.get("tool") or data.get("name", "unknown"),
-                    content=json.dumps(data, ensure_ascii=False)[:500],
+                    type=EventType.TEXT,
+                    content=content,
                     raw=data
                 )
 
-            # Try to extract any text content
-            if data.get("text") or data.get("content"):
-                content = data.get("text") or data.get("content", "")
-                if isinstance(content, str) and content:
-                    return ClaudeCodeEvent(
-                        type=EventType.TEXT,
-                        content=content,
-                        raw=data
-                    )
-
-            return None
-
-        except json.JSONDecodeError:
-            # Not JSON - could be plain text
-            return None
+        return None
 
     async def _handle_event(
         self,
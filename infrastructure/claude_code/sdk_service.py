@@ -16,11 +16,22 @@ import asyncio
 import logging
 import os
 import re
+import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Awaitable, Optional
+from typing import TYPE_CHECKING, Any, Callable, Awaitable, Optional
 from datetime import datetime
 
+from infrastructure.claude_code.client_pool import (
+    SDKClientPool,
+    TaskBinding,
+    config_fingerprint,
+)
+from infrastructure.claude_code.task_env import build_task_env, env_overlay
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
 logger = logging.getLogger(__name__)
 
 # Try to import SDK - may not be installed yet
@@ -47,6 +58,15 @@ except ImportError:
     SDK_AVAILABLE = False
     logger.warning("claude-agent-sdk not installed. Install with: pip install claude-agent-sdk")
 
+# In-process Telegram MCP tools are optional: if they fail to load, tasks
+# fall back to the Node.js server and the SDK backend keeps working
+try:
+    from infrastructure.claude_code.telegram_mcp import create_telegram_mcp_server
+except Exception as e:
+    create_telegram_mcp_server = None
+    if SDK_AVAILABLE:
+        logger.warning(f"In-process Telegram MCP tools unavailable: {e}")
+
 
 def _format_tool_response(tool_name: str, response: Any, max_length: int = 500) -> str:
     """Format tool response for display in Telegram.
@@ -203,9 +223,12 @@ class ClaudeAgentSDKService:
         permission_mode: str = "default",  # "default", "acceptEdits", "bypassPermissions"
         plugins_dir: str = "/plugins",  # For custom plugins only
         enabled_plugins: list[str] = None,  # For custom plugins only
-        telegram_mcp_path: str = "/app/telegram-mcp/build/index.js",  # Path to telegram MCP server
+        telegram_mcp_path: str = "/app/telegram-mcp/build/index.js",  # Node.js fallback without a bot
+        bot: Optional["Bot"] = None,  # Serves telegram MCP tools in-process
         account_service: "AccountService" = None,  # For auth mode switching
         proxy_service: "ProxyService" = None,  # For proxy configuration
+        warm_pool: bool = False,  # Keep idle connected clients between prompts
+        warm_pool_ttl: float = SDKClientPool.IDLE_TTL,
     ):
         if not SDK_AVAILABLE:
             raise RuntimeError(
@@ -219,6 +242,9 @@ class ClaudeAgentSDKService:
         self.plugins_dir = plugins_dir
         self.enabled_plugins = enabled_plugins or []
         self.telegram_mcp_path = telegram_mcp_path
+        self.bot = bot
+        # In-process telegram MCP servers by chat, reused so pooled clients match
+        self._telegram_mcp_servers: dict[int, dict] = {}
         self.account_service = account_service  # Optional - for auth mode switching
         self.proxy_service = proxy_service  # Optional - for proxy configuration
 
@@ -249,6 +275,17 @@ class ClaudeAgentSDKService:
         self._current_task_id: dict[int, str] = {}
         self._task_lock: asyncio.Lock = asyncio.Lock()
 
+        # Warm pool of connected clients (opt-in) + time-to-first-token stats
+        self._pool = SDKClientPool(enabled=warm_pool, idle_ttl=warm_pool_ttl)
+
+    def get_pool_stats(self) -> dict:
+        """Warm pool hits/misses and cold/warm time-to-first-token."""
+        return self._pool.get_stats()
+
+    async def close(self) -> None:
+        """Disconnect idle pooled clients."""
+        await self._pool.close()
+
     async def check_sdk_available(self) -> tuple[bool, str]:
         """Check if Claude Agent SDK is available"""
         if not SDK_AVAILABLE:
@@ -291,11 +328,18 @@ class ClaudeAgentSDKService:
             logger.warning(f"[{user_id}] Error getting auth mode, using default env: {e}")
             return dict(os.environ)
 
+    def attach_bot(self, bot: "Bot") -> None:
+        """Serve the telegram MCP tools in-process through this bot."""
+        self.bot = bot
+        self._telegram_mcp_servers.clear()
+
     def _get_mcp_servers_config(self, user_id: int) -> dict:
         """
         Build MCP servers configuration for ClaudeAgentOptions.
 
         Includes telegram MCP server with dynamic chat_id for the current user.
+        With a bot attached it runs in-process on the bot's session; otherwise
+        the Node.js server is started for the task.
 
         Args:
             user_id: Telegram user ID to send files/messages to
@@ -305,8 +349,17 @@ class ClaudeAgentSDKService:
         """
         mcp_servers = {}
 
+        if self.bot is not None and create_telegram_mcp_server is not None:
+            # Same server object for every task of the user, so the pool key
+            # (which fingerprints mcp_servers) stays stable
+            server = self._telegram_mcp_servers.get(user_id)
+            if server is None:
+                server = create_telegram_mcp_server(self.bot, user_id)
+                self._telegram_mcp_servers[user_id] = server
+            mcp_servers["telegram"] = server
+            logger.debug(f"[{user_id}] Telegram MCP server configured (in-process)")
         # Check if telegram MCP server exists
-        if os.path.isfile(self.telegram_mcp_path):
+        elif os.path.isfile(self.telegram_mcp_path):
             telegram_token = os.environ.get("TELEGRAM_TOKEN", "")
             if telegram_token:
                 mcp_servers["telegram"] = {
@@ -1122,9 +1175,11 @@ class ClaudeAgentSDKService:
 
             return {}
 
-        # Get and apply user-specific environment (for auth mode switching)
-        original_env = dict(os.environ)
-        user_env = await self.get_env_for_user(user_id)
+        # Build an isolated environment for this task (for auth mode switching).
+        # os.environ is never modified, so concurrent tasks of different users
+        # cannot see each other's credentials or model settings.
+        task_env = build_task_env(await self.get_env_for_user(user_id))
+        task_env_overlay = env_overlay(task_env)
 
         # Get user's preferred model (if AccountService is available)
         user_model: Optional[str] = None
@@ -1136,38 +1191,10 @@ class ClaudeAgentSDKService:
             except Exception as e:
                 logger.warning(f"[{user_id}] Error getting user model, using default: {e}")
 
-        # Prevent git from hanging waiting for credentials input
-        os.environ["GIT_TERMINAL_PROMPT"] = "0"
-
-        # Apply user environment
-        env_changes = []
-        for key, value in user_env.items():
-            if key.startswith("_"):  # Skip internal markers
-                continue
-            if os.environ.get(key) != value:
-                env_changes.append(key)
-                os.environ[key] = value
-
-        # Remove keys that should be unset for this mode
-        # IMPORTANT: Include ANTHROPIC_MODEL and default model vars to prevent
-        # z.ai model (e.g., glm-4.7) from being sent to official Claude API
-        keys_to_remove = (
-            "ANTHROPIC_API_KEY",
-            "ANTHROPIC_AUTH_TOKEN",
-            "ANTHROPIC_BASE_URL",
-            "ANTHROPIC_MODEL",
-            "ANTHROPIC_DEFAULT_HAIKU_MODEL",
-            "ANTHROPIC_DEFAULT_SONNET_MODEL",
-            "ANTHROPIC_DEFAULT_OPUS_MODEL",
-        )
-        removed_keys = []
-        for key in list(os.environ.keys()):
-            if key not in user_env and key in keys_to_remove:
-                removed_keys.append(key)
-                del os.environ[key]
-
-        if env_changes or removed_keys:
-            logger.info(f"[{user_id}] Applied env: set={env_changes}, removed={removed_keys}")
+        if task_env_overlay:
+            removed_keys = sorted(k for k in task_env_overlay if k not in task_env)
+            set_keys = sorted(k for k in task_env_overlay if k in task_env)
+            logger.info(f"[{user_id}] Task env: set={set_keys}, removed={removed_keys}")
 
         try:
             # Build plugin configurations
@@ -1180,31 +1207,53 @@ class ClaudeAgentSDKService:
             if mcp_servers:
                 logger.info(f"[{user_id}] MCP servers enabled: {list(mcp_servers.keys())}")
 
-            # Build options
-            options = ClaudeAgentOptions(
-                cwd=work_dir,
-                max_turns=self.max_turns,
-                model=user_model,  # Use user's selected model if set
-                permission_mode=self.permission_mode if self.permission_mode != "default" else None,
-                can_use_tool=can_use_tool,
-                hooks={
-                    "PreToolUse": [HookMatcher(hooks=[pre_tool_hook])],
-                    "PostToolUse": [HookMatcher(hooks=[post_tool_hook])],
-                },
-                # Enable session continuity for context memory (disable on retry)
-                resume=None if _retry_without_resume else session_id,
-                plugins=plugins if plugins else None,
-                # MCP servers for custom tools (telegram file sending, etc.)
-                mcp_servers=mcp_servers if mcp_servers else None,
+            # Enable session continuity for context memory (disable on retry)
+            resume = None if _retry_without_resume else session_id
+
+            async def connect(binding: TaskBinding) -> ClaudeSDKClient:
+                # Callbacks go through the binding so a pooled client can serve later tasks
+                options = ClaudeAgentOptions(
+                    cwd=work_dir,
+                    max_turns=self.max_turns,
+                    model=user_model,  # Use user's selected model if set
+                    permission_mode=self.permission_mode if self.permission_mode != "default" else None,
+                    can_use_tool=binding.can_use_tool,
+                    hooks={
+                        "PreToolUse": [HookMatcher(hooks=[binding.pre_tool_use])],
+                        "PostToolUse": [HookMatcher(hooks=[binding.post_tool_use])],
+                    },
+                    resume=resume,
+                    plugins=plugins if plugins else None,
+                    # MCP servers for custom tools (telegram file sending, etc.)
+                    mcp_servers=mcp_servers if mcp_servers else None,
+                    # Per-task environment for the CLI subprocess
+                    env=dict(task_env_overlay),
+                )
+                client = ClaudeSDKClient(options=options)
+                await client.connect()
+                return client
+
+            # Everything fixed at connect time: project, auth env, model, plugins/MCP
+            pool_key = (
+                user_id,
+                os.path.realpath(work_dir),
+                config_fingerprint(sorted(task_env_overlay.items())),
+                user_model,
+                config_fingerprint(plugins, mcp_servers, self.permission_mode, self.max_turns),
             )
 
-            resume_info = f"resume={session_id[:16]}..." if session_id and not _retry_without_resume else "new session"
+            resume_info = f"resume={session_id[:16]}..." if resume else "new session"
             logger.info(f"[{user_id}] Starting SDK task in {work_dir} ({resume_info})")
             logger.info(f"[{user_id}] Prompt: {prompt[:200]}")
 
-            # Use context manager for proper cleanup
-            async with ClaudeSDKClient(options=options) as client:
+            # Warm client from the pool, or a new connection (disconnected on exit
+            # unless the task finishes cleanly and the pool is enabled)
+            started_at = time.monotonic()
+            async with self._pool.lease(pool_key, resume, connect) as pooled:
+                pooled.binding.bind(can_use_tool, pre_tool_hook, post_tool_hook)
+                client = pooled.client
                 self._clients[user_id] = client
+                ttft_recorded = False
 
                 # Send the prompt
                 logger.info(f"[{user_id}] Sending query to Claude SDK...")
@@ -1224,6 +1273,14 @@ class ClaudeAgentSDKService:
 
                     # Handle different message types
                     if isinstance(message, AssistantMessage):
+                        if not ttft_recorded:
+                            ttft_recorded = True
+                            ttft = time.monotonic() - started_at
+                            self._pool.record_ttft(pooled.warm, ttft)
+                            logger.info(
+                                f"[{user_id}] Time to first token: {ttft:.2f}s "
+                                f"({'warm' if pooled.warm else 'cold'} start)"
+                            )
                         logger.info(f"[{user_id}] AssistantMessage with {len(message.content)} blocks")
                         for block in message.content:
                             if isinstance(block, TextBlock):
@@ -1313,6 +1370,10 @@ class ClaudeAgentSDKService:
                         usage=result_usage,
                     )
 
+                # Clean finish: the client may serve the next prompt of this session
+                pooled.session_id = result_session_id
+                pooled.reusable = True
+
                 return SDKTaskResult(
                     success=True,
                     output="\n".join(output_buffer),
@@ -1371,10 +1432,6 @@ class ClaudeAgentSDKService:
             )
 
         finally:
-            # Restore original environment
-            os.environ.clear()
-            os.environ.update(original_env)
-
             # Cleanup
             self._clients.pop(user_id, None)
             self._tasks.pop(user_id, None)
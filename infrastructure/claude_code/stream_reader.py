@@ -0,0 +1,184 @@
+"""
+Stream-JSON reader for Claude Code CLI output.
+
+Reads the subprocess stdout in large chunks and frames lines itself
+instead of StreamReader.readline(), so multi-megabyte tool-result lines
+don't hit the 64KB StreamReader limit. Parsed events go into a bounded
+queue that a separate consumer drains: the reader never awaits UI
+callbacks, so a slow Telegram edit can't stall the pipe. Events waiting
+in the queue can be merged (consecutive text deltas become one edit).
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional fast JSON decoder (accepts bytes directly)
+try:
+    import orjson
+
+    _loads = orjson.loads
+    FAST_JSON_AVAILABLE = True
+except ImportError:
+    _loads = json.loads
+    FAST_JSON_AVAILABLE = False
+
+
+class StreamJsonReader:
+    """
+    Chunked line reader + bounded event queue for stream-json output.
+
+    Usage:
+        reader = StreamJsonReader(process.stdout, build_event, merge=merge_text)
+        reader_task = asyncio.create_task(reader.run())
+        while (item := await reader.get()) is not None:
+            ...  # event from build_event, or str for a non-JSON line
+    """
+
+    CHUNK_SIZE = 256 * 1024
+    MAX_LINE_BYTES = 64 * 1024 * 1024  # Longer lines are dropped
+    MAX_QUEUED = 256
+
+    def __init__(
+        self,
+        stream: asyncio.StreamReader,
+        build_event: Callable[[dict], Optional[Any]],
+        merge: Optional[Callable[[Any, Any], Optional[Any]]] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_line_bytes: int = MAX_LINE_BYTES,
+        max_queued: int = MAX_QUEUED,
+    ):
+        """
+        Args:
+            stream: Subprocess stdout
+            build_event: Converts a decoded JSON object into an event (None = skip)
+            merge: merge(queued, new) -> combined item, or None if they can't merge
+            chunk_size: Bytes per read()
+            max_line_bytes: Lines longer than this are dropped
+            max_queued: Queue size; the reader waits when the consumer is this far behind
+        """
+        self._stream = stream
+        self._build_event = build_event
+        self._merge = merge
+        self._chunk_size = chunk_size
+        self._max_line_bytes = max_line_bytes
+        self._max_queued = max_queued
+
+        self._items: Deque[Any] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._eof = False
+        self._error: Optional[Exception] = None
+
+        # Statistics
+        self.bytes_read = 0
+        self.lines = 0
+        self.coalesced = 0
+        self.dropped_lines = 0
+        self.max_depth = 0
+
+    async def run(self) -> None:
+        """Read the stream to EOF, framing lines and queueing events."""
+        buffer = bytearray()
+        skipping = False  # Inside an oversized line, drop until newline
+        try:
+            while True:
+                chunk = await self._stream.read(self._chunk_size)
+                if not chunk:
+                    break
+                self.bytes_read += len(chunk)
+
+                # Only the new data can contain the next newline
+                scan_from = len(buffer)
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(b"\n", scan_from)) != -1:
+                    if skipping:
+                        skipping = False
+                    else:
+                        await self._feed(bytes(buffer[start:end]))
+                    start = scan_from = end + 1
+                del buffer[:start]
+
+                if len(buffer) > self._max_line_bytes:
+                    if not skipping:
+                        logger.warning(
+                            f"StreamJsonReader: dropping line longer than {self._max_line_bytes} bytes"
+                        )
+                        self.dropped_lines += 1
+                        skipping = True
+                    buffer.clear()
+
+            if buffer and not skipping:
+                await self._feed(bytes(buffer))
+        except Exception as e:
+            self._error = e
+        finally:
+            self._eof = True
+            self._not_empty.set()
+
+    async def get(self) -> Optional[Any]:
+        """Next queued item, or None once the stream is exhausted."""
+        while not self._items:
+            if self._eof:
+                if self._error is not None:
+                    raise self._error
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        item = self._items.popleft()
+        self._not_full.set()
+        return item
+
+    def get_stats(self) -> dict:
+        """Reader statistics."""
+        return {
+            "bytes_read": self.bytes_read,
+            "lines": self.lines,
+            "coalesced": self.coalesced,
+            "dropped_lines": self.dropped_lines,
+            "queued": len(self._items),
+            "max_depth": self.max_depth,
+            "fast_json": FAST_JSON_AVAILABLE,
+        }
+
+    async def _feed(self, line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
+        self.lines += 1
+
+        try:
+            data = _loads(line)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            # Non-JSON line - plain text output
+            await self._put(line.decode("utf-8", errors="replace"))
+            return
+
+        event = self._build_event(data)
+        if event is not None:
+            await self._put(event)
+
+    async def _put(self, item: Any) -> None:
+        if self._items and self._merge is not None:
+            merged = self._merge(self._items[-1], item)
+            if merged is not None:
+                self._items[-1] = merged
+                self.coalesced += 1
+                return
+
+        while len(self._items) >= self._max_queued:
+            self._not_full.clear()
+            await self._not_full.wait()
+
+        self._items.append(item)
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._not_empty.set()
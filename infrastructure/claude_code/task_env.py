@@ -0,0 +1,74 @@
+"""
+Per-task process environment for Claude Agent SDK tasks.
+
+Each task gets its own immutable environment mapping built from the
+user's auth mode (AccountService.get_env_for_mode / apply_env_for_mode).
+The bot's own os.environ is never modified, so tasks of different users
+(z.ai API, Claude Account, local model) can run concurrently without
+racing on credentials or model variables.
+
+The SDK spawns the CLI with ``{**os.environ, **options.env}``, so an
+overlay can add or replace variables but cannot unset inherited ones.
+Variables that the task environment drops are therefore masked with an
+empty value, which the CLI treats the same as unset.
+"""
+
+import os
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+# Always applied to task environments
+TASK_ENV_DEFAULTS: Mapping[str, str] = MappingProxyType({
+    # Prevent git from hanging waiting for credentials input
+    "GIT_TERMINAL_PROMPT": "0",
+})
+
+
+def build_task_env(user_env: Mapping[str, str]) -> Mapping[str, str]:
+    """
+    Build the full, immutable environment for one task.
+
+    Args:
+        user_env: Complete environment for the user's auth mode
+            (internal ``_``-prefixed markers are dropped)
+
+    Returns:
+        Read-only mapping of environment variables for the task
+    """
+    env = {
+        key: value
+        for key, value in user_env.items()
+        if not key.startswith("_")
+    }
+    env.update(TASK_ENV_DEFAULTS)
+    return MappingProxyType(env)
+
+
+def env_overlay(
+    task_env: Mapping[str, str],
+    inherited_env: Optional[Mapping[str, str]] = None,
+) -> dict[str, str]:
+    """
+    Compute the ClaudeAgentOptions.env overlay for a task environment.
+
+    Args:
+        task_env: Full task environment (from build_task_env)
+        inherited_env: Environment the CLI subprocess inherits
+            (defaults to the current os.environ, read-only)
+
+    Returns:
+        Variables that differ from the inherited environment, plus
+        empty values for inherited variables the task must not see
+    """
+    if inherited_env is None:
+        inherited_env = os.environ
+
+    overlay = {
+        key: value
+        for key, value in task_env.items()
+        if inherited_env.get(key) != value
+    }
+    for key in inherited_env:
+        if key not in task_env:
+            overlay[key] = ""
+    return overlay
@@ -0,0 +1,202 @@
+"""
+In-process Telegram MCP server for Claude Agent SDK tasks.
+
+Offers the tools of telegram-mcp/ (send_file, send_message, send_plan) as
+an SDK MCP server that runs inside the bot process instead of a Node.js
+stdio server started for every task. The tools call the bot's own aiogram
+Bot, so they:
+- reuse the bot's HTTP session instead of a separate fetch client
+- go through the session request middlewares (TelegramSendScheduler:
+  global and per-chat limits, shared 429 backoff)
+- stream files from disk in chunks (FSInputFile) instead of reading
+  them into memory first
+
+Tool names stay mcp__telegram__send_file etc., so prompts and permission
+rules written for the Node.js server keep working.
+"""
+
+import asyncio
+import html
+import logging
+import os
+import re
+import stat
+import time
+from typing import Any, Union
+
+from aiogram import Bot
+from aiogram.types import BufferedInputFile, FSInputFile
+from claude_agent_sdk import SdkMcpTool, create_sdk_mcp_server, tool
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = "telegram"
+
+# Bot API limit for documents uploaded by bots
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+# Large uploads take longer than aiogram's default 60s request timeout
+UPLOAD_TIMEOUT = 300
+
+_CHAT_ID_PROPERTY = {
+    "type": "string",
+    "description": "Telegram chat ID to send to. If not specified, uses the current user's chat.",
+}
+
+
+def _result(text: str, is_error: bool = False) -> dict[str, Any]:
+    """Build an MCP tool result"""
+    result: dict[str, Any] = {"content": [{"type": "text", "text": text}]}
+    if is_error:
+        result["is_error"] = True
+    return result
+
+
+def telegram_tools(bot: Bot, default_chat_id: Union[int, str]) -> list[SdkMcpTool]:
+    """
+    Build the Telegram tools bound to a bot and a default chat.
+
+    Args:
+        bot: Running aiogram Bot (its session and middlewares are used)
+        default_chat_id: Chat used when the model does not pass chat_id
+
+    Returns:
+        Tools for create_sdk_mcp_server
+    """
+
+    def resolve_chat_id(args: dict) -> Union[int, str]:
+        return args.get("chat_id") or default_chat_id
+
+    @tool(
+        "send_file",
+        "Send a file to Telegram chat. Use this when the user asks you to send them a file, "
+        "export something, or share a document.",
+        {
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "Absolute path to the file to send"},
+                "caption": {"type": "string", "description": "Optional caption for the file (supports HTML)"},
+                "chat_id": _CHAT_ID_PROPERTY,
+            },
+            "required": ["file_path"],
+        },
+    )
+    async def send_file(args: dict) -> dict[str, Any]:
+        file_path = args.get("file_path")
+        if not file_path:
+            return _result("Error: file_path is required", is_error=True)
+
+        try:
+            info = await asyncio.to_thread(os.stat, file_path)
+        except OSError:
+            return _result(f"Error: File not found: {file_path}", is_error=True)
+        if not stat.S_ISREG(info.st_mode):
+            return _result(f"Error: Not a regular file: {file_path}", is_error=True)
+        if info.st_size > MAX_UPLOAD_BYTES:
+            return _result(
+                f"Error: File is too large for Telegram "
+                f"({info.st_size / 1024 / 1024:.1f} MB, limit {MAX_UPLOAD_BYTES // 1024 // 1024} MB)",
+                is_error=True,
+            )
+
+        name = os.path.basename(file_path)
+        try:
+            await bot.send_document(
+                resolve_chat_id(args),
+                FSInputFile(file_path, filename=name),
+                caption=args.get("caption"),
+                request_timeout=UPLOAD_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"Telegram MCP: send_file {name} failed: {e}")
+            return _result(f"❌ Error: {e}", is_error=True)
+        return _result(f"✅ File sent: {name}")
+
+    @tool(
+        "send_message",
+        "Send a text message to Telegram chat. Use this for notifications, summaries, "
+        "or when the user asks to be notified about something.",
+        {
+            "type": "object",
+            "properties": {
+                "text": {"type": "string", "description": "Message text (supports HTML formatting)"},
+                "parse_mode": {
+                    "type": "string",
+                    "enum": ["HTML", "Markdown", "MarkdownV2"],
+                    "description": "Parse mode for formatting (default: HTML)",
+                },
+                "chat_id": _CHAT_ID_PROPERTY,
+            },
+            "required": ["text"],
+        },
+    )
+    async def send_message(args: dict) -> dict[str, Any]:
+        text = args.get("text")
+        if not text:
+            return _result("Error: text is required", is_error=True)
+
+        try:
+            await bot.send_message(
+                resolve_chat_id(args),
+                text,
+                parse_mode=args.get("parse_mode") or "HTML",
+            )
+        except Exception as e:
+            logger.warning(f"Telegram MCP: send_message failed: {e}")
+            return _result(f"❌ Error: {e}", is_error=True)
+        return _result("✅ Message sent")
+
+    @tool(
+        "send_plan",
+        "Create a plan document and send it as a .md file to Telegram. Use this when the user "
+        "asks you to create a plan, roadmap, or detailed specification and send it to them.",
+        {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "Plan title (will be used as filename and heading)"},
+                "content": {"type": "string", "description": "Plan content in Markdown format"},
+                "chat_id": _CHAT_ID_PROPERTY,
+            },
+            "required": ["title", "content"],
+        },
+    )
+    async def send_plan(args: dict) -> dict[str, Any]:
+        title = args.get("title")
+        content = args.get("content")
+        if not title or not content:
+            return _result("Error: title and content are required", is_error=True)
+
+        # Sent from memory, no temp file needed
+        safe_title = re.sub(r"[^a-zA-Z0-9_\-\u0400-\u04FF]", "_", title)
+        file_name = f"plan_{safe_title}_{int(time.time() * 1000)}.md"
+        document = BufferedInputFile(f"# {title}\n\n{content}".encode("utf-8"), filename=file_name)
+
+        try:
+            await bot.send_document(
+                resolve_chat_id(args),
+                document,
+                caption=f"📋 План: {html.escape(title)}",
+            )
+        except Exception as e:
+            logger.warning(f"Telegram MCP: send_plan failed: {e}")
+            return _result(f"❌ Error: {e}", is_error=True)
+        return _result(f"✅ Plan sent: {file_name}")
+
+    return [send_file, send_message, send_plan]
+
+
+def create_telegram_mcp_server(bot: Bot, default_chat_id: Union[int, str]) -> dict[str, Any]:
+    """
+    Create the in-process Telegram MCP server for ClaudeAgentOptions.mcp_servers.
+
+    Args:
+        bot: Running aiogram Bot
+        default_chat_id: Chat used when the model does not pass chat_id
+
+    Returns:
+        SDK MCP server configuration (``{"type": "sdk", ...}``)
+    """
+    return create_sdk_mcp_server(
+        name=SERVER_NAME,
+        version="2.0.0",
+        tools=telegram_tools(bot, default_chat_id),
+    )
@@ -0,0 +1,192 @@
+"""
+Background metrics sampler.
+
+psutil calls block: cpu_percent(interval=0.1) sleeps for 100ms and
+process_iter walks /proc. MetricsSampler takes a snapshot in a worker
+thread every few seconds and keeps the recent ones in a ring buffer, so
+handlers read the latest snapshot without touching psutil at all.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import TYPE_CHECKING, Deque, List, Optional, Sequence
+
+import psutil
+
+if TYPE_CHECKING:
+    from infrastructure.monitoring.system_monitor import ProcessInfo, SystemMetrics
+
+logger = logging.getLogger(__name__)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: Sequence[float], width: int = 24, max_value: float = 100.0) -> str:
+    """Render the last width values as a unicode sparkline (0..max_value)."""
+    values = list(values)[-width:]
+    if not values:
+        return ""
+    top = len(SPARK_CHARS) - 1
+    return "".join(
+        SPARK_CHARS[min(top, max(0, round(v / max_value * top)))] for v in values
+    )
+
+
+def collect_metrics(cpu_interval: Optional[float] = None) -> "SystemMetrics":
+    """
+    Take one metrics snapshot (blocking - run in a thread).
+
+    With cpu_interval=None CPU usage is measured since the previous call,
+    so sampling at a fixed period needs no sleep.
+    """
+    from infrastructure.monitoring.system_monitor import SystemMetrics
+
+    cpu_percent = psutil.cpu_percent(interval=cpu_interval)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage("/")
+
+    try:
+        load_average = list(psutil.getloadavg())
+    except (AttributeError, OSError):
+        load_average = [0.0, 0.0, 0.0]
+
+    return SystemMetrics(
+        timestamp=datetime.utcnow(),
+        cpu_percent=cpu_percent,
+        memory_percent=memory.percent,
+        memory_used_gb=round(memory.used / (1024**3), 2),
+        memory_total_gb=round(memory.total / (1024**3), 2),
+        disk_percent=disk.percent,
+        disk_used_gb=round(disk.used / (1024**3), 2),
+        disk_total_gb=round(disk.total / (1024**3), 2),
+        load_average=load_average,
+        uptime_seconds=round(time.time() - psutil.boot_time(), 2),
+    )
+
+
+def scan_processes() -> List["ProcessInfo"]:
+    """Walk all processes (blocking - run in a thread)."""
+    from infrastructure.monitoring.system_monitor import ProcessInfo
+
+    processes = []
+    for proc in psutil.process_iter(
+        ["pid", "name", "cpu_percent", "memory_percent", "status", "cmdline"]
+    ):
+        try:
+            info = proc.info
+            processes.append(
+                ProcessInfo(
+                    pid=info["pid"],
+                    name=info["name"] or "unknown",
+                    cpu_percent=info["cpu_percent"] or 0.0,
+                    memory_percent=info["memory_percent"] or 0.0,
+                    status=info["status"] or "unknown",
+                    command=" ".join(info["cmdline"]) if info["cmdline"] else "",
+                )
+            )
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    processes.sort(key=lambda p: p.cpu_percent + p.memory_percent, reverse=True)
+    return processes
+
+
+class MetricsSampler:
+    """
+    Periodic metrics snapshots in a ring buffer.
+
+    Usage:
+        sampler = get_metrics_sampler()
+        sampler.start()
+        sampler.latest()              # SystemMetrics or None (never blocks)
+        sampler.history("cpu_percent")  # for sparklines
+        await sampler.top_processes(10)  # scanned in a thread, cached briefly
+    """
+
+    INTERVAL = 5.0  # Seconds between snapshots
+    HISTORY_SIZE = 120  # 10 minutes at the default interval
+    PROCESS_CACHE_TTL = 5.0
+
+    def __init__(self, interval: float = INTERVAL, history_size: int = HISTORY_SIZE):
+        self.interval = interval
+        self._history: Deque["SystemMetrics"] = deque(maxlen=history_size)
+        self._task: Optional[asyncio.Task] = None
+
+        self._processes: List["ProcessInfo"] = []
+        self._processes_at = 0.0
+        self._process_scan: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling (idempotent; needs a running loop)."""
+        if not self.running:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"MetricsSampler started (every {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def latest(self) -> Optional["SystemMetrics"]:
+        """Most recent snapshot, or None before the first sample."""
+        return self._history[-1] if self._history else None
+
+    def snapshots(self) -> List["SystemMetrics"]:
+        """All snapshots in the ring buffer, oldest first."""
+        return list(self._history)
+
+    def history(self, field: str) -> List[float]:
+        """Values of one SystemMetrics field over the ring buffer."""
+        return [getattr(s, field) for s in self._history]
+
+    async def sample_now(self) -> "SystemMetrics":
+        """Take a snapshot immediately (in a thread) and record it."""
+        # First CPU reading has no baseline - measure over a short window
+        cpu_interval = None if self._history else 0.1
+        snapshot = await asyncio.to_thread(collect_metrics, cpu_interval)
+        self._history.append(snapshot)
+        return snapshot
+
+    async def top_processes(self, limit: int = 10) -> List["ProcessInfo"]:
+        """Top processes by CPU + memory; concurrent callers share one scan."""
+        if time.monotonic() - self._processes_at > self.PROCESS_CACHE_TTL:
+            if self._process_scan is None or self._process_scan.done():
+                self._process_scan = asyncio.create_task(asyncio.to_thread(scan_processes))
+            self._processes = await asyncio.shield(self._process_scan)
+            self._processes_at = time.monotonic()
+        return self._processes[:limit]
+
+    async def _loop(self) -> None:
+        if self._history:
+            # A snapshot was just taken on demand
+            await asyncio.sleep(self.interval)
+        while True:
+            try:
+                await self.sample_now()
+            except Exception as e:
+                logger.error(f"MetricsSampler: sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Singleton sampler shared by all SystemMonitor instances
+_sampler: Optional[MetricsSampler] = None
+
+
+def get_metrics_sampler() -> MetricsSampler:
+    """Get or create the sampler singleton."""
+    global _sampler
+    if _sampler is None:
+        _sampler = MetricsSampler()
+    return _sampler
@@ -1,12 +1,13 @@
 import asyncio
 import logging
-import time
 import psutil
 import shlex
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
+from infrastructure.monitoring.sampler import get_metrics_sampler
+
 logger = logging.getLogger(__name__)
 
 # Security: Whitelist of allowed systemd services to prevent command injection
@@ -18,6 +19,18 @@ ALLOWED_SERVICES = {
 # Singleton SSH executor for Docker commands
 _ssh_executor_instance = None
 
+# Cached local Docker client (docker.from_env() is created once, used from threads)
+_docker_client = None
+
+
+def get_docker_client():
+    """Get or create the local Docker client (blocking - call from a thread)"""
+    global _docker_client
+    if _docker_client is None:
+        import docker
+        _docker_client = docker.from_env()
+    return _docker_client
+
 
 def get_ssh_executor():
     """Get or create SSH executor singleton for Docker operations"""
@@ -93,72 +106,26 @@ class SystemMonitor:
         self._ssh_executor = ssh_executor
 
     async def get_metrics(self) -> SystemMetrics:
-        """Get current system metrics"""
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-
-        # Memory
-        memory = psutil.virtual_memory()
-        memory_used_gb = memory.used / (1024**3)
-        memory_total_gb = memory.total / (1024**3)
-
-        # Disk
-        disk = psutil.disk_usage("/")
-        disk_used_gb = disk.used / (1024**3)
-        disk_total_gb = disk.total / (1024**3)
-
-        # Load average (Unix-like systems)
-        try:
-            load1, load5, load15 = psutil.getloadavg()
-            load_average = [load1, load5, load15]
-        except (AttributeError, OSError):
-            load_average = [0.0, 0.0, 0.0]
-
-        # Uptime
-        uptime_seconds = time.time() - psutil.boot_time()
-
-        return SystemMetrics(
-            timestamp=datetime.utcnow(),
-            cpu_percent=cpu_percent,
-            memory_percent=memory.percent,
-            memory_used_gb=round(memory_used_gb, 2),
-            memory_total_gb=round(memory_total_gb, 2),
-            disk_percent=disk.percent,
-            disk_used_gb=round(disk_used_gb, 2),
-            disk_total_gb=round(disk_total_gb, 2),
-            load_average=load_average,
-            uptime_seconds=round(uptime_seconds, 2),
-        )
+        """Get latest system metrics (sampled in the background, doesn't block the loop)"""
+        sampler = get_metrics_sampler()
+        snapshot = sampler.latest()
+        if snapshot is None:
+            # Sampler not started yet or no snapshot taken - sample on demand
+            snapshot = await sampler.sample_now()
+        return snapshot
+
+    def get_history(self) -> Dict[str, List[float]]:
+        """Recent CPU/memory/disk values from the sampler ring buffer"""
+        sampler = get_metrics_sampler()
+        return {
+            "cpu_percent": sampler.history("cpu_percent"),
+            "memory_percent": sampler.history("memory_percent"),
+            "disk_percent": sampler.history("disk_percent"),
+        }
 
     async def get_top_processes(self, limit: int = 10) -> List[ProcessInfo]:
-        """Get top processes by CPU and memory usage"""
-        processes = []
-
-        for proc in psutil.process_iter(
-            ["pid", "name", "cpu_percent", "memory_percent", "status", "cmdline"]
-        ):
-            try:
-                proc_info = proc.info
-                processes.append(
-                    ProcessInfo(
-                        pid=proc_info["pid"],
-                        name=proc_info["name"] or "unknown",
-                        cpu_percent=proc_info["cpu_percent"] or 0.0,
-                        memory_percent=proc_info["memory_percent"] or 0.0,
-                        status=proc_info["status"] or "unknown",
-                        command=(
-                            " ".join(proc_info["cmdline"])
-                            if proc_info["cmdline"]
-                            else ""
-                        ),
-                    )
-                )
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
-        # Sort by CPU + memory usage
-        processes.sort(key=lambda p: p.cpu_percent + p.memory_percent, reverse=True)
-        return processes[:limit]
+        """Get top processes by CPU and memory usage (scanned in a thread)"""
+        return await get_metrics_sampler().top_processes(limit)
 
     async def check_alerts(self, metrics: SystemMetrics) -> List[str]:
         """Check if metrics exceed alert thresholds"""
@@ -229,13 +196,9 @@ class SystemMonitor:
 
     async def _get_docker_containers_local(self) -> List[dict]:
         """Get Docker containers via local Docker socket (fallback)"""
-        try:
-            import docker
-
-            client = docker.from_env()
+        def list_containers() -> List[dict]:
             containers = []
-
-            for container in client.containers.list(all=True):
+            for container in get_docker_client().containers.list(all=True):
                 containers.append(
                     {
                         "id": container.short_id,
@@ -256,8 +219,10 @@ class SystemMonitor:
                         ),
                     }
                 )
-
             return containers
+
+        try:
+            return await asyncio.to_thread(list_containers)
         except ImportError:
             logger.warning("docker module not installed")
             return []
@@ -325,16 +290,12 @@ class SystemMonitor:
         return await self._docker_stop_local(container_id)
 
     async def _docker_stop_local(self, container_id: str) -> tuple[bool, str]:
-        try:
-            import docker
-            client = docker.from_env()
-            container = client.containers.get(container_id)
+        def stop() -> tuple[bool, str]:
+            container = get_docker_client().containers.get(container_id)
             container.stop()
             return True, f"Container {container.name} stopped"
-        except ImportError:
-            return False, "Docker module not installed"
-        except Exception as e:
-            return False, str(e)
+
+        return await self._run_docker_local(stop)
 
     async def docker_start(self, container_id: str) -> tuple[bool, str]:
         """Start a Docker container"""
@@ -343,16 +304,12 @@ class SystemMonitor:
         return await self._docker_start_local(container_id)
 
     async def _docker_start_local(self, container_id: str) -> tuple[bool, str]:
-        try:
-            import docker
-            client = docker.from_env()
-            container = client.containers.get(container_id)
+        def start() -> tuple[bool, str]:
+            container = get_docker_client().containers.get(container_id)
             container.start()
             return True, f"Container {container.name} started"
-        except ImportError:
-            return False, "Docker module not installed"
-        except Exception as e:
-            return False, str(e)
+
+        return await self._run_docker_local(start)
 
     async def docker_restart(self, container_id: str) -> tuple[bool, str]:
         """Restart a Docker container"""
@@ -361,16 +318,12 @@ class SystemMonitor:
         return await self._docker_restart_local(container_id)
 
     async def _docker_restart_local(self, container_id: str) -> tuple[bool, str]:
-        try:
-            import docker
-            client = docker.from_env()
-            container = client.containers.get(container_id)
+        def restart() -> tuple[bool, str]:
+            container = get_docker_client().containers.get(container_id)
             container.restart()
             return True, f"Container {container.name} restarted"
-        except ImportError:
-            return False, "Docker module not installed"
-        except Exception as e:
-            return False, str(e)
+
+        return await self._run_docker_local(restart)
 
     async def docker_logs(self, container_id: str, lines: int = 50) -> tuple[bool, str]:
         """Get Docker container logs"""
@@ -422,16 +375,11 @@ class SystemMonitor:
             return False, str(e)
 
     async def _docker_logs_local(self, container_id: str, lines: int = 50) -> tuple[bool, str]:
-        try:
-            import docker
-            client = docker.from_env()
-            container = client.containers.get(container_id)
-            logs = container.logs(tail=lines).decode('utf-8', errors='replace')
-            return True, logs
-        except ImportError:
-            return False, "Docker module not installed"
-        except Exception as e:
-            return False, str(e)
+        def logs() -> tuple[bool, str]:
+            container = get_docker_client().containers.get(container_id)
+            return True, container.logs(tail=lines).decode('utf-8', errors='replace')
+
+        return await self._run_docker_local(logs)
 
     async def docker_remove(self, container_id: str, force: bool = False) -> tuple[bool, str]:
         """Remove a Docker container"""
@@ -441,13 +389,19 @@ class SystemMonitor:
         return await self._docker_remove_local(container_id, force)
 
     async def _docker_remove_local(self, container_id: str, force: bool = False) -> tuple[bool, str]:
-        try:
-            import docker
-            client = docker.from_env()
-            container = client.containers.get(container_id)
+        def remove() -> tuple[bool, str]:
+            container = get_docker_client().containers.get(container_id)
             name = container.name
             container.remove(force=force)
             return True, f"Container {name} removed"
+
+        return await self._run_docker_local(remove)
+
+    @staticmethod
+    async def _run_docker_local(action: Callable[[], tuple[bool, str]]) -> tuple[bool, str]:
+        """Run a blocking Docker SDK call in a thread"""
+        try:
+            return await asyncio.to_thread(action)
         except ImportError:
             return False, "Docker module not installed"
         except Exception as e:
@@ -0,0 +1,273 @@
+"""
+SQLite Connection Manager
+
+Process-wide aiosqlite connection pool shared by all SQLite repositories.
+
+Instead of opening a new connection (and a new worker thread) for every
+query, repositories borrow connections from this manager:
+- One writer connection, serialized with a lock (SQLite allows one writer)
+- A small pool of reader connections (WAL lets readers run concurrently)
+- PRAGMAs applied once per connection when it is opened
+- Prepared statements cached per connection (sqlite3 ``cached_statements``)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolMetrics:
+    """Connection pool counters"""
+
+    open_connections: int = 0
+    idle_readers: int = 0
+    reader_acquisitions: int = 0
+    writer_acquisitions: int = 0
+    reader_wait_total: float = 0.0
+    writer_wait_total: float = 0.0
+    reader_wait_max: float = 0.0
+    writer_wait_max: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Export metrics with average wait times in milliseconds"""
+        return {
+            "open_connections": self.open_connections,
+            "idle_readers": self.idle_readers,
+            "reader_acquisitions": self.reader_acquisitions,
+            "writer_acquisitions": self.writer_acquisitions,
+            "reader_wait_avg_ms": self._avg_ms(self.reader_wait_total, self.reader_acquisitions),
+            "writer_wait_avg_ms": self._avg_ms(self.writer_wait_total, self.writer_acquisitions),
+            "reader_wait_max_ms": round(self.reader_wait_max * 1000, 3),
+            "writer_wait_max_ms": round(self.writer_wait_max * 1000, 3),
+        }
+
+    @staticmethod
+    def _avg_ms(total: float, count: int) -> float:
+        return round(total / count * 1000, 3) if count else 0.0
+
+
+class SQLiteConnectionManager:
+    """
+    Shared pool of aiosqlite connections for one database file.
+
+    Usage:
+        manager = SQLiteConnectionManager("data/bot.db")
+
+        async with manager.reader() as db:
+            async with db.execute("SELECT ...") as cursor:
+                ...
+
+        async with manager.writer() as db:
+            await db.execute("INSERT ...")
+            # committed on exit, rolled back on exception
+
+    Connections are opened lazily on first use and live until close().
+    Rows are returned as aiosqlite.Row (supports both row[0] and row["col"]).
+    """
+
+    DEFAULT_READERS = 4
+    DEFAULT_CACHED_STATEMENTS = 256
+
+    # Applied once per connection when it is opened
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA mmap_size = 268435456",  # 256 MB
+        "PRAGMA cache_size = -16000",  # ~16 MB page cache
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = DEFAULT_READERS,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+    ):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        # In-memory databases are private to a connection, so all
+        # access goes through the writer connection.
+        self._in_memory = db_path == ":memory:"
+        self.max_readers = 0 if self._in_memory else max(0, readers)
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+
+        self._metrics = PoolMetrics()
+        self._closed = False
+
+    # ==================== Connection lifecycle ====================
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """Open a connection and apply PRAGMAs"""
+        if not self._in_memory:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        db = await aiosqlite.connect(
+            self.db_path, cached_statements=self.cached_statements
+        )
+        db.row_factory = aiosqlite.Row
+        for pragma in self.PRAGMAS:
+            await db.execute(pragma)
+        self._metrics.open_connections += 1
+        return db
+
+    async def _get_writer(self) -> aiosqlite.Connection:
+        if self._writer is None:
+            async with self._open_lock:
+                if self._writer is None:
+                    self._writer = await self._open_connection()
+        return self._writer
+
+    async def _ensure_reader_pool(self) -> None:
+        if self._idle_readers is not None:
+            return
+        async with self._open_lock:
+            if self._idle_readers is not None:
+                return
+            queue: asyncio.Queue = asyncio.Queue()
+            for _ in range(self.max_readers):
+                conn = await self._open_connection()
+                self._readers.append(conn)
+                queue.put_nowait(conn)
+            self._idle_readers = queue
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        self._closed = True
+        connections = list(self._readers)
+        if self._writer is not None:
+            connections.append(self._writer)
+
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing SQLite connection: {e}")
+
+        self._readers.clear()
+        self._idle_readers = None
+        self._writer = None
+        self._metrics.open_connections = 0
+        logger.info(f"SQLite connection pool closed ({self.db_path})")
+
+    # ==================== Acquisition ====================
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow the writer connection for one transaction.
+
+        Commits on normal exit, rolls back if the block raises.
+        """
+        self._check_open()
+        started = time.perf_counter()
+        async with self._writer_lock:
+            self._record_wait("writer", time.perf_counter() - started)
+            db = await self._get_writer()
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            else:
+                await db.commit()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool"""
+        self._check_open()
+        if self.max_readers == 0:
+            # No separate readers (in-memory DB) - share the writer
+            started = time.perf_counter()
+            async with self._writer_lock:
+                self._record_wait("reader", time.perf_counter() - started)
+                yield await self._get_writer()
+            return
+
+        await self._ensure_reader_pool()
+        started = time.perf_counter()
+        db = await self._idle_readers.get()
+        self._record_wait("reader", time.perf_counter() - started)
+        try:
+            yield db
+        finally:
+            # Never leave a reader inside an implicit transaction,
+            # otherwise it would pin an old WAL snapshot.
+            if db.in_transaction:
+                await db.rollback()
+            self._idle_readers.put_nowait(db)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError(f"Connection manager for {self.db_path} is closed")
+
+    def _record_wait(self, kind: str, waited: float) -> None:
+        m = self._metrics
+        if kind == "writer":
+            m.writer_acquisitions += 1
+            m.writer_wait_total += waited
+            m.writer_wait_max = max(m.writer_wait_max, waited)
+        else:
+            m.reader_acquisitions += 1
+            m.reader_wait_total += waited
+            m.reader_wait_max = max(m.reader_wait_max, waited)
+
+    # ==================== Metrics ====================
+
+    def get_metrics(self) -> dict:
+        """Get pool metrics (open connections, acquisitions, wait times)"""
+        self._metrics.idle_readers = (
+            self._idle_readers.qsize() if self._idle_readers is not None else 0
+        )
+        return self._metrics.to_dict()
+
+
+# Process-wide managers, one per database file
+_managers: Dict[str, SQLiteConnectionManager] = {}
+
+
+def get_connection_manager(db_path: str, readers: Optional[int] = None) -> SQLiteConnectionManager:
+    """
+    Get the shared connection manager for a database file.
+
+    Repositories created without an explicit manager fall back to this,
+    so every repository pointing at the same file shares one pool.
+
+    Args:
+        db_path: Database file path
+        readers: Reader pool size, used only when the manager is created
+    """
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    manager = _managers.get(key)
+    if manager is None or manager._closed:
+        if readers is None:
+            manager = SQLiteConnectionManager(db_path)
+        else:
+            manager = SQLiteConnectionManager(db_path, readers=readers)
+        _managers[key] = manager
+    return manager
+
+
+async def close_all_connection_managers() -> None:
+    """Close every shared connection manager"""
+    managers = list(_managers.values())
+    _managers.clear()
+    for manager in managers:
+        await manager.close()
@@ -0,0 +1,292 @@
+"""
+SQLite Message Search Repository Implementation
+
+Full-text search over context_messages and session_messages with FTS5.
+
+Each message table has its own FTS5 index kept in sync by triggers, so
+every write path (including bulk deletes) updates it without help from
+the repositories. Next to the text, each row stores the owner as a
+token ("u<user_id>"), so MATCH intersects the user's postings inside
+FTS5 instead of ranking every user's hits and filtering afterwards.
+The indexes store their own copy of the text, because deleting a row
+from an external-content index needs the owner value, and the owner
+(context or session) may already be gone by then.
+"""
+
+import asyncio
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from domain.entities.message_search import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
+    MessageSearchHit,
+    MessageSearchPage,
+)
+from domain.repositories.message_search_repository import IMessageSearchRepository
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
+from shared.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# unicode61 folds case for Cyrillic as well as Latin; remove_diacritics 2
+# makes accented letters match their plain forms
+FTS_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'"
+SNIPPET_TOKENS = 16
+
+# bm25 costs a few microseconds per matching row, so ranking every match
+# of a common word is too slow on large histories. Only the newest
+# SEARCH_WINDOW matches per source are ranked; a query that matches more
+# than that needs more words to reach older messages.
+SEARCH_WINDOW = 500
+
+# fts table -> (content table, owner token of a new row, backfill query)
+FTS_SOURCES = {
+    "context_messages_fts": (
+        "context_messages",
+        "(SELECT 'u' || user_id FROM project_contexts WHERE id = new.context_id)",
+        """
+            SELECT m.id, m.content, 'u' || c.user_id
+            FROM context_messages m JOIN project_contexts c ON c.id = m.context_id
+        """,
+    ),
+    "session_messages_fts": (
+        "session_messages",
+        "(SELECT 'u' || user_id FROM sessions WHERE session_id = new.session_id)",
+        """
+            SELECT m.id, m.content, 'u' || s.user_id
+            FROM session_messages m JOIN sessions s ON s.session_id = m.session_id
+        """,
+    ),
+}
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression for the content column.
+
+    Every word is quoted (so FTS5 operators in user input are literal),
+    words are ANDed and the last one matches as a prefix, which also
+    catches inflected forms ("контейнер" -> "контейнера").
+    Returns None if the query has no searchable words.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SQLiteMessageSearchRepository(IMessageSearchRepository):
+    """SQLite FTS5 implementation of IMessageSearchRepository"""
+
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
+        self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
+        self.available = True
+
+    async def initialize(self) -> None:
+        """
+        Create FTS indexes and sync triggers.
+
+        Must run after the message tables exist. An index created for an
+        existing database is backfilled from its message table.
+        """
+        try:
+            async with self._db.writer() as db:
+                for fts_table, source in FTS_SOURCES.items():
+                    await self._create_index(db, fts_table, *source)
+        except sqlite3.OperationalError as e:
+            if "fts5" not in str(e):
+                raise
+            self.available = False
+            logger.warning(f"SQLite built without FTS5, message search disabled: {e}")
+            return
+
+        logger.info("Message search indexes initialized")
+
+    async def _create_index(
+        self,
+        db,
+        fts_table: str,
+        content_table: str,
+        owner_expr: str,
+        backfill_query: str
+    ) -> None:
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (fts_table,)
+        ) as cursor:
+            exists = await cursor.fetchone() is not None
+
+        await db.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+            USING fts5(content, owner, {FTS_OPTIONS})
+        """)
+
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+                INSERT INTO {fts_table}(rowid, content, owner) VALUES (new.id, new.content, {owner_expr});
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+                DELETE FROM {fts_table} WHERE rowid = old.id;
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF content ON {content_table} BEGIN
+                UPDATE {fts_table} SET content = new.content WHERE rowid = new.id;
+            END
+        """)
+
+        if not exists:
+            await db.execute(f"INSERT INTO {fts_table}(rowid, content, owner) {backfill_query}")
+            logger.info(f"Built search index {fts_table} from {content_table}")
+
+    async def search(
+        self,
+        user_id: UserId,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> MessageSearchPage:
+        """Search a user's messages, most relevant first"""
+        match = build_match_query(query)
+        if not self.available or match is None:
+            return MessageSearchPage(hits=[])
+
+        match = f'owner : "u{int(user_id)}" AND content : ({match})'
+
+        # Each source returns its own top rows; merging them by score and
+        # taking one extra row tells whether another page exists.
+        # Sources run concurrently on separate pooled readers.
+        top = offset + limit + 1
+        searches = [self._search_contexts(match, project_id, top)]
+        if project_id is None:
+            # Bot sessions don't belong to a project
+            searches.append(self._search_sessions(match, top))
+        hits = [hit for source in await asyncio.gather(*searches) for hit in source]
+
+        hits.sort(key=lambda hit: hit.score)
+        page = hits[offset:offset + limit]
+        has_more = len(hits) > offset + limit
+        return MessageSearchPage(
+            hits=page,
+            next_offset=offset + limit if has_more else None
+        )
+
+    @staticmethod
+    def _newest_matches(fts_table: str, rowid_filter: str = "") -> str:
+        """
+        Subquery ranking the newest SEARCH_WINDOW matches of fts_table.
+
+        Walking the doclist newest-first stops after SEARCH_WINDOW rows,
+        so bm25 and snippet run for at most that many rows in one pass.
+        Takes parameters: highlight start, highlight end, match, then the
+        rowid_filter's parameters, then window.
+
+        Args:
+            fts_table: FTS table to search
+            rowid_filter: Extra condition on rowid, applied before the
+                window so it keeps SEARCH_WINDOW of the filtered matches
+        """
+        return f"""
+            SELECT rowid,
+                   bm25({fts_table}, 1.0, 0.0) AS score,
+                   snippet({fts_table}, 0, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet
+            FROM {fts_table}
+            WHERE {fts_table} MATCH ? {f"AND {rowid_filter}" if rowid_filter else ""}
+            ORDER BY rowid DESC
+            LIMIT ?
+        """
+
+    async def _search_contexts(
+        self,
+        match: str,
+        project_id: Optional[str],
+        limit: int
+    ) -> List[MessageSearchHit]:
+        # The project filter goes inside the window, otherwise newer
+        # matches from other projects could fill it
+        rowid_filter = ""
+        params: list = [HIGHLIGHT_START, HIGHLIGHT_END, match]
+        if project_id is not None:
+            rowid_filter = """rowid IN (
+                SELECT pm.id FROM context_messages pm
+                JOIN project_contexts pc ON pc.id = pm.context_id
+                WHERE pc.project_id = ?
+            )"""
+            params.append(project_id)
+        params += [SEARCH_WINDOW, limit]
+
+        query = f"""
+            SELECT m.id, m.role, m.timestamp, m.context_id,
+                   c.name AS context_name, c.project_id,
+                   h.snippet, h.score
+            FROM ({self._newest_matches("context_messages_fts", rowid_filter)}) h
+            JOIN context_messages m ON m.id = h.rowid
+            JOIN project_contexts c ON c.id = m.context_id
+            ORDER BY h.score LIMIT ?
+        """
+
+        async with self._db.reader() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        return [
+            MessageSearchHit(
+                source="context",
+                message_id=row["id"],
+                role=row["role"],
+                snippet=row["snippet"],
+                score=row["score"],
+                timestamp=self._parse_timestamp(row["timestamp"]),
+                context_id=row["context_id"],
+                context_name=row["context_name"],
+                project_id=row["project_id"],
+            )
+            for row in rows
+        ]
+
+    async def _search_sessions(
+        self,
+        match: str,
+        limit: int
+    ) -> List[MessageSearchHit]:
+        async with self._db.reader() as db:
+            async with db.execute(f"""
+                SELECT m.id, m.role, m.timestamp, m.session_id, h.snippet, h.score
+                FROM ({self._newest_matches("session_messages_fts")}) h
+                JOIN session_messages m ON m.id = h.rowid
+                ORDER BY h.score LIMIT ?
+            """, (HIGHLIGHT_START, HIGHLIGHT_END, match, SEARCH_WINDOW, limit)) as cursor:
+                rows = await cursor.fetchall()
+        return [
+            MessageSearchHit(
+                source="session",
+                message_id=row["id"],
+                role=row["role"],
+                snippet=row["snippet"],
+                score=row["score"],
+                timestamp=self._parse_timestamp(row["timestamp"]),
+                session_id=row["session_id"],
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> datetime:
+        return datetime.fromisoformat(value) if value else datetime.now()
@@ -4,29 +4,78 @@ SQLite Project Context Repository Implementation
 Handles project context and message persistence.
 """
 
-import aiosqlite
 import json
 import logging
-from typing import List, Optional, Dict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Dict
 from datetime import datetime
 
-from domain.entities.project_context import ProjectContext, ContextMessage, ContextVariable
+import aiosqlite
+
+from domain.entities.project_context import (
+    ProjectContext,
+    ContextMessage,
+    ContextMessagePage,
+    ContextVariable,
+)
 from domain.value_objects.user_id import UserId
 from domain.repositories.project_context_repository import IProjectContextRepository
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
+from infrastructure.persistence.write_behind import SQLiteWriteBehindQueue
 from shared.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Columns of the message list view; all of them live in the covering index,
+# so headers-only pages never read content/tool_result from the table
+MESSAGE_HEADER_COLUMNS = "id, context_id, role, tool_name, timestamp"
+
 
 class SQLiteProjectContextRepository(IProjectContextRepository):
     """SQLite implementation of IProjectContextRepository"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+        write_queue: Optional[SQLiteWriteBehindQueue] = None,
+    ):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
+        # Message inserts and session-id updates go through the queue;
+        # without one they are committed immediately
+        self._writes = write_queue
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        # Commit queued writes first so reads see them; surface lost ones
+        if self._writes is not None:
+            await self._writes.flush()
+            self._writes.raise_failures()
+        async with self._db.reader() as db:
+            yield db
+
+    @asynccontextmanager
+    async def _writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        # Commit queued writes first to keep them ordered before this one
+        if self._writes is not None:
+            await self._writes.flush()
+        async with self._db.writer() as db:
+            yield db
+
+    async def _submit(self, operation) -> None:
+        if self._writes is not None:
+            await self._writes.submit(operation)
+        else:
+            async with self._db.writer() as db:
+                await operation(db)
 
     async def initialize(self) -> None:
         """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # Project contexts table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS project_contexts (
@@ -99,10 +148,14 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 CREATE INDEX IF NOT EXISTS idx_contexts_project_id
                 ON project_contexts(project_id)
             """)
+            # Keyset pagination walks (context_id, id) in index order; the
+            # trailing columns make it covering for headers-only pages
             await db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_messages_context_id
-                ON context_messages(context_id)
+                CREATE INDEX IF NOT EXISTS idx_messages_context_cursor
+                ON context_messages(context_id, id, role, tool_name, timestamp)
             """)
+            # Superseded by idx_messages_context_cursor
+            await db.execute("DROP INDEX IF EXISTS idx_messages_context_id")
             await db.execute("""
                 CREATE INDEX IF NOT EXISTS idx_variables_context_id
                 ON context_variables(context_id)
@@ -112,14 +165,13 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 ON global_variables(user_id)
             """)
 
-            await db.commit()
             logger.info("Project context tables initialized")
 
     # ==================== Context CRUD ====================
 
     async def save(self, context: ProjectContext) -> None:
         """Save or update a context (including variables)"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO project_contexts
                 (id, project_id, user_id, name, claude_session_id, is_current, message_count, created_at, updated_at)
@@ -139,12 +191,9 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
             # Save variables
             await self._save_variables(db, context.id, context.variables)
 
-            await db.commit()
-
     async def find_by_id(self, context_id: str) -> Optional[ProjectContext]:
         """Find context by ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT * FROM project_contexts WHERE id = ?",
                 (context_id,)
@@ -157,8 +206,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def find_by_project(self, project_id: str) -> List[ProjectContext]:
         """Find all contexts for a project"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT * FROM project_contexts WHERE project_id = ? ORDER BY updated_at DESC",
                 (project_id,)
@@ -172,8 +220,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def get_current(self, project_id: str) -> Optional[ProjectContext]:
         """Get the current context for a project"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT * FROM project_contexts WHERE project_id = ? AND is_current = 1",
                 (project_id,)
@@ -186,7 +233,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def set_current(self, project_id: str, context_id: str) -> None:
         """Set the current context for a project"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             now = datetime.now().isoformat()
 
             # Unset all current contexts for this project
@@ -217,8 +264,6 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                         WHERE user_id = ?
                     """, (context_id, now, user_id))
 
-            await db.commit()
-
     async def create_new(
         self,
         project_id: str,
@@ -235,7 +280,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def delete(self, context_id: str) -> bool:
         """Delete a context and all its messages and variables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             # Check if exists
             async with db.execute(
                 "SELECT id FROM project_contexts WHERE id = ?",
@@ -262,7 +307,6 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 (context_id,)
             )
 
-            await db.commit()
 
         return True
 
@@ -277,10 +321,9 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
         tool_result: Optional[str] = None
     ) -> None:
         """Add a message to a context"""
-        async with aiosqlite.connect(self.db_path) as db:
-            now = datetime.now().isoformat()
+        now = datetime.now().isoformat()
 
-            # Insert message
+        async def insert(db):
             await db.execute("""
                 INSERT INTO context_messages
                 (context_id, role, content, tool_name, tool_result, timestamp)
@@ -294,7 +337,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 WHERE id = ?
             """, (now, context_id))
 
-            await db.commit()
+        await self._submit(insert)
 
     async def get_messages(
         self,
@@ -302,21 +345,53 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
         limit: int = 50,
         offset: int = 0
     ) -> List[ContextMessage]:
-        """Get messages for a context"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        """Get messages for a context (prefer get_messages_page for deep paging)"""
+        # id is monotonic, so ordering by it matches insertion order and
+        # walks the index instead of sorting ISO timestamp strings
+        async with self._reader() as db:
             async with db.execute("""
                 SELECT * FROM context_messages
                 WHERE context_id = ?
-                ORDER BY timestamp DESC
+                ORDER BY id DESC
                 LIMIT ? OFFSET ?
             """, (context_id, limit, offset)) as cursor:
                 rows = await cursor.fetchall()
                 return [self._row_to_message(row) for row in reversed(rows)]
 
+    async def get_messages_page(
+        self,
+        context_id: str,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        headers_only: bool = False
+    ) -> ContextMessagePage:
+        """Get a page of messages, newest first, starting below before_id"""
+        columns = MESSAGE_HEADER_COLUMNS if headers_only else "*"
+        query = f"SELECT {columns} FROM context_messages WHERE context_id = ?"
+        params: list = [context_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        # Fetch one extra row to know whether an older page exists
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        async with self._reader() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        to_message = self._row_to_message_header if headers_only else self._row_to_message
+        messages = [to_message(row) for row in reversed(rows)]
+        return ContextMessagePage(
+            messages=messages,
+            next_cursor=messages[0].id if has_more else None
+        )
+
     async def clear_messages(self, context_id: str) -> None:
         """Clear all messages in a context"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             now = datetime.now().isoformat()
 
             await db.execute(
@@ -330,24 +405,25 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 WHERE id = ?
             """, (now, context_id))
 
-            await db.commit()
 
     # ==================== Claude Session ====================
 
     async def set_claude_session_id(self, context_id: str, session_id: str) -> None:
         """Set Claude Code session ID for a context"""
-        async with aiosqlite.connect(self.db_path) as db:
-            now = datetime.now().isoformat()
+        now = datetime.now().isoformat()
+
+        async def update(db):
             await db.execute("""
                 UPDATE project_contexts
                 SET claude_session_id = ?, updated_at = ?
                 WHERE id = ?
             """, (session_id, now, context_id))
-            await db.commit()
+
+        await self._submit(update)
 
     async def get_claude_session_id(self, context_id: str) -> Optional[str]:
         """Get Claude Code session ID for a context"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT claude_session_id FROM project_contexts WHERE id = ?",
                 (context_id,)
@@ -359,14 +435,13 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def clear_claude_session_id(self, context_id: str) -> None:
         """Clear Claude Code session ID (start fresh)"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             now = datetime.now().isoformat()
             await db.execute("""
                 UPDATE project_contexts
                 SET claude_session_id = NULL, updated_at = ?
                 WHERE id = ?
             """, (now, context_id))
-            await db.commit()
 
     # ==================== Helpers ====================
 
@@ -397,6 +472,17 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
             timestamp=datetime.fromisoformat(row["timestamp"]) if row["timestamp"] else datetime.now()
         )
 
+    def _row_to_message_header(self, row) -> ContextMessage:
+        """Convert a headers-only row to ContextMessage (no content)"""
+        return ContextMessage(
+            id=row["id"],
+            context_id=row["context_id"],
+            role=row["role"],
+            content="",
+            tool_name=row["tool_name"],
+            timestamp=datetime.fromisoformat(row["timestamp"]) if row["timestamp"] else datetime.now()
+        )
+
     # ==================== Variable Operations ====================
 
     async def _save_variables(self, db, context_id: str, variables: Dict[str, ContextVariable]) -> None:
@@ -432,7 +518,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def set_variable(self, context_id: str, name: str, value: str, description: str = "") -> None:
         """Set a single context variable"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             now = datetime.now().isoformat()
             await db.execute("""
                 INSERT OR REPLACE INTO context_variables (context_id, name, value, description, created_at)
@@ -444,11 +530,9 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                 UPDATE project_contexts SET updated_at = ? WHERE id = ?
             """, (now, context_id))
 
-            await db.commit()
-
     async def delete_variable(self, context_id: str, name: str) -> bool:
         """Delete a single context variable"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             cursor = await db.execute(
                 "DELETE FROM context_variables WHERE context_id = ? AND name = ?",
                 (context_id, name)
@@ -461,17 +545,16 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
                     UPDATE project_contexts SET updated_at = ? WHERE id = ?
                 """, (now, context_id))
 
-            await db.commit()
             return deleted
 
     async def get_variables(self, context_id: str) -> Dict[str, ContextVariable]:
         """Get all variables for a context"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             return await self._load_variables(db, context_id)
 
     async def get_variable(self, context_id: str, name: str) -> Optional[ContextVariable]:
         """Get a single variable by name"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT name, value, description FROM context_variables WHERE context_id = ? AND name = ?",
                 (context_id, name)
@@ -490,31 +573,29 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
         description: str = ""
     ) -> None:
         """Set a global variable that applies to all projects"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             now = datetime.now().isoformat()
             await db.execute("""
                 INSERT OR REPLACE INTO global_variables (user_id, name, value, description, created_at)
                 VALUES (?, ?, ?, ?, ?)
             """, (int(user_id), name, value, description, now))
-            await db.commit()
             logger.info(f"Set global variable '{name}' for user {user_id}")
 
     async def delete_global_variable(self, user_id: UserId, name: str) -> bool:
         """Delete a global variable"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._writer() as db:
             cursor = await db.execute(
                 "DELETE FROM global_variables WHERE user_id = ? AND name = ?",
                 (int(user_id), name)
             )
             deleted = cursor.rowcount > 0
-            await db.commit()
             if deleted:
                 logger.info(f"Deleted global variable '{name}' for user {user_id}")
             return deleted
 
     async def get_global_variables(self, user_id: UserId) -> Dict[str, ContextVariable]:
         """Get all global variables for a user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             variables = {}
             async with db.execute(
                 "SELECT name, value, description FROM global_variables WHERE user_id = ?",
@@ -530,7 +611,7 @@ class SQLiteProjectContextRepository(IProjectContextRepository):
 
     async def get_global_variable(self, user_id: UserId, name: str) -> Optional[ContextVariable]:
         """Get a single global variable"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             async with db.execute(
                 "SELECT name, value, description FROM global_variables WHERE user_id = ? AND name = ?",
                 (int(user_id), name)
@@ -4,7 +4,6 @@ SQLite Project Repository Implementation
 Handles project persistence and user workspace state.
 """
 
-import aiosqlite
 import logging
 from typing import List, Optional
 from datetime import datetime
@@ -13,6 +12,10 @@ from domain.entities.project import Project
 from domain.value_objects.user_id import UserId
 from domain.value_objects.project_path import ProjectPath
 from domain.repositories.project_repository import IProjectRepository
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
 from shared.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -21,12 +24,17 @@ logger = logging.getLogger(__name__)
 class SQLiteProjectRepository(IProjectRepository):
     """SQLite implementation of IProjectRepository"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
 
     async def initialize(self) -> None:
         """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # Projects table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS projects (
@@ -60,12 +68,11 @@ class SQLiteProjectRepository(IProjectRepository):
                 ON projects(user_id)
             """)
 
-            await db.commit()
             logger.info("Project tables initialized")
 
     async def save(self, project: Project) -> None:
         """Save or update a project"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO projects
                 (id, user_id, name, path, description, is_active, created_at, updated_at)
@@ -80,12 +87,10 @@ class SQLiteProjectRepository(IProjectRepository):
                 project.created_at.isoformat(),
                 project.updated_at.isoformat()
             ))
-            await db.commit()
 
     async def find_by_id(self, project_id: str) -> Optional[Project]:
         """Find project by ID"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM projects WHERE id = ?",
                 (project_id,)
@@ -97,8 +102,7 @@ class SQLiteProjectRepository(IProjectRepository):
 
     async def find_by_user(self, user_id: UserId) -> List[Project]:
         """Find all projects for a user"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM projects WHERE user_id = ? AND is_active = 1 ORDER BY updated_at DESC",
                 (int(user_id),)
@@ -111,8 +115,7 @@ class SQLiteProjectRepository(IProjectRepository):
         # Normalize path for comparison
         normalized_path = ProjectPath.from_path(path).value
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM projects WHERE user_id = ? AND path = ?",
                 (int(user_id), normalized_path)
@@ -134,8 +137,7 @@ class SQLiteProjectRepository(IProjectRepository):
         """
         normalized_path = ProjectPath.from_path(path).value
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             # Find project where stored path is a prefix of given path
             # The '/%' ensures we only match actual subfolders, not similar names
             # ORDER BY LENGTH(path) DESC gives us the deepest (most specific) match
@@ -154,9 +156,7 @@ class SQLiteProjectRepository(IProjectRepository):
 
     async def get_current(self, user_id: UserId) -> Optional[Project]:
         """Get the currently active project for a user"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
+        async with self._db.reader() as db:
             # Get current project ID from workspace
             async with db.execute(
                 "SELECT current_project_id FROM user_workspace WHERE user_id = ?",
@@ -181,7 +181,7 @@ class SQLiteProjectRepository(IProjectRepository):
 
     async def set_current(self, user_id: UserId, project_id: str) -> None:
         """Set the current project for a user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             now = datetime.now().isoformat()
 
             # Upsert user workspace
@@ -193,11 +193,9 @@ class SQLiteProjectRepository(IProjectRepository):
                     updated_at = excluded.updated_at
             """, (int(user_id), project_id, now, now))
 
-            await db.commit()
-
     async def delete(self, project_id: str) -> bool:
         """Delete a project"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # Check if project exists
             async with db.execute(
                 "SELECT id FROM projects WHERE id = ?",
@@ -215,7 +213,6 @@ class SQLiteProjectRepository(IProjectRepository):
 
             # Delete project
             await db.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-            await db.commit()
 
         return True
 
@@ -223,7 +220,7 @@ class SQLiteProjectRepository(IProjectRepository):
         """Check if a project exists at path for user"""
         normalized_path = ProjectPath.from_path(path).value
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT 1 FROM projects WHERE user_id = ? AND path = ?",
                 (int(user_id), normalized_path)
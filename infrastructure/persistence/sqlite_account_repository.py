@@ -4,12 +4,15 @@ SQLite Account Repository
 Persists user account settings for auth mode switching.
 """
 
-import aiosqlite
 import json
 import logging
 from datetime import datetime
 from typing import Optional
 
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
 from shared.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -18,12 +21,17 @@ logger = logging.getLogger(__name__)
 class SQLiteAccountRepository:
     """SQLite implementation for AccountSettings persistence"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
 
     async def initialize(self):
         """Initialize the account_settings table"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS account_settings (
                     user_id INTEGER PRIMARY KEY,
@@ -34,12 +42,10 @@ class SQLiteAccountRepository:
                     updated_at TEXT
                 )
             """)
-            await db.commit()
 
             # Add model column if it doesn't exist (migration)
             try:
                 await db.execute("ALTER TABLE account_settings ADD COLUMN model TEXT")
-                await db.commit()
                 logger.info("Added model column to account_settings table")
             except Exception:
                 # Column already exists, that's fine
@@ -48,7 +54,6 @@ class SQLiteAccountRepository:
             # Add local_model_config column if it doesn't exist (migration for local models)
             try:
                 await db.execute("ALTER TABLE account_settings ADD COLUMN local_model_config TEXT")
-                await db.commit()
                 logger.info("Added local_model_config column to account_settings table")
             except Exception:
                 # Column already exists, that's fine
@@ -57,7 +62,6 @@ class SQLiteAccountRepository:
             # Add yolo_mode column if it doesn't exist (migration)
             try:
                 await db.execute("ALTER TABLE account_settings ADD COLUMN yolo_mode INTEGER DEFAULT 0")
-                await db.commit()
                 logger.info("Added yolo_mode column to account_settings table")
             except Exception:
                 # Column already exists, that's fine
@@ -66,7 +70,6 @@ class SQLiteAccountRepository:
             # Add zai_api_key column if it doesn't exist (migration for user-provided z.ai API keys)
             try:
                 await db.execute("ALTER TABLE account_settings ADD COLUMN zai_api_key TEXT")
-                await db.commit()
                 logger.info("Added zai_api_key column to account_settings table")
             except Exception:
                 # Column already exists, that's fine
@@ -75,7 +78,6 @@ class SQLiteAccountRepository:
             # Add language column if it doesn't exist (migration for i18n)
             try:
                 await db.execute("ALTER TABLE account_settings ADD COLUMN language TEXT DEFAULT 'ru'")
-                await db.commit()
                 logger.info("Added language column to account_settings table")
             except Exception:
                 # Column already exists, that's fine
@@ -87,8 +89,7 @@ class SQLiteAccountRepository:
         """Find account settings by user ID"""
         from application.services.account_service import AccountSettings, AuthMode
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM account_settings WHERE user_id = ?",
                 (user_id,)
@@ -99,17 +100,32 @@ class SQLiteAccountRepository:
         return None
 
     async def save(self, settings: "AccountSettings") -> None:
-        """Save account settings"""
+        """
+        Save account settings.
+
+        yolo_mode is only written for new rows: it is owned by
+        set_yolo_mode, and settings read earlier (e.g. from the
+        AccountService cache) may hold a stale value.
+        """
         # Serialize local_model_config to JSON
         local_config_json = None
         if settings.local_model_config:
             local_config_json = json.dumps(settings.local_model_config.to_dict())
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute("""
-                INSERT OR REPLACE INTO account_settings
+                INSERT INTO account_settings
                 (user_id, auth_mode, model, proxy_url, local_model_config, yolo_mode, zai_api_key, language, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    auth_mode = excluded.auth_mode,
+                    model = excluded.model,
+                    proxy_url = excluded.proxy_url,
+                    local_model_config = excluded.local_model_config,
+                    zai_api_key = excluded.zai_api_key,
+                    language = excluded.language,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at
             """, (
                 settings.user_id,
                 settings.auth_mode.value,
@@ -122,11 +138,10 @@ class SQLiteAccountRepository:
                 settings.created_at.isoformat() if settings.created_at else None,
                 settings.updated_at.isoformat() if settings.updated_at else None,
             ))
-            await db.commit()
 
     async def set_yolo_mode(self, user_id: int, enabled: bool) -> None:
         """Set yolo mode for user (quick update without full save)"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # First ensure row exists
             await db.execute("""
                 INSERT OR IGNORE INTO account_settings (user_id, auth_mode, yolo_mode, created_at)
@@ -138,11 +153,10 @@ class SQLiteAccountRepository:
                 "UPDATE account_settings SET yolo_mode = ?, updated_at = ? WHERE user_id = ?",
                 (1 if enabled else 0, datetime.utcnow().isoformat(), user_id)
             )
-            await db.commit()
 
     async def get_yolo_mode(self, user_id: int) -> bool:
         """Get yolo mode for user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT yolo_mode FROM account_settings WHERE user_id = ?",
                 (user_id,)
@@ -154,7 +168,7 @@ class SQLiteAccountRepository:
 
     async def set_language(self, user_id: int, language: str) -> None:
         """Set language preference for user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # First ensure row exists
             await db.execute("""
                 INSERT OR IGNORE INTO account_settings (user_id, auth_mode, language, created_at)
@@ -166,11 +180,10 @@ class SQLiteAccountRepository:
                 "UPDATE account_settings SET language = ?, updated_at = ? WHERE user_id = ?",
                 (language, datetime.utcnow().isoformat(), user_id)
             )
-            await db.commit()
 
     async def get_language(self, user_id: int) -> Optional[str]:
         """Get language preference for user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT language FROM account_settings WHERE user_id = ?",
                 (user_id,)
@@ -182,12 +195,11 @@ class SQLiteAccountRepository:
 
     async def delete(self, user_id: int) -> None:
         """Delete account settings for user"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute(
                 "DELETE FROM account_settings WHERE user_id = ?",
                 (user_id,)
             )
-            await db.commit()
 
     def _row_to_settings(self, row) -> "AccountSettings":
         """Convert database row to AccountSettings"""
@@ -10,6 +10,10 @@ from domain.entities.proxy_settings import ProxySettings
 from domain.repositories.proxy_repository import ProxyRepository
 from domain.value_objects.proxy_config import ProxyConfig, ProxyType
 from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +21,21 @@ logger = logging.getLogger(__name__)
 class SQLiteProxyRepository(ProxyRepository):
     """SQLite implementation of proxy settings repository"""
 
-    def __init__(self, db_path: str = "data/bot.db"):
+    def __init__(
+        self,
+        db_path: str = "data/bot.db",
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
         self.db_path = db_path
+        self._db = connection_manager or get_connection_manager(self.db_path)
+        self._table_ready = False
 
     async def _ensure_table(self):
         """Create proxy_settings table if it doesn't exist"""
-        async with aiosqlite.connect(self.db_path) as db:
+        if self._table_ready:
+            return
+
+        async with self._db.writer() as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS proxy_settings (
                     id TEXT PRIMARY KEY,
@@ -42,14 +55,13 @@ class SQLiteProxyRepository(ProxyRepository):
                 CREATE INDEX IF NOT EXISTS idx_proxy_user_id
                 ON proxy_settings(user_id)
             """)
-            await db.commit()
+        self._table_ready = True
 
     async def get_global_settings(self) -> Optional[ProxySettings]:
         """Get global proxy settings (user_id IS NULL)"""
         await self._ensure_table()
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM proxy_settings WHERE user_id IS NULL LIMIT 1"
             ) as cursor:
@@ -62,8 +74,7 @@ class SQLiteProxyRepository(ProxyRepository):
         """Get user-specific proxy settings"""
         await self._ensure_table()
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM proxy_settings WHERE user_id = ? LIMIT 1",
                 (user_id.value,)
@@ -77,7 +88,7 @@ class SQLiteProxyRepository(ProxyRepository):
         """Save global proxy settings"""
         await self._ensure_table()
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # Delete existing global settings
             await db.execute("DELETE FROM proxy_settings WHERE user_id IS NULL")
 
@@ -98,7 +109,6 @@ class SQLiteProxyRepository(ProxyRepository):
                     settings.created_at.isoformat(),
                     settings.updated_at.isoformat()
                 ))
-            await db.commit()
             logger.info("Global proxy settings saved")
 
     async def save_user_settings(self, settings: ProxySettings) -> None:
@@ -108,7 +118,7 @@ class SQLiteProxyRepository(ProxyRepository):
         if not settings.user_id:
             raise ValueError("User ID is required for user-specific settings")
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             # Delete existing user settings
             await db.execute(
                 "DELETE FROM proxy_settings WHERE user_id = ?",
@@ -133,28 +143,25 @@ class SQLiteProxyRepository(ProxyRepository):
                     settings.created_at.isoformat(),
                     settings.updated_at.isoformat()
                 ))
-            await db.commit()
             logger.info(f"User {settings.user_id.value} proxy settings saved")
 
     async def delete_global_settings(self) -> None:
         """Delete global proxy settings"""
         await self._ensure_table()
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute("DELETE FROM proxy_settings WHERE user_id IS NULL")
-            await db.commit()
             logger.info("Global proxy settings deleted")
 
     async def delete_user_settings(self, user_id: UserId) -> None:
         """Delete user-specific proxy settings"""
         await self._ensure_table()
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute(
                 "DELETE FROM proxy_settings WHERE user_id = ?",
                 (user_id.value,)
             )
-            await db.commit()
             logger.info(f"User {user_id.value} proxy settings deleted")
 
     def _row_to_entity(self, row: aiosqlite.Row) -> ProxySettings:
@@ -11,14 +11,24 @@ from domain.value_objects.role import Role, Permission
 from domain.repositories.user_repository import UserRepository
 from domain.repositories.session_repository import SessionRepository
 from domain.repositories.command_repository import CommandRepository
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
 from shared.config.settings import settings
 
 
 class SQLiteUserRepository(UserRepository):
     """SQLite implementation of UserRepository"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
+        super().__init__()
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
         self._init_db()
 
     def _init_db(self):
@@ -30,8 +40,7 @@ class SQLiteUserRepository(UserRepository):
         )
 
     async def find_by_id(self, user_id: UserId) -> Optional[User]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM users WHERE user_id = ?", (int(user_id),)
             ) as cursor:
@@ -41,14 +50,13 @@ class SQLiteUserRepository(UserRepository):
         return None
 
     async def find_all(self) -> List[User]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute("SELECT * FROM users") as cursor:
                 rows = await cursor.fetchall()
                 return [self._row_to_user(row) for row in rows]
 
     async def save(self, user: User) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute(
                 """
                 INSERT OR REPLACE INTO users
@@ -66,16 +74,15 @@ class SQLiteUserRepository(UserRepository):
                     user.last_command_at.isoformat() if user.last_command_at else None,
                 ),
             )
-            await db.commit()
+        self._notify_changed(user.user_id)
 
     async def delete(self, user_id: UserId) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute("DELETE FROM users WHERE user_id = ?", (int(user_id),))
-            await db.commit()
+        self._notify_changed(user_id)
 
     async def find_active(self) -> List[User]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute("SELECT * FROM users WHERE is_active = 1") as cursor:
                 rows = await cursor.fetchall()
                 return [self._row_to_user(row) for row in rows]
@@ -109,8 +116,13 @@ class SQLiteUserRepository(UserRepository):
 class SQLiteSessionRepository(SessionRepository):
     """SQLite implementation of SessionRepository"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
         self._init_db()
 
     def _init_db(self):
@@ -121,12 +133,8 @@ class SQLiteSessionRepository(SessionRepository):
             exist_ok=True,
         )
 
-    async def _get_connection(self) -> aiosqlite.Connection:
-        return await aiosqlite.connect(self.db_path)
-
     async def find_by_id(self, session_id: str) -> Optional[Session]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM sessions WHERE session_id = ?", (session_id,)
             ) as cursor:
@@ -142,9 +150,7 @@ class SQLiteSessionRepository(SessionRepository):
         Uses LEFT JOIN to fetch sessions and their messages together,
         then groups by session_id in Python.
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
+        async with self._db.reader() as db:
             # Single query with LEFT JOIN (N+1 fix)
             query = """
                 SELECT
@@ -189,7 +195,7 @@ class SQLiteSessionRepository(SessionRepository):
             sessions = []
             for data in sessions_dict.values():
                 row = data["row"]
-                sessions.append(Session(
+                session = Session(
                     session_id=row["session_id"],
                     user_id=UserId.from_int(row["user_id"]),
                     messages=data["messages"],
@@ -203,13 +209,14 @@ class SQLiteSessionRepository(SessionRepository):
                         if row["updated_at"] else None
                     ),
                     is_active=bool(row["is_active"]),
-                ))
+                )
+                session.mark_persisted(self._session_row(session))
+                sessions.append(session)
 
             return sessions
 
     async def find_active_by_user(self, user_id: UserId) -> Optional[Session]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM sessions WHERE user_id = ? AND is_active = 1 ORDER BY updated_at DESC LIMIT 1",
                 (int(user_id),),
@@ -220,62 +227,91 @@ class SQLiteSessionRepository(SessionRepository):
         return None
 
     async def save(self, session: Session) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO sessions
-                (session_id, user_id, context, created_at, updated_at, is_active)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    session.session_id,
-                    int(session.user_id),
-                    json.dumps(session.context),
-                    session.created_at.isoformat() if session.created_at else None,
-                    session.updated_at.isoformat() if session.updated_at else None,
-                    session.is_active,
-                ),
-            )
-            # Save messages
-            await db.execute(
-                "DELETE FROM session_messages WHERE session_id = ?",
-                (session.session_id,),
-            )
-            for msg in session.messages:
+        """
+        Save session incrementally.
+
+        Only messages appended since the last load/save are inserted
+        (one executemany), and the session row is written only when its
+        fields changed. Falls back to a full rewrite of the messages when
+        the history was cleared, pruned or replaced.
+        """
+        row = self._session_row(session)
+        new_messages = session.get_unsaved_messages()
+
+        async with self._db.writer() as db:
+            if row != session.persisted_state:
                 await db.execute(
+                    """
+                    INSERT INTO sessions
+                    (session_id, user_id, context, created_at, updated_at, is_active)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(session_id) DO UPDATE SET
+                        user_id = excluded.user_id,
+                        context = excluded.context,
+                        created_at = excluded.created_at,
+                        updated_at = excluded.updated_at,
+                        is_active = excluded.is_active
+                """,
+                    row,
+                )
+
+            if new_messages is None:
+                # History is not an extension of what is stored - rewrite it
+                await db.execute(
+                    "DELETE FROM session_messages WHERE session_id = ?",
+                    (session.session_id,),
+                )
+                new_messages = session.messages
+
+            if new_messages:
+                await db.executemany(
                     """
                     INSERT INTO session_messages
                     (session_id, role, content, timestamp, tool_use_id, tool_result)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                    (
-                        session.session_id,
-                        msg.role.value,
-                        msg.content,
-                        msg.timestamp.isoformat() if msg.timestamp else None,
-                        msg.tool_use_id,
-                        msg.tool_result,
-                    ),
+                    [
+                        (
+                            session.session_id,
+                            msg.role.value,
+                            msg.content,
+                            msg.timestamp.isoformat() if msg.timestamp else None,
+                            msg.tool_use_id,
+                            msg.tool_result,
+                        )
+                        for msg in new_messages
+                    ],
                 )
-            await db.commit()
+
+        session.mark_persisted(row)
 
     async def delete(self, session_id: str) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute(
                 "DELETE FROM session_messages WHERE session_id = ?", (session_id,)
             )
             await db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-            await db.commit()
 
     async def delete_old_sessions(self, days: int = 7) -> int:
         cutoff = datetime.utcnow() - timedelta(days=days)
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             cursor = await db.execute(
                 "DELETE FROM sessions WHERE updated_at < ?", (cutoff.isoformat(),)
             )
-            await db.commit()
             return cursor.rowcount
 
+    @staticmethod
+    def _session_row(session: Session) -> tuple:
+        """Column values of the sessions row for a session"""
+        return (
+            session.session_id,
+            int(session.user_id),
+            json.dumps(session.context),
+            session.created_at.isoformat() if session.created_at else None,
+            session.updated_at.isoformat() if session.updated_at else None,
+            1 if session.is_active else 0,
+        )
+
     async def _row_to_session(self, db: aiosqlite.Connection, row) -> Session:
         messages = []
         async with db.execute(
@@ -298,7 +334,7 @@ class SQLiteSessionRepository(SessionRepository):
                     )
                 )
 
-        return Session(
+        session = Session(
             session_id=row["session_id"],
             user_id=UserId.from_int(row["user_id"]),
             messages=messages,
@@ -311,13 +347,20 @@ class SQLiteSessionRepository(SessionRepository):
             ),
             is_active=bool(row["is_active"]),
         )
+        session.mark_persisted(self._session_row(session))
+        return session
 
 
 class SQLiteCommandRepository(CommandRepository):
     """SQLite implementation of CommandRepository"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        connection_manager: Optional[SQLiteConnectionManager] = None,
+    ):
         self.db_path = db_path or settings.database.url.replace("sqlite:///", "")
+        self._db = connection_manager or get_connection_manager(self.db_path)
         self._init_db()
 
     def _init_db(self):
@@ -328,12 +371,8 @@ class SQLiteCommandRepository(CommandRepository):
             exist_ok=True,
         )
 
-    async def _get_connection(self) -> aiosqlite.Connection:
-        return await aiosqlite.connect(self.db_path)
-
     async def find_by_id(self, command_id: str) -> Optional[Command]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM commands WHERE command_id = ?", (command_id,)
             ) as cursor:
@@ -343,8 +382,7 @@ class SQLiteCommandRepository(CommandRepository):
         return None
 
     async def find_by_user(self, user_id: int, limit: int = 100) -> List[Command]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM commands WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
                 (user_id, limit),
@@ -353,8 +391,7 @@ class SQLiteCommandRepository(CommandRepository):
                 return [self._row_to_command(row) for row in rows]
 
     async def find_pending(self) -> List[Command]:
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(
                 "SELECT * FROM commands WHERE status IN ('pending', 'approved') ORDER BY created_at"
             ) as cursor:
@@ -362,7 +399,7 @@ class SQLiteCommandRepository(CommandRepository):
                 return [self._row_to_command(row) for row in rows]
 
     async def save(self, command: Command) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             await db.execute(
                 """
                 INSERT OR REPLACE INTO commands
@@ -384,15 +421,13 @@ class SQLiteCommandRepository(CommandRepository):
                     command.completed_at.isoformat() if command.completed_at else None,
                 ),
             )
-            await db.commit()
 
     async def delete_old_commands(self, days: int = 30) -> int:
         cutoff = datetime.utcnow() - timedelta(days=days)
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._db.writer() as db:
             cursor = await db.execute(
                 "DELETE FROM commands WHERE created_at < ?", (cutoff.isoformat(),)
             )
-            await db.commit()
             return cursor.rowcount
 
     async def get_statistics(self, user_id: Optional[int] = None) -> dict:
@@ -403,8 +438,7 @@ class SQLiteCommandRepository(CommandRepository):
             params.append(user_id)
         query += " GROUP BY status"
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader() as db:
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 stats = {row["status"]: row["count"] for row in rows}
@@ -437,7 +471,10 @@ class SQLiteCommandRepository(CommandRepository):
         )
 
 
-async def init_database(db_path: str = None):
+async def init_database(
+    db_path: str = None,
+    connection_manager: Optional[SQLiteConnectionManager] = None,
+):
     """Initialize database tables"""
     db_path = db_path or settings.database.url.replace("sqlite:///", "")
     import os
@@ -445,8 +482,9 @@ async def init_database(db_path: str = None):
     os.makedirs(
         os.path.dirname(db_path) if os.path.dirname(db_path) else ".", exist_ok=True
     )
+    manager = connection_manager or get_connection_manager(db_path)
 
-    async with aiosqlite.connect(db_path) as db:
+    async with manager.writer() as db:
         # Users table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -545,5 +583,3 @@ async def init_database(db_path: str = None):
         await db.execute(
             "CREATE INDEX IF NOT EXISTS idx_session_messages_session ON session_messages(session_id)"
         )
-
-        await db.commit()
@@ -0,0 +1,197 @@
+"""
+SQLite Write-Behind Queue
+
+Coalesces small writes into one transaction per tick.
+
+Every writer transaction ends with a commit (and a WAL sync), so a task
+completion that stores the Claude session id and two messages used to pay
+for several syncs in a row before the handler could move on. With the
+queue in "batched" mode, repositories hand their writes over and return
+at once; a background flusher runs everything queued during the tick in
+one transaction. "immediate" mode keeps the old behaviour: each write is
+committed before the call returns.
+
+Pending writes are flushed on close(), so a graceful stop loses nothing.
+A crash can lose at most one tick of writes.
+
+A queued write that fails is rolled back on its own and counted; since its
+caller has already returned, the error is re-raised as WriteBehindError on
+the next raise_failures() call (repositories call it before every read).
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import aiosqlite
+
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+
+logger = logging.getLogger(__name__)
+
+WriteOperation = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+DURABILITY_IMMEDIATE = "immediate"
+DURABILITY_BATCHED = "batched"
+DURABILITY_MODES = (DURABILITY_IMMEDIATE, DURABILITY_BATCHED)
+
+
+class WriteBehindError(Exception):
+    """Queued writes failed after their callers had returned"""
+
+    def __init__(self, errors: List[Exception]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} queued write(s) failed, first: {errors[0]}")
+
+
+class SQLiteWriteBehindQueue:
+    """
+    Write-behind queue on top of a connection manager's writer.
+
+    Usage:
+        queue = SQLiteWriteBehindQueue(manager, durability="batched")
+
+        async def insert(db):
+            await db.execute("INSERT ...", params)
+
+        await queue.submit(insert)  # returns before the commit in batched mode
+        await queue.flush()         # commit everything queued so far
+        queue.raise_failures()      # WriteBehindError if a queued write failed
+        await queue.close()         # flush and stop the flusher
+    """
+
+    DEFAULT_INTERVAL = 0.05  # seconds
+    MAX_RETRY_DELAY = 5.0  # seconds between retries of a failed flush
+
+    def __init__(
+        self,
+        connection_manager: SQLiteConnectionManager,
+        durability: str = DURABILITY_BATCHED,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(
+                f"Unknown durability mode {durability!r}, expected one of {DURABILITY_MODES}"
+            )
+        self._db = connection_manager
+        self.durability = durability
+        self.interval = interval
+
+        self._pending: List[WriteOperation] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._failed: List[Exception] = []
+
+        self.batches = 0
+        self.operations = 0
+        self.failures = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of queued writes not yet committed"""
+        return len(self._pending)
+
+    def raise_failures(self) -> None:
+        """
+        Re-raise queued writes that failed since the last call.
+
+        Raises:
+            WriteBehindError: With the failed writes' exceptions
+        """
+        if self._failed:
+            errors, self._failed = self._failed, []
+            raise WriteBehindError(errors) from errors[0]
+
+    async def submit(self, operation: WriteOperation) -> None:
+        """
+        Queue a write.
+
+        In batched mode the write is committed by the next flush; in
+        immediate mode (or after close) it is committed before returning.
+
+        Args:
+            operation: Coroutine function taking the writer connection
+        """
+        if self.durability == DURABILITY_IMMEDIATE or self._closed:
+            async with self._db.writer() as db:
+                await operation(db)
+            return
+
+        self._pending.append(operation)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Commit all queued writes in one transaction"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+
+            try:
+                async with self._db.writer() as db:
+                    # sqlite3's legacy isolation level does not open a
+                    # transaction for SAVEPOINT; without BEGIN each RELEASE
+                    # below would commit (and sync) on its own
+                    if not db.in_transaction:
+                        await db.execute("BEGIN")
+                    for operation in batch:
+                        # A savepoint per write keeps one bad write from
+                        # rolling back the rest of the batch
+                        await db.execute("SAVEPOINT write_behind")
+                        try:
+                            await operation(db)
+                        except Exception as e:
+                            await db.execute("ROLLBACK TO write_behind")
+                            logger.error(f"Write-behind operation failed: {e}")
+                            self.failures += 1
+                            self._failed.append(e)
+                        await db.execute("RELEASE write_behind")
+            except BaseException:
+                # Transaction rolled back (e.g. flusher cancelled on
+                # shutdown) - requeue the batch for the next flush
+                self._pending[:0] = batch
+                raise
+
+            self.batches += 1
+            self.operations += len(batch)
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the flusher"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.batches:
+            logger.info(
+                f"Write-behind queue closed: {self.operations} writes "
+                f"in {self.batches} transactions"
+            )
+        if self.failures:
+            logger.error(f"Write-behind queue closed with {self.failures} failed writes")
+
+    async def _run(self) -> None:
+        retry_delay = self.interval
+        while True:
+            await self._wakeup.wait()
+            # Let the rest of the tick's writes arrive before committing
+            await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                retry_delay = self.interval
+            except Exception as e:
+                logger.error(f"Write-behind flush failed, retrying in {retry_delay:.2f}s: {e}")
+                # The batch was requeued - retry it without waiting for a new write
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY)
+                self._wakeup.set()
@@ -0,0 +1,308 @@
+"""
+Pooled asyncssh connections.
+
+Forking the ssh binary per command costs a TCP + key exchange handshake
+(~200-500ms) every time. SSHConnectionPool keeps one long-lived asyncssh
+connection per host and opens a multiplexed channel for each command:
+- keepalive detects dead connections, which are re-established on demand
+- failed connects back off exponentially instead of hammering the host
+- a semaphore caps concurrent channels (sshd MaxSessions defaults to 10)
+- stdout/stderr are read incrementally and can be streamed to callbacks
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import asyncssh
+
+logger = logging.getLogger(__name__)
+
+OutputCallback = Callable[[str], Awaitable[None]]
+
+
+class SSHUnavailableError(ConnectionError):
+    """Host is in reconnect backoff after failed connection attempts."""
+
+
+@dataclass
+class SSHRunResult:
+    """Output of a command run over a pooled connection."""
+    stdout: str
+    stderr: str
+    exit_code: int
+    execution_time: float
+
+
+@dataclass
+class LatencyStat:
+    """Count, average and last value of a latency in seconds."""
+    count: int = 0
+    total: float = 0.0
+    last: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "last_ms": round(self.last * 1000, 1) if self.count else None,
+        }
+
+
+class SSHConnectionPool:
+    """
+    One persistent asyncssh connection to a host, shared by all commands.
+
+    Usage:
+        pool = get_ssh_pool(settings.ssh)
+        result = await pool.run("docker ps", timeout=30)
+        pool.get_metrics()  # handshake / command latency, reconnects
+    """
+
+    CONNECT_TIMEOUT = 10.0
+    KEEPALIVE_INTERVAL = 30.0
+    KEEPALIVE_COUNT_MAX = 3
+    MAX_CHANNELS = 8
+    BACKOFF_INITIAL = 1.0
+    BACKOFF_MAX = 60.0
+    READ_CHUNK = 64 * 1024
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        key_path: str,
+        known_hosts: Optional[str] = None,
+        max_channels: int = MAX_CHANNELS,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.key_path = key_path
+        # None disables host key checking (same as StrictHostKeyChecking=no)
+        self.known_hosts = known_hosts
+
+        self._conn: Optional[asyncssh.SSHClientConnection] = None
+        self._connect_lock = asyncio.Lock()
+        self._channels = asyncio.Semaphore(max_channels)
+        self._watchers: set[asyncio.Task] = set()
+
+        self._failures = 0
+        self._retry_at = 0.0  # monotonic time of the next allowed connect
+        self._last_error: Optional[str] = None
+
+        # Statistics
+        self._handshake = LatencyStat()
+        self._command = LatencyStat()
+        self._reconnects = 0
+        self._command_errors = 0
+        self._active_channels = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    async def run(
+        self,
+        command: str,
+        timeout: float = 300,
+        on_stdout: Optional[OutputCallback] = None,
+        on_stderr: Optional[OutputCallback] = None,
+    ) -> SSHRunResult:
+        """
+        Run a command on a new channel of the shared connection.
+
+        Output is read incrementally; callbacks receive each chunk as it
+        arrives. A channel that can't be opened because the connection
+        dropped is retried once on a fresh connection.
+
+        Raises:
+            TimeoutError: Command didn't finish within timeout
+            SSHUnavailableError: Host is in reconnect backoff
+        """
+        async with self._channels:
+            self._active_channels += 1
+            try:
+                for attempt in (1, 2):
+                    conn = await self._get_connection()
+                    try:
+                        return await self._run_on(conn, command, timeout, on_stdout, on_stderr)
+                    except (asyncssh.ChannelOpenError, asyncssh.ConnectionLost, BrokenPipeError) as e:
+                        self._drop(conn, f"channel failed: {e}")
+                        if attempt == 2:
+                            raise
+            finally:
+                self._active_channels -= 1
+
+    async def _run_on(
+        self,
+        conn: asyncssh.SSHClientConnection,
+        command: str,
+        timeout: float,
+        on_stdout: Optional[OutputCallback],
+        on_stderr: Optional[OutputCallback],
+    ) -> SSHRunResult:
+        start = time.monotonic()
+        process = await conn.create_process(command, encoding="utf-8", errors="replace")
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                asyncio.gather(
+                    self._read(process.stdout, on_stdout),
+                    self._read(process.stderr, on_stderr),
+                ),
+                timeout=timeout,
+            )
+            await asyncio.wait_for(process.wait_closed(), timeout=max(1.0, timeout))
+        except asyncio.TimeoutError:
+            self._command_errors += 1
+            process.close()
+            raise TimeoutError(f"Command timed out after {timeout} seconds")
+
+        elapsed = time.monotonic() - start
+        self._command.add(elapsed)
+        return SSHRunResult(
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=process.returncode or 0,
+            execution_time=elapsed,
+        )
+
+    async def _read(
+        self,
+        stream: asyncssh.SSHReader,
+        callback: Optional[OutputCallback],
+    ) -> str:
+        parts = []
+        while True:
+            chunk = await stream.read(self.READ_CHUNK)
+            if not chunk:
+                break
+            parts.append(chunk)
+            if callback:
+                await callback(chunk)
+        return "".join(parts)
+
+    async def _get_connection(self) -> asyncssh.SSHClientConnection:
+        if self._conn is not None:
+            return self._conn
+
+        async with self._connect_lock:
+            if self._conn is not None:
+                return self._conn
+
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise SSHUnavailableError(
+                    f"SSH {self.host}:{self.port} unavailable ({self._last_error}), "
+                    f"retrying in {wait:.0f}s"
+                )
+
+            start = time.monotonic()
+            try:
+                conn = await asyncio.wait_for(
+                    asyncssh.connect(
+                        self.host,
+                        port=self.port,
+                        username=self.username,
+                        client_keys=[self.key_path],
+                        known_hosts=self.known_hosts,
+                        keepalive_interval=self.KEEPALIVE_INTERVAL,
+                        keepalive_count_max=self.KEEPALIVE_COUNT_MAX,
+                    ),
+                    timeout=self.CONNECT_TIMEOUT,
+                )
+            except (OSError, asyncssh.Error, asyncio.TimeoutError) as e:
+                self._failures += 1
+                backoff = min(self.BACKOFF_MAX, self.BACKOFF_INITIAL * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + backoff
+                self._last_error = str(e) or type(e).__name__
+                logger.warning(
+                    f"SSH connect to {self.host}:{self.port} failed ({self._last_error}), "
+                    f"next attempt in {backoff:.0f}s"
+                )
+                raise
+
+            handshake = time.monotonic() - start
+            self._handshake.add(handshake)
+            if self._handshake.count > 1:
+                self._reconnects += 1
+            self._failures = 0
+            self._retry_at = 0.0
+            self._conn = conn
+            logger.info(f"SSH connected to {self.host}:{self.port} in {handshake * 1000:.0f}ms")
+
+            watcher = asyncio.create_task(self._watch(conn))
+            self._watchers.add(watcher)
+            watcher.add_done_callback(self._watchers.discard)
+            return conn
+
+    async def _watch(self, conn: asyncssh.SSHClientConnection) -> None:
+        # Keepalive failures and server disconnects close the connection
+        await conn.wait_closed()
+        if self._conn is conn:
+            self._conn = None
+            logger.info(f"SSH connection to {self.host}:{self.port} closed")
+
+    def _drop(self, conn: asyncssh.SSHClientConnection, reason: str) -> None:
+        if self._conn is conn:
+            self._conn = None
+        logger.warning(f"SSH {self.host}:{self.port}: {reason}, reconnecting")
+        conn.close()
+
+    async def close(self) -> None:
+        """Close the connection."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+            await conn.wait_closed()
+        for watcher in list(self._watchers):
+            watcher.cancel()
+
+    def get_metrics(self) -> dict:
+        """Handshake/command latency, reconnects and channel usage."""
+        return {
+            "host": f"{self.host}:{self.port}",
+            "connected": self.connected,
+            "handshake": self._handshake.to_dict(),
+            "command": self._command.to_dict(),
+            "reconnects": self._reconnects,
+            "connect_failures": self._failures,
+            "command_errors": self._command_errors,
+            "active_channels": self._active_channels,
+            "last_error": self._last_error,
+        }
+
+
+# One pool per host: every SSHCommandExecutor shares the connection
+_pools: Dict[Tuple[str, int, str, str], SSHConnectionPool] = {}
+
+
+def get_ssh_pool(ssh_config) -> SSHConnectionPool:
+    """Get or create the shared pool for an SSHConfig."""
+    key = (ssh_config.host, ssh_config.port, ssh_config.user, ssh_config.key_path)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = SSHConnectionPool(
+            host=ssh_config.host,
+            port=ssh_config.port,
+            username=ssh_config.user,
+            key_path=ssh_config.key_path,
+            known_hosts=getattr(ssh_config, "known_hosts", None) or None,
+        )
+        _pools[key] = pool
+    return pool
+
+
+async def close_ssh_pools() -> None:
+    """Close all pooled SSH connections (on shutdown)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    await asyncio.gather(*(p.close() for p in pools), return_exceptions=True)
@@ -1,72 +1,47 @@
-import asyncio
 import logging
 from typing import Tuple, Optional
 from domain.services.command_execution_service import (
     ICommandExecutionService,
     CommandExecutionResult,
 )
+from infrastructure.ssh.connection_pool import OutputCallback, get_ssh_pool
 from shared.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
 class SSHCommandExecutor(ICommandExecutionService):
-    """SSH-based command execution service"""
+    """SSH-based command execution service (pooled asyncssh connection)"""
 
     def __init__(self, ssh_config=None):
         self.config = ssh_config or settings.ssh
-
-    async def execute(self, command: str, timeout: int = 300) -> CommandExecutionResult:
-        """Execute command via SSH"""
-        ssh_cmd = [
-            "ssh",
-            "-o",
-            "StrictHostKeyChecking=no",
-            "-o",
-            "ConnectTimeout=10",
-            "-i",
-            self.config.key_path,
-            f"{self.config.user}@{self.config.host}",
-            "-p",
-            str(self.config.port),
-            command,
-        ]
-
+        self.pool = get_ssh_pool(self.config)
+
+    async def execute(
+        self,
+        command: str,
+        timeout: int = 300,
+        on_stdout: Optional[OutputCallback] = None,
+        on_stderr: Optional[OutputCallback] = None,
+    ) -> CommandExecutionResult:
+        """Execute command via SSH, optionally streaming output to callbacks"""
         logger.info(f"Executing SSH command: {command[:100]}...")
 
         try:
-            start_time = asyncio.get_event_loop().time()
-            process = await asyncio.create_subprocess_exec(
-                *ssh_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            result = await self.pool.run(
+                command, timeout=timeout, on_stdout=on_stdout, on_stderr=on_stderr
             )
-
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
-                raise TimeoutError(f"Command timed out after {timeout} seconds")
-
-            end_time = asyncio.get_event_loop().time()
-            execution_time = end_time - start_time
-
-            stdout_str = stdout.decode("utf-8", errors="replace").strip()
-            stderr_str = stderr.decode("utf-8", errors="replace").strip()
-            exit_code = process.returncode or 0
-
             return CommandExecutionResult(
-                stdout=stdout_str,
-                stderr=stderr_str,
-                exit_code=exit_code,
-                execution_time=execution_time,
+                stdout=result.stdout.strip(),
+                stderr=result.stderr.strip(),
+                exit_code=result.exit_code,
+                execution_time=result.execution_time,
             )
 
         except FileNotFoundError:
             return CommandExecutionResult(
                 stdout="",
-                stderr="SSH client not found. Please ensure openssh-client is installed.",
+                stderr=f"SSH key not found: {self.config.key_path}",
                 exit_code=1,
                 execution_time=0,
             )
@@ -79,6 +54,10 @@ class SSHCommandExecutor(ICommandExecutionService):
                 execution_time=0,
             )
 
+    def get_metrics(self) -> dict:
+        """Connection pool metrics (handshake/command latency, reconnects)"""
+        return self.pool.get_metrics()
+
     async def execute_script(
         self, script: str, timeout: int = 300
     ) -> CommandExecutionResult:
@@ -25,6 +25,8 @@ import asyncio
 import logging
 import os
 import signal
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 from aiogram import Bot, Dispatcher
@@ -37,6 +39,7 @@ from shared.container import Container, Config
 from infrastructure.claude_code.diagnostics import run_and_log_diagnostics
 from presentation.middleware.auth import AuthMiddleware, CallbackAuthMiddleware
 from presentation.handlers.state.update_coordinator import init_coordinator
+from presentation.middleware.send_scheduler import get_send_scheduler, init_send_scheduler
 
 # Configure logging
 Path("logs").mkdir(exist_ok=True)
@@ -65,6 +68,21 @@ class Application:
         self.bot: Bot = None
         self.dp: Dispatcher = None
         self._shutdown_event = asyncio.Event()
+        self._startup_checks_task: asyncio.Task = None
+        self._startup_timings: dict[str, float] = {}
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Record how long a startup phase took"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._startup_timings[name] = time.perf_counter() - started
+
+    def _log_startup_timings(self, total: float):
+        breakdown = ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in self._startup_timings.items())
+        logger.info(f"Startup timing: {total:.2f}s total ({breakdown})")
 
     async def setup(self):
         """Initialize application components"""
@@ -76,31 +94,11 @@ class Application:
 
         # Initialize container (database, repositories)
         logger.info("Initializing container...")
-        await self.container.init()
+        with self._phase("container"):
+            await self.container.init()
 
-        # Check Claude Code backends
-        claude_proxy = self.container.claude_proxy()
-        claude_sdk = self.container.claude_sdk()
-
-        # Check CLI backend
-        installed, message = await claude_proxy.check_claude_installed()
-        if installed:
-            logger.info(f"✓ CLI: {message}")
-            await run_and_log_diagnostics(claude_proxy.claude_path)
-        else:
-            logger.warning(f"⚠ CLI: {message}")
-
-        # Check SDK backend
-        if claude_sdk:
-            sdk_ok, sdk_msg = await claude_sdk.check_sdk_available()
-            if sdk_ok:
-                logger.info(f"✓ SDK: {sdk_msg}")
-                plugins_info = claude_sdk.get_enabled_plugins_info()
-                available_plugins = [p["name"] for p in plugins_info if p.get("available")]
-                if available_plugins:
-                    logger.info(f"✓ Плагины: {', '.join(available_plugins)}")
-            else:
-                logger.warning(f"⚠ SDK: {sdk_msg}")
+        # Claude Code backends are checked in the background once polling
+        # starts (see _run_startup_checks), so they don't delay startup
 
         # Initialize bot
         self.bot = Bot(
@@ -110,12 +108,35 @@ class Application:
         self.dp = Dispatcher()
 
         # ВАЖНО: Инициализировать координатор обновлений ПЕРЕД хэндлерами!
-        # Координатор гарантирует минимум 2 секунды между обновлениями сообщений
-        coordinator = init_coordinator(self.bot)
-        logger.info(f"✓ MessageUpdateCoordinator initialized (min interval: {coordinator.MIN_UPDATE_INTERVAL}s)")
+        # Интервал между обновлениями адаптивный (по чату), в границах из конфига
+        coordinator = init_coordinator(
+            self.bot,
+            min_interval=self.container.config.telegram_edit_min_interval,
+            max_interval=self.container.config.telegram_edit_max_interval,
+        )
+        logger.info(
+            f"✓ MessageUpdateCoordinator initialized "
+            f"(adaptive interval {coordinator.min_interval}-{coordinator.max_interval}s)"
+        )
+
+        # Все исходящие запросы к Bot API идут через общий планировщик:
+        # глобальный и per-chat лимиты, приоритеты, общий backoff по 429
+        scheduler = init_send_scheduler(self.bot)
+        logger.info(
+            f"✓ TelegramSendScheduler registered "
+            f"(global {scheduler.GLOBAL_RATE:.0f}/s, group {scheduler.GROUP_CHAT_RATE * 60:.0f}/min)"
+        )
+        # 429 из планировщика замедляют обновления соответствующего чата
+        coordinator.attach_rate_limit_feed(scheduler)
+
+        # Telegram MCP tools run in-process on this bot, not as a node server per task
+        claude_sdk = self.container.claude_sdk()
+        if claude_sdk:
+            claude_sdk.attach_bot(self.bot)
 
         # Register handlers (using container)
-        self._register_handlers()
+        with self._phase("handlers"):
+            self._register_handlers()
 
         # Register middleware
         # Rate limiting FIRST (before auth to prevent DoS)
@@ -132,7 +153,8 @@ class Application:
         self.dp.callback_query.middleware(CallbackAuthMiddleware(self.container.bot_service()))
 
         # Register bot commands
-        await self._register_bot_commands()
+        with self._phase("bot_commands"):
+            await self._register_bot_commands()
 
         logger.info("Bot initialized successfully")
         logger.info(f"Default working directory: {self.container.config.claude_working_dir}")
@@ -181,6 +203,7 @@ class Application:
             BotCommand(command="start", description="📱 Открыть меню"),
             BotCommand(command="yolo", description="⚡ Вкл/выкл авто-подтверждение"),
             BotCommand(command="cancel", description="🛑 Отменить задачу"),
+            BotCommand(command="search", description="🔎 Поиск по истории"),
         ]
 
         try:
@@ -232,16 +255,57 @@ class Application:
             except Exception as e:
                 logger.warning(f"⚠ Failed to notify admin {admin_id}: {e}")
 
+    async def _check_cli_backend(self):
+        """Check CLI backend and run diagnostics (prompt test cached per CLI version)"""
+        claude_proxy = self.container.claude_proxy()
+        installed, message = await claude_proxy.check_claude_installed()
+        if installed:
+            logger.info(f"✓ CLI: {message}")
+            await run_and_log_diagnostics(claude_proxy.claude_path)
+        else:
+            logger.warning(f"⚠ CLI: {message}")
+
+    async def _check_sdk_backend(self):
+        """Check SDK backend and enabled plugins"""
+        claude_sdk = self.container.claude_sdk()
+        if not claude_sdk:
+            return
+        sdk_ok, sdk_msg = await claude_sdk.check_sdk_available()
+        if sdk_ok:
+            logger.info(f"✓ SDK: {sdk_msg}")
+            plugins_info = claude_sdk.get_enabled_plugins_info()
+            available_plugins = [p["name"] for p in plugins_info if p.get("available")]
+            if available_plugins:
+                logger.info(f"✓ Плагины: {', '.join(available_plugins)}")
+        else:
+            logger.warning(f"⚠ SDK: {sdk_msg}")
+
+    async def _run_startup_checks(self):
+        """Check Claude Code backends concurrently while the bot is already polling"""
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            self._check_cli_backend(),
+            self._check_sdk_backend(),
+            return_exceptions=True,
+        )
+        for name, result in zip(("CLI", "SDK"), results):
+            if isinstance(result, Exception):
+                logger.error(f"⚠ {name} startup check failed: {result}", exc_info=result)
+        logger.info(f"Startup checks finished in {time.perf_counter() - started:.2f}s")
+
     async def start(self):
         """Start the bot"""
+        started = time.perf_counter()
         await self.setup()
 
         logger.info("Starting bot polling...")
-        info = await self.bot.get_me()
+        with self._phase("get_me"):
+            info = await self.bot.get_me()
         logger.info(f"Bot: @{info.username} (ID: {info.id})")
 
         # Notify admins that bot started
-        await self._notify_admins_startup(info)
+        with self._phase("notify_admins"):
+            await self._notify_admins_startup(info)
 
         # Set up signal handlers (Unix only)
         if sys.platform != "win32":
@@ -249,6 +313,9 @@ class Application:
             for sig in (signal.SIGTERM, signal.SIGINT):
                 loop.add_signal_handler(sig, lambda: asyncio.create_task(self.shutdown()))
 
+        self._log_startup_timings(time.perf_counter() - started)
+        self._startup_checks_task = asyncio.create_task(self._run_startup_checks())
+
         # Start polling
         await self.dp.start_polling(
             self.bot,
@@ -263,6 +330,9 @@ class Application:
         logger.info("Shutting down...")
         self._shutdown_event.set()
 
+        if self._startup_checks_task and not self._startup_checks_task.done():
+            self._startup_checks_task.cancel()
+
         # Stop polling
         if self.dp:
             await self.dp.stop_polling()
@@ -270,6 +340,11 @@ class Application:
         # Close container resources
         await self.container.close()
 
+        # Flush queued outbound messages
+        scheduler = get_send_scheduler()
+        if scheduler:
+            await scheduler.close()
+
         # Close bot session
         if self.bot:
             await self.bot.session.close()
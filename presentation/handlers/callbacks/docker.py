@@ -7,6 +7,7 @@ Handles all Docker-related callbacks: list, start, stop, restart, logs, info, rm
 import logging
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
+from infrastructure.monitoring.sampler import sparkline
 from presentation.handlers.callbacks.base import BaseCallbackHandler
 from shared.constants import DOCKER_LOGS_PAGE_SIZE, DOCKER_LOGS_MAX_LINES, TEXT_TRUNCATE_LIMIT
 
@@ -34,6 +35,13 @@ class DockerCallbackHandler(BaseCallbackHandler):
             if metrics.get('load_average', [0])[0] > 0:
                 text += f"📈 <b>Нагрузка:</b> {metrics['load_average'][0]:.2f}\n"
 
+            history = info.get("history") or {}
+            if len(history.get("cpu_percent", [])) > 1:
+                text += (
+                    f"\n<code>CPU {sparkline(history['cpu_percent'])}</code>\n"
+                    f"<code>RAM {sparkline(history['memory_percent'])}</code>\n"
+                )
+
             if info.get("alerts"):
                 text += "\n⚠️ <b>Предупреждения:</b>\n"
                 text += "\n".join(info["alerts"])
@@ -322,6 +322,9 @@ class CallbackHandlers:
     async def handle_cd_goto(self, callback: CallbackQuery) -> None:
         await self._project.handle_cd_goto(callback)
 
+    async def handle_cd_page(self, callback: CallbackQuery) -> None:
+        await self._project.handle_cd_page(callback)
+
     async def handle_cd_root(self, callback: CallbackQuery) -> None:
         await self._project.handle_cd_root(callback)
 
@@ -633,6 +636,10 @@ def register_handlers(router: Router, handlers: CallbackHandlers) -> None:
         handlers.handle_cd_goto,
         F.data.startswith("cd:goto:")
     )
+    router.callback_query.register(
+        handlers.handle_cd_page,
+        F.data.startswith("cd:page:")
+    )
     router.callback_query.register(
         handlers.handle_cd_root,
         F.data == "cd:root"
@@ -497,7 +497,7 @@ class ProjectCallbackHandler(BaseCallbackHandler):
         try:
             # Get content and tree view
             content = await self.file_browser_service.list_directory(path)
-            tree_view = await self.file_browser_service.get_tree_view(path)
+            tree_view = self.file_browser_service.render_tree_view(content)
 
             # Update message
             await callback.message.edit_text(
@@ -511,6 +511,35 @@ class ProjectCallbackHandler(BaseCallbackHandler):
             logger.error(f"Error navigating to {path}: {e}")
             await callback.answer(f"❌ Ошибка: {e}")
 
+    async def handle_cd_page(self, callback: CallbackQuery) -> None:
+        """Handle switching pages of a large folder in /cd command."""
+        # Extract page token from callback data (cd:page:<token>)
+        token = callback.data.split(":", 2)[-1] if callback.data.count(":") >= 2 else ""
+
+        if not self.file_browser_service:
+            from application.services.file_browser_service import FileBrowserService
+            self.file_browser_service = FileBrowserService()
+
+        path = self.file_browser_service.get_page_path(token)
+        if not path:
+            await callback.answer("❌ Страница устарела, откройте папку заново")
+            return
+
+        try:
+            content = await self.file_browser_service.list_directory(path, token)
+            tree_view = self.file_browser_service.render_tree_view(content)
+
+            await callback.message.edit_text(
+                tree_view,
+                parse_mode=ParseMode.HTML,
+                reply_markup=Keyboards.file_browser(content)
+            )
+            await callback.answer()
+
+        except Exception as e:
+            logger.error(f"Error paging {path}: {e}")
+            await callback.answer(f"❌ Ошибка: {e}")
+
     async def handle_cd_root(self, callback: CallbackQuery) -> None:
         """Handle going to root directory."""
         if not self.file_browser_service:
@@ -525,7 +554,7 @@ class ProjectCallbackHandler(BaseCallbackHandler):
 
             # Get content and tree view
             content = await self.file_browser_service.list_directory(root_path)
-            tree_view = await self.file_browser_service.get_tree_view(root_path)
+            tree_view = self.file_browser_service.render_tree_view(content)
 
             # Update message
             await callback.message.edit_text(
@@ -1,3 +1,4 @@
+import html
 import logging
 import os
 from aiogram import Router, F, types
@@ -6,11 +7,15 @@ from aiogram.types import Message
 from aiogram.enums import ParseMode
 from application.services.bot_service import BotService
 from infrastructure.claude_code.proxy_service import ClaudeCodeProxyService
-from infrastructure.claude_code.diagnostics import run_diagnostics, format_diagnostics_for_telegram
+from infrastructure.claude_code.diagnostics import run_cached_diagnostics, format_diagnostics_for_telegram
+from infrastructure.monitoring.sampler import sparkline
+from domain.entities.message_search import HIGHLIGHT_END, HIGHLIGHT_START
 from presentation.keyboards.keyboards import Keyboards
 
 logger = logging.getLogger(__name__)
 
+SEARCH_PAGE_SIZE = 5
+
 # Claude Code plugin commands that should be passed through to SDK/CLI
 # These are NOT Telegram bot commands - they are Claude Code slash commands
 CLAUDE_SLASH_COMMANDS = {
@@ -44,6 +49,9 @@ class CommandHandlers:
         self.context_service = context_service
         self.file_browser_service = file_browser_service
         self.account_service = account_service
+        # Last /search query per user, for the pagination buttons
+        # (callback_data is too small to carry the query itself)
+        self._search_queries: dict[int, str] = {}
 
     async def start(self, message: Message) -> None:
         """Handle /start command - show main inline menu"""
@@ -245,6 +253,12 @@ class CommandHandlers:
         if metrics.get('load_average', [0])[0] > 0:
             lines.append(f"📈 <b>Нагрузка:</b> {metrics['load_average'][0]:.2f}")
 
+        # Графики по кольцевому буферу сэмплера
+        history = info.get("history") or {}
+        if len(history.get("cpu_percent", [])) > 1:
+            lines.append(f"\n<code>CPU {sparkline(history['cpu_percent'])}</code>")
+            lines.append(f"<code>RAM {sparkline(history['memory_percent'])}</code>")
+
         # Show alerts
         if info.get("alerts"):
             lines.append("\n⚠️ <b>Предупреждения:</b>")
@@ -547,7 +561,7 @@ class CommandHandlers:
 
         # Get directory content and tree view
         content = await self.file_browser_service.list_directory(target_path)
-        tree_view = await self.file_browser_service.get_tree_view(target_path)
+        tree_view = self.file_browser_service.render_tree_view(content)
 
         # Send with HTML formatting
         await message.answer(
@@ -633,12 +647,71 @@ class CommandHandlers:
         await message.answer("🔍 Запуск диагностики... (может занять до 30 секунд)")
 
         try:
-            results = await run_diagnostics(self.claude_proxy.claude_path)
+            # Explicit request: always re-run the live prompt and refresh the cache
+            results = await run_cached_diagnostics(self.claude_proxy.claude_path, force_prompt=True)
             text = format_diagnostics_for_telegram(results)
             await message.answer(text, parse_mode=None)
         except Exception as e:
             await message.answer(f"❌ Diagnostics failed: {e}")
 
+    async def search(self, message: Message, command: CommandObject) -> None:
+        """Handle /search <query> - full-text search over conversation history"""
+        query = (command.args or "").strip()
+        if not query:
+            await message.answer(
+                "🔎 <b>Поиск по истории</b>\n\n"
+                "Использование: <code>/search текст запроса</code>",
+                parse_mode="HTML"
+            )
+            return
+        if not self.context_service:
+            await message.answer("⚠️ Сервис контекстов не инициализирован")
+            return
+
+        self._search_queries[message.from_user.id] = query
+        text, keyboard = await self._render_search_page(message.from_user.id, query, 0)
+        await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
+
+    async def search_page(self, callback: types.CallbackQuery) -> None:
+        """Handle search:page:<offset> - show another page of /search results"""
+        query = self._search_queries.get(callback.from_user.id)
+        if not query or not self.context_service:
+            await callback.answer("Поиск устарел, повторите /search")
+            return
+
+        offset = int(callback.data.split(":")[2])
+        text, keyboard = await self._render_search_page(callback.from_user.id, query, offset)
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
+        await callback.answer()
+
+    async def _render_search_page(self, user_id: int, query: str, offset: int):
+        """Build text and keyboard for one page of search results"""
+        from domain.value_objects.user_id import UserId
+
+        page = await self.context_service.search_messages(
+            UserId.from_int(user_id), query, limit=SEARCH_PAGE_SIZE, offset=offset
+        )
+        header = f"🔎 <b>{html.escape(query)}</b>"
+        if not page.hits:
+            return f"{header}\n\nНичего не найдено.", None
+
+        lines = [header, ""]
+        for number, hit in enumerate(page.hits, start=offset + 1):
+            role = "👤" if hit.role == "user" else "🤖"
+            where = f"💬 {html.escape(hit.context_name)}" if hit.context_name else "📝 сессия"
+            # Escape first, then turn FTS match markers into bold
+            snippet = (
+                html.escape(hit.snippet.replace("\n", " "))
+                .replace(HIGHLIGHT_START, "<b>")
+                .replace(HIGHLIGHT_END, "</b>")
+            )
+            lines.append(f"{number}. {role} {where} · {hit.timestamp:%d.%m.%Y %H:%M}")
+            lines.append(f"<i>{snippet}</i>")
+            lines.append("")
+
+        keyboard = Keyboards.search_pagination(offset, SEARCH_PAGE_SIZE, page.next_offset)
+        return "\n".join(lines).rstrip(), keyboard
+
     async def claude_command_passthrough(self, message: Message, command: CommandObject) -> None:
         """
         Handle Claude Code slash commands by passing them to SDK/CLI.
@@ -937,6 +1010,10 @@ def register_handlers(router: Router, handlers: CommandHandlers) -> None:
     # Test command for AskUserQuestion keyboard
     router.message.register(handlers.test_question, Command("test_question"))
 
+    # Full-text search over conversation history
+    router.message.register(handlers.search, Command("search"))
+    router.callback_query.register(handlers.search_page, F.data.startswith("search:page:"))
+
     # Claude Code plugin commands passthrough
     # These are forwarded to Claude Code SDK/CLI instead of being handled by bot
     for cmd in CLAUDE_SLASH_COMMANDS:
@@ -14,6 +14,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
+from infrastructure.monitoring.sampler import sparkline
 from presentation.keyboards.keyboards import Keyboards
 
 logger = logging.getLogger(__name__)
@@ -397,7 +398,7 @@ class MenuHandlers:
             current_dir = self.file_browser_service.ROOT_PATH
 
         content = await self.file_browser_service.list_directory(current_dir)
-        tree_view = await self.file_browser_service.get_tree_view(current_dir)
+        tree_view = self.file_browser_service.render_tree_view(content)
 
         await callback.message.edit_text(
             tree_view,
@@ -1006,6 +1007,12 @@ class MenuHandlers:
         if metrics.get('load_average', [0])[0] > 0:
             lines.append(f"📈 <b>Нагрузка:</b> {metrics['load_average'][0]:.2f}")
 
+        # Графики по кольцевому буферу сэмплера
+        history = info.get("history") or {}
+        if len(history.get("cpu_percent", [])) > 1:
+            lines.append(f"\n<code>CPU {sparkline(history['cpu_percent'])}</code>")
+            lines.append(f"<code>RAM {sparkline(history['memory_percent'])}</code>")
+
         if info.get("alerts"):
             lines.append("\n⚠️ <b>Предупреждения:</b>")
             lines.extend(info["alerts"])
@@ -1107,8 +1114,8 @@ class MenuHandlers:
         await callback.answer("Запускаю диагностику...")
 
         try:
-            from infrastructure.claude_code.diagnostics import run_diagnostics, format_diagnostics_for_telegram
-            results = await run_diagnostics(self.claude_proxy.claude_path)
+            from infrastructure.claude_code.diagnostics import run_cached_diagnostics, format_diagnostics_for_telegram
+            results = await run_cached_diagnostics(self.claude_proxy.claude_path, force_prompt=True)
             text = format_diagnostics_for_telegram(results)
 
             # Truncate if too long
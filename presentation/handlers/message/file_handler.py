@@ -1,7 +1,7 @@
 """File and photo message handler"""
 
+import asyncio
 import logging
-from io import BytesIO
 from typing import TYPE_CHECKING, Optional, List
 
 from aiogram.types import Message
@@ -24,6 +24,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Total timeout for downloading one file from Telegram (up to 20 MB)
+DOWNLOAD_TIMEOUT = 120
+
 
 class FileMessageHandler(BaseMessageHandler):
     """Handles file and photo message processing"""
@@ -95,20 +98,17 @@ class FileMessageHandler(BaseMessageHandler):
             await message.answer(f"{error}")
             return
 
-        # Download file
+        # Download to a temp file and process it from disk
+        working_dir = await self.get_project_working_dir(user_id)
         try:
-            file = await bot.get_file(file_id)
-            file_content = await bot.download_file(file.file_path)
+            processed = await self._download_and_process(
+                bot, file_id, filename, mime_type, working_dir
+            )
         except Exception as e:
             logger.error(f"Error downloading {file_type_label.lower()}: {e}")
             await message.answer(f"Ошибка скачивания: {e}")
             return
 
-        # Process file
-        processed = await self.file_processor_service.process_file(
-            file_content, filename, mime_type
-        )
-
         if processed.error:
             await message.answer(f"Ошибка обработки: {processed.error}")
             return
@@ -120,6 +120,33 @@ class FileMessageHandler(BaseMessageHandler):
         else:
             await self._cache_file_for_reply(message, processed, file_type_label, user_id)
 
+    async def _download_and_process(
+        self,
+        bot: Bot,
+        file_id: str,
+        filename: str,
+        mime_type: Optional[str],
+        working_dir: str
+    ) -> "ProcessedFile":
+        """
+        Download a Telegram file to a temp file and process it.
+
+        The file is streamed to disk in chunks, never held in memory whole.
+        Only images are kept, in working_dir's .uploads.
+        Download errors are raised; processing errors are in ProcessedFile.error.
+        """
+        upload_path = await asyncio.to_thread(self.file_processor_service.create_upload_path)
+        try:
+            file = await bot.get_file(file_id)
+            await bot.download_file(file.file_path, destination=upload_path, timeout=DOWNLOAD_TIMEOUT)
+        except Exception:
+            self.file_processor_service.discard_upload(upload_path)
+            raise
+
+        return await self.file_processor_service.process_upload(
+            upload_path, filename, mime_type, working_dir
+        )
+
     async def _process_file_with_caption(
         self,
         message: Message,
@@ -211,10 +238,9 @@ class FileMessageHandler(BaseMessageHandler):
                 return None
 
             try:
-                file = await bot.get_file(doc.file_id)
-                file_content = await bot.download_file(file.file_path)
-                processed = await self.file_processor_service.process_file(
-                    file_content, filename, doc.mime_type
+                working_dir = await self.get_project_working_dir(reply_message.from_user.id)
+                processed = await self._download_and_process(
+                    bot, doc.file_id, filename, doc.mime_type, working_dir
                 )
                 if processed.is_valid:
                     return (processed, reply_message.caption or "")
@@ -229,10 +255,9 @@ class FileMessageHandler(BaseMessageHandler):
                 return None
 
             try:
-                file = await bot.get_file(photo.file_id)
-                file_content = await bot.download_file(file.file_path)
-                processed = await self.file_processor_service.process_file(
-                    file_content, f"image_{photo.file_unique_id}.jpg", "image/jpeg"
+                working_dir = await self.get_project_working_dir(reply_message.from_user.id)
+                processed = await self._download_and_process(
+                    bot, photo.file_id, f"image_{photo.file_unique_id}.jpg", "image/jpeg", working_dir
                 )
                 if processed.is_valid:
                     return (processed, reply_message.caption or "")
@@ -355,12 +380,15 @@ class FileMessageHandler(BaseMessageHandler):
             await first_message.answer("⚠️ Обработка файлов недоступна")
             return
 
+        # Get working directory (images are kept in its .uploads)
+        working_dir = await self.get_project_working_dir(user_id)
+
         # Process all files in the group
         processed_files: List["ProcessedFile"] = []
 
         for msg in messages:
             try:
-                processed = await self._process_message_file(msg, bot)
+                processed = await self._process_message_file(msg, bot, working_dir)
                 if processed and processed.is_valid:
                     processed_files.append(processed)
             except Exception as e:
@@ -375,9 +403,6 @@ class FileMessageHandler(BaseMessageHandler):
             f"caption: {bool(caption)}"
         )
 
-        # Get working directory
-        working_dir = await self.get_project_working_dir(user_id)
-
         if caption:
             # Album WITH caption - execute task immediately
             await self._process_media_group_with_caption(
@@ -390,7 +415,7 @@ class FileMessageHandler(BaseMessageHandler):
             )
 
     async def _process_message_file(
-        self, message: Message, bot: Bot
+        self, message: Message, bot: Bot, working_dir: str
     ) -> Optional["ProcessedFile"]:
         """Extract and process file from a single message"""
         if message.document:
@@ -407,15 +432,7 @@ class FileMessageHandler(BaseMessageHandler):
             return None
 
         try:
-            file = await bot.get_file(file_id)
-            file_content = BytesIO()
-            await bot.download_file(file.file_path, file_content)
-            file_content.seek(0)
-
-            processed = await self.file_processor_service.process_file(
-                file_content, filename, mime_type
-            )
-            return processed
+            return await self._download_and_process(bot, file_id, filename, mime_type, working_dir)
 
         except Exception as e:
             logger.error(f"Error downloading file {filename}: {e}")
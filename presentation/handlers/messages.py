@@ -25,6 +25,7 @@ from aiogram.types import Message
 from aiogram.filters import StateFilter
 
 from presentation.keyboards.keyboards import Keyboards
+from presentation.middleware.send_scheduler import SendPriority, send_priority
 from presentation.handlers.streaming import StreamingHandler, HeartbeatTracker, StepStreamingHandler
 from presentation.handlers.state import (
     UserStateManager,
@@ -1041,11 +1042,12 @@ class MessageHandlers:
             # Escape HTML entities to prevent parse errors (e.g., <<'EOF' -> &lt;&lt;'EOF')
             text += f"<b>Детали:</b>\n<pre>{html.escape(display_details)}</pre>"
 
-        await message.answer(
-            text,
-            parse_mode="HTML",
-            reply_markup=Keyboards.claude_permission(user_id, tool_name, request_id)
-        )
+        with send_priority(SendPriority.HITL_PROMPT):
+            await message.answer(
+                text,
+                parse_mode="HTML",
+                reply_markup=Keyboards.claude_permission(user_id, tool_name, request_id)
+            )
 
         event = self._hitl.get_permission_event(user_id)
         if event:
@@ -1181,11 +1183,12 @@ class MessageHandlers:
             # Escape HTML entities to prevent parse errors (e.g., <<'EOF' -> &lt;&lt;'EOF')
             text += f"<b>Детали:</b>\n<pre>{html.escape(display_details)}</pre>"
 
-        perm_msg = await message.answer(
-            text,
-            parse_mode="HTML",
-            reply_markup=Keyboards.claude_permission(user_id, tool_name, request_id)
-        )
+        with send_priority(SendPriority.HITL_PROMPT):
+            perm_msg = await message.answer(
+                text,
+                parse_mode="HTML",
+                reply_markup=Keyboards.claude_permission(user_id, tool_name, request_id)
+            )
         self._hitl.set_permission_context(user_id, request_id, tool_name, details, perm_msg)
 
     async def _on_question_sdk(
@@ -1206,17 +1209,18 @@ class MessageHandlers:
 
         text = f"<b>Вопрос</b>\n\n{html.escape(question)}"
 
-        if options:
-            q_msg = await message.answer(
-                text,
-                parse_mode="HTML",
-                reply_markup=Keyboards.claude_question(user_id, options, request_id)
-            )
-            self._hitl.set_question_context(user_id, request_id, question, options, q_msg)
-        else:
-            self._hitl.set_expecting_answer(user_id, True)
-            q_msg = await message.answer(f"<b>Вопрос</b>\n\n{html.escape(question)}\n\nВведите ваш ответ:", parse_mode="HTML")
-            self._hitl.set_question_context(user_id, request_id, question, options, q_msg)
+        with send_priority(SendPriority.HITL_PROMPT):
+            if options:
+                q_msg = await message.answer(
+                    text,
+                    parse_mode="HTML",
+                    reply_markup=Keyboards.claude_question(user_id, options, request_id)
+                )
+                self._hitl.set_question_context(user_id, request_id, question, options, q_msg)
+            else:
+                self._hitl.set_expecting_answer(user_id, True)
+                q_msg = await message.answer(f"<b>Вопрос</b>\n\n{html.escape(question)}\n\nВведите ваш ответ:", parse_mode="HTML")
+                self._hitl.set_question_context(user_id, request_id, question, options, q_msg)
 
     async def _on_plan_request(
         self,
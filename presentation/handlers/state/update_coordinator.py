@@ -4,20 +4,36 @@ Message Update Coordinator
 Централизованная точка для ВСЕХ обновлений сообщений Telegram.
 Предотвращает rate limiting путём:
 1. Единой очереди обновлений на сообщение
-2. Строгого интервала 2 секунды между обновлениями
+2. Адаптивного интервала между обновлениями (по чату, AIMD по 429)
 3. Объединения множественных запросов в один
+
+Состояния сообщений вытесняются автоматически (TTL + LRU), так что
+вызывать cleanup() не обязательно.
 """
 
 import asyncio
+import hashlib
 import logging
+import sys
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Callable, Awaitable, Any
+from typing import Optional, Dict, Callable, Awaitable, Any, TYPE_CHECKING
 
 from aiogram import Bot
 from aiogram.types import Message, InlineKeyboardMarkup
 from aiogram.exceptions import TelegramRetryAfter, TelegramBadRequest
 
+from presentation.middleware.send_scheduler import (
+    SendDropped,
+    SendPriority,
+    current_send_priority,
+    send_priority,
+)
+
+if TYPE_CHECKING:
+    from presentation.middleware.send_scheduler import TelegramSendScheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +45,12 @@ class PendingUpdate:
     reply_markup: Optional[InlineKeyboardMarkup] = None
     priority: int = 0  # Выше = важнее (final updates имеют высший приоритет)
     is_final: bool = False  # Финальное обновление - игнорировать последующие
+    send_priority: SendPriority = SendPriority.PROGRESS  # Класс в планировщике отправки
+
+
+def _text_digest(text: str) -> bytes:
+    """Отпечаток текста для проверки "не изменился" без хранения строки."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
 
 @dataclass
@@ -36,10 +58,75 @@ class MessageState:
     """Состояние одного сообщения."""
     message: Message
     last_update_time: float = 0.0
-    last_sent_text: str = ""
+    # Вместо последнего отправленного текста храним его хеш и размер
+    last_sent_digest: bytes = b""
+    last_sent_bytes: int = 0
     pending_update: Optional[PendingUpdate] = None
     update_task: Optional[asyncio.Task] = None
     is_finalized: bool = False
+    last_access: float = field(default_factory=time.monotonic)  # Для TTL/LRU
+
+    def mark_sent(self, text: str) -> None:
+        """Запомнить отправленный текст (только хеш и размер)."""
+        self.last_update_time = time.time()
+        self.last_sent_digest = _text_digest(text)
+        self.last_sent_bytes = len(text.encode("utf-8"))
+
+    def is_last_sent(self, text: str) -> bool:
+        """Совпадает ли text с последним отправленным."""
+        return bool(self.last_sent_digest) and _text_digest(text) == self.last_sent_digest
+
+    def cancel_task(self) -> None:
+        """Отменить отложенное обновление, если оно ещё не выполнено."""
+        if self.update_task and not self.update_task.done():
+            self.update_task.cancel()
+        self.update_task = None
+
+    def has_pending_work(self) -> bool:
+        """Есть ли неотправленное или выполняющееся обновление."""
+        return self.pending_update is not None or (
+            self.update_task is not None and not self.update_task.done()
+        )
+
+    def retained_bytes(self) -> int:
+        """Приблизительный объём памяти, удерживаемый состоянием."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.last_sent_digest)
+        if self.pending_update is not None:
+            size += sys.getsizeof(self.pending_update.text)
+        return size
+
+
+@dataclass
+class ChatCadence:
+    """
+    Адаптивный интервал обновлений одного чата (AIMD).
+
+    Каждый успешный edit уменьшает интервал на фиксированный шаг,
+    каждый 429 умножает его - как окно TCP, только наоборот.
+    """
+    interval: float
+    min_interval: float
+    max_interval: float
+    successes: int = 0
+    rate_limited: int = 0
+    last_retry_after: float = 0.0
+
+    def on_success(self, step: float) -> None:
+        self.successes += 1
+        self.interval = max(self.min_interval, self.interval - step)
+
+    def on_rate_limited(self, retry_after: float, factor: float) -> None:
+        self.rate_limited += 1
+        self.last_retry_after = retry_after
+        self.interval = min(self.max_interval, self.interval * factor)
+
+    def to_dict(self) -> dict:
+        return {
+            "interval": round(self.interval, 2),
+            "successes": self.successes,
+            "rate_limited": self.rate_limited,
+            "last_retry_after": self.last_retry_after,
+        }
 
 
 class MessageUpdateCoordinator:
@@ -49,7 +136,8 @@ class MessageUpdateCoordinator:
     ВАЖНО: Все обновления сообщений ДОЛЖНЫ проходить через этот класс!
 
     Гарантии:
-    - Минимум 2 секунды между обновлениями одного сообщения
+    - Интервал между обновлениями одного сообщения адаптируется по чату:
+      сокращается пока edit проходят, растёт после 429 (AIMD)
     - Множественные запросы объединяются (последний побеждает)
     - Rate limit обрабатывается gracefully
     - Финальные обновления имеют приоритет
@@ -57,30 +145,182 @@ class MessageUpdateCoordinator:
     Использование:
         coordinator = MessageUpdateCoordinator(bot)
 
-        # Обычное обновление (будет отложено если <2с с прошлого)
+        # Обычное обновление (будет отложено если интервал чата не прошёл)
         await coordinator.update(message, "новый текст")
 
         # Финальное обновление (гарантированно выполнится)
         await coordinator.update(message, "финал", is_final=True)
     """
 
-    # Строгий минимальный интервал между обновлениями
-    MIN_UPDATE_INTERVAL = 2.0  # секунды
+    # Границы адаптивного интервала между обновлениями (секунды)
+    MIN_UPDATE_INTERVAL = 1.0
+    DEFAULT_UPDATE_INTERVAL = 2.0  # Стартовый интервал нового чата
+    MAX_UPDATE_INTERVAL = 10.0
+
+    # AIMD: шаг уменьшения после успеха, множитель после 429
+    INTERVAL_DECREASE_STEP = 0.1
+    INTERVAL_BACKOFF_FACTOR = 2.0
+
+    # Большие сообщения дороже для Telegram - не обновляем их чаще этого
+    LARGE_TEXT_BYTES = 2500  # >2.5KB → не чаще 2.5s
+    VERY_LARGE_TEXT_BYTES = 3500  # >3.5KB → не чаще 3.0s
 
     # Максимальное время ожидания rate limit
     MAX_RATE_LIMIT_WAIT = 10.0  # секунды
 
-    def __init__(self, bot: Bot):
+    # Вытеснение состояний сообщений
+    FINALIZED_STATE_TTL = 60.0  # Финализированное: больше не обновляется
+    IDLE_STATE_TTL = 30 * 60.0  # Не трогали 30 минут - стрим давно закончился
+    MAX_MESSAGE_STATES = 1000  # LRU: выше - вытесняем самые старые
+    EVICTION_SWEEP_INTERVAL = 30.0  # Как часто проверять TTL
+
+    def __init__(
+        self,
+        bot: Bot,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        initial_interval: Optional[float] = None,
+        finalized_ttl: Optional[float] = None,
+        idle_ttl: Optional[float] = None,
+        max_states: Optional[int] = None,
+    ):
         self.bot = bot
-        self._messages: Dict[int, MessageState] = {}  # message_id -> state
+        # message_id -> state, в порядке последнего обращения (LRU)
+        self._messages: "OrderedDict[int, MessageState]" = OrderedDict()
         self._global_lock = asyncio.Lock()
 
+        self.finalized_ttl = finalized_ttl or self.FINALIZED_STATE_TTL
+        self.idle_ttl = idle_ttl or self.IDLE_STATE_TTL
+        self.max_states = max_states or self.MAX_MESSAGE_STATES
+        self._last_sweep = time.monotonic()
+        self._evicted_ttl = 0
+        self._evicted_lru = 0
+
+        # 0 - допустимая нижняя граница, поэтому None, а не "or"
+        self.min_interval = self.MIN_UPDATE_INTERVAL if min_interval is None else min_interval
+        self.max_interval = max(
+            self.min_interval,
+            self.MAX_UPDATE_INTERVAL if max_interval is None else max_interval,
+        )
+        if initial_interval is None:
+            initial_interval = self.DEFAULT_UPDATE_INTERVAL
+        self.initial_interval = min(self.max_interval, max(self.min_interval, initial_interval))
+        self._cadence: Dict[int, ChatCadence] = {}  # chat_id -> cadence
+        # 429 приходят от планировщика отправки, а не из edit_text
+        self._external_rate_limit_feed = False
+
+    def _get_cadence(self, chat_id: int) -> ChatCadence:
+        """Получить или создать адаптивный интервал чата."""
+        cadence = self._cadence.get(chat_id)
+        if cadence is None:
+            cadence = ChatCadence(
+                interval=self.initial_interval,
+                min_interval=self.min_interval,
+                max_interval=self.max_interval,
+            )
+            self._cadence[chat_id] = cadence
+        return cadence
+
+    def _update_interval(self, state: MessageState, text: str) -> float:
+        """Интервал для сообщения: адаптивный интервал чата с учётом размера."""
+        return self._interval_for_size(state, len(text.encode("utf-8")))
+
+    def _interval_for_size(self, state: MessageState, size: int) -> float:
+        interval = self._get_cadence(state.message.chat.id).interval
+        if size > self.VERY_LARGE_TEXT_BYTES:
+            interval = max(interval, 3.0)
+        elif size > self.LARGE_TEXT_BYTES:
+            interval = max(interval, 2.5)
+        return interval
+
+    def on_rate_limited(self, chat_id: int, retry_after: float) -> None:
+        """Учесть 429 в чате: интервал обновлений растёт мультипликативно."""
+        cadence = self._get_cadence(chat_id)
+        cadence.on_rate_limited(retry_after, self.INTERVAL_BACKOFF_FACTOR)
+        logger.info(
+            f"Chat {chat_id}: rate limited ({retry_after}s), "
+            f"update interval -> {cadence.interval:.2f}s"
+        )
+
+    def attach_rate_limit_feed(self, scheduler: "TelegramSendScheduler") -> None:
+        """Получать 429 от планировщика отправки (он повторяет запросы сам)."""
+        scheduler.add_retry_after_listener(self.on_rate_limited)
+        self._external_rate_limit_feed = True
+
+    def get_chat_cadence(self, chat_id: int) -> dict:
+        """Текущий интервал и счётчики 429 чата."""
+        return self._get_cadence(chat_id).to_dict()
+
+    def get_cadence_stats(self) -> Dict[int, dict]:
+        """Интервалы и счётчики 429 всех известных чатов."""
+        return {chat_id: c.to_dict() for chat_id, c in self._cadence.items()}
+
     def _get_state(self, message: Message) -> MessageState:
         """Получить или создать состояние сообщения."""
         msg_id = message.message_id
-        if msg_id not in self._messages:
-            self._messages[msg_id] = MessageState(message=message)
-        return self._messages[msg_id]
+        now = time.monotonic()
+        state = self._messages.get(msg_id)
+        if state is None:
+            state = MessageState(message=message, last_access=now)
+            self._messages[msg_id] = state
+            self._evict(now, keep=msg_id)
+        else:
+            state.last_access = now
+            self._messages.move_to_end(msg_id)
+        return state
+
+    def _evict(self, now: float, keep: Optional[int] = None) -> None:
+        """
+        Вытеснить устаревшие состояния.
+
+        TTL проверяется не чаще EVICTION_SWEEP_INTERVAL; LRU-лимит -
+        при каждом добавлении. Отложенные задачи вытесненных
+        состояний отменяются, чтобы не держать сообщения в памяти.
+        По LRU вытесняются только состояния без неотправленных
+        обновлений, иначе потерялась бы финальная правка стрима.
+        """
+        if now - self._last_sweep >= self.EVICTION_SWEEP_INTERVAL:
+            self._last_sweep = now
+            expired = [
+                msg_id for msg_id, state in self._messages.items()
+                if msg_id != keep and self._is_expired(state, now)
+            ]
+            for msg_id in expired:
+                self._messages.pop(msg_id).cancel_task()
+            self._evicted_ttl += len(expired)
+            if expired:
+                logger.debug(f"Coordinator: evicted {len(expired)} expired message states")
+
+        excess = len(self._messages) - self.max_states
+        if excess > 0:
+            idle = [
+                msg_id for msg_id, state in self._messages.items()
+                if msg_id != keep and not state.has_pending_work()
+            ]
+            for msg_id in idle[:excess]:
+                self._messages.pop(msg_id).cancel_task()
+                self._evicted_lru += 1
+                logger.debug(f"Message {msg_id}: evicted from coordinator (LRU)")
+
+    def _is_expired(self, state: MessageState, now: float) -> bool:
+        idle = now - state.last_access
+        if state.is_finalized and state.pending_update is None:
+            return idle >= self.finalized_ttl
+        return idle >= self.idle_ttl
+
+    def get_state_stats(self) -> dict:
+        """Сколько состояний сообщений живо и сколько памяти они удерживают."""
+        states = list(self._messages.values())
+        return {
+            "live_states": len(states),
+            "finalized": sum(1 for s in states if s.is_finalized),
+            "scheduled_tasks": sum(
+                1 for s in states if s.update_task and not s.update_task.done()
+            ),
+            "retained_bytes": sum(s.retained_bytes() for s in states),
+            "evicted_ttl": self._evicted_ttl,
+            "evicted_lru": self._evicted_lru,
+        }
 
     async def update(
         self,
@@ -110,7 +350,7 @@ class MessageUpdateCoordinator:
         # Логируем входящий вызов
         logger.info(
             f"Coordinator.update: msg={message.message_id}, text={len(text)}ch, "
-            f"is_final={is_final}, last_sent={len(state.last_sent_text)}ch"
+            f"is_final={is_final}, last_sent={state.last_sent_bytes}b"
         )
 
         # Игнорируем обновления для финализированных сообщений
@@ -119,17 +359,23 @@ class MessageUpdateCoordinator:
             return False
 
         # Если текст не изменился - пропускаем
-        if text == state.last_sent_text and not is_final:
+        if not is_final and state.is_last_sent(text):
             logger.debug(f"Message {message.message_id}: text unchanged ({len(text)}ch), skipping")
             return False
 
+        # Класс отправки: final, либо заданный вызывающим (heartbeat), либо progress
+        send_class = current_send_priority()
+        if is_final or send_class is None:
+            send_class = SendPriority.FINAL if is_final else SendPriority.PROGRESS
+
         # Создаём pending update
         pending = PendingUpdate(
             text=text,
             parse_mode=parse_mode,
             reply_markup=reply_markup,
             priority=priority if not is_final else 100,
-            is_final=is_final
+            is_final=is_final,
+            send_priority=send_class
         )
 
         # Если есть pending с меньшим приоритетом - заменяем
@@ -141,13 +387,15 @@ class MessageUpdateCoordinator:
         now = time.time()
         time_since_update = now - state.last_update_time
 
-        if time_since_update >= self.MIN_UPDATE_INTERVAL or is_final:
+        interval = self._update_interval(state, text)
+
+        if time_since_update >= interval or is_final:
             # Можно обновить сейчас
             logger.info(f"Message {message.message_id}: executing update NOW (elapsed={time_since_update:.1f}s)")
             return await self._execute_update(state)
         else:
             # Планируем отложенное обновление
-            delay = self.MIN_UPDATE_INTERVAL - time_since_update
+            delay = interval - time_since_update
             logger.info(f"Message {message.message_id}: scheduling update in {delay:.1f}s")
             await self._schedule_update(state, delay)
             return True
@@ -194,18 +442,23 @@ class MessageUpdateCoordinator:
         )
 
         try:
-            await state.message.edit_text(
-                pending.text,
-                parse_mode=pending.parse_mode,
-                reply_markup=pending.reply_markup
-            )
-            state.last_update_time = time.time()
-            state.last_sent_text = pending.text
+            # Приоритет берётся из pending, а не из контекста отложенной задачи:
+            # heartbeat, заменённый контентом, уходит как progress edit
+            with send_priority(pending.send_priority):
+                await state.message.edit_text(
+                    pending.text,
+                    parse_mode=pending.parse_mode,
+                    reply_markup=pending.reply_markup
+                )
+            state.mark_sent(pending.text)
+            self._get_cadence(state.message.chat.id).on_success(self.INTERVAL_DECREASE_STEP)
             logger.info(f">>> TELEGRAM EDIT SUCCESS: msg={state.message.message_id}, {len(pending.text)}ch")
             return True
 
         except TelegramRetryAfter as e:
             # Rate limited
+            if not self._external_rate_limit_feed:
+                self.on_rate_limited(state.message.chat.id, e.retry_after)
             if e.retry_after > self.MAX_RATE_LIMIT_WAIT:
                 logger.warning(
                     f"Message {state.message.message_id}: rate limited for {e.retry_after}s, "
@@ -224,11 +477,15 @@ class MessageUpdateCoordinator:
             state.pending_update = pending  # Восстанавливаем
             return await self._execute_update(state)
 
+        except SendDropped:
+            # Устаревший heartbeat не отправлен - текст не считаем доставленным
+            logger.debug(f"Message {state.message.message_id}: stale heartbeat dropped")
+            return False
+
         except TelegramBadRequest as e:
             if "message is not modified" in str(e).lower():
                 # Контент не изменился - это нормально
-                state.last_update_time = time.time()
-                state.last_sent_text = pending.text
+                state.mark_sent(pending.text)
                 return True
             elif "message to edit not found" in str(e).lower():
                 # Сообщение удалено
@@ -246,8 +503,7 @@ class MessageUpdateCoordinator:
                         parse_mode=None,
                         reply_markup=pending.reply_markup
                     )
-                    state.last_update_time = time.time()
-                    state.last_sent_text = plain_text
+                    state.mark_sent(plain_text)
                     return True
                 except Exception:
                     return False
@@ -277,8 +533,7 @@ class MessageUpdateCoordinator:
             )
             # Регистрируем в координаторе
             state = self._get_state(message)
-            state.last_update_time = time.time()
-            state.last_sent_text = text
+            state.mark_sent(text)
             return message
 
         except TelegramRetryAfter as e:
@@ -302,8 +557,7 @@ class MessageUpdateCoordinator:
                     reply_markup=reply_markup
                 )
                 state = self._get_state(message)
-                state.last_update_time = time.time()
-                state.last_sent_text = plain_text
+                state.mark_sent(plain_text)
                 return message
             except Exception:
                 return None
@@ -321,7 +575,8 @@ class MessageUpdateCoordinator:
         """
         state = self._get_state(message)
         elapsed = time.time() - state.last_update_time
-        remaining = max(0, self.MIN_UPDATE_INTERVAL - elapsed)
+        interval = self._interval_for_size(state, state.last_sent_bytes)
+        remaining = max(0, interval - elapsed)
         return remaining
 
     def is_finalized(self, message: Message) -> bool:
@@ -333,8 +588,8 @@ class MessageUpdateCoordinator:
         """Очистить состояние сообщения."""
         msg_id = message.message_id
         state = self._messages.pop(msg_id, None)
-        if state and state.update_task:
-            state.update_task.cancel()
+        if state:
+            state.cancel_task()
         logger.debug(f"Message {msg_id}: cleaned up")
 
     def cleanup_chat(self, chat_id: int) -> None:
@@ -345,8 +600,8 @@ class MessageUpdateCoordinator:
         ]
         for msg_id in to_remove:
             state = self._messages.pop(msg_id, None)
-            if state and state.update_task:
-                state.update_task.cancel()
+            if state:
+                state.cancel_task()
         logger.debug(f"Chat {chat_id}: cleaned up {len(to_remove)} messages")
 
 
@@ -359,9 +614,9 @@ def get_coordinator() -> Optional[MessageUpdateCoordinator]:
     return _coordinator
 
 
-def init_coordinator(bot: Bot) -> MessageUpdateCoordinator:
+def init_coordinator(bot: Bot, **kwargs: Any) -> MessageUpdateCoordinator:
     """Инициализировать глобальный координатор."""
     global _coordinator
-    _coordinator = MessageUpdateCoordinator(bot)
+    _coordinator = MessageUpdateCoordinator(bot, **kwargs)
     logger.info("MessageUpdateCoordinator initialized")
     return _coordinator
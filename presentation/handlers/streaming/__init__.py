@@ -11,6 +11,7 @@ Main components:
 - StreamingHandler: Main streaming controller
 - StepStreamingHandler: Step-by-step tool status display
 - HeartbeatTracker: Periodic status updates with animation
+- HeartbeatTicker: Shared timer driving all heartbeats
 - FileChangeTracker: Track file modifications for summary
 """
 
@@ -30,6 +31,8 @@ from presentation.handlers.streaming.formatting import (
 from presentation.handlers.streaming.trackers import (
     ProgressTracker,
     HeartbeatTracker,
+    HeartbeatTicker,
+    get_heartbeat_ticker,
     FileChange,
     FileChangeTracker,
 )
@@ -52,6 +55,8 @@ __all__ = [
     # Trackers
     "ProgressTracker",
     "HeartbeatTracker",
+    "HeartbeatTicker",
+    "get_heartbeat_ticker",
     "FileChange",
     "FileChangeTracker",
 ]
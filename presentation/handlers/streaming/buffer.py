@@ -0,0 +1,182 @@
+"""
+Chunked text buffer for streaming output.
+
+`self.buffer += text` copies the whole buffer on every SDK text delta,
+which turns long, tool-heavy sessions into O(n²) allocation churn on the
+event loop. StreamBuffer keeps the text as a list of chunks instead:
+- append is O(1) amortised (small chunks are sealed into ~4KB blocks)
+- tail / slice_from only materialise the requested suffix
+- replace_last rewrites only the blocks after the match
+- the full string is built on demand and cached until the next change
+"""
+
+from bisect import bisect_right
+from typing import List, Optional
+
+
+class StreamBuffer:
+    """
+    Append-optimised text buffer.
+
+    Usage:
+        buf = StreamBuffer("🤖 Запускаю...\\n")
+        buf.append("delta")
+        buf.tail(4000)          # last 4000 chars, without joining everything
+        buf.replace_last("⏳ Читаю", "✅ Прочитано")
+        str(buf)                # full text (cached)
+    """
+
+    # Open chunks are joined into one sealed block once they reach this size
+    BLOCK_SIZE = 4096
+
+    def __init__(self, text: str = ""):
+        self.version = 0  # Bumped on every change
+        self.set(text)
+
+    # === Mutation ===
+
+    def set(self, text: str) -> None:
+        """Replace the whole content."""
+        self._blocks: List[str] = []  # Sealed blocks, each >= BLOCK_SIZE
+        self._block_starts: List[int] = []  # Offset of each sealed block
+        self._sealed_length = 0
+        self._open: List[str] = []  # Recent small chunks
+        self._open_length = 0
+        self._changed()
+        if text:
+            self.append(text)
+
+    def clear(self) -> None:
+        """Remove all content."""
+        self.set("")
+
+    def append(self, text: str) -> None:
+        """Append text (O(1) amortised)."""
+        if not text:
+            return
+        self._open.append(text)
+        self._open_length += len(text)
+        if self._open_length >= self.BLOCK_SIZE:
+            self._seal()
+        self._changed()
+
+    def replace_last(self, old: str, new: str) -> bool:
+        """
+        Replace the last occurrence of old with new.
+
+        Only the blocks from the match to the end are rebuilt.
+
+        Returns:
+            True if old was found
+        """
+        idx = self.rfind(old)
+        if idx == -1:
+            return False
+        rest = self.slice_from(idx + len(old))
+        self._truncate(idx)
+        self.append(new + rest)
+        return True
+
+    # === Views ===
+
+    def __len__(self) -> int:
+        return self._sealed_length + self._open_length
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __str__(self) -> str:
+        return self.getvalue()
+
+    def getvalue(self) -> str:
+        """Full text (built once per change)."""
+        if self._text is None:
+            self._text = "".join(self._blocks) + "".join(self._open)
+        return self._text
+
+    def slice_from(self, offset: int) -> str:
+        """Text from offset to the end; cost is proportional to the result."""
+        offset = max(0, offset)
+        if offset >= len(self):
+            return ""
+        if self._text is not None:
+            return self._text[offset:]
+        if offset >= self._sealed_length:
+            return "".join(self._open)[offset - self._sealed_length:]
+        i = bisect_right(self._block_starts, offset) - 1
+        first = self._blocks[i][offset - self._block_starts[i]:]
+        return first + "".join(self._blocks[i + 1:]) + "".join(self._open)
+
+    def tail(self, max_chars: int) -> str:
+        """Last max_chars characters."""
+        return self.slice_from(len(self) - max_chars)
+
+    def head(self, max_chars: int) -> str:
+        """First max_chars characters."""
+        if self._text is not None:
+            return self._text[:max_chars]
+        parts = []
+        remaining = max_chars
+        for chunk in self._blocks + self._open:
+            if remaining <= 0:
+                break
+            parts.append(chunk[:remaining])
+            remaining -= len(chunk)
+        return "".join(parts)
+
+    def tail_start(self, max_chars: int, boundary: str = "\n\n") -> int:
+        """
+        Split point for a tail of at most max_chars characters.
+
+        Prefers to start right after a boundary (paragraph break) so the
+        tail doesn't begin mid-block; falls back to a hard cut.
+        """
+        start = max(0, len(self) - max_chars)
+        if start == 0:
+            return 0
+        tail = self.slice_from(start)
+        idx = tail.find(boundary)
+        if idx != -1:
+            return start + idx + len(boundary)
+        return start
+
+    def rfind(self, sub: str) -> int:
+        """Last index of sub; scans growing windows from the end."""
+        length = len(self)
+        window = max(self.BLOCK_SIZE, 2 * len(sub))
+        while True:
+            start = max(0, length - window)
+            idx = self.slice_from(start).rfind(sub)
+            if idx != -1:
+                return start + idx
+            if start == 0:
+                return -1
+            window *= 2
+
+    # === Internals ===
+
+    def _seal(self) -> None:
+        block = "".join(self._open)
+        self._block_starts.append(self._sealed_length)
+        self._blocks.append(block)
+        self._sealed_length += len(block)
+        self._open = []
+        self._open_length = 0
+
+    def _truncate(self, offset: int) -> None:
+        """Drop everything from offset to the end."""
+        if offset >= self._sealed_length:
+            kept = "".join(self._open)[:offset - self._sealed_length]
+        else:
+            i = bisect_right(self._block_starts, offset) - 1
+            kept = self._blocks[i][:offset - self._block_starts[i]]
+            self._sealed_length = self._block_starts[i]
+            del self._blocks[i:]
+            del self._block_starts[i:]
+        self._open = [kept] if kept else []
+        self._open_length = len(kept)
+        self._changed()
+
+    def _changed(self) -> None:
+        self._text: Optional[str] = None  # Cached full string
+        self.version += 1
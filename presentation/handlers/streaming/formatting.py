@@ -10,9 +10,55 @@ Handles real-time formatting of Claude Code output with:
 import html as html_module
 import logging
 import re
+from dataclasses import dataclass
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Placeholders are single Private Use Area characters (see get_placeholder)
+_PUA_RE = re.compile('[\ue000-\uf8ff]')
+_MAX_PLACEHOLDERS = 0xF8FF - 0xE000 + 1
+
+# Inline markdown rules, applied in order after HTML escaping:
+# (pattern, replacement, "may be partial" check on the stripped text end
+# while streaming, suffix that could still pair with text appended later)
+_INLINE_RULES = (
+    (
+        re.compile(r'\*\*([^*]+)\*\*'), r'<b>\1</b>',
+        lambda end: end.endswith('**'),
+        re.compile(r'\*\*[^*]*\Z'),
+    ),
+    (
+        re.compile(r'__([^_]+)__'), r'<u>\1</u>',
+        lambda end: end.endswith('__'),
+        re.compile(r'__[^_]*\Z'),
+    ),
+    (
+        re.compile(r'~~([^~]+)~~'), r'<s>\1</s>',
+        lambda end: end.endswith('~~'),
+        re.compile(r'~~[^~]*\Z'),
+    ),
+    (
+        re.compile(r'(?<!\*)\*([^*]+)\*(?!\*)'), r'<i>\1</i>',
+        lambda end: end.endswith('*') and not end.endswith('**'),
+        re.compile(r'(?<!\*)\*[^*]*\Z'),
+    ),
+)
+_NO_SKIP = (False,) * len(_INLINE_RULES)
+
+_OPEN_HTML_TAG_TAIL = re.compile(r'<(b|i|code|pre|s|u)>[^<]*\Z')
+
+
+@dataclass
+class _RenderedMarkdown:
+    """Result of one markdown_to_html pass plus what the incremental renderer needs."""
+    html: str
+    skip: tuple  # Which inline rules were skipped as possibly partial
+    placeholders: int
+    blank: bool  # Nothing but whitespace left before inline rules ran
+    blocks_closed: bool  # No code block / blockquote / tag can continue past the end
+    inline_closed: bool  # No inline marker can pair with text appended later
+
 
 def markdown_to_html(text: str, is_streaming: bool = False) -> str:
     """
@@ -48,6 +94,23 @@ def markdown_to_html(text: str, is_streaming: bool = False) -> str:
 
 def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
     """Internal implementation of markdown to HTML conversion."""
+    return _render_markdown(text, is_streaming).html
+
+
+def _render_markdown(
+    text: str,
+    is_streaming: bool = False,
+    skip: Optional[tuple] = None,
+) -> _RenderedMarkdown:
+    """
+    Convert markdown to HTML and report how the text ends.
+
+    Args:
+        text: Markdown text
+        is_streaming: Handle partial constructs at the end of the text
+        skip: Force which inline rules are skipped (default: decided from
+            the end of this text, as markdown_to_html does)
+    """
     # Placeholder system to protect code blocks from double-processing
     placeholders = []
 
@@ -61,6 +124,7 @@ def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
     # 1. Handle UNCLOSED code block (for streaming)
     code_fence_count = text.count('```')
     unclosed_code_placeholder = None
+    blocks_closed = code_fence_count % 2 == 0
 
     if code_fence_count % 2 != 0 and is_streaming:
         last_fence = text.rfind('```')
@@ -98,6 +162,7 @@ def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
         protect_code_block,
         text
     )
+    blocks_closed = blocks_closed and '```' not in text
 
     # 3. Protect inline code (but not partial backticks at end during streaming)
     def protect_inline_code(m: re.Match) -> str:
@@ -124,6 +189,7 @@ def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
 
     # First, handle closed blockquotes
     text = re.sub(r'<blockquote([^>]*)>(.*?)</blockquote>', protect_blockquote, text, flags=re.DOTALL)
+    blocks_closed = blocks_closed and '<blockquote' not in text
 
     # Handle UNCLOSED blockquote (for streaming) - similar to code blocks
     if is_streaming and '<blockquote' in text:
@@ -147,37 +213,26 @@ def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
 
     # Protect paired tags: <b>...</b>, <i>...</i>, <code>...</code>, <pre>...</pre>, <s>...</s>, <u>...</u>
     text = re.sub(r'<(b|i|code|pre|s|u)>([^<]*)</\1>', protect_html_tag, text)
+    blocks_closed = blocks_closed and not _OPEN_HTML_TAG_TAIL.search(text)
 
     # 4. Escape HTML ONLY in unprotected text (outside placeholders)
     text = html_module.escape(text)
 
     # 5. Markdown conversions (now safe - code blocks are protected)
-    # Use non-greedy matching and be careful with partial constructs
-
-    # Bold: **text** - but not if it's just ** at the end (streaming)
-    if is_streaming and text.rstrip().endswith('**'):
-        # Don't convert, might be partial
-        pass
-    else:
-        text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
-
-    # Underline: __text__
-    if is_streaming and text.rstrip().endswith('__'):
-        pass
-    else:
-        text = re.sub(r'__([^_]+)__', r'<u>\1</u>', text)
-
-    # Strikethrough: ~~text~~
-    if is_streaming and text.rstrip().endswith('~~'):
-        pass
-    else:
-        text = re.sub(r'~~([^~]+)~~', r'<s>\1</s>', text)
-
-    # Italic: *text* (but not ** which is bold)
-    if is_streaming and text.rstrip().endswith('*') and not text.rstrip().endswith('**'):
-        pass
-    else:
-        text = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<i>\1</i>', text)
+    # Use non-greedy matching and be careful with partial constructs:
+    # while streaming, a marker at the very end might be half of a pair
+    blank = not text.strip()
+    inline_closed = True
+    skipped = []
+    for i, (pattern, replacement, is_partial, open_tail) in enumerate(_INLINE_RULES):
+        if skip is not None:
+            skip_rule = skip[i]
+        else:
+            skip_rule = is_streaming and is_partial(text.rstrip())
+        skipped.append(skip_rule)
+        if not skip_rule:
+            text = pattern.sub(replacement, text)
+            inline_closed = inline_closed and not open_tail.search(text)
 
     # 6. Add unclosed block at the end
     if unclosed_code_placeholder:
@@ -187,7 +242,14 @@ def _markdown_to_html_impl(text: str, is_streaming: bool = False) -> str:
     for i, content in enumerate(placeholders):
         text = text.replace(get_placeholder(i), content, 1)
 
-    return text
+    return _RenderedMarkdown(
+        html=text,
+        skip=tuple(skipped),
+        placeholders=len(placeholders),
+        blank=blank,
+        blocks_closed=blocks_closed,
+        inline_closed=inline_closed,
+    )
 
 
 def get_open_html_tags(text: str) -> list[str]:
@@ -241,11 +303,121 @@ class StableHTMLFormatter:
     - Never return partial/broken HTML
 
     This completely eliminates flickering by only sending valid HTML.
+
+    render_markdown() is an incremental markdown_to_html(): the stable
+    prefix found by _find_stable_end() is rendered once and cached, and
+    each call only renders the tail appended after it. The output is
+    byte-identical to markdown_to_html(); whenever that cannot be
+    guaranteed (prefix changed, construct spans the split point, ...)
+    it falls back to a full render.
     """
 
+    # Try to move the stable prefix forward once the tail grows this much
+    PREFIX_ADVANCE_CHARS = 1024
+
     def __init__(self):
         self._last_sent_html = ""  # Last HTML we actually sent
         self._last_sent_length = 0  # Length of raw text that produced it
+        self._reset_prefix()
+
+    def _reset_prefix(self) -> None:
+        """Drop the cached stable prefix."""
+        self._prefix_text = ""
+        self._prefix_segments: list[str] = []  # Prefix split at stable points
+        self._prefix_placeholders = 0
+        self._prefix_natural_skip = _NO_SKIP  # Skip flags of the prefix's own end
+        self._prefix_html: dict[tuple, Optional[str]] = {}  # skip flags -> HTML
+
+    def render_markdown(self, raw_text: str, is_streaming: bool = True) -> str:
+        """
+        Incremental markdown_to_html(raw_text, is_streaming).
+
+        Cheap when raw_text extends the text of the previous call.
+        """
+        if not raw_text:
+            return raw_text
+        try:
+            html_text = self._render_incremental(raw_text, is_streaming)
+        except Exception as e:
+            logger.warning(f"Incremental render failed, rendering in full: {e}")
+            html_text = None
+        if html_text is None:
+            return markdown_to_html(raw_text, is_streaming=is_streaming)
+        return html_text
+
+    def _render_incremental(self, text: str, is_streaming: bool) -> Optional[str]:
+        """Render prefix (cached) + tail; None if a full render is required."""
+        if not text.startswith(self._prefix_text):
+            self._reset_prefix()
+        if len(text) - len(self._prefix_text) >= self.PREFIX_ADVANCE_CHARS:
+            self._advance_prefix(text)
+        if not self._prefix_text:
+            return None
+
+        # Tail always starts at a newline, so inline code and markers
+        # cannot straddle the split point
+        tail = text[len(self._prefix_text):]
+        if not tail.startswith('\n') or _PUA_RE.search(tail):
+            return None
+
+        rendered = _render_markdown(tail, is_streaming)
+        if (
+            rendered.placeholders + self._prefix_placeholders > _MAX_PLACEHOLDERS
+            or _PUA_RE.search(rendered.html)
+        ):
+            return None
+
+        # The streaming checks look at the end of the whole text: that is
+        # the tail, unless the tail is only whitespace at that point
+        if rendered.blank:
+            skip = self._prefix_natural_skip if is_streaming else _NO_SKIP
+        else:
+            skip = rendered.skip
+
+        prefix_html = self._prefix_html_for(skip)
+        if prefix_html is None:
+            return None
+        return prefix_html + rendered.html
+
+    def _advance_prefix(self, text: str) -> None:
+        """Extend the cached prefix up to the current stable end, if safe."""
+        start = len(self._prefix_text)
+        end = self._find_stable_end(text)
+        if end <= start or text[end:end + 1] != '\n':
+            return
+
+        segment = text[start:end]
+        if _PUA_RE.search(segment):
+            return
+        natural = _render_markdown(segment, is_streaming=True)
+        if not natural.blocks_closed or natural.blank or _PUA_RE.search(natural.html):
+            return
+
+        self._prefix_text = text[:end]
+        self._prefix_segments.append(segment)
+        self._prefix_placeholders += natural.placeholders
+        self._prefix_natural_skip = natural.skip
+        for skip, html_text in list(self._prefix_html.items()):
+            if html_text is not None:
+                self._prefix_html[skip] = self._append_segment(html_text, segment, skip)
+
+    def _prefix_html_for(self, skip: tuple) -> Optional[str]:
+        """Cached prefix HTML rendered with the given inline skip flags."""
+        if skip not in self._prefix_html:
+            html_text: Optional[str] = ""
+            for segment in self._prefix_segments:
+                html_text = self._append_segment(html_text, segment, skip)
+                if html_text is None:
+                    break
+            self._prefix_html[skip] = html_text
+        return self._prefix_html[skip]
+
+    @staticmethod
+    def _append_segment(html_text: str, segment: str, skip: tuple) -> Optional[str]:
+        rendered = _render_markdown(segment, skip=skip)
+        if not rendered.inline_closed:
+            return None
+        return html_text + rendered.html
 
     def format(self, raw_text: str, is_final: bool = False) -> tuple[str, bool]:
         """
@@ -270,7 +442,8 @@ class StableHTMLFormatter:
 
         # КРИТИЧЕСКИЙ ФИКС: Всегда форматировать ВЕСЬ текст!
         # is_streaming=True позволяет обрабатывать незакрытые конструкции
-        html_text = markdown_to_html(raw_text, is_streaming=not is_final)
+        # (стабильный префикс берётся из кэша, рендерится только хвост)
+        html_text = self.render_markdown(raw_text, is_streaming=not is_final)
         html_text = prepare_html_for_telegram(html_text, is_final=is_final)
 
         # Check if content changed
@@ -369,6 +542,7 @@ class StableHTMLFormatter:
         """Reset formatter state for new message."""
         self._last_sent_html = ""
         self._last_sent_length = 0
+        self._reset_prefix()
 
 
 # Alias for backward compatibility
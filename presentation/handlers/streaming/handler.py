@@ -5,14 +5,14 @@ Manages streaming output to Telegram with rate limiting:
 - Debouncing updates to avoid API rate limits
 - Splitting long messages that exceed Telegram's 4096 char limit
 - Graceful handling of rate limit errors with exponential backoff
-- Adaptive update intervals based on message size
+- Adaptive update intervals (per chat, in MessageUpdateCoordinator)
 """
 
 import asyncio
 import logging
 import re
 import time
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, Union, TYPE_CHECKING
 
 from aiogram import Bot
 from aiogram.types import Message, InlineKeyboardMarkup
@@ -24,7 +24,9 @@ from presentation.handlers.streaming.formatting import (
     StableHTMLFormatter,
     IncrementalFormatter,
 )
+from presentation.handlers.streaming.buffer import StreamBuffer
 from presentation.handlers.streaming.trackers import FileChangeTracker
+from presentation.middleware.send_scheduler import SendPriority, send_priority
 
 if TYPE_CHECKING:
     from presentation.handlers.state.update_coordinator import MessageUpdateCoordinator
@@ -42,18 +44,13 @@ class StreamingHandler:
     - Debouncing updates to avoid API rate limits
     - Splitting long messages that exceed Telegram's 4096 char limit
     - Graceful handling of rate limit errors with exponential backoff
-    - Adaptive update intervals based on message size
+    - Adaptive update intervals (per chat, in MessageUpdateCoordinator)
     """
 
     # Telegram limits - IMPORTANT: Telegram allows ~30 edits/min per chat
     # With heartbeat every 3s + content updates, we need careful timing
+    # Update intervals are set per chat by MessageUpdateCoordinator
     MAX_MESSAGE_LENGTH = 4000  # Leave buffer from 4096
-    DEBOUNCE_INTERVAL = 2.0  # Base seconds between updates (avoid rate limits)
-    MIN_UPDATE_INTERVAL = 2.0  # УВЕЛИЧЕНО до 2 секунд! Синхронизировано с координатором
-
-    # Adaptive interval thresholds (bytes) - increase interval for large messages
-    LARGE_TEXT_BYTES = 2500  # >2.5KB → 2.5s interval
-    VERY_LARGE_TEXT_BYTES = 3500  # >3.5KB → 3.0s interval
 
     # Rate limit backoff settings
     MAX_RATE_LIMIT_RETRIES = 3  # Max retries before giving up on update
@@ -75,7 +72,7 @@ class StreamingHandler:
         self.bot = bot
         self.chat_id = chat_id
         self.current_message = initial_message
-        self.buffer = ""
+        self._buffer = StreamBuffer()  # Chunked: append without copying the whole text
         self.last_update_time = 0.0
         self.messages: list[Message] = []  # All sent messages
         self.is_finalized = False
@@ -91,6 +88,8 @@ class StreamingHandler:
         self._is_plan_mode: bool = False  # Whether Claude is in plan mode
         self._last_todo_html: str = ""  # Cache last todo HTML to avoid "not modified" errors
         self._current_todo_html: str = ""  # Current todo HTML to show at bottom of message
+        # (message, body HTML) of the last full render, reused by status-only refreshes
+        self._rendered_body: Optional[tuple[Message, str]] = None
 
         # Token tracking for context usage display
         self._estimated_tokens: int = 0  # Accumulated token estimate
@@ -114,6 +113,15 @@ class StreamingHandler:
         if initial_message:
             self.messages.append(initial_message)
 
+    @property
+    def buffer(self) -> str:
+        """Full streamed text (materialised on demand, cached until next change)."""
+        return self._buffer.getvalue()
+
+    @buffer.setter
+    def buffer(self, text: str) -> None:
+        self._buffer.set(text)
+
     def add_tokens(self, text: str, multiplier: float = 1.0) -> int:
         """Add estimated tokens from text to the running total.
 
@@ -226,8 +234,8 @@ class StreamingHandler:
             logger.debug(f"Streaming: append ignored, already finalized")
             return
 
-        self.buffer += text
-        logger.debug(f"Streaming: appended {len(text)} chars, buffer now {len(self.buffer)} chars")
+        self._buffer.append(text)
+        logger.debug(f"Streaming: appended {len(text)} chars, buffer now {len(self._buffer)} chars")
 
         # Отправляем в координатор - он сам решит когда обновить
         await self._do_update()
@@ -245,9 +253,7 @@ class StreamingHandler:
         if self.is_finalized:
             return False
 
-        idx = self.buffer.rfind(old_line)
-        if idx != -1:
-            self.buffer = self.buffer[:idx] + new_line + self.buffer[idx + len(old_line):]
+        if self._buffer.replace_last(old_line, new_line):
             await self._do_update()  # Координатор обеспечит rate limiting
             return True
         return False
@@ -274,14 +280,46 @@ class StreamingHandler:
         self._status_line = status
         await self._do_update()
 
-    def _get_display_buffer(self) -> str:
+    async def refresh_status(self, status: str):
+        """Update only the status line (heartbeat).
+
+        Reuses the body rendered by the last full update, so a spinner tick
+        doesn't re-sync and re-render the streamed content. Every content
+        change goes through _do_update(), which renders the body again.
+        """
+        self._status_line = status
+        rendered = self._rendered_body
+        if (
+            self.is_finalized
+            or not self._coordinator
+            or rendered is None
+            or rendered[0] is not self.current_message
+        ):
+            await self._do_update()
+            return
+
+        html_text = self._with_footer(rendered[1])
+        if len(html_text) > self.MAX_MESSAGE_LENGTH:
+            # Longer status may need a split - full update decides
+            await self._do_update()
+            return
+
+        await self._coordinator.update(
+            self.current_message,
+            html_text,
+            parse_mode="HTML",
+            reply_markup=self.reply_markup,
+        )
+
+    def _get_display_buffer(self) -> StreamBuffer:
         """Get buffer content only (without status).
 
-        Returns raw content for HTML formatting.
+        Returns raw content for HTML formatting (the chunked buffer itself,
+        UI state slices only the part it hasn't flushed yet).
         Status line is added separately after HTML formatting.
         """
         # NOTE: Sync now happens in _edit_current_message via ui._content_buffer
-        return self.buffer
+        return self._buffer
 
     def _get_status_line(self) -> str:
         """Get status line (already HTML formatted).
@@ -292,14 +330,6 @@ class StreamingHandler:
             return ""
         return self._status_line
 
-    def _calc_edit_interval(self) -> float:
-        """Calculate edit interval - ВСЕГДА 2 секунды.
-
-        Координатор обеспечивает rate limiting, поэтому адаптивные
-        интервалы больше не нужны.
-        """
-        return self.MIN_UPDATE_INTERVAL  # Всегда 2.0 секунды
-
     async def show_tool_use(self, tool_name: str, details: str = ""):
         """Show that a tool is being used with nice formatting"""
         # Emoji mapping for different tools
@@ -538,20 +568,21 @@ class StreamingHandler:
 
         try:
             # Вопросы важны - используем координатор для надёжной доставки
-            if self._coordinator:
-                msg = await self._coordinator.send_new(
-                    self.chat_id,
-                    html_text,
-                    parse_mode="HTML",
-                    reply_markup=keyboard
-                )
-            else:
-                msg = await self.bot.send_message(
-                    self.chat_id,
-                    html_text,
-                    parse_mode="HTML",
-                    reply_markup=keyboard
-                )
+            with send_priority(SendPriority.HITL_PROMPT):
+                if self._coordinator:
+                    msg = await self._coordinator.send_new(
+                        self.chat_id,
+                        html_text,
+                        parse_mode="HTML",
+                        reply_markup=keyboard
+                    )
+                else:
+                    msg = await self.bot.send_message(
+                        self.chat_id,
+                        html_text,
+                        parse_mode="HTML",
+                        reply_markup=keyboard
+                    )
             return msg
         except Exception as e:
             logger.error(f"Error showing question: {e}")
@@ -571,8 +602,8 @@ class StreamingHandler:
         Координатор гарантирует интервал 2 секунды между обновлениями.
         """
         # Обновляем если есть буфер ИЛИ статус (heartbeat)
-        if (not self.buffer and not self._status_line) or self.is_finalized:
-            logger.debug(f"Streaming: _do_update skipped (buffer={bool(self.buffer)}, status={bool(self._status_line)}, finalized={self.is_finalized})")
+        if (not self._buffer and not self._status_line) or self.is_finalized:
+            logger.debug(f"Streaming: _do_update skipped (buffer={bool(self._buffer)}, status={bool(self._status_line)}, finalized={self.is_finalized})")
             return
 
         display_text = self._get_display_buffer()
@@ -585,8 +616,9 @@ class StreamingHandler:
 
             # Check if we need to split into multiple messages
             # ВАЖНО: проверяем отрендеренный HTML, не raw buffer!
-            rendered_html = self.ui.render_non_content()
+            body_html = self.ui.render_non_content()
             status = self._get_status_line()
+            rendered_html = body_html
             if status:
                 rendered_html = f"{rendered_html}\n\n{status}" if rendered_html else status
 
@@ -611,7 +643,7 @@ class StreamingHandler:
                 if self._just_created_continuation:
                     self._just_created_continuation = False
                 logger.debug(f"Streaming: editing message via coordinator...")
-                await self._edit_current_message(display_text)
+                await self._edit_current_message(display_text, body_html=body_html)
 
             self.last_update_time = time.time()
             logger.debug(f"Streaming: update completed")
@@ -620,13 +652,19 @@ class StreamingHandler:
             # Координатор обрабатывает rate limits внутри
             logger.error(f"Error updating message: {e}")
 
-    async def _edit_current_message(self, text: str, is_final: bool = False):
+    async def _edit_current_message(
+        self,
+        text: Union[str, StreamBuffer],
+        is_final: bool = False,
+        body_html: Optional[str] = None,
+    ):
         """Edit the current message with valid HTML only.
 
         ВАЖНО: Все обновления проходят через MessageUpdateCoordinator!
         Координатор гарантирует минимум 2 секунды между обновлениями.
 
         Uses StreamingUIState.render_non_content() for interleaved content+tools.
+        body_html: that render, when the caller has just made it for this state.
         """
         if not self.current_message:
             logger.debug("_edit_current_message: no current_message, skipping")
@@ -646,7 +684,10 @@ class StreamingHandler:
             self.ui.finalize()
 
         # Render everything through UI state (content + tools interleaved)
-        html_text = self.ui.render_non_content()
+        if body_html is None or is_final:
+            body_html = self.ui.render_non_content()
+        html_text = body_html
+        self._rendered_body = None if is_final else (self.current_message, body_html)
 
         # Логируем для отладки
         logger.debug(
@@ -659,24 +700,7 @@ class StreamingHandler:
             logger.debug("_edit_current_message: no html_text and no status, skipping")
             return
 
-        # Add todo plan and status line at the bottom
-        # Order: content → plan → empty line → status with timer
-        footer_parts = []
-        if self._current_todo_html:
-            footer_parts.append(self._current_todo_html)
-        if status:
-            # Add extra empty line before status to separate from plan
-            if footer_parts:
-                footer_parts.append("")  # Empty line gap
-            footer_parts.append(status)
-
-        if footer_parts:
-            footer = "\n".join(footer_parts)
-            if html_text:
-                html_text = f"{html_text}\n\n{footer}"
-            else:
-                html_text = footer
-
+        html_text = self._with_footer(html_text)
         if not html_text:
             return
 
@@ -717,6 +741,26 @@ class StreamingHandler:
                     except Exception:
                         pass  # Give up on this update
 
+    def _with_footer(self, html_text: str) -> str:
+        """Add todo plan and status line at the bottom of the rendered body.
+
+        Order: content → plan → empty line → status with timer
+        """
+        footer_parts = []
+        if self._current_todo_html:
+            footer_parts.append(self._current_todo_html)
+        status = self._get_status_line()
+        if status:
+            # Add extra empty line before status to separate from plan
+            if footer_parts:
+                footer_parts.append("")  # Empty line gap
+            footer_parts.append(status)
+
+        if not footer_parts:
+            return html_text
+        footer = "\n".join(footer_parts)
+        return f"{html_text}\n\n{footer}" if html_text else footer
+
     async def _send_new_message(self, text: str, is_final: bool = False) -> Message:
         """Send a new message (converts Markdown to HTML)"""
         # Reset formatter for new message
@@ -829,8 +873,9 @@ class StreamingHandler:
 
     async def _handle_overflow_trim(self, is_final: bool = False):
         """Legacy trimming for final messages - keep only newest content."""
-        # Extract header (first lines with emoji status)
-        lines = self.buffer.split("\n")
+        # Extract header (first lines with emoji status) - it is at the top,
+        # so only the head of the buffer is split into lines
+        lines = self._buffer.head(self.MAX_MESSAGE_LENGTH).split("\n")
         header_lines = []
         content_start = 0
 
@@ -843,22 +888,18 @@ class StreamingHandler:
                 break
 
         header = "\n".join(header_lines)
-        content = "\n".join(lines[content_start:])
+        content_offset = sum(len(line) + 1 for line in lines[:content_start])
 
         # Target size - leave room for new content
         target_size = self.MAX_MESSAGE_LENGTH - 500
+        budget = target_size - len(header) - 50
 
-        # Remove oldest content blocks until we fit
-        trimmed = False
-        while len(header) + len(content) + 50 > target_size and content:
-            trimmed = True
-            # Find first block separator (double newline or tool result end)
-            block_end = content.find("\n\n")
-            if block_end > 0 and block_end < len(content)- 100:
-                content = content[block_end + 2:]
-            else:
-                # Fallback: remove first 300 chars
-                content = content[300:]
+        # Keep only the newest content that fits, starting at a block
+        # boundary (double newline) when there is one
+        trimmed = len(self._buffer) - content_offset > budget
+        if trimmed:
+            content_offset = max(content_offset, self._buffer.tail_start(max(budget, 0)))
+        content = self._buffer.slice_from(content_offset)
 
         # Build new buffer with trim indicator
         if trimmed:
@@ -870,10 +911,10 @@ class StreamingHandler:
         # CRITICAL: Reset formatter when buffer is trimmed!
         if trimmed:
             self._formatter.reset()
-            logger.debug(f"Buffer trimmed to {len(self.buffer)} chars, formatter reset")
+            logger.debug(f"Buffer trimmed to {len(self._buffer)} chars, formatter reset")
 
         # Update message with trimmed content
-        await self._edit_current_message(self.buffer, is_final=is_final)
+        await self._edit_current_message(self._buffer, is_final=is_final)
 
     async def finalize(self, final_text: Optional[str] = None):
         """Finalize the stream with optional final text"""
@@ -892,12 +933,12 @@ class StreamingHandler:
             self.buffer = final_text
 
         # Force final update (without status, without cancel button, without cursor)
-        if self.buffer:
+        if self._buffer:
             try:
-                if len(self.buffer) > self.MAX_MESSAGE_LENGTH:
+                if len(self._buffer) > self.MAX_MESSAGE_LENGTH:
                     await self._handle_overflow(is_final=True)
                 else:
-                    await self._edit_current_message(self.buffer, is_final=True)
+                    await self._edit_current_message(self._buffer, is_final=True)
             except Exception as e:
                 logger.error(f"Error finalizing: {e}")
 
@@ -927,9 +968,9 @@ class StreamingHandler:
         to ensure the streaming output stays at the bottom of the chat.
         """
         # Finalize current message without the completion marker
-        if self.current_message and self.buffer:
+        if self.current_message and self._buffer:
             try:
-                await self._edit_current_message(self.buffer)
+                await self._edit_current_message(self._buffer)
             except Exception as e:
                 logger.debug(f"Could not finalize old message: {e}")
 
@@ -53,7 +53,7 @@ class StepStreamingHandler:
             return
 
         # КРИТИЧНО: sync buffer ПЕРЕД add_tool, чтобы flush захватил контент до этого tool
-        self.base.ui.sync_from_buffer(self.base.buffer)
+        self.base.ui.sync_from_buffer(self.base._buffer)
         self.base.ui.add_tool(tool_name, detail, ToolStatus.PENDING)
 
         await self.base._do_update()
@@ -95,7 +95,7 @@ class StepStreamingHandler:
         else:
             # Иначе создать новый (YOLO mode без permission request)
             # КРИТИЧНО: sync buffer ПЕРЕД add_tool, чтобы flush захватил контент до этого tool
-            self.base.ui.sync_from_buffer(self.base.buffer)
+            self.base.ui.sync_from_buffer(self.base._buffer)
             self.base.ui.add_tool(tool_name, detail, ToolStatus.EXECUTING)
 
         await self.base._do_update()
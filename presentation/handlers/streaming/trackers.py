@@ -4,14 +4,18 @@ Progress and status trackers for streaming operations.
 Includes:
 - ProgressTracker: Multi-step operation progress
 - HeartbeatTracker: Periodic status updates with spinner
+- HeartbeatTicker: One shared timer wheel driving all heartbeats
 - FileChange/FileChangeTracker: Track file modifications
 """
 
 import asyncio
 import logging
+import math
 import time
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+from presentation.middleware.send_scheduler import SendDropped, SendPriority, send_priority
 
 if TYPE_CHECKING:
     from presentation.handlers.streaming.handler import StreamingHandler
@@ -68,6 +72,7 @@ class HeartbeatTracker:
 
     Shows elapsed time and current action with animated spinner.
     Интервал = 2 секунды, синхронизирован с координатором.
+    Трекеры не держат своих задач: их ведёт общий HeartbeatTicker.
     """
 
     # Braille spinner animation (smooth rotating dots)
@@ -104,12 +109,19 @@ class HeartbeatTracker:
     # Интервал heartbeat = 2 секунды (синхронизирован с координатором)
     DEFAULT_INTERVAL = 2.0
 
-    def __init__(self, streaming: "StreamingHandler", interval: float = DEFAULT_INTERVAL):
+    def __init__(
+        self,
+        streaming: "StreamingHandler",
+        interval: float = DEFAULT_INTERVAL,
+        ticker: Optional["HeartbeatTicker"] = None,
+    ):
         self.streaming = streaming
         self.interval = max(interval, self.DEFAULT_INTERVAL)  # Не меньше 2 секунд!
         self.start_time = time.time()
         self.is_running = False
-        self._task: Optional[asyncio.Task] = None
+        self._ticker = ticker
+        self._slot: Optional[int] = None  # Слот колеса тикера (None - не запланирован)
+        self._refreshing = False  # Предыдущее обновление ещё не завершилось
         self._spinner_idx = 0
         self._current_action = "default"
         self._action_detail = ""  # Additional detail like filename
@@ -139,57 +151,192 @@ class HeartbeatTracker:
         """Start heartbeat updates"""
         self.is_running = True
         self.start_time = time.time()
-        self._task = asyncio.create_task(self._loop())
+        if self._ticker is None:
+            self._ticker = get_heartbeat_ticker()
+        self._ticker.add(self)
 
     async def stop(self):
         """Stop heartbeat updates"""
         self.is_running = False
-        if self._task:
+        if self._ticker:
+            self._ticker.remove(self)
+
+    def time_until_slot(self) -> float:
+        """Секунды до окна координатора для текущего сообщения стрима."""
+        coordinator = self.streaming._coordinator
+        message = self.streaming.current_message
+        if coordinator is None or message is None:
+            return 0.0
+        return coordinator.get_time_until_next_update(message)
+
+    def build_status(self) -> str:
+        """Собрать строку статуса и сдвинуть спиннер."""
+        elapsed = int(time.time() - self.start_time)
+
+        # Get animated spinner
+        spinner = self.SPINNERS[self._spinner_idx % len(self.SPINNERS)]
+        self._spinner_idx += 1
+
+        # Get emoji for current action
+        emoji = self.ACTION_EMOJIS.get(self._current_action, "🤖")
+
+        # Format time nicely
+        if elapsed < 60:
+            time_str = f"{elapsed}с"
+        else:
+            mins = elapsed // 60
+            secs = elapsed % 60
+            time_str = f"{mins}м {secs}с"
+
+        # Get action label
+        label = self.ACTION_LABELS.get(self._current_action, "Работаю")
+
+        # Build status line with HTML formatting (stable, no flickering):
+        # emoji <b>action</b> spinner (time) <i>detail</i>
+        if self._action_detail:
+            return f"{emoji} <b>{label}</b> {spinner} ({time_str}) · <i>{self._action_detail}</i>"
+        return f"{emoji} <b>{label}...</b> {spinner} ({time_str})"
+
+    async def tick(self) -> None:
+        """Одно обновление статуса (вызывается тикером)."""
+        self._refreshing = True
+        try:
+            # refresh_status() меняет только строку статуса -> координатор
+            # Heartbeat - низший приоритет в планировщике отправки
+            with send_priority(SendPriority.HEARTBEAT):
+                await self.streaming.refresh_status(self.build_status())
+        except SendDropped:
+            pass  # Устаревший статус снят с очереди - следующий тик перерисует
+        except Exception as e:
+            logger.debug(f"Heartbeat error: {e}")
+            await self.stop()
+        finally:
+            self._refreshing = False
+
+
+class HeartbeatTicker:
+    """
+    Один таймер на все активные HeartbeatTracker.
+
+    Вместо задачи со своим sleep на каждый стрим трекеры раскладываются по
+    слотам колеса (шаг RESOLUTION секунд), а одна задача раз в шаг забирает
+    все наступившие слоты и обновляет их трекеры одной пачкой.
+
+    Срок трекера выравнивается по окну координатора его сообщения: если
+    сообщение недавно обновлялось контентом (а статус уходит вместе с ним),
+    heartbeat переносится на момент, когда координатор снова разрешит
+    edit, вместо отложенной задачи в координаторе.
+    """
+
+    RESOLUTION = 0.25  # Шаг колеса (секунды)
+
+    def __init__(self, resolution: float = RESOLUTION):
+        self.resolution = resolution
+        self._slots: Dict[int, List[HeartbeatTracker]] = {}  # Номер слота -> трекеры
+        self._trackers: Set[HeartbeatTracker] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+
+        # Метрики
+        self.ticks = 0
+        self.refreshes = 0
+        self.deferred = 0  # Перенесено на окно координатора
+
+    def add(self, tracker: HeartbeatTracker) -> None:
+        """Начать вести трекер (первое обновление - на ближайшем тике)."""
+        self._trackers.add(tracker)
+        self._schedule(tracker, 0.0)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def remove(self, tracker: HeartbeatTracker) -> None:
+        """Перестать вести трекер (слот очищается лениво)."""
+        self._trackers.discard(tracker)
+        tracker._slot = None
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _schedule(self, tracker: HeartbeatTracker, delay: float) -> None:
+        slot = math.ceil((self._now() + delay) / self.resolution)
+        tracker._slot = slot
+        self._slots.setdefault(slot, []).append(tracker)
+
+    def _due(self) -> List[HeartbeatTracker]:
+        """Забрать трекеры всех наступивших слотов."""
+        current = math.floor(self._now() / self.resolution)
+        due = []
+        for slot in sorted(s for s in self._slots if s <= current):
+            for tracker in self._slots.pop(slot):
+                # Остановленные и перепланированные трекеры пропускаем
+                if tracker._slot == slot and tracker in self._trackers:
+                    due.append(tracker)
+        return due
+
+    def _tick(self) -> None:
+        self.ticks += 1
+        batch = []
+        for tracker in self._due():
+            if tracker._refreshing:
+                self._schedule(tracker, self.resolution)
+                continue
+            # Edit сейчас ушёл бы в отложенную задачу координатора - ждём его окна
+            wait = tracker.time_until_slot()
+            if wait > 0:
+                self.deferred += 1
+                self._schedule(tracker, wait)
+                continue
+            self._schedule(tracker, tracker.interval)
+            batch.append(tracker)
+
+        if batch:
+            self.refreshes += len(batch)
+            task = asyncio.create_task(self._refresh(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _refresh(self, batch: List[HeartbeatTracker]) -> None:
+        """Обновить пачку; медленный edit не задерживает колесо."""
+        await asyncio.gather(*(tracker.tick() for tracker in batch))
+
+    async def _run(self) -> None:
+        while self._trackers:
+            self._tick()
+            await asyncio.sleep(self.resolution)
+        self._slots.clear()
+
+    def get_stats(self) -> dict:
+        """Метрики тикера."""
+        return {
+            "active": len(self._trackers),
+            "ticks": self.ticks,
+            "refreshes": self.refreshes,
+            "deferred": self.deferred,
+        }
+
+    async def close(self) -> None:
+        """Остановить тикер и дождаться текущих обновлений."""
+        self._trackers.clear()
+        if self._task and not self._task.done():
             self._task.cancel()
             try:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
 
-    async def _loop(self):
-        """Periodic status update loop - каждые 2 секунды."""
-        while self.is_running:
-            try:
-                elapsed = int(time.time() - self.start_time)
-
-                # Get animated spinner
-                spinner = self.SPINNERS[self._spinner_idx % len(self.SPINNERS)]
-                self._spinner_idx += 1
-
-                # Get emoji for current action
-                emoji = self.ACTION_EMOJIS.get(self._current_action, "🤖")
 
-                # Format time nicely
-                if elapsed < 60:
-                    time_str = f"{elapsed}с"
-                else:
-                    mins = elapsed // 60
-                    secs = elapsed % 60
-                    time_str = f"{mins}м {secs}с"
-
-                # Get action label
-                label = self.ACTION_LABELS.get(self._current_action, "Работаю")
+# Общий тикер процесса (создаётся при первом heartbeat)
+_ticker: Optional[HeartbeatTicker] = None
 
-                # Build status line with HTML formatting (stable, no flickering):
-                # emoji <b>action</b> spinner (time) <i>detail</i>
-                if self._action_detail:
-                    status = f"{emoji} <b>{label}</b> {spinner} ({time_str}) · <i>{self._action_detail}</i>"
-                else:
-                    status = f"{emoji} <b>{label}...</b> {spinner} ({time_str})"
 
-                # set_status() вызывает _do_update() -> координатор (2с интервал)
-                await self.streaming.set_status(status)
-                await asyncio.sleep(self.interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.debug(f"Heartbeat error: {e}")
-                break
+def get_heartbeat_ticker() -> HeartbeatTicker:
+    """Получить общий HeartbeatTicker."""
+    global _ticker
+    if _ticker is None:
+        _ticker = HeartbeatTicker()
+    return _ticker
 
 
 @dataclass
@@ -15,10 +15,15 @@ Key benefits:
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Union, TYPE_CHECKING
 from enum import Enum
 import html as html_module
 
+from presentation.handlers.streaming.buffer import StreamBuffer
+
+if TYPE_CHECKING:
+    from presentation.handlers.streaming.formatting import StableHTMLFormatter
+
 
 class ElementType(Enum):
     """Type of UI element in the streaming message"""
@@ -32,6 +37,8 @@ class UIElement:
     type: ElementType
     data: Union[str, "ToolState"]  # str for CONTENT, ToolState for TOOL
     collapsed: bool = False  # For CONTENT: show as expandable blockquote
+    # For CONTENT: (finalized, html) of the last render - data never changes after flush
+    rendered: Optional[tuple] = field(default=None, repr=False, compare=False)
 
 
 class ToolStatus(Enum):
@@ -187,6 +194,12 @@ class StreamingUIState:
     # Whether the message is finalized
     finalized: bool = False
 
+    # Incremental markdown renderer for the content buffer (created lazily)
+    _content_formatter: Optional["StableHTMLFormatter"] = field(default=None, repr=False)
+
+    # (buffer id, buffer version, flushed length) of the last sync_from_buffer
+    _synced_from: Optional[tuple] = field(default=None, repr=False)
+
     # Legacy: keep content for backward compatibility
     @property
     def content(self) -> str:
@@ -219,6 +232,7 @@ class StreamingUIState:
         # Track how much we've flushed for sync_from_buffer
         self._flushed_length += len(self._content_buffer)
         self._content_buffer = ""
+        self._synced_from = None
 
     def render(self) -> str:
         """
@@ -263,9 +277,12 @@ class StreamingUIState:
         from presentation.handlers.streaming import markdown_to_html, prepare_html_for_telegram
         for element in self.elements:
             if element.type == ElementType.CONTENT:
-                # Format content block
-                html = markdown_to_html(element.data, is_streaming=not self.finalized)
-                html = prepare_html_for_telegram(html, is_final=self.finalized)
+                # Format content block (once per finalized state - content is immutable)
+                if element.rendered is None or element.rendered[0] != self.finalized:
+                    html = markdown_to_html(element.data, is_streaming=not self.finalized)
+                    html = prepare_html_for_telegram(html, is_final=self.finalized)
+                    element.rendered = (self.finalized, html)
+                html = element.rendered[1]
                 if html:
                     # Collapsed content goes into expandable blockquote
                     if element.collapsed:
@@ -283,7 +300,11 @@ class StreamingUIState:
 
         # 4. Current content buffer (not yet flushed, still streaming)
         if self._content_buffer:
-            html = markdown_to_html(self._content_buffer, is_streaming=True)
+            # Only the tail after the cached stable prefix is re-rendered
+            if self._content_formatter is None:
+                from presentation.handlers.streaming import StableHTMLFormatter
+                self._content_formatter = StableHTMLFormatter()
+            html = self._content_formatter.render_markdown(self._content_buffer, is_streaming=True)
             html = prepare_html_for_telegram(html, is_final=False)
             if html:
                 parts.append(html)
@@ -303,26 +324,39 @@ class StreamingUIState:
     def append_content(self, text: str) -> None:
         """Append text to content buffer (will be flushed when tool is added)"""
         self._content_buffer += text
+        self._synced_from = None
 
     def set_content(self, text: str) -> None:
         """Set content buffer (replaces existing buffer, not flushed elements)"""
         self._content_buffer = text
+        self._synced_from = None
 
-    def sync_from_buffer(self, full_buffer: str) -> None:
+    def sync_from_buffer(self, full_buffer: Union[str, StreamBuffer]) -> None:
         """
         Sync content buffer from external buffer (e.g., StreamingHandler.buffer).
 
         Only takes the NEW part that hasn't been flushed to elements yet.
         This prevents duplication when tool flushes part of content.
+
+        With a StreamBuffer only the unflushed suffix is materialised, and
+        nothing at all if the buffer hasn't changed since the last sync.
         """
         import logging
         logger = logging.getLogger(__name__)
 
         # Only sync the part after what was already flushed
         old_buffer = self._content_buffer
-        if len(full_buffer) > self._flushed_length:
+        if isinstance(full_buffer, StreamBuffer):
+            sync_key = (id(full_buffer), full_buffer.version, self._flushed_length)
+            if sync_key == self._synced_from:
+                return
+            self._synced_from = sync_key
+            self._content_buffer = full_buffer.slice_from(self._flushed_length)
+        elif len(full_buffer) > self._flushed_length:
+            self._synced_from = None
             self._content_buffer = full_buffer[self._flushed_length:]
         else:
+            self._synced_from = None
             self._content_buffer = ""
 
         # Debug logging
@@ -517,6 +551,8 @@ class StreamingUIState:
         self.completion_info = ""
         self.completion_status = ""
         self.finalized = False
+        self._content_formatter = None
+        self._synced_from = None
 
     def finalize(self) -> None:
         """Mark message as finalized"""
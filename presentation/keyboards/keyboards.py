@@ -882,6 +882,33 @@ class Keyboards:
 
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+    @staticmethod
+    def search_pagination(
+        offset: int,
+        page_size: int,
+        next_offset: Optional[int] = None
+    ) -> Optional[InlineKeyboardMarkup]:
+        """
+        Prev/next buttons for /search results.
+
+        Args:
+            offset: Offset of the current page
+            page_size: Hits per page
+            next_offset: Offset of the next page, None on the last page
+        """
+        row = []
+        if offset > 0:
+            row.append(InlineKeyboardButton(
+                text="◀️ Назад",
+                callback_data=f"search:page:{max(0, offset - page_size)}"
+            ))
+        if next_offset is not None:
+            row.append(InlineKeyboardButton(
+                text="Дальше ▶️",
+                callback_data=f"search:page:{next_offset}"
+            ))
+        return InlineKeyboardMarkup(inline_keyboard=[row]) if row else None
+
     @staticmethod
     def folder_browser(
         folders: List[str],
@@ -1002,6 +1029,7 @@ class Keyboards:
 
         Features:
         - Folder buttons for navigation
+        - Previous/next page buttons for large folders
         - Back, Root, Select buttons
         - Close button
         """
@@ -1032,6 +1060,25 @@ class Keyboards:
         for i in range(0, len(folder_buttons), folders_per_row):
             buttons.append(folder_buttons[i:i + folders_per_row])
 
+        # Pages of a large directory (tokens are kept by FileBrowserService)
+        page_row = []
+        if content.prev_token:
+            page_row.append(
+                InlineKeyboardButton(
+                    text="◀️ Пред.",
+                    callback_data=f"cd:page:{content.prev_token}"
+                )
+            )
+        if content.next_token:
+            page_row.append(
+                InlineKeyboardButton(
+                    text="След. ▶️",
+                    callback_data=f"cd:page:{content.next_token}"
+                )
+            )
+        if page_row:
+            buttons.append(page_row)
+
         # Navigation buttons
         nav_row = []
 
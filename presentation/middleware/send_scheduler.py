@@ -0,0 +1,582 @@
+"""
+Outbound Send Scheduler
+
+Единая очередь ВСЕХ исходящих запросов к Telegram Bot API.
+
+Регистрируется как request middleware сессии бота, поэтому через неё
+проходят все edit_text / send_message / send_document / answer без
+изменения мест вызова. Обеспечивает:
+1. Глобальный token bucket (~30 сообщений/сек на бота)
+2. Token bucket на чат (~1/сек для личных чатов, ~20/мин для групп)
+3. Приоритеты: final > HITL prompt > progress edit > heartbeat
+4. Объединение устаревших edit одного сообщения (последний побеждает)
+5. Общий для всех чатов backoff по retry_after (429)
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    CopyMessage,
+    EditMessageCaption,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    SendAnimation,
+    SendAudio,
+    SendChatAction,
+    SendDocument,
+    SendMediaGroup,
+    SendMessage,
+    SendPhoto,
+    SendSticker,
+    SendVideo,
+    SendVoice,
+    TelegramMethod,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SendPriority(IntEnum):
+    """Класс приоритета исходящего запроса (меньше = важнее)."""
+    FINAL = 0  # Финальные ответы и обычные отправки
+    HITL_PROMPT = 1  # Вопросы и запросы разрешений пользователю
+    PROGRESS = 2  # Промежуточные edit стриминга
+    HEARTBEAT = 3  # Спиннер/таймер, chat action
+
+
+# Методы, которые расходуют лимиты чата и идут через очередь.
+# Остальные (getUpdates, getMe, answerCallbackQuery, ...) проходят напрямую.
+_EDIT_METHODS = (EditMessageText, EditMessageReplyMarkup, EditMessageCaption)
+_SCHEDULED_METHODS = _EDIT_METHODS + (
+    SendMessage,
+    SendDocument,
+    SendPhoto,
+    SendMediaGroup,
+    SendAnimation,
+    SendAudio,
+    SendVideo,
+    SendVoice,
+    SendSticker,
+    CopyMessage,
+    ForwardMessage,
+    SendChatAction,
+)
+
+_priority_var: contextvars.ContextVar[Optional[SendPriority]] = contextvars.ContextVar(
+    "send_priority", default=None
+)
+
+
+@contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """
+    Задать приоритет для запросов, отправленных внутри блока.
+
+    Usage:
+        with send_priority(SendPriority.HITL_PROMPT):
+            await bot.send_message(chat_id, "Разрешить?", reply_markup=kb)
+    """
+    token = _priority_var.set(priority)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def current_send_priority() -> Optional[SendPriority]:
+    """Приоритет, заданный через send_priority() (None если не задан)."""
+    return _priority_var.get()
+
+
+class SendDropped(Exception):
+    """Запрос снят с очереди без отправки (устаревший heartbeat)."""
+
+
+def _chat_key(chat_id: Union[int, str]) -> Union[int, str]:
+    """Числовой str id - тот же чат, что и int; строкой остаётся только @username."""
+    if isinstance(chat_id, str):
+        try:
+            return int(chat_id)
+        except ValueError:
+            return chat_id
+    return chat_id
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def time_until_available(self, now: Optional[float] = None) -> float:
+        """Секунды до появления одного токена (0 если есть сейчас)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: Optional[float] = None) -> bool:
+        """Восстановлены ли все токены (никаких долгов перед лимитом)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def consume(self, now: Optional[float] = None) -> None:
+        """Забрать один токен."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class OutboundRequest:
+    """Запрос в очереди планировщика."""
+    priority: SendPriority
+    seq: int
+    chat_id: Union[int, str]
+    method: TelegramMethod
+    make_request: NextRequestMiddlewareType
+    bot: Bot
+    futures: List[asyncio.Future] = field(default_factory=list)
+    coalesce_key: Optional[Tuple[Any, ...]] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    cancelled: bool = False
+
+    def sort_key(self) -> Tuple[int, int]:
+        return (self.priority, self.seq)
+
+
+@dataclass
+class ChatQueue:
+    """Очередь и лимиты одного чата."""
+    bucket: TokenBucket
+    heap: List[Tuple[int, int, OutboundRequest]] = field(default_factory=list)
+    in_flight: bool = False
+    blocked_until: float = 0.0
+
+
+class TelegramSendScheduler(BaseRequestMiddleware):
+    """
+    Планировщик исходящих запросов Telegram.
+
+    Запросы к одному чату отправляются строго по одному (порядок edit
+    сохраняется), разные чаты - параллельно в пределах глобального лимита.
+
+    Использование:
+        scheduler = init_send_scheduler(bot)  # bot.session.middleware(...)
+
+        with send_priority(SendPriority.HEARTBEAT):
+            await message.edit_text("⠋ (12с)")
+
+        scheduler.get_metrics()  # глубина очереди, coalesced, dropped, 429
+    """
+
+    # Глобальный лимит Telegram: ~30 сообщений в секунду на бота
+    GLOBAL_RATE = 30.0
+    GLOBAL_BURST = 30
+
+    # Личные чаты: ~1 сообщение в секунду (короткие всплески допустимы)
+    PRIVATE_CHAT_RATE = 1.0
+    PRIVATE_CHAT_BURST = 3
+
+    # Группы: ~20 сообщений в минуту
+    GROUP_CHAT_RATE = 20 / 60
+    GROUP_CHAT_BURST = 3
+
+    # Повторы после 429 внутри планировщика
+    MAX_RETRY_AFTER = 30.0  # Дольше - отдаём TelegramRetryAfter вызывающему
+    MAX_RETRIES = 3
+
+    # Heartbeat старше этого возраста не отправляется (уже неактуален)
+    HEARTBEAT_TTL = 10.0
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        global_burst: int = GLOBAL_BURST,
+        private_chat_rate: float = PRIVATE_CHAT_RATE,
+        private_chat_burst: int = PRIVATE_CHAT_BURST,
+        group_chat_rate: float = GROUP_CHAT_RATE,
+        group_chat_burst: int = GROUP_CHAT_BURST,
+    ):
+        self._global = TokenBucket(global_rate, global_burst)
+        self._private_rate = (private_chat_rate, private_chat_burst)
+        self._group_rate = (group_chat_rate, group_chat_burst)
+
+        self._chats: Dict[Union[int, str], ChatQueue] = {}
+        self._pending_edits: Dict[Tuple[Any, ...], OutboundRequest] = {}
+        self._seq = itertools.count()
+        self._depth = 0
+        self._paused_until = 0.0  # Общий backoff по retry_after
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._closed = False
+        self._retry_after_listeners: List[Callable[[Union[int, str], float], None]] = []
+
+        # Statistics
+        self._sent = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._retry_after_count = 0
+        self._max_depth = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Any:
+        chat_id = getattr(method, "chat_id", None)
+        if self._closed or chat_id is None or not isinstance(method, _SCHEDULED_METHODS):
+            return await make_request(bot, method)
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(make_request, bot, method, _chat_key(chat_id), future)
+        return await future
+
+    def add_retry_after_listener(
+        self,
+        listener: Callable[[Union[int, str], float], None],
+    ) -> None:
+        """Подписаться на 429: listener(chat_id, retry_after)."""
+        self._retry_after_listeners.append(listener)
+
+    # === Очередь ===
+
+    def _classify(self, method: TelegramMethod) -> SendPriority:
+        priority = current_send_priority()
+        if priority is not None:
+            return priority
+        if isinstance(method, SendChatAction):
+            return SendPriority.HEARTBEAT
+        if isinstance(method, _EDIT_METHODS):
+            return SendPriority.PROGRESS
+        return SendPriority.FINAL
+
+    def _chat(self, chat_id: Union[int, str]) -> ChatQueue:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate, burst = self._group_rate if is_group else self._private_rate
+            chat = ChatQueue(bucket=TokenBucket(rate, burst))
+            self._chats[chat_id] = chat
+        return chat
+
+    def _enqueue(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+        chat_id: Union[int, str],
+        future: asyncio.Future,
+    ) -> None:
+        priority = self._classify(method)
+
+        coalesce_key = None
+        if isinstance(method, _EDIT_METHODS) and method.message_id is not None:
+            coalesce_key = (type(method).__name__, chat_id, method.message_id)
+            queued = self._pending_edits.get(coalesce_key)
+            if queued is not None:
+                # Edit ещё не отправлен - заменяем содержимое новым,
+                # все ожидающие получат результат последнего edit
+                queued.method = method
+                queued.make_request = make_request
+                queued.futures.append(future)
+                if priority < queued.priority:
+                    self._reprioritize(queued, priority)
+                self._coalesced += 1
+                return
+
+        request = OutboundRequest(
+            priority=priority,
+            seq=next(self._seq),
+            chat_id=chat_id,
+            method=method,
+            make_request=make_request,
+            bot=bot,
+            futures=[future],
+            coalesce_key=coalesce_key,
+        )
+        self._push(request)
+        self._ensure_worker()
+
+    def _push(self, request: OutboundRequest) -> None:
+        chat = self._chat(request.chat_id)
+        heapq.heappush(chat.heap, (*request.sort_key(), request))
+        if request.coalesce_key is not None:
+            self._pending_edits[request.coalesce_key] = request
+        self._depth += 1
+        self._max_depth = max(self._max_depth, self._depth)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _reprioritize(self, request: OutboundRequest, priority: SendPriority) -> None:
+        # Старую запись помечаем отменённой, новую кладём с тем же seq
+        request.cancelled = True
+        self._depth -= 1
+        replacement = OutboundRequest(
+            priority=priority,
+            seq=request.seq,
+            chat_id=request.chat_id,
+            method=request.method,
+            make_request=request.make_request,
+            bot=request.bot,
+            futures=request.futures,
+            coalesce_key=request.coalesce_key,
+            enqueued_at=request.enqueued_at,
+            attempts=request.attempts,
+        )
+        self._push(replacement)
+
+    def _pop(self, chat: ChatQueue) -> Optional[OutboundRequest]:
+        while chat.heap:
+            _, _, request = heapq.heappop(chat.heap)
+            if request.cancelled:
+                continue
+            self._depth -= 1
+            if request.coalesce_key is not None:
+                self._pending_edits.pop(request.coalesce_key, None)
+            return request
+        return None
+
+    def _peek(self, chat: ChatQueue) -> Optional[OutboundRequest]:
+        while chat.heap and chat.heap[0][2].cancelled:
+            heapq.heappop(chat.heap)
+        return chat.heap[0][2] if chat.heap else None
+
+    # === Диспетчер ===
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._dispatch_loop())
+
+    def _next_request(self, now: float) -> Tuple[Optional[ChatQueue], float]:
+        """
+        Выбрать самый приоритетный запрос среди чатов, готовых к отправке.
+
+        Returns:
+            (чат, 0) если есть что отправить, иначе (None, секунды до
+            ближайшей возможности; inf если ждать нечего)
+        """
+        best: Optional[ChatQueue] = None
+        best_key: Optional[Tuple[int, int]] = None
+        wait = float("inf")
+
+        for chat_id, chat in list(self._chats.items()):
+            head = self._peek(chat)
+            if head is None and self._is_idle(chat, now):
+                # Пустой чат без долгов перед лимитами не нужен: новый
+                # ChatQueue с полным bucket будет ему эквивалентен
+                del self._chats[chat_id]
+                continue
+            if head is None or chat.in_flight:
+                continue
+            chat_wait = max(
+                chat.blocked_until - now,
+                chat.bucket.time_until_available(now),
+            )
+            if chat_wait > 0:
+                wait = min(wait, chat_wait)
+                continue
+            if best_key is None or head.sort_key() < best_key:
+                best, best_key = chat, head.sort_key()
+
+        return (best, 0.0) if best is not None else (None, wait)
+
+    @staticmethod
+    def _is_idle(chat: ChatQueue, now: float) -> bool:
+        return (
+            not chat.in_flight
+            and chat.blocked_until <= now
+            and chat.bucket.is_full(now)
+        )
+
+    async def _dispatch_loop(self) -> None:
+        while not self._closed:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, self._global.time_until_available(now))
+            if wait <= 0:
+                chat, wait = self._next_request(now)
+                if chat is not None:
+                    request = self._pop(chat)
+                    if request is None:
+                        continue
+                    if self._is_stale(request, now):
+                        self._drop(request)
+                        continue
+                    chat.bucket.consume(now)
+                    self._global.consume(now)
+                    chat.in_flight = True
+                    task = asyncio.create_task(self._send(chat, request))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+                    continue
+
+            self._wakeup.clear()
+            timeout = None if wait == float("inf") else wait
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _is_stale(self, request: OutboundRequest, now: float) -> bool:
+        return (
+            request.priority == SendPriority.HEARTBEAT
+            and now - request.enqueued_at > self.HEARTBEAT_TTL
+        )
+
+    def _drop(self, request: OutboundRequest) -> None:
+        # Устаревший heartbeat: следующий тик всё равно перерисует статус.
+        # Вызывающий получает SendDropped, чтобы не считать текст отправленным
+        self._dropped += 1
+        for future in request.futures:
+            if not future.done():
+                future.set_exception(SendDropped(f"stale heartbeat for chat {request.chat_id}"))
+        logger.debug(f"SendScheduler: dropped stale heartbeat for chat {request.chat_id}")
+
+    async def _send(self, chat: ChatQueue, request: OutboundRequest) -> None:
+        request.attempts += 1
+        try:
+            result = await request.make_request(request.bot, request.method)
+        except TelegramRetryAfter as e:
+            self._on_retry_after(chat, request, e)
+        except Exception as e:
+            for future in request.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self._sent += 1
+            for future in request.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            chat.in_flight = False
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _on_retry_after(
+        self,
+        chat: ChatQueue,
+        request: OutboundRequest,
+        error: TelegramRetryAfter,
+    ) -> None:
+        self._retry_after_count += 1
+        resume_at = time.monotonic() + error.retry_after
+        # Flood control общий: тормозим все чаты, а не только этот
+        self._paused_until = max(self._paused_until, resume_at)
+        chat.blocked_until = max(chat.blocked_until, resume_at)
+        logger.warning(
+            f"SendScheduler: 429 in chat {request.chat_id}, "
+            f"pausing all sends for {error.retry_after}s"
+        )
+        for listener in self._retry_after_listeners:
+            try:
+                listener(request.chat_id, error.retry_after)
+            except Exception as e:
+                logger.error(f"SendScheduler: retry_after listener failed: {e}")
+
+        if error.retry_after > self.MAX_RETRY_AFTER or request.attempts >= self.MAX_RETRIES:
+            for future in request.futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        if request.coalesce_key is not None:
+            queued = self._pending_edits.get(request.coalesce_key)
+            if queued is not None:
+                # Пока ждали, пришёл более новый edit - он и будет отправлен
+                queued.futures.extend(request.futures)
+                self._coalesced += 1
+                return
+        self._push(request)
+
+    # === Жизненный цикл и метрики ===
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Дождаться отправки очереди (не дольше timeout) и остановиться."""
+        deadline = time.monotonic() + timeout
+        while (self._depth or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        self._closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for chat in self._chats.values():
+            while (request := self._pop(chat)) is not None:
+                for future in request.futures:
+                    if not future.done():
+                        future.cancel()
+
+    def get_metrics(self) -> dict:
+        """Метрики планировщика."""
+        by_priority = {p.name.lower(): 0 for p in SendPriority}
+        for chat in self._chats.values():
+            for _, _, request in chat.heap:
+                if not request.cancelled:
+                    by_priority[request.priority.name.lower()] += 1
+
+        return {
+            "queue_depth": self._depth,
+            "max_queue_depth": self._max_depth,
+            "queue_by_priority": by_priority,
+            "in_flight": len(self._in_flight),
+            "active_chats": sum(1 for c in self._chats.values() if c.heap or c.in_flight),
+            "tracked_chats": len(self._chats),
+            "sent": self._sent,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "retry_after": self._retry_after_count,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+        }
+
+
+# Глобальный экземпляр планировщика (инициализируется в main.py)
+_scheduler: Optional[TelegramSendScheduler] = None
+
+
+def get_send_scheduler() -> Optional[TelegramSendScheduler]:
+    """Получить глобальный планировщик."""
+    return _scheduler
+
+
+def init_send_scheduler(bot: Bot, **kwargs: Any) -> TelegramSendScheduler:
+    """Создать планировщик и подключить его к сессии бота."""
+    global _scheduler
+    _scheduler = TelegramSendScheduler(**kwargs)
+    bot.session.middleware(_scheduler)
+    logger.info("TelegramSendScheduler initialized")
+    return _scheduler
@@ -125,6 +125,7 @@ class SSHConfig:
     port: int = 22
     user: str = "root"
     key_path: str = "/app/bot_key"
+    known_hosts: Optional[str] = None  # None = don't verify host key
 
     @classmethod
     def from_env(cls) -> "SSHConfig":
@@ -133,6 +134,7 @@ class SSHConfig:
             port=int(os.getenv("SSH_PORT", "22")),
             user=os.getenv("HOST_USER", "root"),
             key_path=os.getenv("SSH_KEY_PATH", "/app/bot_key"),
+            known_hosts=os.getenv("SSH_KNOWN_HOSTS") or None,
         )
 
 
@@ -34,9 +34,21 @@ class Config:
     claude_permission_mode: str = "default"
     claude_plugins_dir: str = "/plugins"
     claude_plugins: str = "commit-commands,code-review,feature-dev,frontend-design,ralph-loop"
+    claude_warm_pool: bool = False  # Keep idle SDK clients connected between prompts
+    claude_warm_pool_ttl: int = 300
+
+    # Telegram message edits: bounds of the adaptive per-chat interval (seconds)
+    telegram_edit_min_interval: float = 1.0
+    telegram_edit_max_interval: float = 10.0
 
     # Database
     database_url: str = "sqlite:///data/bot.db"
+    database_pool_readers: int = 4
+    database_durability: str = "batched"  # immediate | batched
+    database_batch_interval_ms: int = 50
+
+    # Context variables: max tokens per value in prompts (0 = no limit)
+    context_variable_token_budget: int = 0
 
     # Admin
     admin_ids: list[int] = None  # List of admin user IDs
@@ -62,7 +74,15 @@ class Config:
                 "CLAUDE_PLUGINS",
                 "commit-commands,code-review,feature-dev,frontend-design,ralph-loop"
             ),
+            claude_warm_pool=os.getenv("CLAUDE_WARM_POOL", "false").lower() == "true",
+            claude_warm_pool_ttl=int(os.getenv("CLAUDE_WARM_POOL_TTL", "300")),
+            telegram_edit_min_interval=float(os.getenv("TELEGRAM_EDIT_MIN_INTERVAL", "1.0")),
+            telegram_edit_max_interval=float(os.getenv("TELEGRAM_EDIT_MAX_INTERVAL", "10.0")),
             database_url=os.getenv("DATABASE_URL", "sqlite:///data/bot.db"),
+            database_pool_readers=int(os.getenv("DATABASE_POOL_READERS", "4")),
+            database_durability=os.getenv("DATABASE_DURABILITY", "batched").lower(),
+            database_batch_interval_ms=int(os.getenv("DATABASE_BATCH_INTERVAL_MS", "50")),
+            context_variable_token_budget=int(os.getenv("CONTEXT_VARIABLE_TOKEN_BUDGET", "0")),
             admin_ids=admin_ids,
             log_level=os.getenv("LOG_LEVEL", "INFO"),
         )
@@ -88,56 +108,102 @@ class Container:
 
     # === Repository Layer ===
 
+    def connection_manager(self):
+        """Get or create the shared SQLite connection manager"""
+        if "connection_manager" not in self._cache:
+            # Registered per file, so repositories created without a manager
+            # (e.g. UserStateManager's account repository) share this pool
+            from infrastructure.persistence.connection_manager import get_connection_manager
+            self._cache["connection_manager"] = get_connection_manager(
+                self._db_path(),
+                readers=self.config.database_pool_readers,
+            )
+        return self._cache["connection_manager"]
+
+    def write_queue(self):
+        """Get or create the write-behind queue for message persistence"""
+        if "write_queue" not in self._cache:
+            from infrastructure.persistence.write_behind import SQLiteWriteBehindQueue
+            self._cache["write_queue"] = SQLiteWriteBehindQueue(
+                self.connection_manager(),
+                durability=self.config.database_durability,
+                interval=self.config.database_batch_interval_ms / 1000,
+            )
+        return self._cache["write_queue"]
+
+    def _db_path(self) -> str:
+        return self.config.database_url.replace("sqlite:///", "")
+
     def user_repository(self):
         """Get or create UserRepository"""
         if "user_repository" not in self._cache:
             from infrastructure.persistence.sqlite_repository import SQLiteUserRepository
-            db_path = self.config.database_url.replace("sqlite:///", "")
-            self._cache["user_repository"] = SQLiteUserRepository(db_path)
+            self._cache["user_repository"] = SQLiteUserRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["user_repository"]
 
     def session_repository(self):
         """Get or create SessionRepository"""
         if "session_repository" not in self._cache:
             from infrastructure.persistence.sqlite_repository import SQLiteSessionRepository
-            db_path = self.config.database_url.replace("sqlite:///", "")
-            self._cache["session_repository"] = SQLiteSessionRepository(db_path)
+            self._cache["session_repository"] = SQLiteSessionRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["session_repository"]
 
     def command_repository(self):
         """Get or create CommandRepository"""
         if "command_repository" not in self._cache:
             from infrastructure.persistence.sqlite_repository import SQLiteCommandRepository
-            db_path = self.config.database_url.replace("sqlite:///", "")
-            self._cache["command_repository"] = SQLiteCommandRepository(db_path)
+            self._cache["command_repository"] = SQLiteCommandRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["command_repository"]
 
     def project_repository(self):
         """Get or create ProjectRepository"""
         if "project_repository" not in self._cache:
             from infrastructure.persistence.project_repository import SQLiteProjectRepository
-            self._cache["project_repository"] = SQLiteProjectRepository()
+            self._cache["project_repository"] = SQLiteProjectRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["project_repository"]
 
     def context_repository(self):
         """Get or create ProjectContextRepository"""
         if "context_repository" not in self._cache:
             from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
-            self._cache["context_repository"] = SQLiteProjectContextRepository()
+            self._cache["context_repository"] = SQLiteProjectContextRepository(
+                self._db_path(), self.connection_manager(), self.write_queue()
+            )
         return self._cache["context_repository"]
 
+    def message_search_repository(self):
+        """Get or create MessageSearchRepository"""
+        if "message_search_repository" not in self._cache:
+            from infrastructure.persistence.message_search_repository import SQLiteMessageSearchRepository
+            self._cache["message_search_repository"] = SQLiteMessageSearchRepository(
+                self._db_path(), self.connection_manager()
+            )
+        return self._cache["message_search_repository"]
+
     def account_repository(self):
         """Get or create AccountRepository"""
         if "account_repository" not in self._cache:
             from infrastructure.persistence.sqlite_account_repository import SQLiteAccountRepository
-            self._cache["account_repository"] = SQLiteAccountRepository()
+            self._cache["account_repository"] = SQLiteAccountRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["account_repository"]
 
     def proxy_repository(self):
         """Get or create ProxyRepository"""
         if "proxy_repository" not in self._cache:
             from infrastructure.persistence.sqlite_proxy_repository import SQLiteProxyRepository
-            self._cache["proxy_repository"] = SQLiteProxyRepository()
+            self._cache["proxy_repository"] = SQLiteProxyRepository(
+                self._db_path(), self.connection_manager()
+            )
         return self._cache["proxy_repository"]
 
     # === Service Layer ===
@@ -184,7 +250,11 @@ class Container:
         """Get or create ContextService"""
         if "context_service" not in self._cache:
             from application.services.context_service import ContextService
-            self._cache["context_service"] = ContextService(self.context_repository())
+            self._cache["context_service"] = ContextService(
+                self.context_repository(),
+                self.message_search_repository(),
+                variable_token_budget=self.config.context_variable_token_budget or None,
+            )
         return self._cache["context_service"]
 
     def file_browser_service(self):
@@ -236,6 +306,8 @@ class Container:
                     enabled_plugins=enabled_plugins,
                     account_service=self.account_service(),
                     proxy_service=self.proxy_service(),
+                    warm_pool=self.config.claude_warm_pool,
+                    warm_pool_ttl=self.config.claude_warm_pool_ttl,
                 )
             except ImportError:
                 logger.warning("Claude Agent SDK not available")
@@ -249,20 +321,44 @@ class Container:
         from infrastructure.persistence.sqlite_repository import init_database
 
         # Initialize database
-        db_path = self.config.database_url.replace("sqlite:///", "")
-        await init_database(db_path)
+        await init_database(self._db_path(), self.connection_manager())
 
         # Initialize repositories that need async setup
         await self.account_repository().initialize()
         await self.project_repository().initialize()
         await self.context_repository().initialize()
+        # After the message tables exist: indexes them via triggers
+        await self.message_search_repository().initialize()
+
+        # Metrics history starts at startup, not at the first /metrics call
+        from infrastructure.monitoring.sampler import get_metrics_sampler
+        get_metrics_sampler().start()
 
         logger.info("Container initialized successfully")
 
     async def close(self) -> None:
         """Close all services that need cleanup"""
-        # Add cleanup logic here if needed
-        pass
+        # Stop status heartbeats before the connections they edit through go away
+        from presentation.handlers.streaming.trackers import get_heartbeat_ticker
+        await get_heartbeat_ticker().close()
+
+        # Flush pending work while the connection is still open
+        if "context_service" in self._cache:
+            await self._cache["context_service"].flush_claude_md_sync()
+        if "write_queue" in self._cache:
+            await self._cache["write_queue"].close()
+        if "file_processor_service" in self._cache:
+            await self._cache["file_processor_service"].close()
+        from infrastructure.persistence.connection_manager import close_all_connection_managers
+        await close_all_connection_managers()
+        if self._cache.get("claude_sdk"):
+            await self._cache["claude_sdk"].close()
+
+        from infrastructure.ssh.connection_pool import close_ssh_pools
+        await close_ssh_pools()
+
+        from infrastructure.monitoring.sampler import get_metrics_sampler
+        await get_metrics_sampler().stop()
 
     # === State Managers ===
 
@@ -0,0 +1,105 @@
+"""
+Benchmark: per-update overhead of AuthMiddleware and CallbackAuthMiddleware.
+
+Pushes messages and callback queries from an authorized user through the
+middlewares into a no-op handler, backed by a real SQLite users table.
+Compares a cold lookup on every update (auth cache TTL 0, as before the
+cache) with the cached authorization.
+
+Usage:
+    python -m tests.benchmarks.bench_auth_middleware [--updates 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from application.services.bot_service import BotService
+from domain.entities.user import User
+from domain.value_objects.role import Role
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.sqlite_repository import (
+    SQLiteCommandRepository,
+    SQLiteSessionRepository,
+    SQLiteUserRepository,
+    init_database,
+)
+from presentation.middleware.auth import AuthMiddleware, CallbackAuthMiddleware
+
+USER_ID = 123456789
+
+
+async def _handler(event, data):
+    return None
+
+
+async def _answer(*args, **kwargs):
+    return None
+
+
+def _events():
+    from_user = SimpleNamespace(id=USER_ID, is_bot=False)
+    message = SimpleNamespace(from_user=from_user, text="hello", answer=_answer)
+    callback = SimpleNamespace(from_user=from_user, data="menu:main", answer=_answer)
+    return message, callback
+
+
+async def _measure(middleware, event, updates: int) -> float:
+    """Median per-update time in microseconds over batches of 100"""
+    batches = []
+    for _ in range(updates // 100):
+        started = time.perf_counter()
+        for _ in range(100):
+            await middleware(_handler, event, {})
+        batches.append((time.perf_counter() - started) / 100)
+    return statistics.median(batches) * 1e6
+
+
+async def _run(updates: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SQLiteConnectionManager(os.path.join(tmp, "bench.db"))
+        await init_database(manager.db_path, manager)
+        users = SQLiteUserRepository(manager.db_path, manager)
+        await users.save(User(
+            user_id=UserId.from_int(USER_ID),
+            username="bench",
+            first_name="Bench",
+            last_name=None,
+            role=Role.user(),
+        ))
+
+        message, callback = _events()
+        print(f"updates per case:   {updates}")
+        print(f"{'case':<34} {'per update':>12}")
+        for label, ttl in (("uncached (TTL 0)", 0.0), ("cached", 30.0)):
+            service = BotService(
+                users,
+                SQLiteSessionRepository(manager.db_path, manager),
+                SQLiteCommandRepository(manager.db_path, manager),
+                auth_cache_ttl=ttl,
+            )
+            message_us = await _measure(AuthMiddleware(service), message, updates)
+            callback_us = await _measure(CallbackAuthMiddleware(service), callback, updates)
+            print(f"{'message, ' + label:<34} {message_us:9.1f} us")
+            print(f"{'callback, ' + label:<34} {callback_us:9.1f} us")
+
+        await manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.updates))
+
+
+if __name__ == "__main__":
+    main()
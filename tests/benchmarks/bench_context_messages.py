@@ -0,0 +1,96 @@
+"""
+Benchmark: paging through a 100,000-message context.
+
+Walks the whole history of one context page by page, comparing
+LIMIT/OFFSET paging (get_messages) with keyset paging
+(get_messages_page), with and without message content. OFFSET paging
+re-scans every skipped row, so its cost per page grows with depth;
+keyset paging seeks straight to the cursor.
+
+Usage:
+    python -m tests.benchmarks.bench_context_messages [--messages 100000] [--page 50]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+
+
+async def _fill(repo: SQLiteProjectContextRepository, context_id: str, messages: int) -> None:
+    now = datetime.now().isoformat()
+    rows = [
+        (context_id, "user" if i % 2 else "assistant", f"message {i} " + "x" * 500, None, None, now)
+        for i in range(messages)
+    ]
+    async with repo._db.writer() as db:
+        await db.executemany("""
+            INSERT INTO context_messages
+            (context_id, role, content, tool_name, tool_result, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+async def _walk_offset(repo, context_id: str, messages: int, page: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, messages, page):
+        await repo.get_messages(context_id, limit=page, offset=offset)
+    return time.perf_counter() - started
+
+
+async def _walk_keyset(repo, context_id: str, page: int, headers_only: bool) -> float:
+    started = time.perf_counter()
+    cursor = None
+    while True:
+        result = await repo.get_messages_page(context_id, page, cursor, headers_only)
+        cursor = result.next_cursor
+        if cursor is None:
+            break
+    return time.perf_counter() - started
+
+
+async def _run(messages: int, page: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SQLiteConnectionManager(os.path.join(tmp, "bench.db"))
+        repo = SQLiteProjectContextRepository(manager.db_path, manager)
+        await repo.initialize()
+
+        context = await repo.create_new("bench", UserId(1), "main")
+        # A second context so the index has to filter by context_id
+        noise = await repo.create_new("bench", UserId(1), "noise")
+        await _fill(repo, noise.id, messages // 10)
+        await _fill(repo, context.id, messages)
+
+        pages = -(-messages // page)
+        offset = await _walk_offset(repo, context.id, messages, page)
+        keyset = await _walk_keyset(repo, context.id, page, headers_only=False)
+        headers = await _walk_keyset(repo, context.id, page, headers_only=True)
+
+        await manager.close()
+
+    print(f"context size:          {messages} messages, {pages} pages of {page}")
+    print(f"LIMIT/OFFSET walk:     {offset:8.2f} s  ({offset / pages * 1000:7.3f} ms/page)")
+    print(f"keyset walk:           {keyset:8.2f} s  ({keyset / pages * 1000:7.3f} ms/page)")
+    print(f"keyset headers only:   {headers:8.2f} s  ({headers / pages * 1000:7.3f} ms/page)")
+    print(f"speedup (keyset):      {offset / keyset:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(_run(args.messages, args.page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: docker-logs-api with concurrent log followers.
+
+Starts a fake Docker Engine on a unix socket that streams multiplexed
+log frames, points docker-logs-api at it and opens N `follow=true`
+clients at once. While they stream, /health is probed continuously:
+its latency shows whether the followers block the event loop. Every
+follower must receive every line.
+
+Usage:
+    python -m tests.benchmarks.bench_docker_logs_api [--followers 50] [--lines 2000]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import statistics
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+MAIN_PATH = Path(__file__).resolve().parents[2] / "docker-logs-api" / "main.py"
+
+
+def _load_api():
+    spec = importlib.util.spec_from_file_location("docker_logs_api_main", MAIN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _frame(stream: int, payload: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream, len(payload)) + payload
+
+
+def _fake_docker(lines: int, batch: int) -> web.Application:
+    async def containers(request):
+        return web.json_response([
+            {"Id": f"{i:064x}", "Names": [f"/app{i}"], "State": "running",
+             "Image": "app:latest", "ImageID": "sha256:" + "ab" * 32}
+            for i in range(20)
+        ])
+
+    async def inspect(request):
+        return web.json_response({"Id": request.match_info["id"], "Config": {"Tty": False}})
+
+    async def logs(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for start in range(0, lines, batch):
+            chunk = b"".join(
+                _frame(1 + i % 2, f"2024-01-01T00:00:00Z line {i}\n".encode())
+                for i in range(start, min(lines, start + batch))
+            )
+            await response.write(chunk)
+            await asyncio.sleep(0.001)  # New output trickles in
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/containers/json", containers)
+    app.router.add_get("/containers/{id}/json", inspect)
+    app.router.add_get("/containers/{id}/logs", logs)
+    return app
+
+
+async def _follow(session: aiohttp.ClientSession, url: str) -> int:
+    count = 0
+    async with session.get(url) as response:
+        async for _ in response.content:
+            count += 1
+    return count
+
+
+async def _probe(session: aiohttp.ClientSession, url: str, stop: asyncio.Event) -> list:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def _run(followers: int, lines: int) -> None:
+    api = _load_api()
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "docker.sock")
+        docker_runner = web.AppRunner(_fake_docker(lines, batch=50))
+        await docker_runner.setup()
+        await web.UnixSite(docker_runner, socket_path).start()
+
+        api_runner = web.AppRunner(api.create_app(f"unix://{socket_path}"), handler_cancellation=True)
+        await api_runner.setup()
+        site = web.TCPSite(api_runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base = f"http://127.0.0.1:{port}"
+
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.get(f"{base}/containers") as response:
+                listed = len((await response.json())["containers"])
+
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(session, f"{base}/health", stop))
+            started = time.perf_counter()
+            counts = await asyncio.gather(*(
+                _follow(session, f"{base}/logs/app{i % 20}?follow=true&tail=all")
+                for i in range(followers)
+            ))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            latencies = sorted(await probe)
+
+        await api_runner.cleanup()
+        await docker_runner.cleanup()
+
+    assert listed == 20, listed
+    assert all(c == lines for c in counts), counts
+
+    total = sum(counts)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"followers:         {followers} x {lines} lines")
+    print(f"wall time:         {elapsed:8.2f} s")
+    print(f"throughput:        {total / elapsed:8.0f} lines/s")
+    print(f"/health probes:    {len(latencies)}")
+    print(f"/health p50:       {statistics.median(latencies) * 1000:8.2f} ms")
+    print(f"/health p99:       {p99 * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--followers", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.followers, args.lines))
+
+
+if __name__ == "__main__":
+    main()
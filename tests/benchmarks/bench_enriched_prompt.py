@@ -0,0 +1,101 @@
+"""
+Benchmark: enriching prompts with context and global variables.
+
+Simulates a conversation in one context: every prompt goes through
+ContextService.get_enriched_prompt, and every --edit-every prompts a
+variable changes. Compares the cached variables block with a rebuild on
+every prompt, and reports the cache hit rate and how much a token budget
+shrinks prompts when a large value (a pasted key or config) is set.
+
+Usage:
+    python -m tests.benchmarks.bench_enriched_prompt [--prompts 2000] [--variables 20]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from application.services.context_service import ContextService
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+
+USER = UserId(1)
+LARGE_VALUE_CHARS = 20_000
+TOKEN_BUDGET = 256
+
+
+async def _setup(repo: SQLiteProjectContextRepository, variables: int) -> str:
+    context = await repo.create_new("project-1", USER, "main")
+    for i in range(variables):
+        await repo.set_variable(context.id, f"CTX_VAR_{i}", f"value-{i}", f"Context variable {i}")
+        await repo.set_global_variable(USER, f"GLOBAL_VAR_{i}", f"value-{i}", f"Global variable {i}")
+    await repo.set_global_variable(USER, "PASTED_KEY", "k" * LARGE_VALUE_CHARS, "Large pasted key")
+    return context.id
+
+
+async def _run_prompts(service: ContextService, context_id: str, prompts: int, edit_every: int) -> tuple:
+    total_chars = 0
+    started = time.perf_counter()
+    for i in range(prompts):
+        if edit_every and i and i % edit_every == 0:
+            await service.set_variable(context_id, "CTX_VAR_0", f"edited-{i}")
+        prompt = await service.get_enriched_prompt(context_id, f"prompt {i}", user_id=USER)
+        total_chars += len(prompt)
+    return time.perf_counter() - started, total_chars
+
+
+async def _run(prompts: int, variables: int, edit_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SQLiteConnectionManager(os.path.join(tmp, "bench.db"))
+        repo = SQLiteProjectContextRepository(manager.db_path, manager)
+        await repo.initialize()
+        context_id = await _setup(repo, variables)
+
+        # Rebuild on every prompt, as before the cache
+        uncached = ContextService(repo)
+        started = time.perf_counter()
+        for i in range(prompts):
+            uncached._invalidate_context_variables(context_id)
+            await uncached.get_enriched_prompt(context_id, f"prompt {i}", user_id=USER)
+        rebuild = time.perf_counter() - started
+
+        cached = ContextService(repo)
+        cached_time, full_chars = await _run_prompts(cached, context_id, prompts, edit_every)
+        stats = cached.get_prompt_cache_stats()
+
+        budgeted = ContextService(repo, variable_token_budget=TOKEN_BUDGET)
+        _, budget_chars = await _run_prompts(budgeted, context_id, prompts, edit_every)
+        budget_stats = budgeted.get_prompt_cache_stats()
+
+        print(f"prompts:             {prompts} ({variables} context + {variables + 1} global variables, "
+              f"edit every {edit_every})")
+        print(f"rebuild every time:  {rebuild / prompts * 1e6:8.1f} us/prompt")
+        print(f"cached block:        {cached_time / prompts * 1e6:8.1f} us/prompt "
+              f"({rebuild / cached_time:.1f}x faster)")
+        print(f"cache hit rate:      {stats['hit_rate'] * 100:.1f}% "
+              f"({stats['hits']} hits, {stats['misses']} misses)")
+        print(f"avg prompt size:     {full_chars / prompts:,.0f} chars without budget, "
+              f"{budget_chars / prompts:,.0f} chars with a {TOKEN_BUDGET}-token budget "
+              f"({(1 - budget_chars / full_chars) * 100:.1f}% smaller, "
+              f"{budget_stats['chars_saved']:,} chars saved)")
+
+        await manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=2000)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--edit-every", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(_run(args.prompts, args.variables, args.edit_every))
+
+
+if __name__ == "__main__":
+    main()
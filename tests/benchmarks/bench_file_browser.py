@@ -0,0 +1,129 @@
+"""
+Benchmark: /cd browsing of a large directory.
+
+Creates --entries files and folders in a temporary node_modules and opens
+it --opens times, as repeated "cd" button presses would. Compares the old
+listing (scandir + stat() per entry on the event loop, first MAX_ENTRIES
+found) with FileBrowserService.list_directory (threaded scan, cached by
+(path, mtime), sorted pages). The old listing without the MAX_ENTRIES
+cut-off shows what sorting the whole directory on the loop would cost.
+Reports time per open and the longest event loop stall seen by a 1 ms
+ticker.
+
+Usage:
+    python -m tests.benchmarks.bench_file_browser [--entries 50000] [--opens 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from application.services.file_browser_service import (
+    DirectoryContent,
+    DirectoryEntry,
+    FileBrowserService,
+)
+
+
+async def _old_list_directory(
+    service: FileBrowserService, path: str, limit: bool = True
+) -> DirectoryContent:
+    """Listing as before: blocking scandir + stat, stops at MAX_ENTRIES"""
+    entries = []
+    for entry in os.scandir(path):
+        if entry.name.startswith('.'):
+            continue
+        size = entry.stat().st_size if entry.is_file() else None
+        entries.append(DirectoryEntry(entry.name, entry.path, entry.is_dir(), size))
+        if limit and len(entries) >= service.MAX_ENTRIES:
+            break
+    entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+    return DirectoryContent(path, service.get_parent_path(path), entries, False)
+
+
+async def _max_stall(stop: asyncio.Event) -> float:
+    """Longest gap between 1 ms ticks while the loop is busy elsewhere"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        worst = max(worst, now - last - 0.001)
+        last = now
+    return worst
+
+
+async def _measure(open_dir, opens: int) -> dict:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_stall(stop))
+    await asyncio.sleep(0.01)
+    times = []
+    for _ in range(opens):
+        started = time.perf_counter()
+        await open_dir()
+        times.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)  # Let the ticker run between presses
+    stop.set()
+    return {
+        "first_ms": times[0] * 1000,
+        "median_ms": statistics.median(times[1:] or times) * 1000,
+        "stall_ms": await ticker * 1000,
+    }
+
+
+async def _run(entries: int, opens: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "node_modules")
+        os.mkdir(path)
+        for i in range(entries):
+            name = os.path.join(path, f"pkg-{i:06d}")
+            if i % 2:
+                os.mkdir(name)
+            else:
+                open(name, "w").close()
+
+        print(f"entries: {entries}, opens: {opens}")
+        print(f"{'mode':<30} {'first ms':>9} {'median ms':>10} {'max stall ms':>13}")
+
+        old_service = FileBrowserService(root_path=root)
+        old = await _measure(lambda: _old_list_directory(old_service, path), opens)
+        full = await _measure(lambda: _old_list_directory(old_service, path, limit=False), opens)
+
+        service = FileBrowserService(root_path=root)
+        pages = {"token": None}
+
+        async def open_next_page():
+            content = await service.list_directory(path, pages["token"])
+            pages["token"] = content.next_token
+
+        new = await _measure(open_next_page, opens)
+
+        modes = (
+            ("scandir on loop, first 50", old),
+            ("scandir on loop, all sorted", full),
+            ("threaded + cached pages", new),
+        )
+        for label, stats in modes:
+            print(
+                f"{label:<30} {stats['first_ms']:>9.1f} {stats['median_ms']:>10.2f} "
+                f"{stats['stall_ms']:>13.1f}"
+            )
+        print(f"cache: {service.get_listing_cache_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--opens", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_run(args.entries, args.opens))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: memory and event loop stalls of file uploads.
+
+Image: a --size MB upload handled as before (download into BytesIO,
+read(), base64 into a str, decode back to bytes to save it) vs
+downloaded in chunks to a temp file and moved to .uploads. Reports peak
+Python memory (tracemalloc).
+
+PDF: a --pages page PDF parsed as before (pypdf on the event loop) vs
+in the process pool with MAX_PDF_PAGES. Reports the longest stall seen
+by a 1 ms ticker. Needs pypdf.
+
+Usage:
+    python -m tests.benchmarks.bench_file_upload [--size 20] [--pages 400]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from application.services.file_processor_service import FileProcessorService
+from tests.unit.application.test_file_processor_uploads import PNG, _pdf
+
+CHUNK = 65536
+
+
+async def _chunks(data: bytes):
+    for i in range(0, len(data), CHUNK):
+        yield data[i:i + CHUNK]
+
+
+async def _old_image(service: FileProcessorService, data: bytes, working_dir: str) -> None:
+    """As before: BytesIO download, base64 str, decoded again on save"""
+    file_content = BytesIO()
+    async for chunk in _chunks(data):
+        file_content.write(chunk)
+    file_content.seek(0)
+    processed = await service.process_file(file_content, "shot.png", "image/png")
+    del file_content
+    service.save_to_working_dir(processed, working_dir)
+
+
+async def _new_image(service: FileProcessorService, data: bytes, working_dir: str) -> None:
+    """Chunks appended to the upload file, processed from disk"""
+    path = service.create_upload_path()
+    with open(path, "wb") as f:
+        async for chunk in _chunks(data):
+            f.write(chunk)
+    processed = await service.process_upload(path, "shot.png", "image/png", working_dir)
+    service.save_to_working_dir(processed, working_dir)
+
+
+async def _peak_mb(upload, service, data: bytes, working_dir: str) -> float:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await upload(service, data, working_dir)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+async def _max_stall(stop: asyncio.Event) -> float:
+    """Longest gap between 1 ms ticks while the loop is busy elsewhere"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        worst = max(worst, now - last - 0.001)
+        last = now
+    return worst
+
+
+async def _stall_ms(parse) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_stall(stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await parse()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed * 1000, await ticker * 1000
+
+
+async def _run(size_mb: int, pages: int) -> None:
+    service = FileProcessorService()
+    service.MAX_IMAGE_SIZE = service.MAX_PDF_SIZE = (size_mb + 1) * 1024 * 1024
+    data = PNG + os.urandom(size_mb * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        old = await _peak_mb(_old_image, service, data, working_dir)
+        new = await _peak_mb(_new_image, service, data, working_dir)
+        print(f"image upload, {size_mb} MB:")
+        print(f"  BytesIO + base64 (old):   {old:8.1f} MB peak")
+        print(f"  streamed to disk:         {new:8.1f} MB peak")
+
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            print("pypdf not installed, skipping PDF")
+            return
+
+        pdf = _pdf(pages)
+
+        async def old_parse():
+            reader = PdfReader(BytesIO(pdf))
+            "\n".join(page.extract_text() for page in reader.pages)
+
+        path = os.path.join(working_dir, "report.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf)
+        await service._process_pdf(path)  # Start the pool outside the timing
+
+        old_ms, old_stall = await _stall_ms(old_parse)
+        new_ms, new_stall = await _stall_ms(lambda: service._process_pdf(path))
+        print(f"PDF, {pages} pages (pool reads the first {service.MAX_PDF_PAGES}):")
+        print(f"  pypdf on loop (old):      {old_ms:8.1f} ms, {old_stall:6.1f} ms max stall")
+        print(f"  process pool:             {new_ms:8.1f} ms, {new_stall:6.1f} ms max stall")
+        await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=400)
+    args = parser.parse_args()
+    asyncio.run(_run(args.size, args.pages))
+
+
+if __name__ == "__main__":
+    main()
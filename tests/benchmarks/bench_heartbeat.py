@@ -0,0 +1,128 @@
+"""
+Benchmark: heartbeat status updates for many concurrent streams.
+
+Runs --streams StreamingHandlers with a few KB of streamed content each,
+behind a real MessageUpdateCoordinator whose edits go to a no-op message.
+Compares a heartbeat task per stream calling set_status (a full
+re-render per tick) with the shared HeartbeatTicker and status-only
+refreshes. Intervals are scaled down (--interval) so the run is short.
+
+Usage:
+    python -m tests.benchmarks.bench_heartbeat [--streams 100] [--seconds 5] [--interval 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from presentation.handlers.state.update_coordinator import MessageUpdateCoordinator
+from presentation.handlers.streaming.handler import StreamingHandler
+from presentation.handlers.streaming.trackers import HeartbeatTicker, HeartbeatTracker
+
+CONTENT = (
+    "## Анализ\n\nСмотрю **модуль** `handler.py` и его тесты.\n\n"
+    "```python\ndef handler(event):\n    return event\n```\n\n"
+    "- пункт один\n- пункт два\n\n"
+) * 12
+
+
+class Message(SimpleNamespace):
+    edits = 0
+
+    async def edit_text(self, text, **kwargs):
+        Message.edits += 1
+
+
+async def _streams(count: int, coordinator: MessageUpdateCoordinator) -> list:
+    streams = []
+    for i in range(count):
+        message = Message(message_id=i, chat=SimpleNamespace(id=i))
+        streaming = StreamingHandler(None, chat_id=i, initial_message=message, coordinator=coordinator)
+        await streaming.append(CONTENT)
+        renders = {"count": 0}
+        render = streaming.ui.render_non_content
+
+        def counted(render=render, renders=renders):
+            renders["count"] += 1
+            return render()
+
+        streaming.ui.render_non_content = counted
+        streams.append((streaming, renders))
+    return streams
+
+
+async def _per_stream_loop(tracker: HeartbeatTracker) -> None:
+    """Heartbeat as before: own task, full set_status every interval"""
+    while tracker.is_running:
+        await tracker.streaming.set_status(tracker.build_status())
+        await asyncio.sleep(tracker.interval)
+
+
+async def _run_mode(shared: bool, count: int, seconds: float, interval: float) -> dict:
+    coordinator = MessageUpdateCoordinator(None, min_interval=interval, initial_interval=interval)
+    streams = await _streams(count, coordinator)
+    ticker = HeartbeatTicker(resolution=interval / 8)
+    tasks_before = asyncio.all_tasks()
+
+    trackers = []
+    loops = []
+    Message.edits = 0
+    cpu_started = time.process_time()
+    for streaming, _ in streams:
+        tracker = HeartbeatTracker(streaming, ticker=ticker)
+        tracker.interval = interval
+        trackers.append(tracker)
+        if shared:
+            await tracker.start()
+        else:
+            tracker.is_running = True
+            loops.append(asyncio.create_task(_per_stream_loop(tracker)))
+
+    await asyncio.sleep(seconds / 2)
+    timers = len(asyncio.all_tasks() - tasks_before)
+    await asyncio.sleep(seconds / 2)
+
+    for tracker in trackers:
+        await tracker.stop()
+    for loop in loops:
+        loop.cancel()
+    await asyncio.gather(*loops, return_exceptions=True)
+    await ticker.close()
+    cpu = time.process_time() - cpu_started
+
+    renders = sum(r["count"] for _, r in streams)
+    return {
+        "timers": timers,
+        "edits_per_s": Message.edits / seconds,
+        "renders_per_s": renders / seconds,
+        "cpu_ms_per_s": cpu / seconds * 1000,
+    }
+
+
+async def _run(count: int, seconds: float, interval: float) -> None:
+    print(f"streams: {count}, {seconds:.0f}s, heartbeat every {interval}s")
+    print(f"{'mode':<28} {'tasks':>6} {'edits/s':>8} {'renders/s':>10} {'CPU ms/s':>9}")
+    for label, shared in (("task per stream + set_status", False), ("shared ticker + status-only", True)):
+        stats = await _run_mode(shared, count, seconds, interval)
+        print(
+            f"{label:<28} {stats['timers']:>6} {stats['edits_per_s']:>8.1f} "
+            f"{stats['renders_per_s']:>10.1f} {stats['cpu_ms_per_s']:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(_run(args.streams, args.seconds, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: markdown_to_html over a streamed 50KB response.
+
+Feeds a synthetic Claude answer (prose, lists, inline code, fenced code
+blocks) in small chunks and renders the whole buffer after every chunk,
+once with markdown_to_html (full re-render) and once with
+StableHTMLFormatter.render_markdown (cached stable prefix). Every
+incremental result is checked to be byte-identical to the full render.
+
+Usage:
+    python -m tests.benchmarks.bench_markdown_render [--size 50000] [--chunk 80]
+"""
+
+import argparse
+import random
+import time
+
+from presentation.handlers.streaming.formatting import (
+    StableHTMLFormatter,
+    markdown_to_html,
+)
+
+
+def _build_response(size: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = "the handler parses each update and the **coordinator** keeps edits in order".split()
+    parts = []
+    total = 0
+    while total < size:
+        kind = rnd.random()
+        if kind < 0.55:
+            sentence = " ".join(rnd.choice(words) for _ in range(rnd.randint(20, 60)))
+            part = f"{sentence} with `inline_code()` and *emphasis* & <tags>.\n\n"
+        elif kind < 0.8:
+            items = "\n".join(
+                f"- **item {i}**: {' '.join(rnd.choice(words) for _ in range(8))}"
+                for i in range(rnd.randint(2, 6))
+            )
+            part = f"{items}\n\n"
+        else:
+            body = "\n".join(
+                f"    value_{i} = compute(x < {i} and y > {i})" for i in range(rnd.randint(3, 15))
+            )
+            part = f"```python\ndef step():\n{body}\n```\n\n"
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)[:size]
+
+
+def _run(size: int, chunk: int) -> None:
+    text = _build_response(size)
+    steps = list(range(chunk, len(text), chunk)) + [len(text)]
+
+    started = time.perf_counter()
+    full_outputs = [markdown_to_html(text[:end], is_streaming=True) for end in steps]
+    full = time.perf_counter() - started
+
+    formatter = StableHTMLFormatter()
+    started = time.perf_counter()
+    incremental_outputs = [formatter.render_markdown(text[:end], is_streaming=True) for end in steps]
+    incremental = time.perf_counter() - started
+
+    assert incremental_outputs == full_outputs, "incremental output differs from markdown_to_html"
+
+    print(f"response size:     {len(text)} chars, {len(steps)} renders")
+    print(f"full re-render:    {full * 1000:8.1f} ms total, {full / len(steps) * 1000:6.3f} ms/render")
+    print(f"incremental:       {incremental * 1000:8.1f} ms total, {incremental / len(steps) * 1000:6.3f} ms/render")
+    print(f"speedup:           {full / incremental:8.1f}x (outputs byte-identical)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--chunk", type=int, default=80)
+    args = parser.parse_args()
+    _run(args.size, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
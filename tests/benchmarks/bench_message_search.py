@@ -0,0 +1,142 @@
+"""
+Benchmark: full-text message search on a 1,000,000-message database.
+
+Fills context_messages and session_messages for several users (the FTS
+indexes are maintained by triggers during the load), then times
+SQLiteMessageSearchRepository.search for rare, common and prefix
+queries. The target is under 50 ms per query.
+
+Usage:
+    python -m tests.benchmarks.bench_message_search [--messages 1000000] [--users 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.message_search_repository import SQLiteMessageSearchRepository
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+from infrastructure.persistence.sqlite_repository import init_database
+
+VOCABULARY = [f"word{i}" for i in range(20_000)]
+COMMON = ["docker", "deploy", "error", "config", "python", "test", "commit", "branch"]
+QUERIES = {
+    "rare word": "word12345",
+    "common word": "docker",
+    "two words": "deploy error",
+    "prefix": "conf",
+    "no match": "zzzzzz",
+}
+BATCH = 10_000
+
+
+def _text(rng: random.Random) -> str:
+    words = rng.choices(VOCABULARY, k=rng.randint(10, 60))
+    words += rng.sample(COMMON, k=rng.randint(0, 2))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+async def _fill(manager, messages: int, users: int) -> None:
+    rng = random.Random(42)
+    now = datetime.now().isoformat()
+    contexts_per_user = 5
+    context_share = messages * 4 // 5  # The rest goes to bot sessions
+
+    async with manager.writer() as db:
+        for user in range(users):
+            await db.execute(
+                "INSERT INTO users (user_id, first_name) VALUES (?, ?)", (user, f"user{user}")
+            )
+            await db.execute(
+                "INSERT INTO sessions (session_id, user_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (f"s{user}", user, now, now)
+            )
+            for ctx in range(contexts_per_user):
+                await db.execute("""
+                    INSERT INTO project_contexts (id, project_id, user_id, name, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (f"c{user}-{ctx}", f"p{user}-{ctx % 2}", user, f"ctx{ctx}", now, now))
+
+    for start in range(0, messages, BATCH):
+        rows = range(start, min(messages, start + BATCH))
+        async with manager.writer() as db:
+            context_rows = [
+                (f"c{i % users}-{i % contexts_per_user}", ("user", "assistant")[i % 2], _text(rng), now)
+                for i in rows if i < context_share
+            ]
+            session_rows = [
+                (f"s{i % users}", ("user", "assistant")[i % 2], _text(rng), now)
+                for i in rows if i >= context_share
+            ]
+            if context_rows:
+                await db.executemany("""
+                    INSERT INTO context_messages (context_id, role, content, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, context_rows)
+            if session_rows:
+                await db.executemany("""
+                    INSERT INTO session_messages (session_id, role, content, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, session_rows)
+
+
+async def _time(repo, query: str, rounds: int, **kwargs) -> tuple:
+    latencies = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        page = await repo.search(UserId(3), query, **kwargs)
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies), max(latencies), len(page.hits)
+
+
+async def _run(messages: int, users: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SQLiteConnectionManager(os.path.join(tmp, "bench.db"))
+        await init_database(manager.db_path, manager)
+        await SQLiteProjectContextRepository(manager.db_path, manager).initialize()
+        repo = SQLiteMessageSearchRepository(manager.db_path, manager)
+        await repo.initialize()
+
+        started = time.perf_counter()
+        await _fill(manager, messages, users)
+        load = time.perf_counter() - started
+
+        print(f"database:          {messages} messages, {users} users (loaded in {load:.1f} s)")
+        print(f"{'query':<28} {'median':>10} {'max':>10} {'hits':>6}")
+        worst = 0.0
+        for label, query in QUERIES.items():
+            for scope, kwargs in (("all", {}), ("project", {"project_id": "p3-1"})):
+                median, slowest, hits = await _time(repo, query, rounds, **kwargs)
+                worst = max(worst, median)
+                name = f"{label} ({scope})"
+                print(f"{name:<28} {median * 1000:8.2f}ms {slowest * 1000:8.2f}ms {hits:>6}")
+        median, slowest, hits = await _time(repo, "docker", rounds, offset=50)
+        worst = max(worst, median)
+        print(f"{'common word (page 6)':<28} {median * 1000:8.2f}ms {slowest * 1000:8.2f}ms {hits:>6}")
+        print(f"worst median:      {worst * 1000:.2f} ms (target < 50 ms)")
+
+        await manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_run(args.messages, args.users, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
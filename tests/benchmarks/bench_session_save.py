@@ -0,0 +1,87 @@
+"""
+Benchmark: SQLiteSessionRepository.save on a 2,000-message session.
+
+Compares the incremental save path (append only new messages) with a
+full rewrite (a fresh, never-persisted Session entity for every save).
+
+Usage:
+    python -m tests.benchmarks.bench_session_save [--messages 2000] [--rounds 50]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from domain.entities.message import Message, MessageRole
+from domain.entities.session import Session
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.sqlite_repository import (
+    SQLiteSessionRepository,
+    init_database,
+)
+
+
+def _build_messages(count: int) -> list:
+    roles = (MessageRole.USER, MessageRole.ASSISTANT)
+    return [
+        Message(role=roles[i % 2], content=f"message {i} " + "x" * 200)
+        for i in range(count)
+    ]
+
+
+async def _run(messages: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SQLiteConnectionManager(os.path.join(tmp, "bench.db"))
+        await init_database(manager.db_path, manager)
+        repo = SQLiteSessionRepository(manager.db_path, manager)
+        user_id = UserId(1)
+
+        # Incremental: one entity, two new messages per round
+        session = Session(
+            session_id="incremental",
+            user_id=user_id,
+            messages=_build_messages(messages),
+        )
+        await repo.save(session)
+        started = time.perf_counter()
+        for i in range(rounds):
+            session.messages.append(Message(role=MessageRole.USER, content=f"q{i}"))
+            session.messages.append(Message(role=MessageRole.ASSISTANT, content=f"a{i}"))
+            await repo.save(session)
+        incremental = (time.perf_counter() - started) / rounds
+
+        # Full rewrite: fresh entity every round (the pre-incremental cost)
+        history = _build_messages(messages)
+        started = time.perf_counter()
+        for i in range(rounds):
+            history.append(Message(role=MessageRole.USER, content=f"q{i}"))
+            history.append(Message(role=MessageRole.ASSISTANT, content=f"a{i}"))
+            await repo.save(
+                Session(session_id="rewrite", user_id=user_id, messages=list(history))
+            )
+        rewrite = (time.perf_counter() - started) / rounds
+
+        await manager.close()
+
+    print(f"session size:      {messages} messages, {rounds} saves")
+    print(f"full rewrite:      {rewrite * 1000:8.2f} ms/save")
+    print(f"incremental:       {incremental * 1000:8.2f} ms/save")
+    print(f"speedup:           {rewrite / incremental:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(_run(args.messages, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: per-task startup of the Telegram MCP server.
+
+Before every task the Claude CLI started the Node.js telegram MCP server
+and ran the MCP handshake (initialize + tools/list) over stdio. The
+in-process server is built once per chat and answers tools/list from the
+bot process. Compares both per task.
+
+If telegram-mcp/build/index.js is missing (npm run build), the Node.js
+case falls back to a bare `node -e ""` start, a lower bound of the old
+cost.
+
+Usage:
+    python -m tests.benchmarks.bench_telegram_mcp [--tasks 20] [--node-server telegram-mcp/build/index.js]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import time
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+
+from mcp import types
+
+from infrastructure.claude_code.telegram_mcp import create_telegram_mcp_server
+
+CHAT_ID = 123456789
+
+
+async def _rpc(proc, message: dict) -> dict:
+    proc.stdin.write((json.dumps(message) + "\n").encode())
+    await proc.stdin.drain()
+    if "id" not in message:
+        return {}
+    while True:
+        line = await proc.stdout.readline()
+        if not line:
+            raise RuntimeError("MCP server exited during handshake")
+        response = json.loads(line)
+        if response.get("id") == message["id"]:
+            return response
+
+
+async def _node_server_task(node: str, server_path: str) -> float:
+    """Start the Node.js server and run initialize + tools/list"""
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        node, server_path,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env={**os.environ, "TELEGRAM_CHAT_ID": str(CHAT_ID)},
+    )
+    await _rpc(proc, {
+        "jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "1.0"},
+        },
+    })
+    await _rpc(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+    tools = await _rpc(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+    assert len(tools["result"]["tools"]) == 3
+    elapsed = time.perf_counter() - started
+    proc.kill()
+    await proc.wait()
+    return elapsed
+
+
+async def _node_bare_task(node: str) -> float:
+    """Start and exit Node.js without loading anything"""
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(node, "-e", "")
+    await proc.wait()
+    return time.perf_counter() - started
+
+
+async def _in_process_task(servers: dict) -> float:
+    """Get the chat's server (built on first use) and list its tools"""
+    started = time.perf_counter()
+    server = servers.get(CHAT_ID)
+    if server is None:
+        server = servers[CHAT_ID] = create_telegram_mcp_server(bot=None, default_chat_id=CHAT_ID)
+    handler = server["instance"].request_handlers[types.ListToolsRequest]
+    result = await handler(types.ListToolsRequest(method="tools/list"))
+    assert len(result.root.tools) == 3
+    return time.perf_counter() - started
+
+
+async def _run(tasks: int, server_path: str) -> None:
+    node = shutil.which("node")
+    if node is None:
+        print("node not found, nothing to compare against")
+        return
+
+    if os.path.isfile(server_path):
+        label = "node server + handshake"
+        node_times = [await _node_server_task(node, server_path) for _ in range(tasks)]
+    else:
+        label = "bare node start"
+        print(f"{server_path} not built, using a bare node start (lower bound)")
+        node_times = [await _node_bare_task(node) for _ in range(tasks)]
+
+    servers: dict = {}
+    first = await _in_process_task(servers)
+    in_process = [await _in_process_task(servers) for _ in range(tasks)]
+
+    node_ms = statistics.median(node_times) * 1000
+    in_process_ms = statistics.median(in_process) * 1000
+    print(f"tasks:                   {tasks}")
+    print(f"{label + ':':<24} {node_ms:8.1f} ms/task (median)")
+    print(f"in-process, first task:  {first * 1000:8.2f} ms")
+    print(f"in-process:              {in_process_ms:8.3f} ms/task (median)")
+    print(f"saved per task:          {node_ms - in_process_ms:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--node-server", default="telegram-mcp/build/index.js")
+    args = parser.parse_args()
+    asyncio.run(_run(args.tasks, args.node_server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Unit tests for the AccountService settings cache."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.services.account_service import AccountService, AccountSettings, AuthMode
+
+
+@pytest.fixture
+def repository():
+    """Account repository mock holding one user's settings."""
+    repo = Mock()
+    repo.find_by_user_id = AsyncMock(return_value=AccountSettings(
+        user_id=1,
+        auth_mode=AuthMode.ZAI_API,
+        model="glm-4.7",
+        language="en",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    ))
+    repo.save = AsyncMock()
+    repo.set_language = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def service(repository):
+    return AccountService(repository)
+
+
+class TestSettingsCache:
+    """Tests for read-through caching and write-through invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_path_reads_settings_once(self, service, repository):
+        await service.get_model(1)
+        await service.get_settings(1)
+        await service.get_auth_mode(1)
+        await service.get_user_language(1)
+
+        assert repository.find_by_user_id.await_count == 1
+        assert service.get_cache_stats()["hits"] == 3
+        assert service.get_cache_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_set_model_writes_through(self, service, repository):
+        await service.get_model(1)
+        await service.set_model(1, "glm-4.5-air")
+
+        assert await service.get_model(1) == "glm-4.5-air"
+        assert repository.find_by_user_id.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_set_auth_mode_writes_through(self, service, repository):
+        await service.set_auth_mode(1, AuthMode.LOCAL_MODEL)
+
+        assert await service.get_auth_mode(1) == AuthMode.LOCAL_MODEL
+        assert repository.find_by_user_id.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_set_language_invalidates(self, service, repository):
+        await service.get_user_language(1)
+        await service.set_user_language(1, "zh")
+
+        await service.get_user_language(1)
+
+        assert repository.find_by_user_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_set_zai_api_key_writes_through(self, service):
+        service._validate_zai_api_key = AsyncMock(return_value=(True, ""))
+
+        await service.set_zai_api_key(1, "key")
+
+        assert await service.has_zai_api_key(1)
+
+    @pytest.mark.asyncio
+    async def test_callers_cannot_modify_cached_settings(self, service):
+        settings = await service.get_settings(1)
+        settings.model = "changed"
+
+        assert (await service.get_settings(1)).model == "glm-4.7"
+
+    @pytest.mark.asyncio
+    async def test_failed_save_drops_entry(self, service, repository):
+        await service.get_settings(1)
+        repository.save.side_effect = RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError):
+            await service.set_model(1, "glm-4.5-air")
+
+        assert 1 not in service._settings_cache
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, repository):
+        service = AccountService(repository, cache_ttl=0)
+
+        await service.get_settings(1)
+        await service.get_settings(1)
+
+        assert repository.find_by_user_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_size_is_bounded(self, repository):
+        service = AccountService(repository, cache_size=2)
+
+        for user_id in (1, 2, 3):
+            await service.get_settings(user_id)
+
+        assert list(service._settings_cache) == [2, 3]
@@ -1,6 +1,7 @@
 """Unit tests for BotService application service."""
 
 import pytest
+import pytest_asyncio
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
 import uuid
@@ -122,6 +123,90 @@ class TestBotServiceUserManagement:
         assert result is None  # Cannot execute commands
 
 
+class TestBotServiceAuthorizationCache:
+    """Tests for the authorize_user cache."""
+
+    @pytest.fixture
+    def user_repository(self, tmp_path):
+        """Real SQLite user repository, so save/delete notify the cache."""
+        from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+        from infrastructure.persistence.sqlite_repository import SQLiteUserRepository
+
+        manager = SQLiteConnectionManager(str(tmp_path / "users.db"))
+        return SQLiteUserRepository(manager.db_path, manager)
+
+    @pytest.fixture
+    def bot_service(self, user_repository, mock_session_repository, mock_command_repository):
+        """Create BotService on the real user repository."""
+        return BotService(
+            user_repository=user_repository,
+            session_repository=mock_session_repository,
+            command_repository=mock_command_repository
+        )
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def users_table(self, user_repository):
+        from infrastructure.persistence.sqlite_repository import init_database
+        await init_database(user_repository.db_path, user_repository._db)
+        yield
+        await user_repository._db.close()
+
+    @pytest.mark.asyncio
+    async def test_repeat_updates_skip_repository(self, bot_service, user_repository, user):
+        await user_repository.save(user)
+        user_repository.find_by_id = AsyncMock(wraps=user_repository.find_by_id)
+
+        for _ in range(5):
+            assert await bot_service.authorize_user(123456789) == user
+
+        assert user_repository.find_by_id.await_count == 1
+        assert bot_service.auth_cache_hits == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_cached_until_created(self, bot_service, user_repository, user):
+        user_repository.find_by_id = AsyncMock(wraps=user_repository.find_by_id)
+
+        assert await bot_service.authorize_user(123456789) is None
+        assert await bot_service.authorize_user(123456789) is None
+        assert user_repository.find_by_id.await_count == 1
+
+        await user_repository.save(user)
+
+        assert await bot_service.authorize_user(123456789) == user
+
+    @pytest.mark.asyncio
+    async def test_deactivation_takes_effect_immediately(self, bot_service, user_repository, user):
+        await user_repository.save(user)
+        assert await bot_service.authorize_user(123456789) == user
+
+        user.deactivate()
+        await user_repository.save(user)
+
+        assert await bot_service.authorize_user(123456789) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates(self, bot_service, user_repository, user):
+        await user_repository.save(user)
+        assert await bot_service.authorize_user(123456789) == user
+
+        await user_repository.delete(user.user_id)
+
+        assert await bot_service.authorize_user(123456789) is None
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, user_repository, mock_session_repository, mock_command_repository, user):
+        bot_service = BotService(
+            user_repository, mock_session_repository, mock_command_repository, auth_cache_ttl=0
+        )
+        await user_repository.save(user)
+        user_repository.find_by_id = AsyncMock(wraps=user_repository.find_by_id)
+
+        await bot_service.authorize_user(123456789)
+        await bot_service.authorize_user(123456789)
+
+        assert user_repository.find_by_id.await_count == 2
+
+
 class TestBotServiceSessionManagement:
     """Tests for BotService session management methods."""
 
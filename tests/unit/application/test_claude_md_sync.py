@@ -0,0 +1,130 @@
+"""Unit tests for the debounced CLAUDE.md sync in ContextService."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.services.context_service import ContextService
+from domain.entities.project_context import ContextVariable
+from domain.value_objects.user_id import UserId
+
+
+@pytest.fixture
+def claude_md(tmp_path, monkeypatch):
+    """Point the home directory at a temp dir and return the CLAUDE.md path."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path / ".claude" / "CLAUDE.md"
+
+
+@pytest.fixture
+def repository():
+    """Context repository mock storing global variables in a dict."""
+    variables = {}
+    repo = Mock()
+
+    async def set_global_variable(user_id, name, value, description=""):
+        variables[name] = ContextVariable(name=name, value=value, description=description)
+
+    async def delete_global_variable(user_id, name):
+        return variables.pop(name, None) is not None
+
+    repo.set_global_variable = AsyncMock(side_effect=set_global_variable)
+    repo.delete_global_variable = AsyncMock(side_effect=delete_global_variable)
+    repo.get_global_variables = AsyncMock(side_effect=lambda user_id: dict(variables))
+    return repo
+
+
+@pytest.fixture
+def service(repository):
+    service = ContextService(repository)
+    service.CLAUDE_MD_SYNC_DELAY = 0.01
+    return service
+
+
+async def wait_for_sync(service):
+    while service._claude_md_tasks:
+        await asyncio.sleep(0.01)
+
+
+class TestClaudeMdSync:
+    """Tests for debouncing and atomic writes."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_changes_is_one_write(self, service, repository, claude_md):
+        service._write_claude_md = Mock(wraps=service._write_claude_md)
+
+        for i in range(10):
+            await service.set_global_variable(UserId(1), f"VAR_{i}", f"value {i}")
+        await wait_for_sync(service)
+
+        assert service._write_claude_md.call_count == 1
+        content = claude_md.read_text()
+        assert all(f"### VAR_{i}" in content for i in range(10))
+
+    @pytest.mark.asyncio
+    async def test_keeps_user_content_and_skips_unchanged(self, service, claude_md):
+        claude_md.parent.mkdir(parents=True)
+        claude_md.write_text("# My notes\n\nkeep me\n")
+
+        await service.set_global_variable(UserId(1), "TOKEN", "abc")
+        await wait_for_sync(service)
+        mtime = claude_md.stat().st_mtime_ns
+
+        assert await service.sync_global_variables_to_claude_md(UserId(1))
+
+        assert claude_md.read_text().startswith("# My notes\n\nkeep me\n")
+        assert claude_md.stat().st_mtime_ns == mtime
+
+    @pytest.mark.asyncio
+    async def test_replaces_section_and_leaves_no_temp_files(self, service, claude_md):
+        await service.set_global_variable(UserId(1), "PATH_VAR", r"C:\new\1")
+        await wait_for_sync(service)
+        await service.delete_global_variable(UserId(1), "PATH_VAR")
+        await service.set_global_variable(UserId(1), "OTHER", "x")
+        await wait_for_sync(service)
+
+        content = claude_md.read_text()
+        assert content.count(service.CLAUDE_MD_START_MARKER) == 1
+        assert "PATH_VAR" not in content
+        assert "### OTHER" in content
+        assert [p.name for p in claude_md.parent.iterdir()] == ["CLAUDE.md"]
+
+    @pytest.mark.asyncio
+    async def test_backslashes_are_written_verbatim(self, service, claude_md):
+        await service.set_global_variable(UserId(1), "PATH_VAR", r"C:\new\1")
+        await wait_for_sync(service)
+        await service.set_global_variable(UserId(1), "PATH_VAR", r"D:\old\2")
+        await wait_for_sync(service)
+
+        assert r"D:\old\2" in claude_md.read_text()
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_pending_changes(self, service, claude_md):
+        service.CLAUDE_MD_SYNC_DELAY = 60
+
+        await service.set_global_variable(UserId(1), "TOKEN", "abc")
+        assert not claude_md.exists()
+
+        await service.flush_claude_md_sync()
+
+        assert "### TOKEN" in claude_md.read_text()
+        assert not service._claude_md_tasks
+
+    @pytest.mark.asyncio
+    async def test_flush_during_running_sync_keeps_change(self, service, repository, claude_md):
+        await service.set_global_variable(UserId(1), "TOKEN", "abc")
+        reading = asyncio.Event()
+        get_global_variables = repository.get_global_variables.side_effect
+
+        async def slow_get_global_variables(user_id):
+            reading.set()
+            await asyncio.sleep(60)
+
+        repository.get_global_variables.side_effect = slow_get_global_variables
+        await reading.wait()
+        repository.get_global_variables.side_effect = get_global_variables
+
+        await service.flush_claude_md_sync()
+
+        assert "### TOKEN" in claude_md.read_text()
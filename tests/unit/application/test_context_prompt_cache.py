@@ -0,0 +1,104 @@
+"""Unit tests for the ContextService enriched prompt cache."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.services.context_service import ContextService
+from domain.entities.project_context import ContextVariable, ProjectContext
+from domain.value_objects.user_id import UserId
+
+
+def variable(name, value):
+    return ContextVariable(name=name, value=value)
+
+
+@pytest.fixture
+def repository():
+    """Context repository mock with one context and one global variable."""
+    context = ProjectContext(id="ctx-1", project_id="project-1", user_id=UserId(1), name="main")
+    context.variables = {"HOST": variable("HOST", "example.com")}
+
+    repo = Mock()
+    repo.find_by_id = AsyncMock(return_value=context)
+    repo.get_global_variables = AsyncMock(return_value={"TOKEN": variable("TOKEN", "secret")})
+    repo.get_variables = AsyncMock(return_value=dict(context.variables))
+    repo.set_variable = AsyncMock()
+    repo.delete_variable = AsyncMock(return_value=True)
+    repo.set_global_variable = AsyncMock()
+    repo.delete_global_variable = AsyncMock(return_value=True)
+    return repo
+
+
+@pytest.fixture
+def service(repository):
+    service = ContextService(repository)
+    service.schedule_claude_md_sync = Mock()
+    return service
+
+
+class TestEnrichedPromptCache:
+    """Tests for the cached variables block."""
+
+    @pytest.mark.asyncio
+    async def test_merges_global_and_context_variables(self, service, repository):
+        prompt = await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        assert "HOST=example.com" in prompt
+        assert "TOKEN=secret" in prompt
+        assert prompt.endswith("---\n\nhello")
+        # Context variables come with find_by_id, not a second query
+        repository.get_variables.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_repeat_prompts_hit_cache(self, service, repository):
+        first = await service.get_enriched_prompt("ctx-1", "one", user_id=UserId(1))
+        second = await service.get_enriched_prompt("ctx-1", "two", user_id=UserId(1))
+
+        assert first.replace("one", "two") == second
+        assert repository.find_by_id.await_count == 1
+        assert repository.get_global_variables.await_count == 1
+        assert service.get_prompt_cache_stats()["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("change", [
+        lambda s: s.set_variable("ctx-1", "HOST", "other.com"),
+        lambda s: s.delete_variable("ctx-1", "HOST"),
+        lambda s: s.set_global_variable(UserId(1), "TOKEN", "new"),
+        lambda s: s.delete_global_variable(UserId(1), "TOKEN"),
+    ])
+    async def test_variable_changes_invalidate(self, service, repository, change):
+        await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        await change(service)
+        await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        assert repository.find_by_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_other_users_globals_do_not_invalidate(self, service, repository):
+        await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        await service.set_global_variable(UserId(2), "TOKEN", "new")
+        await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        assert repository.find_by_id.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_context_returns_prompt(self, service, repository):
+        repository.find_by_id.return_value = None
+
+        assert await service.get_enriched_prompt("gone", "hello", user_id=UserId(1)) == "hello"
+
+    @pytest.mark.asyncio
+    async def test_token_budget_truncates_large_values(self, repository):
+        repository.get_global_variables.return_value = {"KEY": variable("KEY", "x" * 10_000)}
+        service = ContextService(repository, variable_token_budget=10)
+
+        prompt = await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+        await service.get_enriched_prompt("ctx-1", "hello", user_id=UserId(1))
+
+        assert "KEY=" + "x" * 40 + "… [truncated, 10000 chars total]" in prompt
+        assert "HOST=example.com" in prompt
+        saved_per_prompt = 10_000 - 40 - len("… [truncated, 10000 chars total]")
+        assert service.get_prompt_cache_stats()["chars_saved"] == 2 * saved_per_prompt
@@ -0,0 +1,85 @@
+"""Unit tests for paged, cached directory listings in FileBrowserService."""
+
+import os
+
+import pytest
+
+from application.services.file_browser_service import FileBrowserService
+from presentation.keyboards.keyboards import Keyboards
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = FileBrowserService(root_path=str(tmp_path))
+    service.MAX_ENTRIES = 3
+    return service
+
+
+@pytest.fixture
+def big_dir(tmp_path):
+    directory = tmp_path / "node_modules"
+    directory.mkdir()
+    for name in ("b", "D", "a"):
+        (directory / name).mkdir()
+    for name in ("z.js", "c.js", "Y.js", ".hidden"):
+        (directory / name).write_text("x" * 10)
+    return directory
+
+
+class TestListDirectory:
+    """Tests for sorting, paging and caching of listings."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_whole_sorted_listing(self, service, big_dir):
+        first = await service.list_directory(str(big_dir))
+        second = await service.list_directory(str(big_dir), first.next_token)
+
+        names = [e.name for page in (first, second) for e in page.entries]
+        assert names == ["a", "b", "D", "c.js", "Y.js", "z.js"]
+        assert (first.total, first.offset, second.offset) == (6, 0, 3)
+        assert first.prev_token is None and second.next_token is None
+        assert second.entries[0].size == 10
+        back = await service.list_directory(str(big_dir), second.prev_token)
+        assert back.entries == first.entries
+
+    @pytest.mark.asyncio
+    async def test_listing_cached_until_directory_changes(self, service, big_dir):
+        await service.list_directory(str(big_dir))
+        await service.list_directory(str(big_dir))
+        assert service.get_listing_cache_stats()["hits"] == 1
+
+        (big_dir / "0.js").write_text("")
+        os.utime(big_dir, ns=(0, os.stat(big_dir).st_mtime_ns + 1))
+        content = await service.list_directory(str(big_dir))
+
+        assert service.get_listing_cache_stats()["misses"] == 2
+        assert content.total == 7
+
+    @pytest.mark.asyncio
+    async def test_page_token_stable_when_earlier_entries_change(self, service, big_dir):
+        first = await service.list_directory(str(big_dir))
+        (big_dir / "a").rmdir()
+        os.utime(big_dir, ns=(0, os.stat(big_dir).st_mtime_ns + 1))
+
+        second = await service.list_directory(str(big_dir), first.next_token)
+
+        assert second.entries[0].name == "c.js"
+        assert service.get_page_path(first.next_token) == str(big_dir)
+        assert service.get_page_path("unknown") is None
+
+    @pytest.mark.asyncio
+    async def test_outside_root_falls_back_to_root(self, service, tmp_path):
+        content = await service.list_directory(str(tmp_path.parent))
+
+        assert content.path == str(tmp_path)
+        assert content.is_root
+
+    @pytest.mark.asyncio
+    async def test_keyboard_and_tree_show_pages(self, service, big_dir):
+        content = await service.list_directory(str(big_dir))
+
+        keyboard = Keyboards.file_browser(content)
+        callbacks = [b.callback_data for row in keyboard.inline_keyboard for b in row]
+
+        assert f"cd:page:{content.next_token}" in callbacks
+        assert "Показано 1–3 из 6" in service.render_tree_view(content)
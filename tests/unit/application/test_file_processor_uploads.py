@@ -0,0 +1,202 @@
+"""Unit tests for processing uploads streamed to disk by FileProcessorService."""
+
+import multiprocessing
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from application.services.file_processor_service import FileProcessorService, FileType
+from presentation.handlers.message.file_handler import FileMessageHandler
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def _pdf(pages: int) -> bytes:
+    """Minimal PDF with one line of text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(pages)), pages
+        ),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (Page %d) Tj ET" % (i + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return data
+
+
+@pytest.fixture
+def service():
+    return FileProcessorService()
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    """System temp dir for downloads, isolated per test."""
+    path = tmp_path / "tmp"
+    path.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(path))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    path = tmp_path / "project"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def upload(service, temp_dir):
+    """Write bytes to a fresh upload path, as a download would."""
+    def _write(data: bytes) -> str:
+        path = service.create_upload_path()
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    return _write
+
+
+class TestProcessUpload:
+    """Tests for type sniffing, size checks and saving of uploads."""
+
+    @pytest.mark.asyncio
+    async def test_image_moved_to_project_uploads(self, service, upload, project, temp_dir):
+        processed = await service.process_upload(
+            upload(PNG), "../photo.jpg", "image/jpeg", str(project)
+        )
+
+        assert processed.is_valid
+        assert processed.file_type == FileType.IMAGE
+        assert processed.mime_type == "image/png"  # From the header, not the name
+        assert processed.content == ""
+        assert processed.saved_path == str(project / ".uploads" / "photo.jpg")
+        assert service.save_to_working_dir(processed, str(project)) == processed.saved_path
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_image_stays_in_temp_when_project_is_not_writable(
+        self, service, upload, tmp_path, temp_dir
+    ):
+        not_a_dir = tmp_path / "project"  # .uploads cannot be created under a file
+        not_a_dir.write_text("")
+
+        processed = await service.process_upload(upload(PNG), "photo.png", None, str(not_a_dir))
+
+        assert processed.is_valid
+        assert os.path.dirname(processed.saved_path) == str(temp_dir)
+        assert os.path.isfile(processed.saved_path)
+
+    @pytest.mark.asyncio
+    async def test_rejected_upload_is_removed(self, service, upload, temp_dir, monkeypatch):
+        mismatch = await service.process_upload(upload(b"not an image"), "photo.png")
+        monkeypatch.setattr(service, "MAX_TEXT_SIZE", 4)
+        too_large = await service.process_upload(upload(b"12345"), "notes.txt")
+
+        assert "не соответствует расширению .png" in mismatch.error
+        assert "слишком большой" in too_large.error
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_text_is_decoded_and_not_kept(self, service, upload, project, temp_dir):
+        processed = await service.process_upload(
+            upload("привет".encode()), "notes.md", None, str(project)
+        )
+
+        assert processed.content == "привет"
+        assert processed.size_bytes == len("привет".encode())
+        assert processed.saved_path is None
+        assert os.listdir(temp_dir) == []
+        assert os.listdir(project) == []
+
+    @pytest.mark.asyncio
+    async def test_pdf_extracted_in_process_pool_up_to_page_limit(self, service, upload, temp_dir):
+        pytest.importorskip("pypdf")
+        service.MAX_PDF_PAGES = 2
+
+        processed = await service.process_upload(upload(_pdf(3)), "report.pdf")
+
+        assert processed.file_type == FileType.PDF
+        assert "Page 1" in processed.content and "Page 2" in processed.content
+        assert "Page 3" not in processed.content
+        assert "первые 2 из 3 страниц" in processed.content
+        assert os.listdir(temp_dir) == []
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_pdf_timeout_terminates_pool(self, service, upload):
+        service.PDF_TIMEOUT = 0.001  # Меньше, чем запуск spawn-воркера
+        service._pdf_pool = pool = multiprocessing.get_context("spawn").Pool(1)
+
+        processed = await service.process_upload(upload(_pdf(1)), "report.pdf")
+
+        assert "превышено время обработки" in processed.content
+        assert service._pdf_pool is None
+        with pytest.raises(ValueError):  # Pool not running
+            pool.apply_async(print)
+        await service.close()
+
+
+class FakeBot:
+    """Writes `data` to the download destination, or fails."""
+
+    def __init__(self, data: bytes = b"", error: Exception = None):
+        self.data = data
+        self.error = error
+
+    async def get_file(self, file_id):
+        return SimpleNamespace(file_path=f"documents/{file_id}")
+
+    async def download_file(self, file_path, destination=None, **kwargs):
+        if self.error:
+            raise self.error
+        with open(destination, "wb") as f:
+            f.write(self.data)
+
+
+class TestDownloadAndProcess:
+    """Tests for FileMessageHandler downloading straight to disk."""
+
+    @pytest.fixture
+    def handler(self, service):
+        return FileMessageHandler(
+            Mock(), Mock(), Mock(), Mock(), Mock(), Mock(), file_processor_service=service
+        )
+
+    @pytest.mark.asyncio
+    async def test_image_download_lands_in_uploads(self, handler, project, temp_dir):
+        processed = await handler._download_and_process(
+            FakeBot(PNG), "file-1", "shot.png", None, str(project)
+        )
+
+        assert processed.is_valid
+        assert os.listdir(project / ".uploads") == ["shot.png"]
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_download_leaves_no_temp_file(self, handler, project, temp_dir):
+        with pytest.raises(RuntimeError):
+            await handler._download_and_process(
+                FakeBot(error=RuntimeError("timeout")), "file-1", "shot.png", None, str(project)
+            )
+
+        assert os.listdir(temp_dir) == []
+        assert os.listdir(project) == []
@@ -165,3 +165,37 @@ class TestSession:
         assert len(history) == 2
         assert history[0] == {"role": "user", "content": "Hello"}
         assert history[1] == {"role": "assistant", "content": "Hi!"}
+
+    def test_unsaved_messages_none_until_persisted(self, session, message):
+        """Test that a never-stored session needs a full save."""
+        session.add_message(message)
+
+        assert session.get_unsaved_messages() is None
+
+    def test_unsaved_messages_after_mark_persisted(self, session):
+        """Test that only messages appended after mark_persisted are unsaved."""
+        session.add_message(Message(role=MessageRole.USER, content="Hello"))
+        session.mark_persisted(("row",))
+        assert session.get_unsaved_messages() == []
+        assert session.persisted_state == ("row",)
+
+        reply = Message(role=MessageRole.ASSISTANT, content="Hi!")
+        session.add_message(reply)
+
+        assert session.get_unsaved_messages() == [reply]
+
+    def test_unsaved_messages_none_after_history_rewrite(self, session):
+        """Test that clearing or pruning history forces a full save."""
+        for i in range(5):
+            session.add_message(Message(role=MessageRole.USER, content=f"m{i}"))
+        session.mark_persisted()
+
+        session.prune_old_messages(keep_recent=2)
+        assert session.get_unsaved_messages() is None
+
+        session.mark_persisted()
+        session.clear_messages()
+        session.add_message(Message(role=MessageRole.USER, content="new"))
+        session.add_message(Message(role=MessageRole.USER, content="newer"))
+        session.add_message(Message(role=MessageRole.USER, content="newest"))
+        assert session.get_unsaved_messages() is None
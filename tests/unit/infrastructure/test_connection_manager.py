@@ -0,0 +1,144 @@
+"""Unit tests for the shared SQLite connection manager."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from infrastructure.persistence.connection_manager import (
+    SQLiteConnectionManager,
+    get_connection_manager,
+)
+from infrastructure.persistence.sqlite_repository import (
+    SQLiteUserRepository,
+    init_database,
+)
+from domain.value_objects.user_id import UserId
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    """Create a connection manager on a temporary database."""
+    mgr = SQLiteConnectionManager(str(tmp_path / "test.db"), readers=2)
+    yield mgr
+    await mgr.close()
+
+
+class TestSQLiteConnectionManager:
+    """Tests for SQLiteConnectionManager."""
+
+    @pytest.mark.asyncio
+    async def test_writer_commits_on_exit(self, manager):
+        async with manager.writer() as db:
+            await db.execute("CREATE TABLE t (x INTEGER)")
+            await db.execute("INSERT INTO t VALUES (1)")
+
+        async with manager.reader() as db:
+            async with db.execute("SELECT x FROM t") as cursor:
+                rows = await cursor.fetchall()
+        assert [row["x"] for row in rows] == [1]
+
+    @pytest.mark.asyncio
+    async def test_writer_rolls_back_on_error(self, manager):
+        async with manager.writer() as db:
+            await db.execute("CREATE TABLE t (x INTEGER)")
+
+        with pytest.raises(RuntimeError):
+            async with manager.writer() as db:
+                await db.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+
+        async with manager.reader() as db:
+            async with db.execute("SELECT COUNT(*) FROM t") as cursor:
+                assert (await cursor.fetchone())[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied(self, manager):
+        async with manager.reader() as db:
+            async with db.execute("PRAGMA journal_mode") as cursor:
+                assert (await cursor.fetchone())[0] == "wal"
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, manager):
+        async with manager.writer() as db:
+            await db.execute("CREATE TABLE t (x INTEGER)")
+
+        async def read():
+            async with manager.reader() as db:
+                async with db.execute("SELECT COUNT(*) FROM t") as cursor:
+                    return (await cursor.fetchone())[0]
+
+        results = await asyncio.gather(*(read() for _ in range(20)))
+
+        assert results == [0] * 20
+        metrics = manager.get_metrics()
+        # 1 writer + 2 readers, regardless of how many queries ran
+        assert metrics["open_connections"] == 3
+        assert metrics["idle_readers"] == 2
+        assert metrics["reader_acquisitions"] == 20
+        assert metrics["writer_acquisitions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_in_memory_database_uses_single_connection(self):
+        mgr = SQLiteConnectionManager(":memory:")
+        try:
+            async with mgr.writer() as db:
+                await db.execute("CREATE TABLE t (x INTEGER)")
+                await db.execute("INSERT INTO t VALUES (7)")
+            async with mgr.reader() as db:
+                async with db.execute("SELECT x FROM t") as cursor:
+                    assert (await cursor.fetchone())[0] == 7
+            assert mgr.get_metrics()["open_connections"] == 1
+        finally:
+            await mgr.close()
+
+    @pytest.mark.asyncio
+    async def test_closed_manager_rejects_use(self, manager):
+        await manager.close()
+        with pytest.raises(RuntimeError):
+            async with manager.reader():
+                pass
+
+    def test_get_connection_manager_is_shared_per_path(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        assert get_connection_manager(path) is get_connection_manager(path)
+
+    def test_get_connection_manager_applies_readers_on_creation(self, tmp_path):
+        path = str(tmp_path / "sized.db")
+        manager = get_connection_manager(path, readers=2)
+
+        assert manager.max_readers == 2
+        assert get_connection_manager(path) is manager
+
+    @pytest.mark.asyncio
+    async def test_repository_uses_shared_pool(self, manager, user):
+        await init_database(manager.db_path, manager)
+        repo = SQLiteUserRepository(manager.db_path, manager)
+
+        await repo.save(user)
+        for _ in range(10):
+            assert await repo.find_by_id(user.user_id) is not None
+        assert await repo.find_by_id(UserId(1)) is None
+
+        assert manager.get_metrics()["open_connections"] == 3
+
+
+class TestContainerConnectionManager:
+    """Tests for the container sharing the per-file registry."""
+
+    @pytest.mark.asyncio
+    async def test_container_pool_is_the_shared_one(self, tmp_path):
+        from infrastructure.persistence.sqlite_account_repository import SQLiteAccountRepository
+        from shared.container import Config, Container
+
+        path = str(tmp_path / "bot.db")
+        container = Container(Config(database_url=f"sqlite:///{path}", database_pool_readers=2))
+        manager = container.connection_manager()
+
+        assert manager is get_connection_manager(path)
+        assert SQLiteAccountRepository(path)._db is manager
+        assert manager.max_readers == 2
+
+        await container.close()
+
+        assert manager._closed
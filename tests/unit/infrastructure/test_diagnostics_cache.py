@@ -0,0 +1,98 @@
+"""Tests for cached Claude Code CLI diagnostics."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from infrastructure.claude_code import diagnostics
+
+
+def _test(name: str, passed: bool = True, output: str = "") -> dict:
+    return {"name": name, "passed": passed, "output": output, "error": ""}
+
+
+@pytest.fixture
+def fake_cli():
+    """Replace subprocess-backed tests with instant fakes."""
+    prompt = AsyncMock(return_value=_test(diagnostics.SIMPLE_PROMPT_TEST, output="OK"))
+    version = AsyncMock(return_value=_test("Version check", output="1.0.0 (Claude Code)"))
+    with patch.object(diagnostics, "_test_binary_exists", AsyncMock(return_value=_test("Binary exists"))), \
+            patch.object(diagnostics, "_test_version", version), \
+            patch.object(diagnostics, "_test_help", AsyncMock(return_value=_test("Help output"))), \
+            patch.object(diagnostics, "_test_environment", return_value=_test("Environment")), \
+            patch.object(diagnostics, "_test_simple_prompt", prompt):
+        yield version, prompt
+
+
+class TestRunDiagnostics:
+    @pytest.mark.asyncio
+    async def test_skips_prompt_when_not_requested(self, fake_cli):
+        _, prompt = fake_cli
+
+        results = await diagnostics.run_diagnostics("claude", include_prompt=False)
+
+        prompt.assert_not_called()
+        assert [t["name"] for t in results["tests"]] == [
+            "Binary exists", "Version check", "Help output", "Environment",
+        ]
+        assert results["working"] is True
+
+
+class TestRunCachedDiagnostics:
+    @pytest.mark.asyncio
+    async def test_prompt_result_reused_for_same_version(self, fake_cli, tmp_path):
+        _, prompt = fake_cli
+        cache = tmp_path / "diag.json"
+
+        first = await diagnostics.run_cached_diagnostics("claude", cache)
+        second = await diagnostics.run_cached_diagnostics("claude", cache)
+
+        assert prompt.await_count == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["tests"][-1]["output"] == "OK"
+        assert second["summary"] == "Passed 5/5 tests"
+
+    @pytest.mark.asyncio
+    async def test_version_change_reruns_prompt(self, fake_cli, tmp_path):
+        version, prompt = fake_cli
+        cache = tmp_path / "diag.json"
+
+        await diagnostics.run_cached_diagnostics("claude", cache)
+        version.return_value = _test("Version check", output="1.1.0 (Claude Code)")
+        results = await diagnostics.run_cached_diagnostics("claude", cache)
+
+        assert prompt.await_count == 2
+        assert results["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_force_prompt_bypasses_cache(self, fake_cli, tmp_path):
+        _, prompt = fake_cli
+        cache = tmp_path / "diag.json"
+
+        await diagnostics.run_cached_diagnostics("claude", cache)
+        await diagnostics.run_cached_diagnostics("claude", cache, force_prompt=True)
+
+        assert prompt.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_prompt_not_cached(self, fake_cli, tmp_path):
+        _, prompt = fake_cli
+        prompt.return_value = _test(diagnostics.SIMPLE_PROMPT_TEST, passed=False)
+        cache = tmp_path / "diag.json"
+
+        await diagnostics.run_cached_diagnostics("claude", cache)
+        results = await diagnostics.run_cached_diagnostics("claude", cache)
+
+        assert prompt.await_count == 2
+        assert results["working"] is False
+        assert not cache.exists()
+
+    @pytest.mark.asyncio
+    async def test_corrupt_cache_is_ignored(self, fake_cli, tmp_path):
+        cache = tmp_path / "diag.json"
+        cache.write_text("{not json")
+
+        results = await diagnostics.run_cached_diagnostics("claude", cache)
+
+        assert results["cached"] is False
@@ -0,0 +1,150 @@
+"""Unit tests for FTS5 message search."""
+
+import pytest
+import pytest_asyncio
+
+from domain.entities.message_search import HIGHLIGHT_END, HIGHLIGHT_START
+from domain.entities.message import Message, MessageRole
+from domain.entities.session import Session
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence import message_search_repository as search_module
+from infrastructure.persistence.message_search_repository import (
+    SQLiteMessageSearchRepository,
+    build_match_query,
+)
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+from infrastructure.persistence.sqlite_repository import SQLiteSessionRepository, init_database
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    manager = SQLiteConnectionManager(str(tmp_path / "search.db"))
+    await init_database(manager.db_path, manager)
+    yield manager
+    await manager.close()
+
+
+@pytest_asyncio.fixture
+async def contexts(manager):
+    repo = SQLiteProjectContextRepository(manager.db_path, manager)
+    await repo.initialize()
+    return repo
+
+
+@pytest_asyncio.fixture
+async def search(manager, contexts):
+    repo = SQLiteMessageSearchRepository(manager.db_path, manager)
+    await repo.initialize()
+    return repo
+
+
+class TestBuildMatchQuery:
+    def test_quotes_words_and_prefixes_last(self):
+        assert build_match_query("docker deploy") == '"docker" "deploy"*'
+
+    def test_fts_syntax_is_literal(self):
+        assert build_match_query('NOT a* OR "b"') == '"NOT" "a" "OR" "b"*'
+
+    def test_no_words(self):
+        assert build_match_query("  ?! ") is None
+
+
+class TestMessageSearch:
+    @pytest.mark.asyncio
+    async def test_finds_context_messages_with_highlight(self, contexts, search):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(ctx.id, "assistant", "Restart the docker container with compose")
+        await contexts.add_message(ctx.id, "user", "unrelated text")
+
+        page = await search.search(UserId(1), "docker")
+
+        assert len(page.hits) == 1
+        hit = page.hits[0]
+        assert hit.source == "context"
+        assert hit.context_name == "main"
+        assert f"{HIGHLIGHT_START}docker{HIGHLIGHT_END}" in hit.snippet
+
+    @pytest.mark.asyncio
+    async def test_results_are_scoped_to_user(self, contexts, search):
+        mine = await contexts.create_new("p1", UserId(1), "main")
+        theirs = await contexts.create_new("p2", UserId(2), "main")
+        await contexts.add_message(mine.id, "user", "secret plan")
+        await contexts.add_message(theirs.id, "user", "secret plan too")
+
+        page = await search.search(UserId(1), "secret")
+
+        assert [h.context_id for h in page.hits] == [mine.id]
+
+    @pytest.mark.asyncio
+    async def test_project_filter_skips_sessions(self, manager, contexts, search):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(ctx.id, "user", "nginx config")
+        sessions = SQLiteSessionRepository(manager.db_path, manager)
+        session = Session(session_id="s1", user_id=UserId(1))
+        session.add_message(Message(role=MessageRole.USER, content="nginx reload"))
+        await sessions.save(session)
+
+        everything = await search.search(UserId(1), "nginx")
+        project_only = await search.search(UserId(1), "nginx", project_id="p1")
+
+        assert {h.source for h in everything.hits} == {"context", "session"}
+        assert [h.source for h in project_only.hits] == ["context"]
+
+    @pytest.mark.asyncio
+    async def test_project_filter_applies_before_window(self, contexts, search, monkeypatch):
+        monkeypatch.setattr(search_module, "SEARCH_WINDOW", 2)
+        old = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(old.id, "user", "redis eviction")
+        newer = await contexts.create_new("p2", UserId(1), "main")
+        for i in range(3):
+            await contexts.add_message(newer.id, "user", f"redis cluster {i}")
+
+        page = await search.search(UserId(1), "redis", project_id="p1")
+
+        assert [h.context_id for h in page.hits] == [old.id]
+
+    @pytest.mark.asyncio
+    async def test_prefix_and_cyrillic(self, contexts, search):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(ctx.id, "assistant", "Перезапустил контейнера бота")
+
+        page = await search.search(UserId(1), "КОНТЕЙНЕР")
+
+        assert len(page.hits) == 1
+
+    @pytest.mark.asyncio
+    async def test_deleted_messages_leave_index(self, contexts, search):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(ctx.id, "user", "ephemeral note")
+        await contexts.clear_messages(ctx.id)
+
+        page = await search.search(UserId(1), "ephemeral")
+
+        assert page.hits == []
+
+    @pytest.mark.asyncio
+    async def test_pagination(self, contexts, search):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        for i in range(5):
+            await contexts.add_message(ctx.id, "user", f"kubernetes pod {i}")
+
+        first = await search.search(UserId(1), "kubernetes", limit=3)
+        second = await search.search(UserId(1), "kubernetes", limit=3, offset=first.next_offset)
+
+        assert first.next_offset == 3
+        assert len(second.hits) == 2
+        assert second.next_offset is None
+        ids = [h.message_id for h in first.hits + second.hits]
+        assert len(set(ids)) == 5
+
+    @pytest.mark.asyncio
+    async def test_existing_messages_are_backfilled(self, manager, contexts):
+        ctx = await contexts.create_new("p1", UserId(1), "main")
+        await contexts.add_message(ctx.id, "user", "written before the index existed")
+
+        repo = SQLiteMessageSearchRepository(manager.db_path, manager)
+        await repo.initialize()
+        page = await repo.search(UserId(1), "written")
+
+        assert len(page.hits) == 1
@@ -0,0 +1,81 @@
+"""Unit tests for context message pagination in SQLiteProjectContextRepository."""
+
+import pytest
+import pytest_asyncio
+
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    """Create a context repository on a temporary database."""
+    manager = SQLiteConnectionManager(str(tmp_path / "contexts.db"))
+    repo = SQLiteProjectContextRepository(manager.db_path, manager)
+    await repo.initialize()
+    yield repo
+    await manager.close()
+
+
+@pytest_asyncio.fixture
+async def context_id(repository):
+    context = await repository.create_new("project-1", UserId(1), "main")
+    for i in range(7):
+        await repository.add_message(context.id, "user", f"message {i}", tool_result=f"result {i}")
+    return context.id
+
+
+class TestGetMessagesPage:
+    """Tests for keyset pagination."""
+
+    @pytest.mark.asyncio
+    async def test_first_page_is_newest_in_chronological_order(self, repository, context_id):
+        page = await repository.get_messages_page(context_id, limit=3)
+
+        assert [m.content for m in page.messages] == ["message 4", "message 5", "message 6"]
+        assert page.next_cursor == page.messages[0].id
+
+    @pytest.mark.asyncio
+    async def test_walks_whole_history_without_gaps(self, repository, context_id):
+        contents = []
+        cursor = None
+        while True:
+            page = await repository.get_messages_page(context_id, limit=3, before_id=cursor)
+            contents = [m.content for m in page.messages] + contents
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert contents == [f"message {i}" for i in range(7)]
+
+    @pytest.mark.asyncio
+    async def test_exact_fit_has_no_next_cursor(self, repository, context_id):
+        page = await repository.get_messages_page(context_id, limit=7)
+
+        assert len(page.messages) == 7
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_headers_only_skips_content(self, repository, context_id):
+        page = await repository.get_messages_page(context_id, limit=2, headers_only=True)
+
+        assert [m.role for m in page.messages] == ["user", "user"]
+        assert all(m.content == "" and m.tool_result is None for m in page.messages)
+        assert all(m.timestamp is not None for m in page.messages)
+
+    @pytest.mark.asyncio
+    async def test_pages_are_scoped_to_context(self, repository, context_id):
+        other = await repository.create_new("project-1", UserId(1), "other")
+        await repository.add_message(other.id, "user", "elsewhere")
+
+        page = await repository.get_messages_page(other.id)
+
+        assert [m.content for m in page.messages] == ["elsewhere"]
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_get_messages_offset_still_supported(self, repository, context_id):
+        messages = await repository.get_messages(context_id, limit=2, offset=1)
+
+        assert [m.content for m in messages] == ["message 4", "message 5"]
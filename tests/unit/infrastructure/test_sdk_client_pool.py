@@ -0,0 +1,136 @@
+"""Tests for the warm ClaudeSDKClient pool in ClaudeAgentSDKService."""
+
+import asyncio
+
+import pytest
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from infrastructure.claude_code import sdk_service as sdk_module
+from infrastructure.claude_code.client_pool import SDKClientPool
+from infrastructure.claude_code.sdk_service import ClaudeAgentSDKService
+
+
+class FakeSDKClient:
+    """Records connects/queries; each client is positioned on one session."""
+
+    instances: list = []
+
+    def __init__(self, options):
+        self.options = options
+        self.session_id = options.resume or f"session-{len(FakeSDKClient.instances)}"
+        self.connected = False
+        self.queries = []
+        FakeSDKClient.instances.append(self)
+
+    async def connect(self, prompt=None):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def interrupt(self):
+        pass
+
+    async def query(self, prompt):
+        self.queries.append(prompt)
+
+    async def receive_response(self):
+        await asyncio.sleep(0)
+        yield AssistantMessage(content=[TextBlock(text="ok")], model="test")
+        yield ResultMessage(
+            subtype="success", duration_ms=1, duration_api_ms=1,
+            is_error=False, num_turns=1, session_id=self.session_id,
+        )
+
+
+@pytest.fixture
+def make_service(monkeypatch, tmp_path):
+    monkeypatch.setattr(sdk_module, "ClaudeSDKClient", FakeSDKClient)
+    FakeSDKClient.instances = []
+
+    def factory(**kwargs):
+        return ClaudeAgentSDKService(
+            default_working_dir=str(tmp_path),
+            telegram_mcp_path=str(tmp_path / "missing.js"),
+            **kwargs,
+        )
+
+    return factory
+
+
+class TestWarmPool:
+    """Reuse, invalidation and expiry of pooled clients."""
+
+    @pytest.mark.asyncio
+    async def test_next_prompt_of_session_reuses_client(self, make_service):
+        service = make_service(warm_pool=True)
+
+        first = await service.run_task(user_id=1, prompt="one")
+        second = await service.run_task(user_id=1, prompt="two", session_id=first.session_id)
+
+        assert second.success
+        assert len(FakeSDKClient.instances) == 1
+        assert FakeSDKClient.instances[0].queries == ["one", "two"]
+
+        stats = service.get_pool_stats()
+        assert stats["hits"] == 1
+        assert stats["ttft"]["cold"]["count"] == 1
+        assert stats["ttft"]["warm"]["count"] == 1
+        await service.close()
+        assert not FakeSDKClient.instances[0].connected
+
+    @pytest.mark.asyncio
+    async def test_new_session_starts_cold(self, make_service):
+        service = make_service(warm_pool=True)
+
+        await service.run_task(user_id=1, prompt="one")
+        await service.run_task(user_id=1, prompt="fresh")
+        await asyncio.sleep(0)
+
+        assert len(FakeSDKClient.instances) == 2
+        assert not FakeSDKClient.instances[0].connected
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_pool_disconnects_after_each_task(self, make_service):
+        service = make_service()
+
+        first = await service.run_task(user_id=1, prompt="one")
+        await service.run_task(user_id=1, prompt="two", session_id=first.session_id)
+
+        assert len(FakeSDKClient.instances) == 2
+        assert not any(c.connected for c in FakeSDKClient.instances)
+        assert FakeSDKClient.instances[1].options.resume == first.session_id
+        assert service.get_pool_stats()["ttft"]["cold"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_idle_client_expires(self, make_service):
+        service = make_service(warm_pool=True, warm_pool_ttl=0.01)
+
+        await service.run_task(user_id=1, prompt="one")
+        await asyncio.sleep(0.05)
+
+        assert not FakeSDKClient.instances[0].connected
+        assert service.get_pool_stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_callbacks_follow_current_task(self, make_service):
+        service = make_service(warm_pool=True)
+        first = await service.run_task(user_id=1, prompt="one")
+        seen = []
+
+        async def on_tool_use(name, tool_input):
+            seen.append(name)
+
+        await service.run_task(
+            user_id=1, prompt="two", session_id=first.session_id, on_tool_use=on_tool_use
+        )
+        hook = FakeSDKClient.instances[0].options.hooks["PreToolUse"][0].hooks[0]
+        await hook({"tool_name": "Read", "tool_input": {}}, None, None)
+
+        assert seen == ["Read"]
+        await service.close()
+
+
+def test_pool_is_disabled_by_default():
+    assert SDKClientPool().enabled is False
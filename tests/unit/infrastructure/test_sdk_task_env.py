@@ -0,0 +1,137 @@
+"""Tests for per-task environment isolation in ClaudeAgentSDKService."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.services.account_service import (
+    AccountService,
+    AccountSettings,
+    AuthMode,
+    LocalModelConfig,
+)
+from infrastructure.claude_code import sdk_service as sdk_module
+from infrastructure.claude_code.sdk_service import ClaudeAgentSDKService
+from infrastructure.claude_code.task_env import build_task_env, env_overlay
+
+
+class FakeSDKClient:
+    """Stands in for ClaudeSDKClient and records what each task received."""
+
+    seen: list = []
+    active = 0
+    max_active = 0
+
+    def __init__(self, options):
+        self.options = options
+
+    async def connect(self, prompt=None):
+        FakeSDKClient.active += 1
+        FakeSDKClient.max_active = max(FakeSDKClient.max_active, FakeSDKClient.active)
+
+    async def disconnect(self):
+        FakeSDKClient.active -= 1
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.disconnect()
+        return False
+
+    async def query(self, prompt):
+        # Yield so that other tasks interleave with this one
+        await asyncio.sleep(0.01)
+        FakeSDKClient.seen.append((prompt, dict(self.options.env), dict(os.environ)))
+
+    async def receive_response(self):
+        await asyncio.sleep(0.01)
+        return
+        yield
+
+
+class TestTaskEnv:
+    """Tests for build_task_env / env_overlay."""
+
+    def test_build_task_env_is_immutable_and_drops_markers(self):
+        env = build_task_env({"A": "1", "_REMOVE_B": "1"})
+
+        assert dict(env) == {"A": "1", "GIT_TERMINAL_PROMPT": "0"}
+        with pytest.raises(TypeError):
+            env["A"] = "2"
+
+    def test_env_overlay_sets_changed_and_masks_removed(self):
+        inherited = {"KEEP": "x", "CHANGE": "old", "DROP": "secret"}
+        task_env = build_task_env({"KEEP": "x", "CHANGE": "new"})
+
+        overlay = env_overlay(task_env, inherited)
+
+        assert overlay == {"CHANGE": "new", "DROP": "", "GIT_TERMINAL_PROMPT": "0"}
+
+
+class TestConcurrentTaskIsolation:
+    """Concurrent run_task calls with mixed auth modes."""
+
+    @pytest.fixture
+    def account_service(self):
+        settings = {
+            1: AccountSettings(user_id=1, auth_mode=AuthMode.ZAI_API, zai_api_key="key-user-1"),
+            2: AccountSettings(user_id=2, auth_mode=AuthMode.CLAUDE_ACCOUNT),
+            3: AccountSettings(
+                user_id=3,
+                auth_mode=AuthMode.LOCAL_MODEL,
+                local_model_config=LocalModelConfig(
+                    name="local", base_url="http://local:8000", model_name="qwen"
+                ),
+            ),
+            4: AccountSettings(user_id=4, auth_mode=AuthMode.ZAI_API, zai_api_key="key-user-4"),
+        }
+        repository = Mock()
+        repository.find_by_user_id = AsyncMock(side_effect=lambda uid: settings[uid])
+        return AccountService(repository)
+
+    @pytest.mark.asyncio
+    async def test_mixed_auth_modes_run_in_parallel(self, monkeypatch, tmp_path, account_service):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "global-key")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", "https://zai.example")
+        monkeypatch.setenv("ANTHROPIC_MODEL", "glm-4.7")
+        monkeypatch.setattr(sdk_module, "ClaudeSDKClient", FakeSDKClient)
+        FakeSDKClient.seen = []
+        FakeSDKClient.max_active = 0
+
+        service = ClaudeAgentSDKService(
+            default_working_dir=str(tmp_path),
+            account_service=account_service,
+            telegram_mcp_path=str(tmp_path / "missing.js"),
+        )
+        environ_before = dict(os.environ)
+
+        results = await asyncio.gather(*(
+            service.run_task(user_id=uid, prompt=f"user-{uid}")
+            for uid in (1, 2, 3, 4)
+        ))
+
+        assert all(r.success for r in results)
+        assert FakeSDKClient.max_active == 4
+        assert dict(os.environ) == environ_before
+
+        envs = {prompt: env for prompt, env, _ in FakeSDKClient.seen}
+        # z.ai users get their own keys
+        assert envs["user-1"]["ANTHROPIC_API_KEY"] == "key-user-1"
+        assert envs["user-4"]["ANTHROPIC_API_KEY"] == "key-user-4"
+        # Claude Account must not inherit API configuration
+        assert envs["user-2"]["ANTHROPIC_API_KEY"] == ""
+        assert envs["user-2"]["ANTHROPIC_BASE_URL"] == ""
+        assert envs["user-2"]["ANTHROPIC_MODEL"] == ""
+        # Local model points at its own server
+        assert envs["user-3"]["ANTHROPIC_BASE_URL"] == "http://local:8000"
+        assert envs["user-3"]["ANTHROPIC_MODEL"] == "qwen"
+        for env in envs.values():
+            assert env["GIT_TERMINAL_PROMPT"] == "0"
+
+        # The process environment was never touched while tasks were running
+        for _, _, process_env in FakeSDKClient.seen:
+            assert process_env == environ_before
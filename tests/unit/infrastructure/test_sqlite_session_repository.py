@@ -0,0 +1,104 @@
+"""Unit tests for SQLiteSessionRepository incremental persistence."""
+
+import pytest
+import pytest_asyncio
+
+from domain.entities.message import Message, MessageRole
+from domain.entities.session import Session
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.sqlite_repository import (
+    SQLiteSessionRepository,
+    init_database,
+)
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    """Create a session repository on a temporary database."""
+    manager = SQLiteConnectionManager(str(tmp_path / "sessions.db"))
+    await init_database(manager.db_path, manager)
+    yield SQLiteSessionRepository(manager.db_path, manager)
+    await manager.close()
+
+
+async def _count_rows(repository, session_id: str) -> int:
+    async with repository._db.reader() as db:
+        async with db.execute(
+            "SELECT COUNT(*) FROM session_messages WHERE session_id = ?",
+            (session_id,),
+        ) as cursor:
+            return (await cursor.fetchone())[0]
+
+
+class TestSQLiteSessionRepositorySave:
+    """Tests for SQLiteSessionRepository.save."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_reload(self, repository, session):
+        session.add_message(Message(role=MessageRole.USER, content="Hello"))
+        session.add_message(Message(role=MessageRole.ASSISTANT, content="Hi!"))
+
+        await repository.save(session)
+        loaded = await repository.find_by_id(session.session_id)
+
+        assert [m.content for m in loaded.messages] == ["Hello", "Hi!"]
+        assert loaded.get_unsaved_messages() == []
+
+    @pytest.mark.asyncio
+    async def test_repeated_save_appends_only_new(self, repository, session):
+        session.add_message(Message(role=MessageRole.USER, content="one"))
+        await repository.save(session)
+        await repository.save(session)
+
+        session.add_message(Message(role=MessageRole.ASSISTANT, content="two"))
+        await repository.save(session)
+
+        assert await _count_rows(repository, session.session_id) == 2
+
+    @pytest.mark.asyncio
+    async def test_save_after_load_appends(self, repository, session):
+        session.add_message(Message(role=MessageRole.USER, content="one"))
+        await repository.save(session)
+
+        loaded = await repository.find_active_by_user(session.user_id)
+        loaded.add_message(Message(role=MessageRole.ASSISTANT, content="two"))
+        await repository.save(loaded)
+
+        reloaded = await repository.find_by_id(session.session_id)
+        assert [m.content for m in reloaded.messages] == ["one", "two"]
+
+    @pytest.mark.asyncio
+    async def test_save_after_clear_rewrites_history(self, repository, session):
+        session.add_message(Message(role=MessageRole.USER, content="one"))
+        session.add_message(Message(role=MessageRole.ASSISTANT, content="two"))
+        await repository.save(session)
+
+        session.clear_messages()
+        session.add_message(Message(role=MessageRole.USER, content="fresh"))
+        await repository.save(session)
+
+        reloaded = await repository.find_by_id(session.session_id)
+        assert [m.content for m in reloaded.messages] == ["fresh"]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_session_is_not_rewritten(self, repository, session):
+        session.add_message(Message(role=MessageRole.USER, content="one"))
+        await repository.save(session)
+
+        async with repository._db.writer() as db:
+            changes_before = db.total_changes
+        await repository.save(session)
+        async with repository._db.writer() as db:
+            assert db.total_changes == changes_before
+
+    @pytest.mark.asyncio
+    async def test_fresh_entity_with_existing_id_replaces_history(self, repository, user_id):
+        first = Session(session_id="dup", user_id=user_id)
+        first.add_message(Message(role=MessageRole.USER, content="old"))
+        await repository.save(first)
+
+        second = Session(session_id="dup", user_id=user_id)
+        second.add_message(Message(role=MessageRole.USER, content="new"))
+        await repository.save(second)
+
+        assert await _count_rows(repository, "dup") == 1
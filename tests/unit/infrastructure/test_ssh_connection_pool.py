@@ -0,0 +1,152 @@
+"""Tests for the pooled asyncssh connection used by SSHCommandExecutor."""
+
+import asyncio
+
+import asyncssh
+import pytest
+import pytest_asyncio
+
+from infrastructure.ssh.connection_pool import SSHConnectionPool, SSHUnavailableError
+from infrastructure.ssh.ssh_executor import SSHCommandExecutor
+from shared.config.settings import SSHConfig
+
+
+class _Server(asyncssh.SSHServer):
+    connections = 0
+
+    def connection_made(self, conn):
+        _Server.connections += 1
+
+    def begin_auth(self, username):
+        return True
+
+    def public_key_auth_supported(self):
+        return True
+
+
+async def _handle(process: asyncssh.SSHServerProcess):
+    command = process.command or ""
+    if command.startswith("sleep"):
+        await asyncio.sleep(float(command.split()[1]))
+    elif command == "fail":
+        process.stderr.write("boom\n")
+        process.exit(3)
+        return
+    else:
+        for part in command.split():
+            process.stdout.write(part + "\n")
+            await asyncio.sleep(0)
+    process.exit(0)
+
+
+@pytest_asyncio.fixture
+async def ssh_server(tmp_path):
+    host_key = asyncssh.generate_private_key("ssh-ed25519")
+    client_key = asyncssh.generate_private_key("ssh-ed25519")
+    key_path = tmp_path / "client_key"
+    client_key.write_private_key(str(key_path))
+    authorized = tmp_path / "authorized_keys"
+    client_key.write_public_key(str(authorized))
+
+    _Server.connections = 0
+    server = await asyncssh.listen(
+        "127.0.0.1", 0,
+        server_factory=_Server,
+        server_host_keys=[host_key],
+        authorized_client_keys=str(authorized),
+        process_factory=_handle,
+    )
+    port = server.sockets[0].getsockname()[1]
+    config = SSHConfig(host="127.0.0.1", port=port, user="bot", key_path=str(key_path))
+    yield server, config
+    server.close()
+    await server.wait_closed()
+
+
+def _pool(config: SSHConfig, **kwargs) -> SSHConnectionPool:
+    return SSHConnectionPool(
+        host=config.host, port=config.port, username=config.user,
+        key_path=config.key_path, **kwargs,
+    )
+
+
+class TestSSHConnectionPool:
+    """Multiplexing, streaming, channel cap and reconnect."""
+
+    @pytest.mark.asyncio
+    async def test_commands_share_one_connection(self, ssh_server):
+        _, config = ssh_server
+        pool = _pool(config)
+
+        results = await asyncio.gather(*(pool.run(f"echo {i}") for i in range(5)))
+
+        assert [r.stdout for r in results] == [f"echo\n{i}\n" for i in range(5)]
+        assert _Server.connections == 1
+        metrics = pool.get_metrics()
+        assert metrics["handshake"]["count"] == 1
+        assert metrics["command"]["count"] == 5
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_output_is_streamed_and_exit_code_kept(self, ssh_server):
+        _, config = ssh_server
+        pool = _pool(config)
+        chunks = []
+
+        async def on_stdout(chunk):
+            chunks.append(chunk)
+
+        result = await pool.run("a b c", on_stdout=on_stdout)
+        failed = await pool.run("fail")
+
+        assert "".join(chunks) == result.stdout == "a\nb\nc\n"
+        assert (failed.exit_code, failed.stderr) == (3, "boom\n")
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_channels_are_capped(self, ssh_server):
+        _, config = ssh_server
+        pool = _pool(config, max_channels=2)
+
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(pool.run("sleep 0.1") for _ in range(4)))
+
+        assert asyncio.get_running_loop().time() - started >= 0.2
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_connection_loss(self, ssh_server):
+        _, config = ssh_server
+        pool = _pool(config)
+        await pool.run("one")
+
+        pool._conn.close()
+        await asyncio.sleep(0.05)
+        result = await pool.run("two")
+
+        assert result.stdout == "two\n"
+        assert pool.get_metrics()["reconnects"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_backs_off(self, tmp_path):
+        pool = SSHConnectionPool("127.0.0.1", 1, "bot", str(tmp_path / "missing"))
+
+        with pytest.raises(Exception):
+            await pool.run("echo")
+        with pytest.raises(SSHUnavailableError):
+            await pool.run("echo")
+        assert pool.get_metrics()["connect_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_executor_reports_errors_as_results(ssh_server):
+    _, config = ssh_server
+    executor = SSHCommandExecutor(config)
+
+    ok = await executor.execute("hello")
+    timed_out = await executor.execute("sleep 1", timeout=0.05)
+
+    assert ok.success and ok.stdout == "hello"
+    assert timed_out.exit_code == 1 and "timed out" in timed_out.stderr
+    await executor.pool.close()
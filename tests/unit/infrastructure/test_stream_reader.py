@@ -0,0 +1,134 @@
+"""Tests for the chunked stream-json reader used by ClaudeCodeProxyService."""
+
+import asyncio
+import json
+import random
+import stat
+import sys
+
+import pytest
+
+from infrastructure.claude_code.proxy_service import ClaudeCodeProxyService
+from infrastructure.claude_code.stream_reader import StreamJsonReader
+
+
+def _delta(text: str) -> str:
+    return json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}})
+
+
+def _stream(data: bytes, rnd: random.Random) -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    pos = 0
+    while pos < len(data):
+        size = rnd.randint(1, 300)
+        stream.feed_data(data[pos:pos + size])
+        pos += size
+    stream.feed_eof()
+    return stream
+
+
+async def _drain(reader: StreamJsonReader) -> list:
+    task = asyncio.create_task(reader.run())
+    items = []
+    while (item := await reader.get()) is not None:
+        items.append(item)
+    await task
+    return items
+
+
+class TestStreamJsonReader:
+    """Line framing, coalescing and backpressure."""
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        lines = [json.dumps({"n": i, "pad": "x" * (i * 37 % 500)}) for i in range(200)]
+        data = ("\n".join(lines) + "\n\nplain text line\n" + json.dumps({"n": "last"})).encode()
+        reader = StreamJsonReader(_stream(data, random.Random(1)), lambda d: d["n"], chunk_size=97)
+
+        items = await _drain(reader)
+
+        assert items == list(range(200)) + ["plain text line", "last"]
+
+    @pytest.mark.asyncio
+    async def test_huge_line_beyond_readline_limit(self):
+        big = "y" * 1_000_000
+        data = (json.dumps({"n": big}) + "\n" + json.dumps({"n": "after"}) + "\n").encode()
+        reader = StreamJsonReader(_stream(data, random.Random(2)), lambda d: d["n"])
+
+        assert await _drain(reader) == [big, "after"]
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_is_dropped(self):
+        data = ("z" * 5000 + "\n" + json.dumps({"n": 1}) + "\n").encode()
+        reader = StreamJsonReader(
+            _stream(data, random.Random(3)), lambda d: d["n"], chunk_size=64, max_line_bytes=1000
+        )
+
+        assert await _drain(reader) == [1]
+        assert reader.dropped_lines == 1
+
+    @pytest.mark.asyncio
+    async def test_text_deltas_coalesce_while_consumer_is_busy(self):
+        data = ("\n".join(_delta(f"t{i} ") for i in range(100)) + "\n").encode()
+        service = ClaudeCodeProxyService()
+        reader = StreamJsonReader(
+            _stream(data, random.Random(4)),
+            service._event_from_data,
+            merge=service._merge_text_events,
+            max_queued=2,
+        )
+
+        # The consumer doesn't read until the whole stream is parsed
+        await asyncio.wait_for(reader.run(), timeout=5)
+        items = await _drain(reader)
+
+        assert len(items) == 1
+        assert items[0].content == "".join(f"t{i} " for i in range(100))
+        assert reader.coalesced == 99
+
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded_for_non_mergeable_events(self):
+        data = ("\n".join(json.dumps({"n": i}) for i in range(10)) + "\n").encode()
+        reader = StreamJsonReader(_stream(data, random.Random(5)), lambda d: d["n"], max_queued=3)
+        task = asyncio.create_task(reader.run())
+        await asyncio.sleep(0.05)
+
+        assert not task.done()
+        assert reader.max_depth == 3
+
+        items = []
+        while (item := await reader.get()) is not None:
+            items.append(item)
+        await task
+        assert items == list(range(10))
+
+
+class TestProxyRunTask:
+    """run_task end to end against a fake CLI."""
+
+    @pytest.mark.asyncio
+    async def test_slow_callbacks_receive_all_text(self, tmp_path):
+        script = tmp_path / "claude"
+        events = [_delta(f"chunk{i} ") for i in range(300)]
+        events.append(json.dumps({"type": "result", "result": "", "session_id": "s1"}))
+        payload = "\n".join(events)
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"sys.stdout.write({payload!r} + '\\n')\n"
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+        received = []
+
+        async def on_text(text):
+            received.append(text)
+            await asyncio.sleep(0.01)  # Slow Telegram edit
+
+        service = ClaudeCodeProxyService(claude_path=str(script), default_working_dir=str(tmp_path))
+        result = await service.run_task(1, "prompt", on_text=on_text)
+
+        assert result.success
+        assert result.session_id == "s1"
+        assert "".join(received) == "".join(f"chunk{i} " for i in range(300))
+        assert len(received) < 300  # Deltas were merged while callbacks ran
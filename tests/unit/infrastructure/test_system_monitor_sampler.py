@@ -0,0 +1,122 @@
+"""Tests for the background metrics sampler behind SystemMonitor."""
+
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from infrastructure.monitoring import sampler as sampler_module
+from infrastructure.monitoring.sampler import MetricsSampler, sparkline
+from infrastructure.monitoring.system_monitor import ProcessInfo, SystemMetrics, SystemMonitor
+
+
+def _metrics(cpu: float) -> SystemMetrics:
+    return SystemMetrics(
+        timestamp=datetime.utcnow(),
+        cpu_percent=cpu,
+        memory_percent=50.0,
+        memory_used_gb=1.0,
+        memory_total_gb=2.0,
+        disk_percent=10.0,
+        disk_used_gb=1.0,
+        disk_total_gb=10.0,
+        load_average=[0.0, 0.0, 0.0],
+        uptime_seconds=1.0,
+    )
+
+
+@pytest.fixture
+def fresh_sampler():
+    sampler = MetricsSampler(interval=0.01, history_size=5)
+    with patch.object(sampler_module, "_sampler", sampler):
+        yield sampler
+
+
+class TestSparkline:
+    def test_scales_to_blocks(self):
+        assert sparkline([0, 50, 100]) == "▁▅█"
+
+    def test_keeps_last_width_values_and_clamps(self):
+        assert sparkline([100] * 10 + [0, 150, -5], width=3) == "▁█▁"
+
+    def test_empty(self):
+        assert sparkline([]) == ""
+
+
+class TestMetricsSampler:
+    @pytest.mark.asyncio
+    async def test_ring_buffer_is_bounded(self, fresh_sampler):
+        values = iter(range(100))
+        with patch.object(sampler_module, "collect_metrics", lambda _: _metrics(next(values))):
+            for _ in range(8):
+                await fresh_sampler.sample_now()
+
+        assert fresh_sampler.history("cpu_percent") == [3, 4, 5, 6, 7]
+        assert fresh_sampler.latest().cpu_percent == 7
+
+    @pytest.mark.asyncio
+    async def test_background_loop_fills_history(self, fresh_sampler):
+        with patch.object(sampler_module, "collect_metrics", lambda _: _metrics(1.0)):
+            fresh_sampler.start()
+            await asyncio.sleep(0.1)
+            await fresh_sampler.stop()
+
+        assert len(fresh_sampler.snapshots()) > 1
+        assert not fresh_sampler.running
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_process_scan(self, fresh_sampler):
+        calls = []
+
+        def scan():
+            calls.append(threading.get_ident())
+            return [ProcessInfo(i, f"p{i}", 1.0, 1.0, "running", "") for i in range(20)]
+
+        with patch.object(sampler_module, "scan_processes", scan):
+            results = await asyncio.gather(*(fresh_sampler.top_processes(5) for _ in range(10)))
+            await fresh_sampler.top_processes(3)
+
+        assert len(calls) == 1
+        assert calls[0] != threading.get_ident()  # Scanned off the event loop
+        assert all(len(r) == 5 for r in results)
+
+
+class TestSystemMonitorMetrics:
+    @pytest.mark.asyncio
+    async def test_get_metrics_reads_snapshot_without_blocking_psutil(self, fresh_sampler):
+        loop_thread = threading.get_ident()
+        calls = []
+
+        def collect(interval):
+            calls.append(threading.get_ident())
+            return _metrics(42.0)
+
+        with patch.object(sampler_module, "collect_metrics", collect):
+            monitor = SystemMonitor()
+            first = await monitor.get_metrics()
+            second = await monitor.get_metrics()
+            await fresh_sampler.stop()
+
+        assert first.cpu_percent == second.cpu_percent == 42.0
+        assert loop_thread not in calls
+        assert monitor.get_history()["cpu_percent"][0] == 42.0
+
+    @pytest.mark.asyncio
+    async def test_container_runs_sampler_from_init_to_close(self, fresh_sampler, tmp_path):
+        from shared.container import Config, Container
+
+        container = Container(Config(database_url=f"sqlite:///{tmp_path / 'bot.db'}"))
+        with patch.object(sampler_module, "collect_metrics", lambda _: _metrics(5.0)):
+            await container.init()
+            try:
+                started = fresh_sampler.running
+                await asyncio.sleep(0.05)
+            finally:
+                await container.close()
+
+        assert started
+
+        assert not fresh_sampler.running
+        assert fresh_sampler.latest().cpu_percent == 5.0
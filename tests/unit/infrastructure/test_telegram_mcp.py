@@ -0,0 +1,131 @@
+"""Tests for the in-process Telegram MCP server."""
+
+import pytest
+from aiogram.types import BufferedInputFile, FSInputFile
+
+from infrastructure.claude_code import telegram_mcp
+from infrastructure.claude_code import sdk_service
+from infrastructure.claude_code.sdk_service import ClaudeAgentSDKService
+
+
+class FakeBot:
+    """Records Bot API calls instead of sending them."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+
+    async def send_document(self, chat_id, document, **kwargs):
+        self.calls.append(("send_document", chat_id, document, kwargs))
+        if self.error:
+            raise self.error
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls.append(("send_message", chat_id, text, kwargs))
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def bot():
+    return FakeBot()
+
+
+@pytest.fixture
+def tools(bot):
+    return {t.name: t.handler for t in telegram_mcp.telegram_tools(bot, 42)}
+
+
+def text_of(result):
+    return result["content"][0]["text"]
+
+
+class TestTelegramTools:
+    """Tests for send_file, send_message and send_plan."""
+
+    @pytest.mark.asyncio
+    async def test_send_file_streams_from_disk(self, tools, bot, tmp_path):
+        path = tmp_path / "report.txt"
+        path.write_text("data")
+
+        result = await tools["send_file"]({"file_path": str(path), "caption": "Отчёт"})
+
+        assert text_of(result) == "✅ File sent: report.txt"
+        method, chat_id, document, kwargs = bot.calls[0]
+        assert (method, chat_id) == ("send_document", 42)
+        assert isinstance(document, FSInputFile)
+        assert document.path == str(path)
+        assert kwargs["caption"] == "Отчёт"
+
+    @pytest.mark.asyncio
+    async def test_send_file_rejects_missing_and_oversized(self, tools, bot, tmp_path, monkeypatch):
+        missing = await tools["send_file"]({"file_path": str(tmp_path / "gone.txt")})
+        directory = await tools["send_file"]({"file_path": str(tmp_path)})
+
+        monkeypatch.setattr(telegram_mcp, "MAX_UPLOAD_BYTES", 3)
+        path = tmp_path / "big.bin"
+        path.write_bytes(b"1234")
+        too_large = await tools["send_file"]({"file_path": str(path)})
+
+        assert all(r["is_error"] for r in (missing, directory, too_large))
+        assert "File not found" in text_of(missing)
+        assert "too large" in text_of(too_large)
+        assert bot.calls == []
+
+    @pytest.mark.asyncio
+    async def test_send_message_uses_chat_override(self, tools, bot):
+        result = await tools["send_message"]({"text": "<b>done</b>", "chat_id": "-100500"})
+
+        assert text_of(result) == "✅ Message sent"
+        assert bot.calls == [("send_message", "-100500", "<b>done</b>", {"parse_mode": "HTML"})]
+
+    @pytest.mark.asyncio
+    async def test_send_plan_sends_from_memory(self, tools, bot):
+        result = await tools["send_plan"]({"title": "Релиз 2.0", "content": "- шаг 1"})
+
+        _, _, document, kwargs = bot.calls[0]
+        assert isinstance(document, BufferedInputFile)
+        assert document.data == "# Релиз 2.0\n\n- шаг 1".encode("utf-8")
+        assert document.filename.startswith("plan_Релиз_2_0_")
+        assert text_of(result) == f"✅ Plan sent: {document.filename}"
+
+    @pytest.mark.asyncio
+    async def test_api_errors_are_tool_errors(self):
+        bot = FakeBot(error=RuntimeError("Bad Request: chat not found"))
+        tools = {t.name: t.handler for t in telegram_mcp.telegram_tools(bot, 42)}
+
+        result = await tools["send_message"]({"text": "hi"})
+
+        assert result["is_error"]
+        assert "chat not found" in text_of(result)
+
+
+class TestSDKServiceMcpConfig:
+    """Tests for choosing the in-process server over the Node.js one."""
+
+    def test_in_process_server_is_reused_per_user(self, tmp_path):
+        service = ClaudeAgentSDKService(
+            default_working_dir=str(tmp_path),
+            telegram_mcp_path=str(tmp_path / "missing.js"),
+        )
+        assert service._get_mcp_servers_config(1) == {}
+
+        service.attach_bot(FakeBot())
+        first = service._get_mcp_servers_config(1)["telegram"]
+
+        assert first["type"] == "sdk"
+        assert service._get_mcp_servers_config(1)["telegram"] is first
+        assert service._get_mcp_servers_config(2)["telegram"] is not first
+
+    def test_falls_back_to_node_server_without_in_process_tools(self, tmp_path, monkeypatch):
+        node_server = tmp_path / "index.js"
+        node_server.write_text("")
+        monkeypatch.setattr(sdk_service, "create_telegram_mcp_server", None)
+        monkeypatch.setenv("TELEGRAM_TOKEN", "token")
+        service = ClaudeAgentSDKService(
+            default_working_dir=str(tmp_path),
+            telegram_mcp_path=str(node_server),
+        )
+        service.attach_bot(FakeBot())
+
+        assert service._get_mcp_servers_config(1)["telegram"]["command"] == "node"
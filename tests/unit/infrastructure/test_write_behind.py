@@ -0,0 +1,257 @@
+"""Unit tests for SQLiteWriteBehindQueue and batched context persistence."""
+
+import asyncio
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from domain.value_objects.user_id import UserId
+from infrastructure.persistence.connection_manager import SQLiteConnectionManager
+from infrastructure.persistence.project_context_repository import SQLiteProjectContextRepository
+from infrastructure.persistence.write_behind import SQLiteWriteBehindQueue, WriteBehindError
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    """Create a connection manager on a temporary database."""
+    manager = SQLiteConnectionManager(str(tmp_path / "writes.db"))
+    async with manager.writer() as db:
+        await db.execute("CREATE TABLE items (value TEXT NOT NULL)")
+    yield manager
+    await manager.close()
+
+
+def insert(value):
+    async def operation(db):
+        await db.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    return operation
+
+
+async def stored(manager):
+    async with manager.reader() as db:
+        async with db.execute("SELECT value FROM items ORDER BY rowid") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+class TestWriteBehindQueue:
+    """Tests for the queue itself."""
+
+    @pytest.mark.asyncio
+    async def test_batched_writes_share_one_transaction(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        for i in range(3):
+            await queue.submit(insert(f"v{i}"))
+
+        assert queue.pending == 3
+        assert await stored(manager) == []
+
+        await queue.flush()
+
+        assert await stored(manager) == ["v0", "v1", "v2"]
+        assert queue.batches == 1
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_is_invisible_until_commit(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        seen = []
+
+        async def peek(db):
+            # Separate connection: sees only committed rows
+            other = sqlite3.connect(manager.db_path)
+            seen.append(other.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+            other.close()
+
+        await queue.submit(insert("v0"))
+        await queue.submit(insert("v1"))
+        await queue.submit(peek)
+        await queue.flush()
+
+        assert seen == [0]
+        assert await stored(manager) == ["v0", "v1"]
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_does_not_duplicate_writes(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        started = asyncio.Event()
+
+        async def slow(db):
+            started.set()
+            await asyncio.sleep(60)
+
+        await queue.submit(insert("v0"))
+        await queue.submit(slow)
+        flush = asyncio.create_task(queue.flush())
+        await started.wait()
+        flush.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+
+        assert queue.pending == 2
+        queue._pending.pop()  # Drop the slow write, replay the rest
+        await queue.close()
+
+        assert await stored(manager) == ["v0"]
+
+    @pytest.mark.asyncio
+    async def test_flusher_commits_after_interval(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=0.01)
+        await queue.submit(insert("v"))
+
+        for _ in range(100):
+            if not queue.pending:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await stored(manager) == ["v"]
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_writes(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        for i in range(5):
+            await queue.submit(insert(f"v{i}"))
+
+        await queue.close()
+
+        assert await stored(manager) == [f"v{i}" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_drop_batch(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        await queue.submit(insert("before"))
+        await queue.submit(insert(None))  # NOT NULL violation
+        await queue.submit(insert("after"))
+
+        await queue.close()
+
+        assert await stored(manager) == ["before", "after"]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_reraised_once(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        await queue.submit(insert(None))  # NOT NULL violation
+        await queue.flush()
+
+        with pytest.raises(WriteBehindError) as error:
+            queue.raise_failures()
+        queue.raise_failures()
+
+        assert isinstance(error.value.errors[0], sqlite3.IntegrityError)
+        assert queue.failures == 1
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_flusher_retries_failed_flush_without_new_writes(self, manager, monkeypatch):
+        queue = SQLiteWriteBehindQueue(manager, interval=0.01)
+        writer = manager.writer
+        attempts = []
+
+        def flaky_writer():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return writer()
+
+        monkeypatch.setattr(manager, "writer", flaky_writer)
+        await queue.submit(insert("v"))
+
+        for _ in range(100):
+            if not queue.pending:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(attempts) == 2
+        assert await stored(manager) == ["v"]
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_immediate_mode_commits_before_returning(self, manager):
+        queue = SQLiteWriteBehindQueue(manager, durability="immediate")
+        await queue.submit(insert("v"))
+
+        assert queue.pending == 0
+        assert await stored(manager) == ["v"]
+
+    def test_rejects_unknown_mode(self, manager):
+        with pytest.raises(ValueError):
+            SQLiteWriteBehindQueue(manager, durability="eventually")
+
+
+class TestBatchedContextRepository:
+    """Tests for context persistence through the queue."""
+
+    @pytest.mark.asyncio
+    async def test_no_loss_on_graceful_stop(self, tmp_path):
+        path = str(tmp_path / "contexts.db")
+        manager = SQLiteConnectionManager(path)
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        repo = SQLiteProjectContextRepository(path, manager, queue)
+        await repo.initialize()
+        context = await repo.create_new("project-1", UserId(1), "main")
+
+        await repo.set_claude_session_id(context.id, "session-1")
+        await repo.add_message(context.id, "user", "prompt")
+        await repo.add_message(context.id, "assistant", "answer")
+        assert queue.pending == 3
+
+        await queue.close()
+        await manager.close()
+
+        reopened = SQLiteConnectionManager(path)
+        repo = SQLiteProjectContextRepository(path, reopened)
+        messages = await repo.get_messages(context.id)
+        stored_context = await repo.find_by_id(context.id)
+        await reopened.close()
+
+        assert [m.content for m in messages] == ["prompt", "answer"]
+        assert stored_context.claude_session_id == "session-1"
+        assert stored_context.message_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_see_queued_writes(self, tmp_path):
+        manager = SQLiteConnectionManager(str(tmp_path / "contexts.db"))
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        repo = SQLiteProjectContextRepository(manager.db_path, manager, queue)
+        await repo.initialize()
+        context = await repo.create_new("project-1", UserId(1), "main")
+
+        await repo.set_claude_session_id(context.id, "session-1")
+
+        assert await repo.get_claude_session_id(context.id) == "session-1"
+        await queue.close()
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_read_reports_lost_queued_write(self, tmp_path):
+        manager = SQLiteConnectionManager(str(tmp_path / "contexts.db"))
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        repo = SQLiteProjectContextRepository(manager.db_path, manager, queue)
+        await repo.initialize()
+        context = await repo.create_new("project-1", UserId(1), "main")
+
+        await repo.add_message(context.id, "user", None)  # content is NOT NULL
+
+        with pytest.raises(WriteBehindError):
+            await repo.get_messages(context.id)
+        assert await repo.get_messages(context.id) == []
+        await queue.close()
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_direct_writes_stay_ordered_after_queued_ones(self, tmp_path):
+        manager = SQLiteConnectionManager(str(tmp_path / "contexts.db"))
+        queue = SQLiteWriteBehindQueue(manager, interval=60)
+        repo = SQLiteProjectContextRepository(manager.db_path, manager, queue)
+        await repo.initialize()
+        context = await repo.create_new("project-1", UserId(1), "main")
+
+        await repo.add_message(context.id, "user", "prompt")
+        await repo.clear_messages(context.id)
+
+        assert await repo.get_messages(context.id) == []
+        await queue.close()
+        await manager.close()
+
@@ -0,0 +1,75 @@
+"""Unit tests for incremental markdown rendering in StableHTMLFormatter."""
+
+import random
+
+import pytest
+
+from presentation.handlers.streaming.formatting import (
+    StableHTMLFormatter,
+    markdown_to_html,
+)
+
+
+# Fragments that exercise every rule: fences, inline code, blockquotes,
+# our own HTML tags, inline markers, HTML escaping and paragraph breaks
+FRAGMENTS = [
+    "**", "*", "__", "~~", "`", "```", "```python\n", "\n", "\n\n", "\n\n",
+    "<b>", "</b>", "<i>", "</i>", "<blockquote>", "</blockquote>",
+    "<blockquote expandable>", "word ", "some prose here ", "&", "<", ">",
+    '"', "   ", "- item\n", "<code>", "</code>", "**bold**", "`code`", "*it*",
+]
+
+
+def _stream(text: str, rnd: random.Random):
+    end = 0
+    while end < len(text):
+        end = min(len(text), end + rnd.randint(1, 40))
+        yield text[:end]
+
+
+class TestIncrementalRender:
+    """StableHTMLFormatter.render_markdown must match markdown_to_html exactly."""
+
+    @pytest.mark.parametrize("seed", range(3))
+    @pytest.mark.parametrize("is_streaming", [True, False])
+    def test_matches_full_render_on_random_streams(self, seed, is_streaming):
+        rnd = random.Random(seed)
+        for _ in range(30):
+            text = "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(0, 120)))
+            formatter = StableHTMLFormatter()
+            formatter.PREFIX_ADVANCE_CHARS = rnd.choice([1, 16, 64])
+            for chunk in _stream(text, rnd):
+                assert formatter.render_markdown(chunk, is_streaming) == markdown_to_html(chunk, is_streaming)
+
+    def test_stable_prefix_is_cached(self):
+        formatter = StableHTMLFormatter()
+        formatter.PREFIX_ADVANCE_CHARS = 10
+        text = "First **paragraph** with `code`.\n\n```python\nx = 1\n```\n\nSecond paragraph"
+
+        assert formatter.render_markdown(text) == markdown_to_html(text, is_streaming=True)
+        assert formatter._prefix_text
+        assert text.startswith(formatter._prefix_text)
+
+    def test_marker_spanning_paragraphs_matches_full_render(self):
+        formatter = StableHTMLFormatter()
+        formatter.PREFIX_ADVANCE_CHARS = 1
+        text = "start **bold\n\nstill bold** done\n\nmore"
+
+        for end in range(1, len(text) + 1):
+            chunk = text[:end]
+            assert formatter.render_markdown(chunk) == markdown_to_html(chunk, is_streaming=True)
+
+    def test_edited_prefix_resets_cache(self):
+        formatter = StableHTMLFormatter()
+        formatter.PREFIX_ADVANCE_CHARS = 1
+        formatter.render_markdown("🔧 Running **tool**\n\nrest of the text")
+
+        edited = "✅ Done **tool**\n\nrest of the text"
+        assert formatter.render_markdown(edited) == markdown_to_html(edited, is_streaming=True)
+
+    def test_format_uses_incremental_render(self):
+        formatter = StableHTMLFormatter()
+        html_text, changed = formatter.format("Hello **world**\n\nand `more`")
+
+        assert changed
+        assert html_text == "Hello <b>world</b>\n\nand <code>more</code>"
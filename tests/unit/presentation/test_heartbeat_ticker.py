@@ -0,0 +1,152 @@
+"""Unit tests for the shared HeartbeatTicker and status-only refreshes."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from presentation.handlers.streaming import trackers as trackers_module
+from presentation.handlers.streaming.handler import StreamingHandler
+from presentation.handlers.streaming.trackers import HeartbeatTicker, HeartbeatTracker
+
+
+def _streaming(wait: float = 0.0) -> Mock:
+    """Streaming handler stub whose coordinator slot opens in `wait` seconds."""
+    streaming = Mock()
+    streaming.refresh_status = AsyncMock()
+    streaming._coordinator.get_time_until_next_update = Mock(return_value=wait)
+    return streaming
+
+
+def _tracker(ticker: HeartbeatTicker, wait: float = 0.0) -> HeartbeatTracker:
+    tracker = HeartbeatTracker(_streaming(wait), ticker=ticker)
+    tracker.interval = 0.05  # Not clamped to 2s, for fast tests
+    return tracker
+
+
+@pytest.fixture
+def ticker():
+    return HeartbeatTicker(resolution=0.01)
+
+
+class TestHeartbeatTicker:
+    """Tests for driving many heartbeats from one timer."""
+
+    @pytest.mark.asyncio
+    async def test_one_task_drives_all_trackers(self, ticker):
+        tasks_before = asyncio.all_tasks()
+        trackers = [_tracker(ticker) for _ in range(50)]
+        for tracker in trackers:
+            await tracker.start()
+
+        assert len(asyncio.all_tasks() - tasks_before) == 1
+        for _ in range(200):  # Up to 2s on a loaded machine
+            if all(t.streaming.refresh_status.await_count >= 2 for t in trackers):
+                break
+            await asyncio.sleep(0.01)
+
+        for tracker in trackers:
+            assert tracker.streaming.refresh_status.await_count >= 2
+            status = tracker.streaming.refresh_status.await_args.args[0]
+            assert status.startswith("🤖 <b>Работаю...</b>")
+        await ticker.close()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_coordinator_slot(self, ticker):
+        tracker = _tracker(ticker, wait=1.0)
+        await tracker.start()
+
+        await asyncio.sleep(0.05)
+
+        tracker.streaming.refresh_status.assert_not_awaited()
+        assert ticker.get_stats()["deferred"] == 1
+        await ticker.close()
+
+    @pytest.mark.asyncio
+    async def test_stopped_tracker_is_dropped(self, ticker):
+        tracker = _tracker(ticker)
+        await tracker.start()
+        await asyncio.sleep(0.03)
+        await tracker.stop()
+        refreshes = tracker.streaming.refresh_status.await_count
+
+        await asyncio.sleep(0.1)
+
+        assert tracker.streaming.refresh_status.await_count == refreshes
+        assert ticker.get_stats()["active"] == 0
+        assert ticker._task.done()
+
+    @pytest.mark.asyncio
+    async def test_failing_tracker_stops(self, ticker):
+        tracker = _tracker(ticker)
+        tracker.streaming.refresh_status.side_effect = RuntimeError("boom")
+
+        await tracker.start()
+        await asyncio.sleep(0.03)
+
+        assert not tracker.is_running
+        assert ticker.get_stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_container_close_stops_shared_ticker(self, ticker, tmp_path, monkeypatch):
+        from shared.container import Config, Container
+
+        monkeypatch.setattr(trackers_module, "_ticker", ticker)
+        tracker = HeartbeatTracker(_streaming())
+        await tracker.start()
+
+        await Container(Config(database_url=f"sqlite:///{tmp_path / 'bot.db'}")).close()
+
+        assert ticker.get_stats()["active"] == 0
+        assert ticker._task.done()
+
+
+class TestStatusOnlyRefresh:
+    """Tests for StreamingHandler.refresh_status."""
+
+    @pytest.fixture
+    def coordinator(self):
+        coordinator = Mock()
+        coordinator.update = AsyncMock()
+        return coordinator
+
+    @pytest.fixture
+    def handler(self, coordinator):
+        message = Mock()
+        message.message_id = 1
+        return StreamingHandler(Mock(), chat_id=100, initial_message=message, coordinator=coordinator)
+
+    @pytest.mark.asyncio
+    async def test_status_tick_reuses_rendered_body(self, handler, coordinator):
+        await handler.append("**hello**")
+        handler.ui.render_non_content = Mock(wraps=handler.ui.render_non_content)
+
+        await handler.refresh_status("⏳ tick")
+
+        handler.ui.render_non_content.assert_not_called()
+        text = coordinator.update.await_args.args[1]
+        assert text == handler._rendered_body[1] + "\n\n⏳ tick"
+        assert "hello" in text
+        assert text.endswith("⏳ tick")
+
+    @pytest.mark.asyncio
+    async def test_content_change_renders_again(self, handler, coordinator):
+        await handler.append("one")
+        await handler.refresh_status("⏳ tick")
+        await handler.append(" two")
+        await handler.refresh_status("⏳ tock")
+
+        text = coordinator.update.await_args.args[1]
+        assert "one two" in text
+        assert text.endswith("⏳ tock")
+
+    @pytest.mark.asyncio
+    async def test_first_tick_and_finalized_use_full_update(self, handler, coordinator):
+        handler._do_update = AsyncMock()
+
+        await handler.refresh_status("⏳ tick")
+        handler.is_finalized = True
+        await handler.refresh_status("⏳ tock")
+
+        assert handler._do_update.await_count == 2
+        coordinator.update.assert_not_awaited()
@@ -0,0 +1,198 @@
+"""Unit tests for the outbound Telegram send scheduler."""
+
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, GetMe, SendChatAction, SendMessage
+
+from presentation.middleware.send_scheduler import (
+    SendDropped,
+    SendPriority,
+    TelegramSendScheduler,
+    send_priority,
+)
+
+
+class FakeTransport:
+    """Stands in for the session's make_request and records sent methods."""
+
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.fail_with = []
+
+    async def __call__(self, bot, method):
+        await self.gate.wait()
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.sent.append(method)
+        return getattr(method, "text", True)
+
+
+def _edit(text: str, chat_id: int = 1, message_id: int = 10) -> EditMessageText:
+    return EditMessageText(chat_id=chat_id, message_id=message_id, text=text)
+
+
+@pytest.fixture
+def scheduler():
+    return TelegramSendScheduler(private_chat_rate=1000, private_chat_burst=1000)
+
+
+class TestTelegramSendScheduler:
+    """Tests for TelegramSendScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_unscheduled_methods_pass_through(self, scheduler):
+        transport = FakeTransport()
+
+        await scheduler(transport, None, GetMe())
+
+        assert isinstance(transport.sent[0], GetMe)
+        assert scheduler.get_metrics()["sent"] == 0
+
+    @pytest.mark.asyncio
+    async def test_superseded_edits_are_coalesced(self, scheduler):
+        transport = FakeTransport()
+        transport.gate.clear()
+
+        # First send occupies the chat, the edits queue up behind it
+        first = asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=1, text="start")))
+        await asyncio.sleep(0)
+        edits = [asyncio.create_task(scheduler(transport, None, _edit(f"v{i}"))) for i in range(3)]
+        await asyncio.sleep(0)
+        transport.gate.set()
+
+        assert await first == "start"
+        assert await asyncio.gather(*edits) == ["v2", "v2", "v2"]
+        assert [m.text for m in transport.sent] == ["start", "v2"]
+        assert scheduler.get_metrics()["coalesced"] == 2
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_priority_order_within_chat(self, scheduler):
+        transport = FakeTransport()
+        transport.gate.clear()
+
+        busy = asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=1, text="busy")))
+        await asyncio.sleep(0)
+        with send_priority(SendPriority.HEARTBEAT):
+            heartbeat = asyncio.create_task(scheduler(transport, None, _edit("tick", message_id=1)))
+        progress = asyncio.create_task(scheduler(transport, None, _edit("progress", message_id=2)))
+        with send_priority(SendPriority.HITL_PROMPT):
+            prompt = asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=1, text="allow?")))
+        final = asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=1, text="done")))
+        await asyncio.sleep(0)
+
+        assert scheduler.get_metrics()["queue_by_priority"] == {
+            "final": 1, "hitl_prompt": 1, "progress": 1, "heartbeat": 1,
+        }
+        transport.gate.set()
+        await asyncio.gather(busy, heartbeat, progress, prompt, final)
+
+        assert [m.text for m in transport.sent] == ["busy", "done", "allow?", "progress", "tick"]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_all_chats(self, scheduler):
+        transport = FakeTransport()
+        transport.fail_with.append(
+            TelegramRetryAfter(method=SendMessage(chat_id=1, text="x"), message="Flood", retry_after=1)
+        )
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            scheduler(transport, None, SendMessage(chat_id=1, text="first")),
+            scheduler(transport, None, SendMessage(chat_id=2, text="other")),
+        )
+
+        assert results == ["first", "other"]
+        # The other chat waited out the shared backoff as well
+        assert time.monotonic() - started >= 0.9
+        assert scheduler.get_metrics()["retry_after"] == 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_is_raised_to_caller(self, scheduler):
+        transport = FakeTransport()
+        transport.fail_with.append(
+            TelegramRetryAfter(method=SendMessage(chat_id=1, text="x"), message="Flood", retry_after=120)
+        )
+
+        with pytest.raises(TelegramRetryAfter):
+            await scheduler(transport, None, SendMessage(chat_id=1, text="first"))
+        assert scheduler.get_metrics()["paused_for"] > 100
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_heartbeat_is_dropped(self, scheduler):
+        scheduler.HEARTBEAT_TTL = 0
+        transport = FakeTransport()
+        transport.gate.clear()
+
+        busy = asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=1, text="busy")))
+        await asyncio.sleep(0)
+        stale = asyncio.create_task(
+            scheduler(transport, None, SendChatAction(chat_id=1, action="typing"))
+        )
+        await asyncio.sleep(0.01)
+        transport.gate.set()
+        await busy
+
+        with pytest.raises(SendDropped):
+            await stale
+        assert [type(m) for m in transport.sent] == [SendMessage]
+        assert scheduler.get_metrics()["dropped"] == 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_group_chat_bucket_limits_rate(self):
+        scheduler = TelegramSendScheduler(group_chat_rate=10, group_chat_burst=1)
+        transport = FakeTransport()
+
+        started = time.monotonic()
+        await asyncio.gather(*(
+            scheduler(transport, None, SendMessage(chat_id=-100, text=str(i)))
+            for i in range(3)
+        ))
+
+        # One token up front, then 10/s for the remaining two
+        assert time.monotonic() - started >= 0.18
+        assert [m.text for m in transport.sent] == ["0", "1", "2"]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_chats_are_pruned(self):
+        scheduler = TelegramSendScheduler(private_chat_rate=1000, private_chat_burst=1)
+        transport = FakeTransport()
+
+        await asyncio.gather(*(
+            scheduler(transport, None, SendMessage(chat_id=chat_id, text="hi"))
+            for chat_id in range(1, 101)
+        ))
+        await asyncio.sleep(0.01)  # Buckets refill at 1000/s
+        await scheduler(transport, None, SendMessage(chat_id=1, text="again"))
+
+        assert len(transport.sent) == 101
+        assert scheduler.get_metrics()["tracked_chats"] <= 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_numeric_string_chat_id_shares_the_chat_bucket(self, scheduler):
+        transport = FakeTransport()
+        transport.gate.clear()
+
+        sends = [
+            asyncio.create_task(scheduler(transport, None, SendMessage(chat_id=chat_id, text="x")))
+            for chat_id in (42, "42", "@channel")
+        ]
+        await asyncio.sleep(0)
+
+        assert set(scheduler._chats) == {42, "@channel"}
+        assert scheduler._chats[42].bucket.rate == 1000  # Private rate from the fixture
+        assert scheduler._chats["@channel"].bucket.rate == scheduler.GROUP_CHAT_RATE
+        transport.gate.set()
+        await asyncio.gather(*sends)
+        await scheduler.close()
@@ -0,0 +1,111 @@
+"""Unit tests for the chunked StreamBuffer used by StreamingHandler."""
+
+import random
+
+from presentation.handlers.streaming.buffer import StreamBuffer
+from presentation.handlers.streaming_ui import StreamingUIState
+
+
+def _buffer(block_size: int = 8) -> StreamBuffer:
+    buf = StreamBuffer()
+    buf.BLOCK_SIZE = block_size  # Small blocks so tests cross block boundaries
+    return buf
+
+
+class TestStreamBuffer:
+    """StreamBuffer must behave exactly like the str it replaces."""
+
+    def test_random_operations_match_str(self):
+        rnd = random.Random(0)
+        words = ["⏳ Читаю", "✅ Прочитано", "text ", "\n\n", "x" * 20, "🔧", "\n"]
+
+        for _ in range(50):
+            buf, ref = _buffer(rnd.choice([1, 8, 64])), ""
+            for _ in range(60):
+                op = rnd.random()
+                if op < 0.6:
+                    chunk = rnd.choice(words)
+                    buf.append(chunk)
+                    ref += chunk
+                elif op < 0.8:
+                    old, new = rnd.choice(words), rnd.choice(words)
+                    idx = ref.rfind(old)
+                    assert buf.replace_last(old, new) is (idx != -1)
+                    if idx != -1:
+                        ref = ref[:idx] + new + ref[idx + len(old):]
+                else:
+                    n = rnd.randint(0, len(ref) + 5)
+                    assert buf.tail(n) == ref[max(0, len(ref) - n):]
+                    assert buf.head(n) == ref[:n]
+                    assert buf.slice_from(n) == ref[n:]
+
+                assert len(buf) == len(ref)
+                assert buf.getvalue() == ref
+
+    def test_tail_start_prefers_paragraph_boundary(self):
+        buf = _buffer()
+        buf.append("first paragraph\n\nsecond paragraph\n\nthird")
+
+        start = buf.tail_start(20)
+
+        assert buf.slice_from(start) == "third"
+        assert buf.tail_start(1000) == 0
+
+    def test_tail_start_falls_back_to_hard_cut(self):
+        buf = _buffer()
+        buf.append("a" * 100)
+
+        assert buf.tail_start(30) == 70
+
+    def test_version_changes_on_every_mutation(self):
+        buf = StreamBuffer("text")
+        versions = {buf.version}
+
+        buf.append(" more")
+        versions.add(buf.version)
+        buf.replace_last("more", "less")
+        versions.add(buf.version)
+        buf.set("")
+        versions.add(buf.version)
+
+        assert len(versions) == 4
+
+
+class TestSyncFromBuffer:
+    """StreamingUIState.sync_from_buffer with a StreamBuffer source."""
+
+    def test_takes_only_unflushed_part(self):
+        buf = _buffer()
+        ui = StreamingUIState()
+        buf.append("intro text")
+        ui.sync_from_buffer(buf)
+        ui._flush_content_buffer()
+
+        buf.append(" and the rest")
+        ui.sync_from_buffer(buf)
+
+        assert ui._content_buffer == " and the rest"
+
+    def test_matches_str_source(self):
+        buf = _buffer()
+        buf.append("some streamed content\n\nwith paragraphs")
+        from_buffer, from_str = StreamingUIState(), StreamingUIState()
+
+        from_buffer.sync_from_buffer(buf)
+        from_str.sync_from_buffer(buf.getvalue())
+
+        assert from_buffer._content_buffer == from_str._content_buffer
+
+    def test_unchanged_buffer_is_not_resliced(self):
+        buf = _buffer()
+        ui = StreamingUIState()
+        buf.append("content")
+        ui.sync_from_buffer(buf)
+
+        ui._content_buffer = "edited"
+        ui.sync_from_buffer(buf)
+        assert ui._content_buffer == "edited"
+
+        buf.append("!")
+        ui.sync_from_buffer(buf)
+        assert ui._content_buffer == "content!"
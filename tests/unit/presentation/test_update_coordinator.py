@@ -0,0 +1,183 @@
+"""Unit tests for MessageUpdateCoordinator adaptive edit cadence."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText
+
+from presentation.handlers.state.update_coordinator import MessageUpdateCoordinator
+from presentation.middleware.send_scheduler import SendDropped, TelegramSendScheduler
+
+
+def _message(message_id: int = 1, chat_id: int = 100) -> Mock:
+    message = Mock()
+    message.message_id = message_id
+    message.chat.id = chat_id
+    message.edit_text = AsyncMock()
+    return message
+
+
+def _retry_after(seconds: int) -> TelegramRetryAfter:
+    method = EditMessageText(chat_id=100, message_id=1, text="x")
+    return TelegramRetryAfter(method=method, message="Flood", retry_after=seconds)
+
+
+@pytest.fixture
+def coordinator():
+    return MessageUpdateCoordinator(
+        Mock(), min_interval=0.5, max_interval=8.0, initial_interval=2.0
+    )
+
+
+class TestAdaptiveCadence:
+    """Tests for the per-chat AIMD update interval."""
+
+    @pytest.mark.asyncio
+    async def test_successful_edits_shorten_interval(self, coordinator):
+        message = _message()
+
+        for i in range(5):
+            await coordinator.update(message, f"text {i}", is_final=False)
+            coordinator._get_state(message).last_update_time = 0
+
+        cadence = coordinator.get_chat_cadence(100)
+        assert cadence["interval"] == pytest.approx(1.5)
+        assert cadence["successes"] == 5
+
+    @pytest.mark.asyncio
+    async def test_interval_never_drops_below_minimum(self, coordinator):
+        message = _message()
+
+        for i in range(50):
+            await coordinator.update(message, f"text {i}")
+            coordinator._get_state(message).last_update_time = 0
+
+        assert coordinator.get_chat_cadence(100)["interval"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_backs_off_multiplicatively(self, coordinator):
+        message = _message()
+        message.edit_text.side_effect = [_retry_after(0), None]
+
+        assert await coordinator.update(message, "text") is True
+
+        cadence = coordinator.get_chat_cadence(100)
+        assert cadence["interval"] == pytest.approx(4.0 - 0.1)
+        assert cadence["rate_limited"] == 1
+
+    def test_backoff_is_bounded_and_per_chat(self, coordinator):
+        for _ in range(10):
+            coordinator.on_rate_limited(100, 5)
+
+        stats = coordinator.get_cadence_stats()
+        assert stats[100]["interval"] == 8.0
+        assert stats[100]["rate_limited"] == 10
+        assert coordinator.get_chat_cadence(200)["interval"] == 2.0
+
+    def test_scheduler_feeds_rate_limits(self, coordinator):
+        scheduler = TelegramSendScheduler()
+        coordinator.attach_rate_limit_feed(scheduler)
+
+        for listener in scheduler._retry_after_listeners:
+            listener(100, 3)
+
+        assert coordinator.get_chat_cadence(100)["rate_limited"] == 1
+        assert coordinator.get_chat_cadence(100)["last_retry_after"] == 3
+
+    @pytest.mark.asyncio
+    async def test_dropped_heartbeat_is_not_recorded_as_sent(self, coordinator):
+        message = _message()
+        message.edit_text.side_effect = SendDropped("stale")
+
+        assert await coordinator.update(message, "⠋ (12с)") is False
+
+        state = coordinator._get_state(message)
+        assert not state.is_last_sent("⠋ (12с)")
+        assert coordinator.get_chat_cadence(100)["successes"] == 0
+
+    def test_zero_minimum_is_kept(self):
+        coordinator = MessageUpdateCoordinator(Mock(), min_interval=0, initial_interval=0)
+
+        assert coordinator.min_interval == 0
+        assert coordinator.initial_interval == 0
+        assert coordinator.max_interval == MessageUpdateCoordinator.MAX_UPDATE_INTERVAL
+
+    def test_large_messages_keep_a_size_floor(self, coordinator):
+        message = _message()
+        state = coordinator._get_state(message)
+        coordinator._get_cadence(100).interval = 0.5
+
+        assert coordinator._update_interval(state, "x" * 100) == 0.5
+        assert coordinator._update_interval(state, "x" * 3000) == 2.5
+        assert coordinator._update_interval(state, "x" * 4000) == 3.0
+
+
+class TestStateEviction:
+    """Tests for TTL/LRU eviction of per-message state."""
+
+    @pytest.mark.asyncio
+    async def test_lru_limit_evicts_oldest_idle_state(self):
+        coordinator = MessageUpdateCoordinator(Mock(), max_states=2)
+        first, second, third = _message(1), _message(2), _message(3)
+
+        await coordinator.update(first, "one")
+        await coordinator.update(second, "two")
+        await coordinator.update(third, "three")
+
+        assert list(coordinator._messages) == [2, 3]
+        assert coordinator.get_state_stats()["evicted_lru"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_keeps_states_with_pending_edits(self):
+        coordinator = MessageUpdateCoordinator(Mock(), max_states=2)
+        first, second, third = _message(1), _message(2), _message(3)
+
+        await coordinator.update(first, "one")
+        await coordinator.update(first, "one more")  # Schedules a delayed edit
+        task = coordinator._get_state(first).update_task
+        await coordinator.update(second, "two")
+        await coordinator.update(third, "three")
+        await asyncio.sleep(0)
+
+        assert list(coordinator._messages) == [1, 3]
+        assert not task.cancelled()
+        coordinator._get_state(first).cancel_task()
+
+    @pytest.mark.asyncio
+    async def test_finalized_states_expire_after_ttl(self, coordinator):
+        finished, active = _message(1), _message(2)
+        await coordinator.update(finished, "done", is_final=True)
+        await coordinator.update(active, "streaming")
+
+        now = time.monotonic()
+        coordinator._get_state(finished).last_access = now - coordinator.finalized_ttl
+        coordinator._get_state(active).last_access = now - coordinator.finalized_ttl
+        coordinator._last_sweep = 0
+        coordinator._get_state(_message(3))
+
+        assert 1 not in coordinator._messages
+        assert 2 in coordinator._messages
+        assert coordinator.get_state_stats()["evicted_ttl"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_check_uses_digest(self, coordinator):
+        message = _message()
+        await coordinator.update(message, "same text")
+        coordinator._get_state(message).last_update_time = 0
+
+        assert await coordinator.update(message, "same text") is False
+        assert message.edit_text.await_count == 1
+        assert not hasattr(coordinator._get_state(message), "last_sent_text")
+
+    @pytest.mark.asyncio
+    async def test_state_stats_gauge(self, coordinator):
+        await coordinator.update(_message(1), "x" * 100)
+        await coordinator.update(_message(2), "y" * 100, is_final=True)
+
+        stats = coordinator.get_state_stats()
+        assert stats["live_states"] == 2
+        assert stats["finalized"] == 1
+        assert stats["retained_bytes"] > 0